@@ -18,12 +18,14 @@ show_help() {
     echo "  prompts  - Solo prompts MCP"
     echo "  docs     - Solo documentación"
     echo "  clean    - Limpiar y regenerar todo"
+    echo "  watch    - Regenerar al cambiar especificación/plantillas"
     echo ""
     echo "Ejemplos:"
     echo "  ./generate.sh           # Flujo completo"
     echo "  ./generate.sh png       # Solo PNG"
     echo "  ./generate.sh drawio    # Solo DrawIO con plantillas"
     echo "  ./generate.sh clean     # Limpiar y regenerar"
+    echo "  ./generate.sh watch     # Modo watch"
 }
 
 # Activar entorno virtual si existe
@@ -54,17 +56,7 @@ generate_section() {
             ;;
         "drawio")
             echo "📐 Generando diagramas DrawIO con plantillas..."
-            python -c "
-from generators.template_drawio_generator import TemplateDrawIOGenerator
-import json
-
-with open('outputs/generated/bmc.json', 'r') as f:
-    config = json.load(f)
-
-gen = TemplateDrawIOGenerator('outputs')
-results = gen.generate_all_templates(config, 'bmc_input')
-print(f'✅ {len(results)} diagramas DrawIO generados')
-"
+            python run.py --target drawio:template
             ;;
         "prompts")
             echo "🎯 Generando prompts MCP..."
@@ -78,6 +70,10 @@ print(f'✅ {len(results)} diagramas DrawIO generados')
             echo "🧹 Limpiando y regenerando todo..."
             python run.py --clean all --run complete
             ;;
+        "watch")
+            echo "👀 Modo watch..."
+            python run.py --watch
+            ;;
         "help"|"-h"|"--help")
             show_help
             return
@@ -6,154 +6,229 @@ Limpieza, ejecución completa y por secciones
 
 import os
 import sys
+import glob
 import shutil
 import argparse
 from pathlib import Path
-import json
 import time
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+from core.logger import get_logger, setup_logging
+
+logger = get_logger("run")
+
 def clean_outputs(section=None):
     """Limpia archivos generados"""
     
     outputs_dir = Path("outputs")
     
     if section == "all" or section is None:
-        print("🧹 Limpiando todos los archivos generados...")
+        logger.info("🧹 Limpiando todos los archivos generados...")
         if outputs_dir.exists():
             shutil.rmtree(outputs_dir)
-        print("✅ Todos los archivos eliminados")
+        logger.info("✅ Todos los archivos eliminados")
         
     elif section == "png":
-        print("🧹 Limpiando diagramas PNG...")
+        logger.info("🧹 Limpiando diagramas PNG...")
         png_dir = outputs_dir / "png"
         if png_dir.exists():
             shutil.rmtree(png_dir)
-        print("✅ PNG eliminados")
+        logger.info("✅ PNG eliminados")
         
     elif section == "drawio":
-        print("🧹 Limpiando diagramas DrawIO...")
+        logger.info("🧹 Limpiando diagramas DrawIO...")
         drawio_dir = outputs_dir / "drawio"
         if drawio_dir.exists():
             shutil.rmtree(drawio_dir)
-        print("✅ DrawIO eliminados")
+        logger.info("✅ DrawIO eliminados")
         
     elif section == "docs":
-        print("🧹 Limpiando documentación...")
+        logger.info("🧹 Limpiando documentación...")
         docs_dir = outputs_dir / "documentation"
         if docs_dir.exists():
             shutil.rmtree(docs_dir)
-        print("✅ Documentación eliminada")
+        logger.info("✅ Documentación eliminada")
         
     elif section == "prompts":
-        print("🧹 Limpiando prompts MCP...")
+        logger.info("🧹 Limpiando prompts MCP...")
         prompts_dir = outputs_dir / "prompts"
         if prompts_dir.exists():
             shutil.rmtree(prompts_dir)
-        print("✅ Prompts eliminados")
+        logger.info("✅ Prompts eliminados")
         
     elif section == "config":
-        print("🧹 Limpiando configuración generada...")
+        logger.info("🧹 Limpiando configuración generada...")
         generated_dir = outputs_dir / "generated"
         if generated_dir.exists():
             shutil.rmtree(generated_dir)
-        print("✅ Configuración eliminada")
+        logger.info("✅ Configuración eliminada")
 
-def run_complete_workflow():
+def run_complete_workflow(parallel=False, workers=None, use_cache=True, profile=False, trace_memory=False):
     """Ejecuta el flujo completo"""
     
-    print("🚀 EJECUTANDO FLUJO COMPLETO BMC DIAGRAM GENERATOR")
-    print("=" * 60)
+    logger.info("🚀 EJECUTANDO FLUJO COMPLETO BMC DIAGRAM GENERATOR")
+    logger.info("=" * 60)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         from core.workflow_orchestrator import run_complete_workflow
-        results = run_complete_workflow('bmc_input')
+        results = run_complete_workflow('bmc_input', parallel=parallel, max_workers=workers,
+                                        use_cache=use_cache, profile=profile, trace_memory=trace_memory)
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         duration = end_time - start_time
         
-        print(f"\n🎉 FLUJO COMPLETO EXITOSO")
-        print(f"⏱️  Tiempo total: {duration:.1f}s")
-        print(f"📂 Archivos generados: {results['summary']['total_files']}")
+        logger.info("🎉 FLUJO COMPLETO EXITOSO")
+        logger.info("⏱️  Tiempo total: %.1fs", duration)
+        logger.info("📂 Archivos generados: %s", results['summary']['total_files'])
+        
+        for stage_name, stage_seconds in results.get('stage_timings', {}).items():
+            logger.info("   - %s: %.2fs", stage_name, stage_seconds)
+        
+        cache_hits = results.get('cache', {}).get('hits', [])
+        if cache_hits:
+            logger.info("♻️  Artefactos desde caché: %s", len(cache_hits))
+        
+        if results.get('trace_files'):
+            logger.info("🔍 Traza: %s", results['trace_files']['trace'])
         
         return results
         
     except Exception as e:
-        print(f"❌ Error en flujo completo: {e}")
+        logger.error("❌ Error en flujo completo: %s", e)
         return None
 
-def run_section(section):
-    """Ejecuta una sección específica"""
+# Secciones de run.py -> targets del pipeline
+SECTION_TARGETS = {
+    "config": ["config"],
+    "png": ["png"],
+    "drawio": ["drawio"],
+    "prompts": ["prompts"],
+    "docs": ["documentation"]
+}
+
+def run_targets(targets, parallel=False, workers=None, use_cache=True, profile=False, trace_memory=False):
+    """Ejecuta solo los nodos del pipeline necesarios para los targets"""
     
-    print(f"🎯 EJECUTANDO SECCIÓN: {section.upper()}")
-    print("=" * 40)
+    logger.info("🎯 EJECUTANDO TARGETS: %s", ', '.join(targets))
+    logger.info("=" * 40)
     
     try:
-        # Cargar configuración
-        config_path = Path("outputs/generated/bmc.json")
-        if not config_path.exists():
-            print("⚠️  Configuración no encontrada, generando...")
-            from core.dynamic_config_generator import generate_dynamic_config
-            generate_dynamic_config()
+        from core.workflow_orchestrator import run_workflow_targets
+        results = run_workflow_targets(targets, 'bmc_input', parallel=parallel, max_workers=workers,
+                                       use_cache=use_cache, profile=profile, trace_memory=trace_memory)
         
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        for node_name, node_seconds in results['stage_timings'].items():
+            status = "❌" if node_name in results['errors'] else "✅"
+            logger.info("%s %s: %.2fs", status, node_name, node_seconds)
         
-        if section == "config":
-            from core.dynamic_config_generator import generate_dynamic_config
-            result = generate_dynamic_config(force_regenerate=True)
-            print("✅ Configuración regenerada")
-            
-        elif section == "png":
-            from generators.diagram_generator import DiagramGenerator
-            gen = DiagramGenerator(config, 'outputs/png/bmc_input')
-            
-            png_types = ['network', 'microservices', 'security', 'data_flow']
-            for png_type in png_types:
-                result = gen.generate_diagram(png_type)
-                print(f"✅ {png_type}: {Path(result).name}")
-                
-        elif section == "drawio":
-            # DrawIO estático
-            from generators.universal_generator import UniversalGenerator
-            gen = UniversalGenerator('outputs')
-            result = gen.generate_drawio_xml(config)
-            print(f"✅ DrawIO estático: {Path(result).name}")
-            
-            # DrawIO dinámico
-            from generators.dynamic_drawio_generator import DynamicDrawIOGenerator
-            with open('config/bmc-input-specification.md', 'r') as f:
-                spec = f.read()
-            
-            dynamic_gen = DynamicDrawIOGenerator('outputs')
-            result = dynamic_gen.generate_dynamic_drawio(spec, 'bmc_input')
-            print(f"✅ DrawIO dinámico: {Path(result).name}")
-            
-        elif section == "prompts":
-            from generators.prompt_generator import MCPPromptGenerator
-            gen = MCPPromptGenerator(config, 'outputs/prompts')
-            results = gen.generate_prompts('bmc_input')
-            print(f"✅ Prompts generados: {len(results)} archivos")
-            
-        elif section == "docs":
-            from generators.doc_generator import ImplementationDocGenerator
-            gen = ImplementationDocGenerator(config, 'outputs/documentation')
-            results = gen.generate_implementation_docs('bmc_input')
-            print(f"✅ Documentos generados: {len(results)} archivos")
-            
-        else:
-            print(f"❌ Sección desconocida: {section}")
-            return False
-            
-        return True
+        for node_name in results['skipped']:
+            logger.info("⏭️  %s: omitido", node_name)
+        
+        if results['trace_files']:
+            logger.info("🔍 Traza: %s", results['trace_files']['trace'])
+        
+        return not results['errors'] and not results['skipped']
         
     except Exception as e:
-        print(f"❌ Error en sección {section}: {e}")
+        logger.error("❌ Error ejecutando targets %s: %s", targets, e)
+        return False
+
+def run_projects(spec_patterns, jobs=None, use_cache=True):
+    """Ejecuta el flujo completo para varias especificaciones en paralelo"""
+    
+    logger.info("📦 EJECUCIÓN BATCH MULTI-PROYECTO")
+    logger.info("=" * 60)
+    
+    # Expandir patrones que el shell no expandió (p.ej. entre comillas)
+    spec_files = []
+    for pattern in spec_patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        spec_files.extend(match for match in matches if match not in spec_files)
+    
+    if not spec_files:
+        logger.error("❌ No se encontraron especificaciones")
+        return None
+    
+    from core.batch_runner import run_batch
+    summary = run_batch(spec_files, jobs=jobs, use_cache=use_cache)
+    
+    logger.info("📊 %s/%s proyectos OK en %.1fs",
+                summary['succeeded'], summary['total_projects'], summary['duration_seconds'])
+    if summary['failed']:
+        logger.error("❌ Fallidos: %s", ', '.join(summary['failed']))
+    logger.info("📄 Resumen: %s", summary['summary_path'])
+    
+    return summary
+
+def run_validation(directory, jobs=None, use_cache=True):
+    """Valida en paralelo todos los DrawIO de un directorio (reporte JSON + JUnit)"""
+    
+    logger.info("🔍 VALIDACIÓN MASIVA DRAWIO")
+    logger.info("=" * 40)
+    
+    if not Path(directory).is_dir():
+        logger.error("❌ Directorio no encontrado: %s", directory)
+        return None
+    
+    from validators.bulk_validator import validate_tree
+    summary = validate_tree(directory, jobs=jobs, use_cache=use_cache)
+    
+    logger.info("📊 %s/%s archivos válidos en %.1fs (%s desde caché)",
+                summary['passed'], summary['total_files'], summary['duration_seconds'], summary['cached'])
+    for file_result in summary['files']:
+        if file_result['status'] != 'passed':
+            logger.error("❌ %s: %s", file_result['file'], '; '.join(file_result['errors'][:3]))
+    logger.info("📄 Reportes: %s, %s", summary['report_paths']['json'], summary['report_paths']['junit'])
+    
+    return summary
+
+def run_section(section, parallel=False, workers=None, use_cache=True, profile=False, trace_memory=False):
+    """Ejecuta una sección específica"""
+    
+    if section not in SECTION_TARGETS:
+        logger.error("❌ Sección desconocida: %s", section)
         return False
+    
+    if section == "config":
+        try:
+            from core.dynamic_config_generator import generate_dynamic_config
+            generate_dynamic_config(force_regenerate=True)
+            logger.info("✅ Configuración regenerada")
+        except Exception as e:
+            logger.error("❌ Error en sección %s: %s", section, e)
+            return False
+    
+    return run_targets(SECTION_TARGETS[section], parallel=parallel, workers=workers, use_cache=use_cache,
+                       profile=profile, trace_memory=trace_memory)
+
+def run_watch(parallel=False, workers=None, use_cache=True, debounce=1.0):
+    """Regenera artefactos al cambiar especificación, esquema o plantillas"""
+    
+    logger.info("👀 MODO WATCH BMC DIAGRAM GENERATOR")
+    logger.info("=" * 40)
+    
+    from core.workflow_orchestrator import WorkflowOrchestrator
+    from core.watcher import WorkflowWatcher
+    
+    orchestrator = WorkflowOrchestrator('bmc_input', parallel=parallel, max_workers=workers,
+                                        use_cache=use_cache)
+    WorkflowWatcher(orchestrator, debounce=debounce).watch()
+
+def list_targets():
+    """Lista los nodos del pipeline y sus dependencias"""
+    
+    from core.workflow_orchestrator import WorkflowOrchestrator
+    engine = WorkflowOrchestrator('bmc_input', use_cache=False).build_pipeline()
+    
+    print("🧩 TARGETS DISPONIBLES")
+    print("=" * 40)
+    for node in engine.describe():
+        inputs = ", ".join(node['inputs']) or "-"
+        print(f"  {node['name']:<18} <- {inputs:<40} {node['description']}")
 
 def show_status():
     """Muestra el estado actual del sistema"""
@@ -202,9 +277,20 @@ def main():
 Ejemplos de uso:
   python run.py --clean all              # Limpiar todo
   python run.py --run complete           # Ejecutar flujo completo
+  python run.py --run complete --parallel --workers 4  # Etapas en paralelo
+  python run.py --run complete --no-cache               # Ignorar caché incremental
+  python run.py --run complete --profile --trace-memory  # cProfile/tracemalloc por etapa
   python run.py --run png                # Solo generar PNG
+  python run.py --target png:network     # Solo un nodo y sus dependencias
+  python run.py --list-targets           # Ver nodos del pipeline
+  python run.py --watch                  # Regenerar al editar la especificación
+  python run.py --projects specs/*.md --jobs 8         # Varios proyectos en paralelo
+  python run.py --validate --jobs 8                    # Validar outputs/drawio (JSON + JUnit)
   python run.py --clean png --run png    # Limpiar y regenerar PNG
   python run.py --status                 # Ver estado actual
+  python run.py --run complete --quiet   # Solo errores
+  LOG_FORMAT=json python run.py --run complete         # Logs estructurados
+  python run.py --run drawio --compressed              # DrawIO comprimido (más livianos)
         """
     )
     
@@ -214,9 +300,57 @@ Ejemplos de uso:
     parser.add_argument('--run', choices=['complete', 'config', 'png', 'drawio', 'prompts', 'docs'],
                        help='Ejecutar generación')
     
+    parser.add_argument('--target', nargs='+',
+                       help='Ejecutar nodos del pipeline (p.ej. png:network, drawio, html_report)')
+    
+    parser.add_argument('--list-targets', action='store_true',
+                       help='Listar nodos del pipeline')
+    
+    parser.add_argument('--profile', action='store_true',
+                       help='Capturar cProfile por etapa (outputs/generated/profiles)')
+    
+    parser.add_argument('--trace-memory', action='store_true',
+                       help='Registrar memoria por etapa con tracemalloc')
+    
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default=None,
+                       help='Nivel de log (default: variable LOG_LEVEL o INFO)')
+    
+    parser.add_argument('--log-json', action='store_true',
+                       help='Logs en JSON, una línea por mensaje (o LOG_FORMAT=json)')
+    
+    parser.add_argument('--quiet', action='store_true',
+                       help='Solo errores; omite el formateo de mensajes informativos')
+    
+    parser.add_argument('--projects', nargs='+',
+                       help='Especificaciones a procesar en batch (un proyecto por archivo)')
+    
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Procesos para --projects y --validate (default: número de CPUs)')
+    
+    parser.add_argument('--validate', nargs='?', const='outputs/drawio', default=None, metavar='DIR',
+                       help='Validar en paralelo los .drawio del directorio (default: outputs/drawio)')
+    
+    parser.add_argument('--watch', action='store_true',
+                       help='Observar especificación, esquema y plantillas y regenerar lo afectado')
+    
+    parser.add_argument('--debounce', type=float, default=None,
+                       help='Segundos sin cambios antes de regenerar en modo watch (default 1.0)')
+    
     parser.add_argument('--status', action='store_true',
                        help='Mostrar estado actual')
     
+    parser.add_argument('--parallel', action='store_true',
+                       help='Ejecutar nodos independientes en paralelo')
+    
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Número de workers para ejecución paralela y render PNG')
+    
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Regenerar todos los artefactos ignorando la caché incremental')
+    
+    parser.add_argument('--compressed', action='store_true',
+                       help='DrawIO comprimido (deflate + base64, formato nativo; o DRAWIO_COMPRESSED=true)')
+    
     args = parser.parse_args()
     
     # Si no hay argumentos, mostrar ayuda
@@ -224,18 +358,50 @@ Ejemplos de uso:
         parser.print_help()
         return
     
+    setup_logging(level=args.log_level, json_output=args.log_json or None, quiet=args.quiet)
+    
+    if args.compressed:
+        # Por variable de entorno para que la hereden los procesos de --projects
+        os.environ["DRAWIO_COMPRESSED"] = "true"
+    
     # Ejecutar acciones
     if args.clean:
         clean_outputs(args.clean)
     
     if args.run:
         if args.run == 'complete':
-            run_complete_workflow()
+            run_complete_workflow(parallel=args.parallel, workers=args.workers,
+                                  use_cache=not args.no_cache, profile=args.profile,
+                                  trace_memory=args.trace_memory)
         else:
-            run_section(args.run)
+            run_section(args.run, parallel=args.parallel, workers=args.workers,
+                        use_cache=not args.no_cache, profile=args.profile,
+                        trace_memory=args.trace_memory)
+    
+    if args.projects:
+        summary = run_projects(args.projects, jobs=args.jobs, use_cache=not args.no_cache)
+        if summary is None or summary['failed']:
+            sys.exit(1)
+    
+    if args.validate:
+        summary = run_validation(args.validate, jobs=args.jobs, use_cache=not args.no_cache)
+        if summary is None or summary['failed']:
+            sys.exit(1)
+    
+    if args.target:
+        run_targets(args.target, parallel=args.parallel, workers=args.workers,
+                    use_cache=not args.no_cache, profile=args.profile,
+                    trace_memory=args.trace_memory)
+    
+    if args.list_targets:
+        list_targets()
     
     if args.status:
         show_status()
+    
+    if args.watch:
+        run_watch(parallel=args.parallel, workers=args.workers, use_cache=not args.no_cache,
+                  debounce=args.debounce if args.debounce is not None else 1.0)
 
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ Diagram API - API REST para generación de diagramas PNG y DrawIO
 
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
+import os
 import json
 import tempfile
 from pathlib import Path
@@ -12,7 +13,7 @@ from typing import Dict, Any
 import traceback
 
 from ..core.universal_schema import UniversalDiagramSchema, DiagramType, OutputFormat, SchemaBuilder
-from ..generators.universal_generator import UniversalGenerator
+from ..core.logger import setup_logging
 
 app = Flask(__name__)
 CORS(app)
@@ -21,7 +22,29 @@ CORS(app)
 OUTPUT_DIR = Path("outputs/api")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-generator = UniversalGenerator(str(OUTPUT_DIR))
+_generator = None
+_lint_engine = None
+
+def get_generator():
+    """Generador universal, creado en la primera petición que lo necesita"""
+    global _generator
+    
+    if _generator is None:
+        from ..generators.universal_generator import UniversalGenerator
+        _generator = UniversalGenerator(str(OUTPUT_DIR))
+    
+    return _generator
+
+def get_lint_engine():
+    """Motor de reglas de /validate; LINT_IGNORE desactiva reglas (p.ej. "canvas.*,connections.dangling")"""
+    global _lint_engine
+    
+    if _lint_engine is None:
+        from ..validators.diagram_rules import RULES, API_RULES, RuleEngine
+        ignore = [pattern.strip() for pattern in os.environ.get("LINT_IGNORE", "").split(",") if pattern.strip()]
+        _lint_engine = RuleEngine(RULES, select=API_RULES, ignore=ignore)
+    
+    return _lint_engine
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -65,7 +88,7 @@ def generate_diagram():
         schema = UniversalDiagramSchema.from_dict(data)
         
         # Generar diagramas
-        results = generator.generate(schema)
+        results = get_generator().generate(schema)
         
         # Preparar respuesta
         response = {
@@ -167,36 +190,16 @@ def validate_schema():
         # Intentar crear esquema
         schema = UniversalDiagramSchema.from_dict(data)
         
-        # Validaciones adicionales
-        errors = []
-        warnings = []
-        
-        # Validar componentes
-        if not schema.components and not schema.containers:
-            errors.append("Debe tener al menos un componente o contenedor")
-        
-        # Validar conexiones
-        all_component_ids = set()
-        for comp in schema.components:
-            all_component_ids.add(comp.id)
-        for cont in schema.containers:
-            for comp in cont.components:
-                all_component_ids.add(comp.id)
-        
-        for conn in schema.connections:
-            if conn.from_id not in all_component_ids:
-                errors.append(f"Conexión desde componente inexistente: {conn.from_id}")
-            if conn.to_id not in all_component_ids:
-                errors.append(f"Conexión hacia componente inexistente: {conn.to_id}")
-        
-        # Validar canvas
-        if schema.canvas.width < 800 or schema.canvas.height < 600:
-            warnings.append("Canvas muy pequeño, recomendado mínimo 800x600")
+        # Reglas de lint (API_RULES menos las desactivadas con LINT_IGNORE)
+        from ..validators.diagram_index import DiagramIndex
+        report = get_lint_engine().run(DiagramIndex.from_schema(schema))
         
         return jsonify({
-            "valid": len(errors) == 0,
-            "errors": errors,
-            "warnings": warnings,
+            "valid": report.valid,
+            "errors": report.errors,
+            "warnings": report.warnings,
+            "issues": [issue.to_dict() for issue in report.issues],
+            "rule_timings_ms": report.to_dict()["timings_ms"],
             "schema_summary": {
                 "components": len(schema.components),
                 "containers": len(schema.containers),
@@ -212,6 +215,28 @@ def validate_schema():
             "warnings": []
         }), 400
 
+@app.route('/api/v1/diagrams/rules', methods=['GET'])
+def list_rules():
+    """Reglas de lint, si están activas en /validate y su tiempo acumulado"""
+    
+    engine = get_lint_engine()
+    active = {rule.id for rule in engine.rules}
+    timings = engine.timing_summary()
+    
+    return jsonify({
+        "rules": [
+            {
+                "id": rule.id,
+                "severity": rule.severity.value,
+                "description": rule.description,
+                "requires": sorted(rule.requires),
+                "active": rule.id in active,
+                "timing": timings.get(rule.id)
+            }
+            for rule in engine.registry
+        ]
+    }), 200
+
 @app.route('/api/v1/diagrams/batch', methods=['POST'])
 def generate_batch():
     """
@@ -240,7 +265,7 @@ def generate_batch():
         for i, schema_data in enumerate(schemas_data):
             try:
                 schema = UniversalDiagramSchema.from_dict(schema_data)
-                generated_files = generator.generate(schema)
+                generated_files = get_generator().generate(schema)
                 
                 results.append({
                     "index": i,
@@ -285,4 +310,5 @@ def internal_error(error):
     return jsonify({"error": "Error interno del servidor"}), 500
 
 if __name__ == '__main__':
+    setup_logging()
     app.run(debug=True, host='0.0.0.0', port=5000)
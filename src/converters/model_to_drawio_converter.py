@@ -5,15 +5,18 @@ Model to DrawIO Converter - Convierte JSON/YAML a DrawIO XML
 
 import json
 import yaml
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Union
+from typing import Dict, Any, List, Tuple, Union
+
+from layouts.edge_router import EdgeRouter
+from core.mxgraph_writer import MxGraphWriter
 
 class ModelToDrawIOConverter:
     """Conversor de modelos a DrawIO XML"""
     
     def __init__(self):
+        self.edge_router = EdgeRouter()
         self.aws_shapes = {
             "compute": {
                 "fargate": "mxgraph.aws4.fargate",
@@ -65,126 +68,111 @@ class ModelToDrawIOConverter:
     def _convert_model_to_drawio(self, data: Dict[str, Any], output_file: str) -> str:
         """Convierte modelo a DrawIO XML"""
         
-        # Crear estructura XML DrawIO
-        mxfile = ET.Element("mxfile", host="app.diagrams.net")
-        diagram = ET.SubElement(mxfile, "diagram", 
-                               name=data.get("title", "Architecture"), 
-                               id="model")
+        # Ruta de salida
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if not output_file.endswith('.drawio'):
+            output_file += '.drawio'
         
+        output_path = Path("outputs/mcp/diagrams") / "converted" / f"{output_file}_{timestamp}"
+        
+        # Las celdas se escriben al archivo a medida que se generan
         canvas = data.get("canvas", {"width": 1600, "height": 900})
-        model = ET.SubElement(diagram, "mxGraphModel", 
-                             dx=str(canvas["width"]), 
-                             dy=str(canvas["height"]), 
-                             grid="1", gridSize="10")
-        root = ET.SubElement(model, "root")
+        with MxGraphWriter.open(output_path) as writer:
+            writer.start_file()
+            writer.start_diagram(data.get("title", "Architecture"), "model",
+                                 dx=canvas["width"], dy=canvas["height"])
+            self._write_cells(writer, data)
         
-        # Celdas base
-        ET.SubElement(root, "mxCell", id="0")
-        ET.SubElement(root, "mxCell", id="1", parent="0")
+        return str(output_path)
+    
+    def _write_cells(self, writer: MxGraphWriter, data: Dict[str, Any]) -> None:
+        """Título, componentes, contenedores y conexiones del modelo"""
         
         cell_id = 2
         
         # Título
         if "title" in data:
-            title = ET.SubElement(root, "mxCell",
-                id=str(cell_id),
-                value=data["title"],
-                style="rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
-                vertex="1", parent="1"
-            )
-            ET.SubElement(title, "mxGeometry", x="50", y="20", width="1500", height="50", **{"as": "geometry"})
+            writer.vertex(cell_id, data["title"],
+                          "rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
+                          50, 20, 1500, 50)
             cell_id += 1
         
         # Procesar componentes
         component_ids = {}
+        boxes = {}
         if "components" in data:
             for component in data["components"]:
-                comp_id = self._create_component_from_model(root, component, cell_id, "1")
-                component_ids[component.get("id", f"comp_{cell_id}")] = comp_id
+                comp_id = self._create_component_from_model(writer, component, cell_id, "1")
+                key = component.get("id", f"comp_{cell_id}")
+                component_ids[key] = comp_id
+                boxes[key] = self._absolute_box(component, 0, 0)
                 cell_id = comp_id + 1
         
         # Procesar contenedores/clusters
         if "containers" in data:
             for container in data["containers"]:
-                container_id = self._create_container_from_model(root, container, cell_id, "1")
+                container_id = self._create_container_from_model(writer, container, cell_id, "1")
+                geometry = container.get("geometry", {"x": 100, "y": 100})
                 
-                # Procesar componentes dentro del contenedor
+                # Procesar componentes dentro del contenedor (posición relativa)
                 if "components" in container:
                     for component in container["components"]:
-                        comp_id = self._create_component_from_model(root, component, cell_id + 1, str(container_id))
-                        component_ids[component.get("id", f"comp_{cell_id + 1}")] = comp_id
+                        comp_id = self._create_component_from_model(writer, component, cell_id + 1, str(container_id))
+                        key = component.get("id", f"comp_{cell_id + 1}")
+                        component_ids[key] = comp_id
+                        boxes[key] = self._absolute_box(component, geometry["x"], geometry["y"])
                         cell_id = comp_id + 1
                 
                 cell_id = container_id + 1
         
         # Procesar conexiones
         if "connections" in data:
+            routes = self.edge_router.route_all(boxes, (
+                ((c.get("from"), c.get("to")), c.get("from"), c.get("to")) for c in data["connections"]
+            ))
             for connection in data["connections"]:
-                self._create_connection_from_model(root, connection, component_ids, cell_id)
+                points = routes[(connection.get("from"), connection.get("to"))]
+                self._create_connection_from_model(writer, connection, component_ids, cell_id, points)
                 cell_id += 1
-        
-        # Guardar archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if not output_file.endswith('.drawio'):
-            output_file += '.drawio'
-        
-        output_path = Path("outputs/mcp/diagrams") / "converted" / f"{output_file}_{timestamp}"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        ET.indent(mxfile, space="  ")
-        xml_str = ET.tostring(mxfile, encoding='unicode', xml_declaration=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(xml_str)
-        
-        return str(output_path)
     
-    def _create_component_from_model(self, root, component: Dict[str, Any], cell_id: int, parent_id: str) -> int:
+    def _create_component_from_model(self, writer: MxGraphWriter, component: Dict[str, Any], cell_id: int,
+                                     parent_id: str) -> int:
         """Crea componente desde modelo"""
         
         # Determinar tipo AWS
         comp_type = component.get("type", "generic")
         aws_shape = self._get_aws_shape(comp_type)
         
-        # Crear componente
-        comp = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=component.get("label", component.get("name", "Component")),
-            style=self._get_component_style(aws_shape),
-            vertex="1", parent=parent_id
-        )
-        
         # Posición y tamaño
         position = component.get("position", {"x": 100, "y": 100})
         size = component.get("size", {"width": 100, "height": 100})
         
-        ET.SubElement(comp, "mxGeometry", 
-                     x=str(position["x"]), y=str(position["y"]), 
-                     width=str(size["width"]), height=str(size["height"]), 
-                     **{"as": "geometry"})
-        
+        writer.vertex(cell_id, component.get("label", component.get("name", "Component")),
+                      self._get_component_style(aws_shape),
+                      position["x"], position["y"], size["width"], size["height"], parent=parent_id)
         return cell_id
     
-    def _create_container_from_model(self, root, container: Dict[str, Any], cell_id: int, parent_id: str) -> int:
+    def _create_container_from_model(self, writer: MxGraphWriter, container: Dict[str, Any], cell_id: int,
+                                     parent_id: str) -> int:
         """Crea contenedor desde modelo"""
         
-        cont = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=container.get("label", container.get("name", "Container")),
-            style="fillColor=#E3F2FD;strokeColor=#1976D2;dashed=1;verticalAlign=top;fontStyle=1;fontColor=#1976D2;whiteSpace=wrap;html=1;fontSize=12;",
-            vertex="1", parent=parent_id
-        )
-        
         # Geometría del contenedor
         geometry = container.get("geometry", {"x": 100, "y": 100, "width": 400, "height": 300})
-        ET.SubElement(cont, "mxGeometry", 
-                     x=str(geometry["x"]), y=str(geometry["y"]), 
-                     width=str(geometry["width"]), height=str(geometry["height"]), 
-                     **{"as": "geometry"})
-        
+        writer.vertex(cell_id, container.get("label", container.get("name", "Container")),
+                      "fillColor=#E3F2FD;strokeColor=#1976D2;dashed=1;verticalAlign=top;fontStyle=1;fontColor=#1976D2;whiteSpace=wrap;html=1;fontSize=12;",
+                      geometry["x"], geometry["y"], geometry["width"], geometry["height"], parent=parent_id)
         return cell_id
     
-    def _create_connection_from_model(self, root, connection: Dict[str, Any], component_ids: Dict[str, int], cell_id: int):
+    def _absolute_box(self, component: Dict[str, Any], offset_x: int, offset_y: int) -> Tuple[int, int, int, int]:
+        """Caja del componente en coordenadas absolutas (mismos defaults que el XML)"""
+        
+        position = component.get("position", {"x": 100, "y": 100})
+        size = component.get("size", {"width": 100, "height": 100})
+        return offset_x + position["x"], offset_y + position["y"], size["width"], size["height"]
+    
+    def _create_connection_from_model(self, writer: MxGraphWriter, connection: Dict[str, Any],
+                                      component_ids: Dict[str, int], cell_id: int,
+                                      points: List[Tuple[int, int]] = ()):
         """Crea conexión desde modelo"""
         
         from_id = component_ids.get(connection.get("from"))
@@ -195,14 +183,9 @@ class ModelToDrawIOConverter:
             color = style.get("color", "#232F3E")
             width = style.get("width", 2)
             
-            edge = ET.SubElement(root, "mxCell",
-                id=str(cell_id),
-                value=connection.get("label", ""),
-                style=f"endArrow=classic;html=1;rounded=0;strokeColor={color};strokeWidth={width};",
-                edge="1", parent="1", 
-                source=str(from_id), target=str(to_id)
-            )
-            ET.SubElement(edge, "mxGeometry", width="50", height="50", relative="1", **{"as": "geometry"})
+            writer.edge(cell_id, f"endArrow=classic;html=1;rounded=0;strokeColor={color};strokeWidth={width};",
+                        from_id, to_id, value=connection.get("label", ""), points=points or None,
+                        geometry={"width": "50", "height": "50"})
     
     def _get_aws_shape(self, comp_type: str) -> str:
         """Obtiene shape AWS para tipo de componente"""
@@ -7,7 +7,11 @@ import os
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
 
 @dataclass
 class AppPaths:
@@ -84,16 +88,29 @@ class AppPaths:
         )
 
 class AppConfig:
-    """Configuración transversal de la aplicación"""
+    """Configuración transversal de la aplicación
     
-    def __init__(self, root_path: str = None):
+    La instancia global sirve al flujo de un solo proyecto. Para ejecutar
+    varios proyectos a la vez se crea una instancia por proyecto con su
+    propia especificación y directorio outputs/generated/<proyecto>.
+    """
+    
+    def __init__(self, root_path: str = None, spec_file: str = None, project_name: str = None):
         self.paths = AppPaths.from_root(root_path)
         self._config_cache = {}
         
+        if project_name:
+            generated_dir = self.paths.outputs_generated_dir / project_name
+            generated_dir.mkdir(exist_ok=True)
+            self.paths = replace(self.paths, outputs_generated_dir=generated_dir)
+        
+        self.spec_file = Path(spec_file) if spec_file else self.paths.config_dir / "bmc-input-specification.md"
+
         # Variables de entorno
         self.env = {
             "DEBUG": os.getenv("DEBUG", "false").lower() == "true",
             "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
+            "LOG_FORMAT": os.getenv("LOG_FORMAT", "text"),  # text, json
             "OUTPUT_FORMAT": os.getenv("OUTPUT_FORMAT", "both"),  # png, drawio, both
             "AWS_REGION": os.getenv("AWS_REGION", "us-east-1"),
             "PROJECT_NAME": os.getenv("PROJECT_NAME", "mcp_diagrams")
@@ -109,11 +126,11 @@ class AppConfig:
         if config_name == "bmc":
             try:
                 from .dynamic_config_generator import generate_dynamic_config
-                config = generate_dynamic_config()
+                config = generate_dynamic_config(config=self)
                 self._config_cache[config_name] = config
                 return config
             except Exception as e:
-                print(f"⚠️ Error generando configuración dinámica: {e}")
+                logger.warning("⚠️ Error generando configuración dinámica: %s", e)
                 # Fallback a configuración por defecto
                 pass
         
@@ -138,7 +155,7 @@ class AppConfig:
                     self._config_cache[config_name] = config
                     return config
                 except Exception as e:
-                    print(f"⚠️ Error cargando {config_path}: {e}")
+                    logger.warning("⚠️ Error cargando %s: %s", config_path, e)
         
         # Configuración por defecto
         default_config = self._get_default_config(config_name)
@@ -166,6 +183,14 @@ class AppConfig:
         
         return str(config_path)
     
+    def clear_cache(self, config_name: str = None) -> None:
+        """Descarta configuraciones cacheadas para releerlas de disco"""
+        
+        if config_name is None:
+            self._config_cache.clear()
+        else:
+            self._config_cache.pop(config_name, None)
+    
     def get_output_path(self, file_type: str, filename: str, 
                        project_name: str = None) -> Path:
         """Obtiene ruta de salida para tipo de archivo"""
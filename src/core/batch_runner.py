@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Batch Runner - Ejecución del flujo completo para varios proyectos
+"""
+
+import re
+import io
+import json
+import time
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from .app_config import AppConfig, app_config
+from .logger import get_logger, capture_logs
+
+logger = get_logger(__name__)
+
+def project_name_from_spec(spec_file: str) -> str:
+    """Nombre de proyecto a partir del archivo de especificación"""
+    
+    name = Path(spec_file).stem
+    name = re.sub(r"[-_.]?(input[-_.])?specification$", "", name, flags=re.IGNORECASE) or name
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "project"
+
+def run_project(spec_file: str, project_name: str, root_path: Optional[str] = None,
+                use_cache: bool = True, log_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Ejecuta el flujo completo de un proyecto con su propio AppConfig
+    
+    Pensado para ejecutarse en un proceso worker: los logs del flujo se
+    guardan en un log por proyecto y los errores se retornan, no se lanzan.
+    """
+    
+    from .workflow_orchestrator import WorkflowOrchestrator
+    
+    start = time.perf_counter()
+    output = io.StringIO()
+    summary = {"project": project_name, "spec": str(spec_file), "status": "failed"}
+    
+    try:
+        if not Path(spec_file).exists():
+            raise FileNotFoundError(f"Especificación no encontrada: {spec_file}")
+        
+        # Logs propios y salida de librerías externas van al log del proyecto
+        with capture_logs(output), redirect_stdout(output), redirect_stderr(output):
+            config = AppConfig(root_path, spec_file=spec_file, project_name=project_name)
+            orchestrator = WorkflowOrchestrator(project_name, use_cache=use_cache, app_config=config)
+            results = orchestrator.execute_complete_workflow()
+        
+        summary.update({
+            "status": "ok",
+            "files": results["summary"]["total_files"],
+            "node_errors": dict(orchestrator.engine.errors)
+        })
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    
+    summary["duration_seconds"] = round(time.perf_counter() - start, 2)
+    
+    if log_dir:
+        log_path = Path(log_dir) / f"{project_name}.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.write_text(output.getvalue(), encoding='utf-8')
+        summary["log"] = str(log_path)
+    
+    return summary
+
+def run_batch(spec_files: List[str], jobs: Optional[int] = None, use_cache: bool = True,
+              root_path: Optional[str] = None) -> Dict[str, Any]:
+    """Ejecuta un orquestador por especificación en un pool de procesos"""
+    
+    paths = AppConfig(root_path).paths if root_path else app_config.paths
+    log_dir = paths.outputs_dir / "batch" / "logs"
+    
+    projects = {}
+    for spec_file in spec_files:
+        name = project_name_from_spec(spec_file)
+        # Nombres repetidos (misma especificación en otra carpeta) se desambiguan
+        unique_name, suffix = name, 2
+        while unique_name in projects:
+            unique_name, suffix = f"{name}_{suffix}", suffix + 1
+        projects[unique_name] = str(spec_file)
+    
+    jobs = max(1, min(jobs or multiprocessing.cpu_count(), len(projects) or 1))
+    logger.info("📦 Ejecutando %s proyectos con %s procesos", len(projects), jobs)
+    
+    start = time.perf_counter()
+    project_results = []
+    
+    if jobs == 1:
+        for name, spec_file in projects.items():
+            project_results.append(run_project(spec_file, name, root_path, use_cache, str(log_dir)))
+            _print_project(project_results[-1])
+    else:
+        # spawn: cada proyecto arranca en un intérprete limpio, sin estado global heredado
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {
+                name: executor.submit(run_project, spec_file, name, root_path, use_cache, str(log_dir))
+                for name, spec_file in projects.items()
+            }
+            
+            for name, future in futures.items():
+                try:
+                    project_results.append(future.result())
+                except Exception as e:
+                    # El worker murió (p.ej. sin memoria): se registra igual
+                    project_results.append({"project": name, "spec": projects[name], "status": "failed",
+                                            "error": f"{type(e).__name__}: {e}", "duration_seconds": None})
+                _print_project(project_results[-1])
+    
+    failed = [result["project"] for result in project_results if result["status"] != "ok"]
+    
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "jobs": jobs,
+        "total_projects": len(project_results),
+        "succeeded": len(project_results) - len(failed),
+        "failed": failed,
+        "duration_seconds": round(time.perf_counter() - start, 2),
+        "projects": project_results
+    }
+    
+    summary_path = paths.outputs_dir / "batch" / "batch_summary.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    summary["summary_path"] = str(summary_path)
+    
+    return summary
+
+def _print_project(result: Dict[str, Any]) -> None:
+    """Línea de progreso por proyecto"""
+    
+    if result["status"] == "ok":
+        logger.info("✅ %s: %s archivos en %.1fs", result['project'], result['files'], result['duration_seconds'])
+    else:
+        logger.error("❌ %s: %s", result['project'], result.get('error'))
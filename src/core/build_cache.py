@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Build Cache - Caché incremental de artefactos direccionada por contenido
+"""
+
+import ast
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+class BuildCache:
+    """Manifiesto de hashes de entrada por artefacto generado
+    
+    Cada artefacto se identifica por nombre (p.ej. "prompts", "png:network").
+    Su clave es el hash de sus entradas (subárbol de configuración) más el
+    contenido de los módulos que lo generan, de modo que cambiar el código
+    del generador también invalida el artefacto.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, manifest_path: Path, enabled: bool = True):
+        self.manifest_path = Path(manifest_path)
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+        self._lock = threading.Lock()
+        self._source_digests = {}
+        self._imports = {}
+        self._entries = self._load_manifest()
+    
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Carga manifiesto existente o retorna uno vacío"""
+        
+        if not self.enabled or not self.manifest_path.exists():
+            return {}
+        
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        
+        if manifest.get("version") != self.VERSION:
+            return {}
+        
+        return manifest.get("artifacts", {})
+    
+    def compute_key(self, inputs: Any, sources: List[Path] = None) -> str:
+        """Calcula clave SHA-256 de entradas y fuentes del generador"""
+        
+        digest = hashlib.sha256()
+        digest.update(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8'))
+        
+        for source in sources or []:
+            digest.update(self._source_digest(Path(source)).encode('utf-8'))
+        
+        return digest.hexdigest()
+    
+    def _source_digest(self, source: Path) -> str:
+        """Hash del contenido de un archivo fuente (memoizado por proceso)"""
+        
+        key = str(source)
+        if key not in self._source_digests:
+            try:
+                self._source_digests[key] = hashlib.sha256(source.read_bytes()).hexdigest()
+            except OSError:
+                self._source_digests[key] = "missing"
+        
+        return self._source_digests[key]
+    
+    def lookup(self, artifact: str, key: str) -> Optional[Dict[str, str]]:
+        """Retorna salidas cacheadas si la clave coincide y los archivos existen"""
+        
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(artifact)
+        
+        if entry and entry.get("key") == key:
+            outputs = entry.get("outputs", {})
+            if all(Path(path).exists() for path in outputs.values()):
+                with self._lock:
+                    self.hits.append(artifact)
+                return dict(outputs)
+        
+        with self._lock:
+            self.misses.append(artifact)
+        return None
+    
+    def store(self, artifact: str, key: str, outputs: Dict[str, str]) -> None:
+        """Registra salidas de un artefacto recién generado"""
+        
+        if not self.enabled or not outputs:
+            return
+        
+        with self._lock:
+            self._entries[artifact] = {"key": key, "outputs": dict(outputs)}
+    
+    def invalidate(self, artifact: str = None) -> None:
+        """Invalida un artefacto o todo el manifiesto"""
+        
+        with self._lock:
+            if artifact is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(artifact, None)
+    
+    def save(self) -> Optional[str]:
+        """Guarda manifiesto en disco"""
+        
+        if not self.enabled:
+            return None
+        
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock:
+            manifest = {"version": self.VERSION, "artifacts": dict(sorted(self._entries.items()))}
+        
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        
+        return str(self.manifest_path)
+    
+    def source_closure(self, sources: List[Path], root: Path) -> List[Path]:
+        """Fuentes más todos los módulos de root que importan, directa o transitivamente
+        
+        Un generador delega en helpers (layouts, writer, schema); cambiar
+        cualquiera de ellos debe invalidar sus artefactos. Los archivos que no
+        son .py (specs, plantillas) se incluyen tal cual.
+        """
+        
+        root = Path(root).resolve()
+        closure, stack = [], [Path(source) for source in sources]
+        seen = set()
+        
+        while stack:
+            source = stack.pop()
+            resolved = source.resolve()
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+            closure.append(resolved)
+            if resolved.suffix == ".py" and resolved.is_relative_to(root):
+                stack.extend(self._local_imports(resolved, root))
+        
+        return sorted(closure)
+    
+    def _local_imports(self, source: Path, root: Path) -> List[Path]:
+        """Módulos de root importados por un archivo (memoizado por proceso)"""
+        
+        if source in self._imports:
+            return self._imports[source]
+        
+        try:
+            tree = ast.parse(source.read_bytes(), filename=str(source))
+        except (OSError, SyntaxError, ValueError):
+            tree = ast.Module(body=[], type_ignores=[])
+        
+        package = list(source.relative_to(root).parent.parts)
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = package[:len(package) - node.level + 1] if node.level else []
+                module = ".".join(base + ([node.module] if node.module else []))
+                names.append(module)
+                # "from pkg import modulo" también importa submódulos
+                names.extend(f"{module}.{alias.name}" if module else alias.name for alias in node.names)
+        
+        imports = []
+        for name in names:
+            parts = name.split(".")
+            if parts[0] == root.name:
+                parts = parts[1:]   # "src.core.x" y "core.x" son el mismo módulo
+            for depth in range(1, len(parts) + 1):
+                module = root.joinpath(*parts[:depth])
+                for candidate in (module.with_suffix(".py"), module / "__init__.py"):
+                    if candidate.is_file():
+                        imports.append(candidate)
+        
+        self._imports[source] = imports
+        return imports
+    
+    def reset_stats(self) -> None:
+        """Reinicia aciertos y fallos (una ejecución por llamada)"""
+        
+        with self._lock:
+            self.hits = []
+            self.misses = []
+    
+    def summary(self) -> Dict[str, Any]:
+        """Resumen de aciertos y fallos de caché"""
+        
+        return {
+            "enabled": self.enabled,
+            "hits": sorted(self.hits),
+            "misses": sorted(self.misses)
+        }
+
+def stable_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Subárbol de configuración sin metadatos volátiles (fechas de generación)"""
+    
+    return {key: value for key, value in config.items() if key != "metadata"}
@@ -8,6 +8,10 @@ import json
 from pathlib import Path
 from typing import Dict, Any
 
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
 class ConfigManager:
     """Gestor de configuración única para BMC"""
     
@@ -57,9 +61,9 @@ class ConfigManager:
         active_configs = [f for f in config_files if f.name != "bmc-consolidated-config.json"]
         
         if active_configs:
-            print(f"⚠️ Archivos de configuración adicionales encontrados:")
+            logger.warning("⚠️ Archivos de configuración adicionales encontrados:")
             for config in active_configs:
-                print(f"  - {config}")
+                logger.info("  - %s", config)
             return False
         
         return True
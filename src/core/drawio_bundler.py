@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+DrawIO Bundler - Varias páginas en un solo .drawio
+
+En lugar de un archivo con timestamp por tipo de diagrama, las páginas
+(network, microservices, security, data_flow...) se escriben en un único
+.drawio con un <diagram> por página, en una sola pasada. Cada página se
+renderiza una vez a su mxGraphModel compacto y se identifica por el hash de
+su contenido (id="page-<hash>"):
+
+- una página idéntica a otra ya escrita en el bundle se omite;
+- si todas las páginas coinciden con las del archivo existente, el archivo
+  no se reescribe (no cambia su fecha ni su diff).
+"""
+
+import io
+import hashlib
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .mxgraph_writer import MxGraphWriter, compressed_by_default
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class BundlePage:
+    """Página del bundle: render escribe las celdas con el writer que recibe"""
+    
+    name: str
+    render: Callable[[MxGraphWriter], None]
+    graph_attrs: Dict[str, Any] = field(default_factory=dict)
+
+class DrawIOBundler:
+    """Escritor de .drawio multi-página deduplicado por hash de contenido"""
+    
+    HASH_LENGTH = 16
+    
+    @staticmethod
+    def render_page(page: BundlePage) -> Tuple[str, str]:
+        """mxGraphModel serializado (sin indentación) y su hash"""
+        
+        buffer = io.StringIO()
+        writer = MxGraphWriter(buffer, pretty=False)
+        writer.start_model(**page.graph_attrs)
+        page.render(writer)
+        writer.close()
+        
+        model_xml = buffer.getvalue()
+        return model_xml, hashlib.sha1(model_xml.encode("utf-8")).hexdigest()[:DrawIOBundler.HASH_LENGTH]
+    
+    @staticmethod
+    def read_pages(path: str) -> Optional[List[Tuple[str, str, bool]]]:
+        """(nombre, id, comprimida) de las páginas de un .drawio; None si no existe o es ilegible"""
+        
+        path = Path(path)
+        if not path.is_file():
+            return None
+        
+        pages = []
+        try:
+            for _, element in ET.iterparse(path, events=("end",)):
+                if element.tag == "diagram":
+                    pages.append((element.get("name"), element.get("id"), element.find("mxGraphModel") is None))
+                    element.clear()
+        except ET.ParseError:
+            return None
+        return pages
+    
+    @classmethod
+    def write(cls, path: str, pages: Iterable[BundlePage], compressed: Optional[bool] = None) -> Dict[str, Any]:
+        """Escribe las páginas en path; retorna páginas escritas, duplicadas y si el archivo cambió"""
+        
+        path = Path(path)
+        compressed = compressed_by_default() if compressed is None else compressed
+        previous = cls.read_pages(path)
+        
+        written, duplicates, seen = [], [], {}
+        with MxGraphWriter.open(path, compressed=compressed) as writer:
+            writer.start_file()
+            for page in pages:
+                model_xml, content_hash = cls.render_page(page)
+                if content_hash in seen:
+                    logger.debug("♻️ Página %s idéntica a %s, omitida", page.name, seen[content_hash])
+                    duplicates.append(page.name)
+                    continue
+                
+                seen[content_hash] = page.name
+                page_id = f"page-{content_hash}"
+                writer.write_diagram(page.name, page_id, model_xml)
+                written.append((page.name, page_id, compressed))
+            
+            unchanged = written == previous
+            if unchanged:
+                writer.discard()
+        
+        if unchanged:
+            logger.info("⏭️ Bundle DrawIO sin cambios: %s", path.name)
+        else:
+            logger.info("✅ Bundle DrawIO generado: %s (%s páginas, %s duplicadas)", path, len(written), len(duplicates))
+        
+        return {
+            "path": str(path),
+            "pages": [name for name, _, _ in written],
+            "duplicates": duplicates,
+            "changed": not unchanged
+        }
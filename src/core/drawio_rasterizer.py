@@ -0,0 +1,818 @@
+#!/usr/bin/env python3
+"""
+DrawIO Rasterizer - Previews PNG/SVG sin drawio-export
+
+Dibuja en el proceso actual el subconjunto de mxGraph que emiten los
+generadores: rectángulos (redondeados, punteados), contenedores y swimlanes,
+íconos AWS (mxgraph.aws4.*), conexiones ortogonales con sus puntos de quiebre
+y labels. El .drawio se parsea una vez (plano o comprimido) a una Scene con
+coordenadas absolutas y de ahí se dibuja:
+
+- SVG: Python puro, siempre disponible; cada ícono es un <symbol> usado
+  con <use>.
+- PNG: con Pillow (import diferido); cada ícono se dibuja una vez por
+  tamaño y se pega como bitmap.
+
+Los íconos son una aproximación (mosaico con el color de la categoría AWS y
+la abreviatura del servicio), no los SVG oficiales de draw.io. Los previews
+se nombran con el hash del contenido: si el archivo no cambió se reutiliza
+el preview existente sin volver a dibujarlo.
+"""
+
+import io
+import os
+import re
+import math
+import time
+import hashlib
+import importlib.util
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html import escape, unescape
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .mxgraph_writer import parse_drawio
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+Box = Tuple[float, float, float, float]
+Point = Tuple[float, float]
+
+# Cambiar al modificar el dibujo: invalida los previews cacheados
+RENDERER_VERSION = "1"
+
+PREVIEW_SIZE = (1200, 800)
+MARGIN = 10
+HASH_LENGTH = 16
+DEFAULT_FONT_SIZE = 11
+LINE_HEIGHT = 1.2           # × fontSize
+CHAR_WIDTH = 0.6            # × fontSize (estimación para los límites del dibujo)
+ARROW_SIZE = 8
+MIN_PNG_FONT = 4            # Con menos píxeles el texto no se lee: se omite
+
+# Colores de categoría de los íconos AWS (Architecture Icons)
+_COMPUTE, _STORAGE, _DATABASE, _NETWORK = "#ED7100", "#7AA116", "#C925D1", "#8C4FFF"
+_SECURITY, _MANAGEMENT, _ML, _GENERAL = "#DD344C", "#E7157B", "#01A88D", "#232F3E"
+
+AWS_ICONS: Dict[str, Tuple[str, str]] = {
+    "fargate": ("FG", _COMPUTE), "ec2": ("EC2", _COMPUTE), "lambda": ("FN", _COMPUTE),
+    "ecs": ("ECS", _COMPUTE), "eks": ("EKS", _COMPUTE),
+    "s3": ("S3", _STORAGE), "efs": ("EFS", _STORAGE),
+    "rds": ("RDS", _DATABASE), "elasticache": ("EC", _DATABASE), "dynamodb": ("DDB", _DATABASE),
+    "aurora": ("AUR", _DATABASE),
+    "cloudfront": ("CF", _NETWORK), "api_gateway": ("API", _NETWORK), "application_load_balancer": ("ALB", _NETWORK),
+    "elastic_load_balancing": ("ELB", _NETWORK), "route_53": ("R53", _NETWORK), "vpc": ("VPC", _NETWORK),
+    "internet": ("WWW", _NETWORK),
+    "waf": ("WAF", _SECURITY), "shield": ("SHD", _SECURITY), "cognito": ("COG", _SECURITY),
+    "kms": ("KMS", _SECURITY), "secrets_manager": ("SM", _SECURITY), "iam": ("IAM", _SECURITY),
+    "cloudwatch": ("CW", _MANAGEMENT), "cloudtrail": ("CT", _MANAGEMENT),
+    "textract": ("TX", _ML), "sagemaker": ("SGM", _ML),
+    "users": ("USR", _GENERAL),
+}
+
+_AWS_SHAPE = re.compile(r"mxgraph\.aws4\.([A-Za-z0-9_]+)")
+_HEX_COLOR = re.compile(r"^#[0-9A-Fa-f]{6}$|^#[0-9A-Fa-f]{3}$")
+_HTML_BREAK = re.compile(r"<br\s*/?>|</div>|</p>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+@dataclass
+class SceneLabel:
+    """Texto con su estilo (fontSize, fontColor, fontStyle)"""
+    
+    lines: List[str]
+    font_size: float
+    color: str
+    bold: bool = False
+
+@dataclass
+class SceneNode:
+    """Vértice en coordenadas absolutas"""
+    
+    id: str
+    box: Box
+    kind: str                           # "rect", "ellipse", "swimlane", "text", "icon", "group"
+    style: Dict[str, str]
+    label: Optional[SceneLabel] = None
+    icon: Optional[str] = None          # nombre del servicio (mxgraph.aws4.<icon>)
+
+@dataclass
+class SceneEdge:
+    """Conexión ya ruteada (polilínea absoluta) con sus labels"""
+    
+    id: str
+    points: List[Point]
+    style: Dict[str, str]
+    labels: List[Tuple[SceneLabel, Point]] = field(default_factory=list)
+
+@dataclass
+class Scene:
+    """Página lista para dibujar, en orden de documento"""
+    
+    items: List[Union[SceneNode, SceneEdge]] = field(default_factory=list)
+    
+    @property
+    def icons(self) -> List[str]:
+        return sorted({item.icon for item in self.items if isinstance(item, SceneNode) and item.icon})
+    
+    def bounds(self) -> Box:
+        """Caja que contiene formas, labels y conexiones (con margen)"""
+        
+        xs, ys = [], []
+        for item in self.items:
+            if isinstance(item, SceneNode):
+                x, y, width, height = item.box
+                xs += [x, x + width]
+                ys += [y, y + height]
+                if item.label is not None:
+                    left, top, right, bottom = _label_extent(item)
+                    xs += [left, right]
+                    ys += [top, bottom]
+            else:
+                xs += [point[0] for point in item.points]
+                ys += [point[1] for point in item.points]
+        
+        if not xs:
+            return 0.0, 0.0, 2.0 * MARGIN, 2.0 * MARGIN
+        min_x, min_y = min(xs) - MARGIN, min(ys) - MARGIN
+        return min_x, min_y, max(xs) + MARGIN - min_x, max(ys) + MARGIN - min_y
+
+# Escena
+
+def parse_style(style: Optional[str]) -> Dict[str, str]:
+    """'text;fillColor=#fff;' -> {'text': '', 'fillColor': '#fff'}"""
+    
+    result = {}
+    for part in (style or "").split(";"):
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        result[key.strip()] = value.strip()
+    return result
+
+def build_scene(content: str, page: int = 0) -> Scene:
+    """Escena de una página del .drawio (plano o comprimido)
+    
+    Lanza ET.ParseError si el XML es inválido e IndexError si la página no existe.
+    """
+    
+    root = parse_drawio(content)
+    models = [root] if root.tag == "mxGraphModel" else [
+        diagram.find("mxGraphModel") for diagram in root.iter("diagram")
+        if diagram.find("mxGraphModel") is not None
+    ]
+    if not models:
+        return Scene()
+    
+    cells: Dict[str, ET.Element] = {}
+    for cell in models[page].iter("mxCell"):
+        cells.setdefault(cell.get("id"), cell)
+    
+    origins: Dict[str, Point] = {}
+    boxes: Dict[str, Box] = {}
+    
+    def origin(cell_id: Optional[str], seen: Tuple[str, ...] = ()) -> Point:
+        """Origen absoluto de los hijos de una celda (los vértices desplazan a sus hijos)"""
+        
+        if cell_id in origins:
+            return origins[cell_id]
+        cell = cells.get(cell_id)
+        if cell is None or cell.get("vertex") != "1" or cell_id in seen:
+            return 0.0, 0.0
+        
+        geometry = _geometry(cell)
+        parent_x, parent_y = origin(cell.get("parent"), seen + (cell_id,))
+        origins[cell_id] = (parent_x + geometry[0], parent_y + geometry[1]) if geometry else (parent_x, parent_y)
+        return origins[cell_id]
+    
+    # Primera pasada: cajas absolutas (las conexiones pueden apuntar a celdas posteriores)
+    parents = {cell.get("parent") for cell in cells.values()}
+    for cell_id, cell in cells.items():
+        if cell.get("vertex") != "1" or _is_edge(cells.get(cell.get("parent"))):
+            continue
+        geometry = _geometry(cell)
+        if geometry is not None:
+            offset_x, offset_y = origin(cell.get("parent"))
+            boxes[cell_id] = (offset_x + geometry[0], offset_y + geometry[1], geometry[2], geometry[3])
+    
+    scene = Scene()
+    edges: Dict[str, SceneEdge] = {}
+    for cell_id, cell in cells.items():
+        style = parse_style(cell.get("style"))
+        
+        if _is_edge(cell):
+            edge = _build_edge(cell, style, boxes, origin(cell.get("parent")))
+            if edge is not None:
+                edges[cell_id] = edge
+                scene.items.append(edge)
+        elif cell.get("vertex") == "1":
+            parent = cells.get(cell.get("parent"))
+            if _is_edge(parent):
+                # Label de conexión: x relativo en [-1, 1] a lo largo de la polilínea
+                edge = edges.get(parent.get("id"))
+                label = _label(cell, style)
+                if edge is not None and label is not None:
+                    geometry = cell.find("mxGeometry")
+                    position = (float(geometry.get("x", 0)) + 1) / 2 if geometry is not None else 0.5
+                    edge.labels.append((label, _offset(_along(edge.points, position), geometry)))
+            elif cell_id in boxes:
+                scene.items.append(_build_node(cell, style, boxes[cell_id], cell_id in parents))
+    
+    return scene
+
+def _is_edge(cell: Optional[ET.Element]) -> bool:
+    return cell is not None and cell.get("edge") == "1"
+
+def _geometry(cell: ET.Element) -> Optional[Box]:
+    geometry = cell.find("mxGeometry")
+    if geometry is None or geometry.get("relative") == "1":
+        return None
+    try:
+        return tuple(float(geometry.get(attr, 0)) for attr in ("x", "y", "width", "height"))
+    except ValueError:
+        return None
+
+def _label(cell: ET.Element, style: Dict[str, str]) -> Optional[SceneLabel]:
+    value = cell.get("value") or ""
+    if style.get("html") == "1":
+        value = unescape(_HTML_TAG.sub("", _HTML_BREAK.sub("\n", value)))
+    lines = [line.strip() for line in value.replace("\\n", "\n").split("\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines or style.get("noLabel") == "1":
+        return None
+    
+    try:
+        font_size = float(style.get("fontSize", DEFAULT_FONT_SIZE))
+        font_style = int(style.get("fontStyle", 0))
+    except ValueError:
+        font_size, font_style = DEFAULT_FONT_SIZE, 0
+    return SceneLabel(lines, font_size, _color(style.get("fontColor"), "#000000") or "#000000", bool(font_style & 1))
+
+def _build_node(cell: ET.Element, style: Dict[str, str], box: Box, has_children: bool) -> SceneNode:
+    shape = style.get("shape", "")
+    aws_match = _AWS_SHAPE.search(style.get("resIcon") or shape)
+    
+    if aws_match:
+        kind = "icon"
+    elif "text" in style or "edgeLabel" in style:
+        kind = "text"
+    elif "swimlane" in style or shape == "swimlane":
+        kind = "swimlane"
+    elif "group" in style:
+        kind = "group"
+    elif "ellipse" in style or shape == "ellipse":
+        kind = "ellipse"
+    else:
+        kind = "rect"
+    
+    if has_children and kind == "rect" and "verticalAlign" not in style:
+        style = {**style, "verticalAlign": "top"}
+    
+    return SceneNode(cell.get("id"), box, kind, style, _label(cell, style),
+                     aws_match.group(1) if aws_match else None)
+
+def _build_edge(cell: ET.Element, style: Dict[str, str], boxes: Dict[str, Box], offset: Point) -> Optional[SceneEdge]:
+    geometry = cell.find("mxGeometry")
+    waypoints, terminals = [], {}
+    if geometry is not None:
+        for point in geometry.iter("mxPoint"):
+            role = point.get("as")
+            if role == "offset":
+                continue
+            try:
+                xy = (float(point.get("x", 0)) + offset[0], float(point.get("y", 0)) + offset[1])
+            except ValueError:
+                continue
+            if role in ("sourcePoint", "targetPoint"):
+                terminals[role] = xy
+            else:
+                waypoints.append(xy)
+    
+    source_box, target_box = boxes.get(cell.get("source")), boxes.get(cell.get("target"))
+    start = _center(source_box) if source_box else terminals.get("sourcePoint")
+    end = _center(target_box) if target_box else terminals.get("targetPoint")
+    if start is None or end is None:
+        return None
+    
+    points = route(start, end, waypoints, source_box, target_box,
+                   orthogonal=style.get("edgeStyle", "").startswith("orthogonal"))
+    
+    edge = SceneEdge(cell.get("id"), points, style)
+    label = _label(cell, style)
+    if label is not None:
+        edge.labels.append((label, _along(points, 0.5)))
+    return edge
+
+# Ruteo
+
+def route(start: Point, end: Point, waypoints: List[Point], source_box: Optional[Box] = None,
+          target_box: Optional[Box] = None, orthogonal: bool = True) -> List[Point]:
+    """Polilínea de start a end por los waypoints, recortada a los bordes de las cajas
+    
+    En modo ortogonal cada tramo queda horizontal o vertical (se agrega un
+    codo donde hace falta); sin waypoints se arma la ruta en Z entre centros,
+    o una recta si las cajas se enfrentan.
+    """
+    
+    if not orthogonal:
+        points = [start, *waypoints, end]
+    elif waypoints:
+        # Si la caja enfrenta al waypoint, el tramo sale recto hacia él
+        if source_box:
+            start = _facing(start, waypoints[0], source_box)
+        if target_box:
+            end = _facing(end, waypoints[-1], target_box)
+        
+        points = [start]
+        for point in [*waypoints, end]:
+            last = points[-1]
+            if last[0] != point[0] and last[1] != point[1]:
+                points.append((point[0], last[1]))
+            points.append(point)
+    else:
+        points = _auto_route(start, end, source_box, target_box)
+    
+    if source_box:
+        points[0] = _exit(points[0], points[1], source_box)
+    if target_box:
+        points[-1] = _exit(points[-1], points[-2], target_box)
+    return _dedupe(points)
+
+def _auto_route(start: Point, end: Point, source_box: Optional[Box], target_box: Optional[Box]) -> List[Point]:
+    (sx, sy), (tx, ty) = start, end
+    if source_box and target_box:
+        overlap_x = (max(source_box[0], target_box[0]), min(source_box[0] + source_box[2], target_box[0] + target_box[2]))
+        overlap_y = (max(source_box[1], target_box[1]), min(source_box[1] + source_box[3], target_box[1] + target_box[3]))
+        if overlap_x[0] < overlap_x[1]:
+            x = (overlap_x[0] + overlap_x[1]) / 2
+            return [(x, sy), (x, ty)]
+        if overlap_y[0] < overlap_y[1]:
+            y = (overlap_y[0] + overlap_y[1]) / 2
+            return [(sx, y), (tx, y)]
+    
+    if abs(tx - sx) >= abs(ty - sy):
+        mid = (sx + tx) / 2
+        return [start, (mid, sy), (mid, ty), end]
+    mid = (sy + ty) / 2
+    return [start, (sx, mid), (tx, mid), end]
+
+def _facing(point: Point, toward: Point, box: Box) -> Point:
+    """Punto de la caja a la altura (o en la columna) de toward, si la caja lo enfrenta"""
+    
+    x, y, width, height = box
+    if y <= toward[1] <= y + height:
+        return point[0], toward[1]
+    if x <= toward[0] <= x + width:
+        return toward[0], point[1]
+    return point
+
+def _exit(inside: Point, toward: Point, box: Box) -> Point:
+    """Donde el tramo inside -> toward sale de la caja"""
+    
+    x, y, width, height = box
+    dx, dy = toward[0] - inside[0], toward[1] - inside[1]
+    limits = []
+    if dx:
+        limits.append(((x + width if dx > 0 else x) - inside[0]) / dx)
+    if dy:
+        limits.append(((y + height if dy > 0 else y) - inside[1]) / dy)
+    t = min(limits) if limits else 0
+    if not 0 <= t < 1:
+        return inside
+    return inside[0] + dx * t, inside[1] + dy * t
+
+def _dedupe(points: List[Point]) -> List[Point]:
+    result = [points[0]]
+    for point in points[1:]:
+        if point != result[-1]:
+            result.append(point)
+    return result
+
+def _center(box: Box) -> Point:
+    return box[0] + box[2] / 2, box[1] + box[3] / 2
+
+def _along(points: List[Point], fraction: float) -> Point:
+    """Punto a una fracción del largo de la polilínea"""
+    
+    lengths = [math.dist(a, b) for a, b in zip(points, points[1:])]
+    remaining = sum(lengths) * min(max(fraction, 0.0), 1.0)
+    for (a, b), length in zip(zip(points, points[1:]), lengths):
+        if remaining <= length and length:
+            t = remaining / length
+            return a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t
+        remaining -= length
+    return points[-1]
+
+def _offset(point: Point, geometry: Optional[ET.Element]) -> Point:
+    offset = geometry.find("mxPoint[@as='offset']") if geometry is not None else None
+    if offset is None:
+        return point
+    return point[0] + float(offset.get("x", 0)), point[1] + float(offset.get("y", 0))
+
+# Labels
+
+def _label_layout(node: SceneNode) -> Tuple[float, float, str]:
+    """(x de anclaje, y superior del bloque, alineación "start"/"middle"/"end")"""
+    
+    x, y, width, height = node.box
+    style, label = node.style, node.label
+    text_height = len(label.lines) * label.font_size * LINE_HEIGHT
+    
+    # labelPosition desplaza la región horizontal del label; align la alinea dentro
+    region_x = {"left": x - width, "right": x + width}.get(style.get("labelPosition"), x)
+    align = style.get("align", "center")
+    anchor = {"left": "start", "right": "end"}.get(align, "middle")
+    anchor_x = {"start": region_x + 2, "end": region_x + width - 2}.get(anchor, region_x + width / 2)
+    
+    vertical_position = style.get("verticalLabelPosition")
+    if vertical_position == "top":
+        top = y - text_height - 2
+    elif vertical_position == "bottom":
+        top = y + height + 2
+    elif node.kind == "swimlane":
+        top = y + (_header(node) - text_height) / 2
+    else:
+        top = {"top": y + 2, "bottom": y + height - text_height - 2}.get(
+            style.get("verticalAlign"), y + (height - text_height) / 2)
+    return anchor_x, top, anchor
+
+def _label_extent(node: SceneNode) -> Box:
+    """(izquierda, arriba, derecha, abajo) estimados del label"""
+    
+    anchor_x, top, anchor = _label_layout(node)
+    label = node.label
+    width = max(len(line) for line in label.lines) * label.font_size * CHAR_WIDTH
+    left = {"start": anchor_x, "end": anchor_x - width}.get(anchor, anchor_x - width / 2)
+    return left, top, left + width, top + len(label.lines) * label.font_size * LINE_HEIGHT
+
+def _header(node: SceneNode) -> float:
+    try:
+        return float(node.style.get("startSize", 23))
+    except ValueError:
+        return 23.0
+
+# Estilos
+
+def _color(value: Optional[str], default: Optional[str]) -> Optional[str]:
+    """Color hex, None para 'none' y default si falta o no se reconoce"""
+    
+    if value == "none":
+        return None
+    if value and _HEX_COLOR.match(value):
+        return value
+    return default
+
+def _fill(node: SceneNode) -> Optional[str]:
+    default = None if node.kind in ("text", "group") else "#FFFFFF"
+    return _color(node.style.get("fillColor"), default)
+
+def _stroke(style: Dict[str, str], kind: str = "rect") -> Optional[str]:
+    default = None if kind in ("text", "group") else "#000000"
+    return _color(style.get("strokeColor"), default)
+
+def _stroke_width(style: Dict[str, str]) -> float:
+    try:
+        return float(style.get("strokeWidth", 1))
+    except ValueError:
+        return 1.0
+
+def _dashes(style: Dict[str, str], width: float) -> Optional[Tuple[float, float]]:
+    if style.get("dashed", "0") in ("0", ""):
+        return None
+    return 3 * max(width, 1), 3 * max(width, 1)
+
+def _radius(node: SceneNode) -> float:
+    if node.style.get("rounded") != "1":
+        return 0.0
+    return min(node.box[2], node.box[3]) * 0.15
+
+def icon_info(name: str) -> Tuple[str, str]:
+    """(abreviatura, color) del ícono; servicios sin entrada usan sus iniciales"""
+    
+    if name in AWS_ICONS:
+        return AWS_ICONS[name]
+    return "".join(word[0] for word in name.split("_") if word)[:3].upper() or "AWS", _GENERAL
+
+def _has_end_arrow(style: Dict[str, str]) -> bool:
+    return style.get("endArrow", "classic") != "none"
+
+def _arrow(points: List[Point], size: float) -> List[Point]:
+    """Triángulo de la flecha en el extremo final"""
+    
+    (x1, y1), (x2, y2) = points[-2], points[-1]
+    angle = math.atan2(y2 - y1, x2 - x1)
+    return [(x2, y2),
+            (x2 - size * math.cos(angle - 0.4), y2 - size * math.sin(angle - 0.4)),
+            (x2 - size * math.cos(angle + 0.4), y2 - size * math.sin(angle + 0.4))]
+
+def _scale(bounds: Box, max_size: Tuple[int, int]) -> float:
+    return min(1.0, max_size[0] / bounds[2], max_size[1] / bounds[3])
+
+# SVG
+
+def render_svg(scene: Scene, max_size: Tuple[int, int] = PREVIEW_SIZE) -> str:
+    """SVG de la escena (viewBox en coordenadas del diagrama, escalado a max_size)"""
+    
+    bounds = scene.bounds()
+    scale = _scale(bounds, max_size)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{_n(bounds[2] * scale)}" height="{_n(bounds[3] * scale)}" '
+        f'viewBox="{_n(bounds[0])} {_n(bounds[1])} {_n(bounds[2])} {_n(bounds[3])}" '
+        f'font-family="Helvetica, Arial, sans-serif">',
+        f'<rect x="{_n(bounds[0])}" y="{_n(bounds[1])}" width="{_n(bounds[2])}" height="{_n(bounds[3])}" fill="#FFFFFF"/>'
+    ]
+    
+    if scene.icons:
+        parts.append("<defs>")
+        parts.extend(_svg_icon(name) for name in scene.icons)
+        parts.append("</defs>")
+    
+    for item in scene.items:
+        parts.extend(_svg_node(item) if isinstance(item, SceneNode) else _svg_edge(item))
+    
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+def _n(value: float) -> str:
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+def _svg_icon(name: str) -> str:
+    abbreviation, color = icon_info(name)
+    font_size = 26 if len(abbreviation) < 3 else 20
+    return (f'<symbol id="aws-{escape(name)}" viewBox="0 0 64 64">'
+            f'<rect width="64" height="64" rx="8" fill="{color}"/>'
+            f'<text x="32" y="32" dy="0.35em" text-anchor="middle" font-size="{font_size}" font-weight="bold" '
+            f'fill="#FFFFFF">{escape(abbreviation)}</text></symbol>')
+
+def _svg_paint(fill: Optional[str], stroke: Optional[str], style: Dict[str, str]) -> str:
+    width = _stroke_width(style)
+    paint = f'fill="{fill or "none"}" stroke="{stroke or "none"}"'
+    if stroke:
+        paint += f' stroke-width="{_n(width)}"'
+        dashes = _dashes(style, width)
+        if dashes:
+            paint += f' stroke-dasharray="{_n(dashes[0])} {_n(dashes[1])}"'
+    return paint
+
+def _svg_node(node: SceneNode) -> List[str]:
+    x, y, width, height = node.box
+    geometry = f'x="{_n(x)}" y="{_n(y)}" width="{_n(width)}" height="{_n(height)}"'
+    parts = []
+    
+    if node.kind == "icon":
+        parts.append(f'<use xlink:href="#aws-{escape(node.icon)}" href="#aws-{escape(node.icon)}" {geometry}/>')
+    elif node.kind == "ellipse":
+        parts.append(f'<ellipse cx="{_n(x + width / 2)}" cy="{_n(y + height / 2)}" rx="{_n(width / 2)}" '
+                     f'ry="{_n(height / 2)}" {_svg_paint(_fill(node), _stroke(node.style), node.style)}/>')
+    elif node.kind != "group":
+        radius = _radius(node)
+        rounded = f' rx="{_n(radius)}"' if radius else ""
+        paint = _svg_paint(_fill(node), _stroke(node.style, node.kind), node.style)
+        if paint != 'fill="none" stroke="none"':
+            parts.append(f'<rect {geometry}{rounded} {paint}/>')
+        if node.kind == "swimlane":
+            header_y = _n(y + _header(node))
+            parts.append(f'<line x1="{_n(x)}" y1="{header_y}" x2="{_n(x + width)}" y2="{header_y}" '
+                         f'stroke="{_stroke(node.style) or "#000000"}"/>')
+    
+    if node.label is not None:
+        anchor_x, top, anchor = _label_layout(node)
+        parts.append(_svg_text(node.label, anchor_x, top, anchor))
+    return parts
+
+def _svg_edge(edge: SceneEdge) -> List[str]:
+    stroke = _stroke(edge.style) or "#000000"
+    width = _stroke_width(edge.style)
+    points = " ".join(f"{_n(x)},{_n(y)}" for x, y in edge.points)
+    parts = [f'<polyline points="{points}" {_svg_paint(None, stroke, edge.style)}/>']
+    
+    if _has_end_arrow(edge.style) and len(edge.points) > 1:
+        arrow = " ".join(f"{_n(x)},{_n(y)}" for x, y in _arrow(edge.points, ARROW_SIZE + width))
+        parts.append(f'<polygon points="{arrow}" fill="{stroke}" stroke="{stroke}"/>')
+    
+    for label, (x, y) in edge.labels:
+        text_width = max(len(line) for line in label.lines) * label.font_size * CHAR_WIDTH
+        text_height = len(label.lines) * label.font_size * LINE_HEIGHT
+        parts.append(f'<rect x="{_n(x - text_width / 2 - 2)}" y="{_n(y - text_height / 2)}" '
+                     f'width="{_n(text_width + 4)}" height="{_n(text_height)}" fill="#FFFFFF"/>')
+        parts.append(_svg_text(label, x, y - text_height / 2, "middle"))
+    return parts
+
+def _svg_text(label: SceneLabel, x: float, top: float, anchor: str) -> str:
+    weight = ' font-weight="bold"' if label.bold else ""
+    line_height = label.font_size * LINE_HEIGHT
+    spans = "".join(
+        f'<tspan x="{_n(x)}" y="{_n(top + line_height * (i + 0.8))}">{escape(line)}</tspan>'
+        for i, line in enumerate(label.lines)
+    )
+    return (f'<text text-anchor="{anchor}" font-size="{_n(label.font_size)}" '
+            f'fill="{label.color}"{weight}>{spans}</text>')
+
+# PNG (Pillow)
+
+def has_pillow() -> bool:
+    """Pillow instalado (necesario solo para PNG)"""
+    
+    return importlib.util.find_spec("PIL") is not None
+
+def render_png(scene: Scene, max_size: Tuple[int, int] = PREVIEW_SIZE) -> bytes:
+    """PNG de la escena con Pillow (lanza ImportError si no está instalado)"""
+    
+    from PIL import Image, ImageDraw
+    
+    min_x, min_y, width, height = bounds = scene.bounds()
+    scale = _scale(bounds, max_size)
+    image = Image.new("RGB", (max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))), "#FFFFFF")
+    draw = ImageDraw.Draw(image)
+    
+    def at(point: Point) -> Point:
+        return (point[0] - min_x) * scale, (point[1] - min_y) * scale
+    
+    for item in scene.items:
+        if isinstance(item, SceneNode):
+            _png_node(image, draw, item, at, scale)
+        else:
+            _png_edge(draw, item, at, scale)
+    
+    # Compresión mínima: para un preview pesa más el tiempo que los bytes
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+def _png_node(image, draw, node: SceneNode, at, scale: float) -> None:
+    x, y, width, height = node.box
+    (left, top), (right, bottom) = at((x, y)), at((x + width, y + height))
+    stroke_width = max(1, round(_stroke_width(node.style) * scale))
+    
+    if node.kind == "icon":
+        bitmap = _icon_bitmap(node.icon, max(1, round(right - left)), max(1, round(bottom - top)))
+        image.paste(bitmap, (round(left), round(top)), bitmap)
+    elif node.kind == "ellipse":
+        draw.ellipse((left, top, right, bottom), fill=_fill(node), outline=_stroke(node.style), width=stroke_width)
+    elif node.kind != "group":
+        fill, stroke = _fill(node), _stroke(node.style, node.kind)
+        dashes = _dashes(node.style, _stroke_width(node.style))
+        radius = _radius(node) * scale
+        outline = None if dashes else stroke
+        if fill or outline:
+            if radius:
+                draw.rounded_rectangle((left, top, right, bottom), radius, fill=fill, outline=outline, width=stroke_width)
+            else:
+                draw.rectangle((left, top, right, bottom), fill=fill, outline=outline, width=stroke_width)
+        if dashes and stroke:
+            corners = [(left, top), (right, top), (right, bottom), (left, bottom), (left, top)]
+            _png_polyline(draw, corners, stroke, stroke_width, (dashes[0] * scale, dashes[1] * scale))
+        if node.kind == "swimlane":
+            header_y = top + _header(node) * scale
+            draw.line([(left, header_y), (right, header_y)], fill=stroke or "#000000", width=stroke_width)
+    
+    if node.label is not None:
+        anchor_x, label_top, anchor = _label_layout(node)
+        anchor_x, label_top = at((anchor_x, label_top))
+        _png_text(draw, node.label, anchor_x, label_top, anchor, scale)
+
+def _png_edge(draw, edge: SceneEdge, at, scale: float) -> None:
+    points = [at(point) for point in edge.points]
+    stroke = _stroke(edge.style) or "#000000"
+    width = _stroke_width(edge.style)
+    dashes = _dashes(edge.style, width)
+    _png_polyline(draw, points, stroke, max(1, round(width * scale)),
+                  (dashes[0] * scale, dashes[1] * scale) if dashes else None)
+    
+    if _has_end_arrow(edge.style) and len(points) > 1:
+        draw.polygon(_arrow(points, (ARROW_SIZE + width) * scale), fill=stroke)
+    
+    for label, point in edge.labels:
+        x, y = at(point)
+        font = _font(round(label.font_size * scale), label.bold)
+        if font is None:
+            continue
+        text_width = max(draw.textlength(line, font=font) for line in label.lines)
+        text_height = len(label.lines) * label.font_size * LINE_HEIGHT * scale
+        draw.rectangle((x - text_width / 2 - 2, y - text_height / 2, x + text_width / 2 + 2, y + text_height / 2),
+                       fill="#FFFFFF")
+        _png_text(draw, label, x, y - text_height / 2, "middle", scale)
+
+def _png_polyline(draw, points: List[Point], fill: str, width: int, dashes: Optional[Tuple[float, float]]) -> None:
+    if not dashes:
+        draw.line(points, fill=fill, width=width)
+        return
+    
+    from PIL import ImageColor
+    
+    # Un trazo por guion: el color se convierte una vez y no en cada llamada
+    fill = ImageColor.getrgb(fill)
+    dash, gap = max(dashes[0], 1.0), max(dashes[1], 1.0)
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        length = math.dist((x1, y1), (x2, y2))
+        position = 0.0
+        while position < length:
+            end = min(position + dash, length)
+            draw.line([(x1 + (x2 - x1) * position / length, y1 + (y2 - y1) * position / length),
+                       (x1 + (x2 - x1) * end / length, y1 + (y2 - y1) * end / length)], fill=fill, width=width)
+            position = end + gap
+
+def _png_text(draw, label: SceneLabel, x: float, top: float, anchor: str, scale: float) -> None:
+    font = _font(round(label.font_size * scale), label.bold)
+    if font is None:
+        return
+    
+    line_height = label.font_size * LINE_HEIGHT * scale
+    for i, line in enumerate(label.lines):
+        line_width = draw.textlength(line, font=font)
+        line_x = {"start": x, "end": x - line_width}.get(anchor, x - line_width / 2)
+        draw.text((line_x, top + line_height * i), line, fill=label.color, font=font)
+
+@lru_cache(maxsize=32)
+def _font(size: int, bold: bool = False):
+    """Fuente TrueType del sistema (o la de Pillow); None si es demasiado chica"""
+    
+    from PIL import ImageFont
+    
+    if size < MIN_PNG_FONT:
+        return None
+    for name in (("DejaVuSans-Bold.ttf", "Arial Bold.ttf") if bold else ()) + ("DejaVuSans.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+@lru_cache(maxsize=256)
+def _icon_bitmap(name: str, width: int, height: int):
+    """Ícono AWS como bitmap RGBA, dibujado una vez por servicio y tamaño"""
+    
+    from PIL import Image, ImageDraw
+    
+    abbreviation, color = icon_info(name)
+    bitmap = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(bitmap)
+    draw.rounded_rectangle((0, 0, width - 1, height - 1), max(1, min(width, height) // 8), fill=color)
+    
+    font = _font(round(min(width, height) * (0.4 if len(abbreviation) < 3 else 0.3)), True)
+    if font is not None:
+        left, top, right, bottom = draw.textbbox((0, 0), abbreviation, font=font)
+        draw.text(((width - (right - left)) / 2 - left, (height - (bottom - top)) / 2 - top),
+                  abbreviation, fill="#FFFFFF", font=font)
+    return bitmap
+
+# Previews cacheados
+
+def preview_path(drawio_path: str, content: bytes, output_dir: str, fmt: str = "png",
+                 max_size: Tuple[int, int] = PREVIEW_SIZE, page: int = 0) -> Path:
+    """<output_dir>/<carpeta>-<nombre>_preview_<hash>.<fmt>; el hash cubre contenido, tamaño, página y versión"""
+    
+    digest = hashlib.sha256(content)
+    digest.update(f"|{fmt}|{max_size[0]}x{max_size[1]}|{page}|{RENDERER_VERSION}".encode("utf-8"))
+    return Path(output_dir) / f"{_preview_prefix(drawio_path)}_preview_{digest.hexdigest()[:HASH_LENGTH]}.{fmt}"
+
+def _preview_prefix(drawio_path: str) -> str:
+    """Carpeta y nombre del .drawio: cada proyecto escribe drawio/<proyecto>/<mismo nombre>.drawio"""
+    
+    path = Path(drawio_path)
+    return f"{path.parent.name}-{path.stem}" if path.parent.name else path.stem
+
+def render_preview(drawio_path: str, output_dir: str, fmt: str = "png",
+                   max_size: Tuple[int, int] = PREVIEW_SIZE, page: int = 0) -> Optional[str]:
+    """Preview PNG o SVG del .drawio, reutilizado si el contenido no cambió
+    
+    Retorna None si se pide PNG y Pillow no está instalado. Los errores de
+    parseo (ET.ParseError) se propagan.
+    """
+    
+    if fmt not in ("png", "svg"):
+        raise ValueError(f"Formato de preview no soportado: {fmt}")
+    
+    content = Path(drawio_path).read_bytes()
+    output_path = preview_path(drawio_path, content, output_dir, fmt, max_size, page)
+    if output_path.exists():
+        logger.debug("♻️ Preview en caché: %s", output_path)
+        return str(output_path)
+    
+    start = time.perf_counter()
+    scene = build_scene(content.decode("utf-8"), page)
+    if fmt == "svg":
+        data = render_svg(scene, max_size).encode("utf-8")
+    else:
+        try:
+            data = render_png(scene, max_size)
+        except ImportError:
+            logger.warning("⚠️ Pillow no instalado, preview PNG omitido")
+            return None
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_suffix(f".{fmt}.{os.getpid()}.tmp")
+    temp_path.write_bytes(data)
+    temp_path.replace(output_path)
+    
+    # Previews anteriores del mismo archivo (otro contenido) quedan obsoletos
+    for stale in output_path.parent.glob(f"{_preview_prefix(drawio_path)}_preview_{'?' * HASH_LENGTH}.{fmt}"):
+        if stale != output_path:
+            stale.unlink(missing_ok=True)
+    
+    logger.info("✅ Preview %s generado en %.1f ms: %s", fmt.upper(), (time.perf_counter() - start) * 1000, output_path)
+    return str(output_path)
@@ -8,26 +8,30 @@ import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
-from .app_config import save_config, get_paths
+from .app_config import AppConfig, app_config
+from .logger import get_logger
+
+logger = get_logger(__name__)
 
 class DynamicConfigGenerator:
     """Generador dinámico de configuración desde especificación Markdown"""
     
-    def __init__(self):
-        self.paths = get_paths()
-    
+    def __init__(self, config: AppConfig = None):
+        self.config = config or app_config
+        self.paths = self.config.paths
+
     def generate_config_from_specification(self, spec_file: str = None) -> Dict[str, Any]:
         """Genera configuración dinámicamente desde especificación"""
         
         if spec_file is None:
-            spec_file = self.paths.config_dir / "bmc-input-specification.md"
-        
+            spec_file = self.config.spec_file
+
         spec_path = Path(spec_file)
         
         if not spec_path.exists():
             raise FileNotFoundError(f"Especificación no encontrada: {spec_file}")
         
-        print(f"📋 Generando configuración desde: {spec_path.name}")
+        logger.info("📋 Generando configuración desde: %s", spec_path.name)
         
         # Leer especificación
         with open(spec_path, 'r', encoding='utf-8') as f:
@@ -37,8 +41,8 @@ class DynamicConfigGenerator:
         config = self._parse_specification(content)
         
         # Guardar configuración generada
-        config_path = save_config("bmc", config)
-        print(f"✅ Configuración generada: {Path(config_path).name}")
+        config_path = self.config.save_config("bmc", config)
+        logger.info("✅ Configuración generada: %s", Path(config_path).name)
         
         return config
     
@@ -118,8 +122,8 @@ class DynamicConfigGenerator:
         """Verifica si la especificación es más nueva que la configuración"""
         
         if spec_file is None:
-            spec_file = self.paths.config_dir / "bmc-input-specification.md"
-        
+            spec_file = self.config.spec_file
+
         spec_path = Path(spec_file)
         # Configuración siempre en outputs/generated
         config_path = self.paths.outputs_generated_dir / "bmc.json"
@@ -136,17 +140,19 @@ class DynamicConfigGenerator:
         
         return spec_mtime > config_mtime
 
-def generate_dynamic_config(force_regenerate: bool = False) -> Dict[str, Any]:
+def generate_dynamic_config(force_regenerate: bool = False, config: AppConfig = None) -> Dict[str, Any]:
     """Función de conveniencia para generar configuración dinámica"""
     
-    generator = DynamicConfigGenerator()
+    generator = DynamicConfigGenerator(config)
     
     # Verificar si necesita regenerar
     if not force_regenerate and not generator.is_specification_newer():
-        print("⚠️ Especificación no ha cambiado, usando configuración existente")
-        from .app_config import get_config
-        return get_config("bmc")
+        logger.warning("⚠️ Especificación no ha cambiado, usando configuración existente")
+        # Leer directamente el archivo: get_config("bmc") volvería a llamar aquí
+        config_path = generator.paths.outputs_generated_dir / "bmc.json"
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     
     # Generar nueva configuración
-    print("🔄 Especificación actualizada, regenerando configuración...")
+    logger.info("🔄 Especificación actualizada, regenerando configuración...")
     return generator.generate_config_from_specification()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Logger - Capa central de logging estructurado
+
+Todos los módulos obtienen su logger con get_logger(__name__); cuelgan del
+logger raíz "bmc", que se configura una sola vez con setup_logging().
+Los mensajes usan argumentos diferidos (logger.info("... %s", valor)) para
+que los niveles desactivados no paguen el coste de formatear.
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from typing import Optional, TextIO
+
+ROOT_LOGGER = "bmc"
+
+# Atributos estándar de LogRecord; el resto viene de `extra=` y va al JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JSONFormatter(logging.Formatter):
+    """Una línea JSON por registro"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName
+        }
+        
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger de un módulo bajo el logger raíz de la aplicación"""
+    
+    if name == ROOT_LOGGER or name.startswith(f"{ROOT_LOGGER}."):
+        return logging.getLogger(name)
+    
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class _ConsoleHandler(logging.StreamHandler):
+    """StreamHandler que no reporta la consola cerrada (p.ej. `run.py | head`)"""
+    
+    def handleError(self, record: logging.LogRecord) -> None:
+        if isinstance(sys.exc_info()[1], BrokenPipeError):
+            return
+        super().handleError(record)
+
+def _build_handler(stream: TextIO, json_output: bool) -> logging.Handler:
+    """Handler de consola con formato texto (mensaje tal cual) o JSON"""
+    
+    handler = _ConsoleHandler(stream)
+    handler.setFormatter(JSONFormatter() if json_output else logging.Formatter("%(message)s"))
+    return handler
+
+def setup_logging(level: Optional[str] = None, json_output: Optional[bool] = None,
+                  quiet: bool = False, async_output: bool = True,
+                  stream: Optional[TextIO] = None) -> logging.Logger:
+    """Configura el logger raíz de la aplicación
+    
+    - level: nivel (default LOG_LEVEL o INFO)
+    - json_output: una línea JSON por mensaje (default LOG_FORMAT=json)
+    - quiet: solo errores; los mensajes informativos no se formatean
+    - async_output: la escritura ocurre en un hilo aparte (QueueHandler)
+    """
+    
+    global _listener
+    
+    if level is None:
+        level = os.getenv("LOG_LEVEL", "INFO")
+    if json_output is None:
+        json_output = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(logging.ERROR if quiet else getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+    
+    _stop_listener()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    
+    handler = _build_handler(stream or sys.stdout, json_output)
+    
+    if async_output:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        logger.addHandler(handler)
+    
+    return logger
+
+def _stop_listener() -> None:
+    """Vacía la cola y detiene el hilo de escritura"""
+    
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+@contextmanager
+def capture_logs(stream: TextIO, json_output: Optional[bool] = None):
+    """Redirige temporalmente los logs de la aplicación a `stream`
+    
+    Usado en ejecuciones batch para guardar un log por proyecto sin mezclar
+    la salida de distintos proyectos.
+    """
+    
+    if json_output is None:
+        json_output = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    
+    logger = logging.getLogger(ROOT_LOGGER)
+    previous = (list(logger.handlers), logger.level, logger.propagate)
+    
+    # Asegura que lo encolado antes de la captura salga por el handler anterior
+    if _listener is not None:
+        _listener.stop()
+    for handler in previous[0]:
+        logger.removeHandler(handler)
+    
+    logger.addHandler(_build_handler(stream, json_output))
+    if logger.level == logging.NOTSET:
+        logger.setLevel(getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO))
+    logger.propagate = False
+    
+    try:
+        yield logger
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in previous[0]:
+            logger.addHandler(handler)
+        logger.setLevel(previous[1])
+        logger.propagate = previous[2]
+        if _listener is not None:
+            _listener.start()
+
+atexit.register(_stop_listener)
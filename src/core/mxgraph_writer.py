@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+MxGraph Writer - Escritura incremental de archivos DrawIO
+
+Las celdas se escriben en el stream (archivo, socket.makefile(), StringIO)
+a medida que se generan: no se arma el documento completo en memoria ni
+como texto ni como árbol ElementTree, así que el consumo de memoria no
+crece con el tamaño del diagrama. Todos los valores de atributos se
+escapan (incluidos saltos de línea reales, que DrawIO guarda como &#10;).
+
+En modo comprimido cada <diagram> lleva el formato nativo de draw.io:
+deflate (raw) del mxGraphModel URL-encoded, en base64. Se comprime a medida
+que se escribe, sin juntar la página en memoria. parse_drawio() lee ambos
+formatos.
+"""
+
+import os
+import re
+import base64
+import zlib
+import xml.etree.ElementTree as ET
+from urllib.parse import quote, unquote_to_bytes
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+_ATTRIBUTE_ESCAPES = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+    "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"
+})
+_NEEDS_ESCAPE = re.compile('[&<>"\n\r\t]')
+
+# Caracteres que encodeURIComponent (lo que usa draw.io) no codifica
+_URI_SAFE = "!*'()"
+
+# Bloque de lectura de diagramas comprimidos (múltiplo de 4 para base64)
+DECOMPRESS_CHUNK = 1 << 16
+
+def escape_attribute(value: Any) -> str:
+    """Escapa un valor para usarlo entre comillas dobles en un atributo XML"""
+    
+    text = str(value)
+    # translate() es lento incluso sin nada que reemplazar: la mayoría de los valores (IDs, coordenadas) no lo necesita
+    return text.translate(_ATTRIBUTE_ESCAPES) if _NEEDS_ESCAPE.search(text) else text
+
+def compressed_by_default() -> bool:
+    """Salida comprimida por defecto (variable DRAWIO_COMPRESSED o run.py --compressed)"""
+    
+    return os.getenv("DRAWIO_COMPRESSED", "false").lower() == "true"
+
+def compress_diagram(xml: str) -> str:
+    """mxGraphModel serializado -> contenido comprimido de <diagram>"""
+    
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    data = compressor.compress(quote(xml, safe=_URI_SAFE).encode("ascii")) + compressor.flush()
+    return base64.b64encode(data).decode("ascii")
+
+def decompress_diagram(payload: str) -> str:
+    """Contenido comprimido de <diagram> -> mxGraphModel serializado"""
+    
+    return b"".join(iter_decompressed(payload)).decode("utf-8")
+
+def iter_decompressed(payload: str, chunk_size: int = DECOMPRESS_CHUNK) -> Iterator[bytes]:
+    """Contenido comprimido de <diagram> -> mxGraphModel en bloques de bytes
+    
+    base64, inflate y URL-decode se hacen por bloques (un %XX partido entre
+    bloques pasa al siguiente), así que la memoria no depende del tamaño de
+    la página. Lanza ValueError (base64), zlib.error si el deflate es
+    inválido o está truncado.
+    """
+    
+    payload = "".join(payload.split())
+    inflater = zlib.decompressobj(-15)
+    carry = b""
+    
+    for offset in range(0, len(payload), chunk_size):
+        data = base64.b64decode(payload[offset:offset + chunk_size])
+        while data:
+            # max_length acota lo descomprimido por paso (una página puede comprimir 50x o más)
+            inflated = carry + inflater.decompress(data, chunk_size)
+            data = inflater.unconsumed_tail
+            cut = inflated.rfind(b"%", max(0, len(inflated) - 2))
+            cut = len(inflated) if cut == -1 else cut
+            carry = inflated[cut:]
+            yield unquote_to_bytes(inflated[:cut])
+    
+    yield unquote_to_bytes(carry + inflater.flush())
+    if not inflater.eof:
+        raise zlib.error("incomplete or truncated stream")
+
+def parse_drawio(content: str) -> ET.Element:
+    """Parsea un .drawio expandiendo los diagramas comprimidos
+    
+    Lanza ET.ParseError si el XML (o un diagrama descomprimido) es inválido.
+    """
+    
+    root = ET.fromstring(content)
+    for diagram in root.iter("diagram"):
+        payload = (diagram.text or "").strip()
+        if diagram.find("mxGraphModel") is not None or not payload:
+            continue
+        
+        # Se parsea a medida que se descomprime: nunca está la página entera como texto
+        parser = ET.XMLParser()
+        try:
+            for chunk in iter_decompressed(payload):
+                parser.feed(chunk)
+            model = parser.close()
+        except (ValueError, zlib.error, UnicodeDecodeError) as e:
+            raise ET.ParseError(f"Diagrama comprimido inválido ({diagram.get('name')}): {e}")
+        diagram.text = None
+        diagram.append(model)
+    return root
+
+def compress_tree(root: ET.Element) -> None:
+    """Comprime en el lugar los diagramas de un árbol mxfile"""
+    
+    for diagram in root.iter("diagram"):
+        model = diagram.find("mxGraphModel")
+        if model is None:
+            continue
+        diagram.remove(model)
+        model.tail = None
+        diagram.text = compress_diagram(ET.tostring(model, encoding="unicode"))
+
+def compress_document(content: str) -> str:
+    """Versión comprimida de un .drawio ya serializado"""
+    
+    root = ET.fromstring(content)
+    compress_tree(root)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding="unicode")
+
+class _DeflateStream:
+    """Stream de texto que escribe en target el deflate + base64 de lo recibido"""
+    
+    def __init__(self, target: TextIO):
+        self.target = target
+        self._compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        self._pending = b""
+    
+    def write(self, text: str) -> None:
+        self._emit(self._compressor.compress(quote(text, safe=_URI_SAFE).encode("ascii")))
+    
+    def finish(self) -> None:
+        self._emit(self._compressor.flush())
+        self.target.write(base64.b64encode(self._pending).decode("ascii"))
+        self._pending = b""
+    
+    def _emit(self, data: bytes) -> None:
+        # base64 por bloques de 3 bytes para poder escribir a medida que se comprime
+        data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self.target.write(base64.b64encode(data[:cut]).decode("ascii"))
+        self._pending = data[cut:]
+
+class MxGraphWriter:
+    """Escritor incremental de mxfile / diagram / mxGraphModel / mxCell"""
+    
+    GRAPH_DEFAULTS = {
+        "dx": 2500, "dy": 1600, "grid": 1, "gridSize": 10, "guides": 1, "tooltips": 1,
+        "connect": 1, "arrows": 1, "fold": 1, "page": 1, "pageScale": 1,
+        "pageWidth": 1400, "pageHeight": 1000
+    }
+    EDGE_LABEL_STYLE = "edgeLabel;html=1;align=center;verticalAlign=middle;resizable=0;points=[];"
+    
+    def __init__(self, stream: TextIO, pretty: bool = True, indent: str = "  ", compressed: bool = False):
+        self.stream = stream
+        self.pretty = pretty
+        self.indent = indent
+        self.compressed = compressed
+        self._stack: List[str] = []
+        self._started = False
+        self._deflate: Optional[Tuple[_DeflateStream, TextIO, bool, int]] = None
+        self.discarded = False
+    
+    @classmethod
+    @contextmanager
+    def open(cls, path: str, pretty: bool = True, compressed: Optional[bool] = None) -> Iterator['MxGraphWriter']:
+        """Escritor sobre un archivo; al salir se cierran los elementos abiertos
+        
+        Se escribe a un temporal que reemplaza al archivo solo si no hubo
+        errores (ni se llamó a discard()): un fallo a mitad de camino no deja
+        un .drawio truncado. compressed=None toma el valor de compressed_by_default().
+        """
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        
+        try:
+            with open(temp_path, "w", encoding="utf-8") as stream:
+                writer = cls(stream, pretty, compressed=compressed_by_default() if compressed is None else compressed)
+                yield writer
+                writer.close()
+            if not writer.discarded:
+                os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+    
+    def discard(self) -> None:
+        """Descarta lo escrito con open(): el archivo destino queda como estaba"""
+        
+        self.discarded = True
+    
+    # Elementos genéricos
+    
+    def start(self, tag: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        """Abre un elemento (se cierra con end())"""
+        
+        self._write_tag(tag, attrs, ">")
+        self._stack.append(tag)
+    
+    def end(self) -> None:
+        """Cierra el último elemento abierto"""
+        
+        if self._deflate is not None and len(self._stack) == self._deflate[3]:
+            self._end_compressed_diagram()
+            return
+        
+        tag = self._stack.pop()
+        self._newline()
+        self.stream.write(f"</{tag}>")
+    
+    def empty(self, tag: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        """Elemento sin hijos (<tag .../>)"""
+        
+        self._write_tag(tag, attrs, "/>")
+    
+    def comment(self, text: str) -> None:
+        self._newline()
+        self.stream.write(f"<!-- {text.replace('--', '- -')} -->")
+    
+    def close(self) -> None:
+        """Cierra todos los elementos abiertos"""
+        
+        while self._stack:
+            self.end()
+        if self.pretty and self._started:
+            self.stream.write("\n")
+        self._started = False
+    
+    # Estructura DrawIO
+    
+    def start_file(self, **attrs: Any) -> None:
+        """Declaración XML y <mxfile>"""
+        
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>')
+        self._started = True
+        self.start("mxfile", {"host": "app.diagrams.net", "modified": datetime.now().isoformat(),
+                              "version": "22.1.11", **attrs})
+    
+    def start_diagram(self, name: str, diagram_id: str, **graph_attrs: Any) -> None:
+        """<diagram><mxGraphModel><root> con las celdas base 0 y 1"""
+        
+        self.start("diagram", {"name": name, "id": diagram_id})
+        if self.compressed:
+            # El contenido de la página va comprimido y sin indentación dentro de <diagram>
+            deflate = _DeflateStream(self.stream)
+            self._deflate = (deflate, self.stream, self.pretty, len(self._stack))
+            self.stream, self.pretty = deflate, False
+        
+        self.start_model(**graph_attrs)
+    
+    def end_diagram(self) -> None:
+        """Cierra root, mxGraphModel y diagram"""
+        
+        for _ in range(3):
+            self.end()
+    
+    def start_model(self, **graph_attrs: Any) -> None:
+        """<mxGraphModel><root> con las celdas base 0 y 1 (sin <diagram>)"""
+        
+        self.start("mxGraphModel", {**self.GRAPH_DEFAULTS, **graph_attrs})
+        self.start("root")
+        self.empty("mxCell", {"id": "0"})
+        self.empty("mxCell", {"id": "1", "parent": "0"})
+    
+    def write_diagram(self, name: str, diagram_id: str, model_xml: str) -> None:
+        """Página completa a partir de un mxGraphModel ya serializado"""
+        
+        self.start("diagram", {"name": name, "id": diagram_id})
+        self.stream.write(compress_diagram(model_xml) if self.compressed else model_xml)
+        self.stream.write(f"</{self._stack.pop()}>")
+    
+    def vertex(self, cell_id: Any, value: Optional[str], style: str, x: Any, y: Any, width: Any, height: Any,
+               parent: Any = "1", **attrs: Any) -> None:
+        """Celda vértice con su geometría"""
+        
+        self.start("mxCell", {"id": cell_id, "value": value, "style": style, "vertex": "1", "parent": parent, **attrs})
+        self.empty("mxGeometry", {"x": x, "y": y, "width": width, "height": height, "as": "geometry"})
+        self.end()
+    
+    def edge(self, cell_id: Any, style: str, source: Any, target: Any, parent: Any = "1",
+             value: Optional[str] = None, points: Optional[Iterable[Tuple[Any, Any]]] = None,
+             offset: Optional[Tuple[Any, Any]] = None, geometry: Optional[Dict[str, Any]] = None,
+             **attrs: Any) -> None:
+        """Celda conexión; points escribe <Array as="points"> (vacío si no hay puntos)"""
+        
+        self.start("mxCell", {"id": cell_id, "value": value, "style": style, "edge": "1", "parent": parent,
+                              "source": source, "target": target, **attrs})
+        
+        geometry_attrs = {**(geometry or {}), "relative": "1", "as": "geometry"}
+        if offset is None and points is None:
+            self.empty("mxGeometry", geometry_attrs)
+        else:
+            self.start("mxGeometry", geometry_attrs)
+            if offset is not None:
+                self.empty("mxPoint", {"x": offset[0], "y": offset[1], "as": "offset"})
+            if points is not None:
+                self.points(points)
+            self.end()
+        
+        self.end()
+    
+    def points(self, points: Iterable[Tuple[Any, Any]]) -> None:
+        """<Array as="points"> con los puntos de quiebre"""
+        
+        points = list(points)
+        if not points:
+            self.empty("Array", {"as": "points"})
+            return
+        
+        self.start("Array", {"as": "points"})
+        for x, y in points:
+            self.empty("mxPoint", {"x": x, "y": y})
+        self.end()
+    
+    def edge_label(self, cell_id: Any, value: str, edge_id: Any, font_size: Any = 10,
+                   font_color: str = "#1976D2") -> None:
+        """Label de una conexión (vértice hijo de la conexión)"""
+        
+        style = f"{self.EDGE_LABEL_STYLE}fontSize={font_size};fontColor={font_color};"
+        self.start("mxCell", {"id": cell_id, "value": value, "style": style, "vertex": "1",
+                              "connectable": "0", "parent": edge_id})
+        self.start("mxGeometry", {"x": "-0.1", "y": "1", "relative": "1", "as": "geometry"})
+        self.empty("mxPoint", {"as": "offset"})
+        self.end()
+        self.end()
+    
+    # Internos
+    
+    def _end_compressed_diagram(self) -> None:
+        deflate, self.stream, self.pretty, _ = self._deflate
+        self._deflate = None
+        deflate.finish()
+        self.stream.write(f"</{self._stack.pop()}>")
+    
+    def _write_tag(self, tag: str, attrs: Optional[Dict[str, Any]], close: str) -> None:
+        self._newline()
+        self._started = True
+        parts = [f"<{tag}"]
+        if attrs:
+            parts.extend(f' {name}="{escape_attribute(value)}"' for name, value in attrs.items() if value is not None)
+        parts.append(close)
+        self.stream.write("".join(parts))
+    
+    def _newline(self) -> None:
+        if self.pretty and self._started:
+            self.stream.write("\n" + self.indent * len(self._stack))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Pipeline - Motor de ejecución por grafo de dependencias (DAG)
+"""
+
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Union
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass
+class PipelineNode:
+    """Nodo del pipeline: un generador con entradas y salidas declaradas
+    
+    `func` recibe un diccionario {nodo_entrada: resultado} con los resultados
+    de los nodos de los que depende.
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    description: str = ""
+
+class PipelineEngine:
+    """Ejecuta nodos en orden topológico sobre un pool de hilos"""
+    
+    def __init__(self, max_workers: int = 1, tracer=None):
+        self.max_workers = max(1, max_workers or 1)
+        self.tracer = tracer
+        self.nodes: Dict[str, PipelineNode] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.skipped: List[str] = []
+    
+    def add_node(self, node: PipelineNode) -> None:
+        """Registra un nodo"""
+        
+        if node.name in self.nodes:
+            raise ValueError(f"Nodo duplicado: {node.name}")
+        self.nodes[node.name] = node
+    
+    def expand_targets(self, targets: Union[str, List[str], None]) -> List[str]:
+        """Expande targets a nombres de nodo ("png" incluye todos los "png:*")"""
+        
+        if targets is None:
+            return list(self.nodes)
+        
+        if isinstance(targets, str):
+            targets = [targets]
+        
+        expanded = []
+        for target in targets:
+            if target in self.nodes:
+                matches = [target]
+            else:
+                matches = [name for name in self.nodes if name.startswith(f"{target}:")]
+            
+            if not matches:
+                raise ValueError(f"Target desconocido: {target}. Disponibles: {', '.join(self.nodes)}")
+            
+            expanded.extend(name for name in matches if name not in expanded)
+        
+        return expanded
+    
+    def resolve(self, targets: Union[str, List[str], None] = None) -> List[str]:
+        """Orden topológico de los nodos necesarios para los targets"""
+        
+        order = []
+        state = {}  # 1 = visitando, 2 = resuelto
+        
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Ciclo de dependencias: {' -> '.join(path + [name])}")
+            if name not in self.nodes:
+                raise ValueError(f"Dependencia desconocida: {name} (requerida por {path[-1]})")
+            
+            state[name] = 1
+            for dependency in self.nodes[name].inputs:
+                visit(dependency, path + [name])
+            state[name] = 2
+            order.append(name)
+        
+        for target in self.expand_targets(targets):
+            visit(target, [])
+        
+        return order
+    
+    def run(self, targets: Union[str, List[str], None] = None) -> Dict[str, Any]:
+        """Ejecuta los nodos requeridos y retorna {nodo: resultado}
+        
+        Si un nodo falla, sus dependientes se omiten y el resto continúa.
+        """
+        
+        order = self.resolve(targets)
+        
+        if self.max_workers == 1:
+            for name in order:
+                if self._ready_to_run(name):
+                    self._execute(name)
+            return dict(self.results)
+        
+        pending = list(order)
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Lanzar todo nodo cuyas dependencias ya terminaron
+                for name in list(pending):
+                    node = self.nodes[name]
+                    if any(dep in pending or dep in running.values() for dep in node.inputs):
+                        continue
+                    pending.remove(name)
+                    if self._ready_to_run(name):
+                        running[executor.submit(self._execute, name)] = name
+                
+                if not running:
+                    continue
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+        
+        return dict(self.results)
+    
+    def _ready_to_run(self, name: str) -> bool:
+        """Verifica dependencias; marca el nodo como omitido si alguna falló"""
+        
+        failed = [dep for dep in self.nodes[name].inputs if dep not in self.results]
+        if failed:
+            self.skipped.append(name)
+            logger.info("⏭️ Nodo %s omitido: dependencias fallidas %s", name, failed)
+            return False
+        return True
+    
+    def _execute(self, name: str) -> None:
+        """Ejecuta un nodo registrando duración y errores"""
+        
+        node = self.nodes[name]
+        inputs = {dep: self.results[dep] for dep in node.inputs}
+        start = time.perf_counter()
+        
+        span = self.tracer.span(name, "stage", profile=True) if self.tracer else nullcontext()
+        
+        try:
+            with span:
+                self.results[name] = node.func(inputs)
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.error("❌ Error en nodo %s: %s", name, e)
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+    
+    def describe(self) -> List[Dict[str, Any]]:
+        """Descripción de nodos para listados (--list-targets)"""
+        
+        return [
+            {
+                "name": node.name,
+                "inputs": node.inputs,
+                "outputs": node.outputs,
+                "description": node.description
+            }
+            for node in self.nodes.values()
+        ]
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tracing - Spans anidados por etapa y generador con export a Chrome trace
+"""
+
+import os
+import json
+import time
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+class Tracer:
+    """Registra spans (etapas, llamadas a generadores) con tiempos y perfiles
+    
+    Los spans siempre se registran: su coste es despreciable frente a los
+    generadores. cProfile y tracemalloc solo se activan con `profile` y
+    `memory`, y solo en spans marcados con profile=True (las etapas).
+    """
+    
+    def __init__(self, profile: bool = False, memory: bool = False):
+        self.profile = profile
+        self.memory = memory
+        self.spans: List[Dict[str, Any]] = []
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        # cProfile admite un solo perfilador activo a la vez (sys.monitoring en 3.12)
+        self._profiler_lock = threading.Lock()
+        self._local = threading.local()
+        
+        self._owns_tracemalloc = self.memory and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+    
+    @contextmanager
+    def span(self, name: str, category: str = "generator", profile: bool = False, **args):
+        """Mide un bloque; los spans abiertos en el mismo hilo quedan anidados"""
+        
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        
+        record = {
+            "name": name,
+            "cat": category,
+            "parent": stack[-1]["name"] if stack else None,
+            "depth": len(stack),
+            "tid": threading.get_ident(),
+            "args": dict(args)
+        }
+        
+        profiler = None
+        if profile and self.profile and self._profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Otro perfilador (p.ej. un depurador) ya está activo
+                self._profiler_lock.release()
+                profiler = None
+        elif profile and self.profile:
+            record["args"]["profile"] = "omitido: otra etapa se está perfilando"
+        
+        memory_before = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        
+        stack.append(record)
+        start = time.perf_counter_ns()
+        
+        try:
+            yield record
+        except Exception as e:
+            record["args"]["error"] = str(e)
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            stack.pop()
+            
+            if profiler is not None:
+                profiler.disable()
+                self._profiler_lock.release()
+                self.profiles[name] = profiler
+                record["args"]["top_functions"] = self._top_functions(profiler)
+            
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record["args"]["memory_delta_kb"] = round((current - memory_before) / 1024, 1)
+                record["args"]["memory_peak_kb"] = round(peak / 1024, 1)
+            
+            record["start_us"] = (start - self._origin) / 1000
+            record["duration_us"] = (end - start) / 1000
+            
+            with self._lock:
+                self.spans.append(record)
+    
+    @staticmethod
+    def _top_functions(profiler: cProfile.Profile, limit: int = 10) -> List[Dict[str, Any]]:
+        """Funciones con mayor tiempo acumulado dentro del span"""
+        
+        stats = pstats.Stats(profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        
+        return [
+            {
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": calls,
+                "cumulative_s": round(cumulative, 4)
+            }
+            for (filename, line, function), (_, calls, _, cumulative, _) in ranked
+        ]
+    
+    def breakdown(self) -> Dict[str, Any]:
+        """Resumen por span: duración total, número de llamadas y padre"""
+        
+        summary = {}
+        with self._lock:
+            spans = list(self.spans)
+        
+        for span in sorted(spans, key=lambda s: s["start_us"]):
+            entry = summary.setdefault(span["name"], {
+                "category": span["cat"],
+                "parent": span["parent"],
+                "calls": 0,
+                "total_seconds": 0.0
+            })
+            entry["calls"] += 1
+            entry["total_seconds"] = round(entry["total_seconds"] + span["duration_us"] / 1e6, 4)
+            for key in ("top_functions", "memory_delta_kb", "memory_peak_kb", "error"):
+                if key in span["args"]:
+                    entry[key] = span["args"][key]
+        
+        return summary
+    
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Eventos en formato Chrome trace-event (chrome://tracing, Perfetto)"""
+        
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_us"])
+        
+        events = [
+            {
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["start_us"], 3),
+                "dur": round(span["duration_us"], 3),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": {key: value for key, value in span["args"].items() if key != "top_functions"}
+            }
+            for span in spans
+        ]
+        
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+    
+    def export(self, output_dir: Path, prefix: str) -> Dict[str, str]:
+        """Guarda trace Chrome, resumen y perfiles .prof en output_dir"""
+        
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        trace_path = output_dir / f"{prefix}_trace.json"
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        
+        breakdown_path = output_dir / f"{prefix}_timings.json"
+        with open(breakdown_path, 'w', encoding='utf-8') as f:
+            json.dump(self.breakdown(), f, indent=2, ensure_ascii=False)
+        
+        files = {"trace": str(trace_path), "timings": str(breakdown_path)}
+        
+        for name, profiler in self.profiles.items():
+            profile_path = output_dir / "profiles" / f"{prefix}_{name.replace(':', '_')}.prof"
+            profile_path.parent.mkdir(exist_ok=True)
+            profiler.dump_stats(str(profile_path))
+            files[f"profile:{name}"] = str(profile_path)
+        
+        return files
+    
+    def close(self) -> None:
+        """Detiene tracemalloc si este tracer lo inició"""
+        
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Watcher - Modo watch con regeneración incremental
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Módulos que se importan una sola vez por sesión de watch (los generadores
+# difieren diagrams hasta renderizar, así que se precarga explícitamente)
+WARM_MODULES = [
+    "diagrams",
+    "diagrams.aws.compute",
+    "diagrams.aws.database",
+    "diagrams.aws.network",
+    "diagrams.aws.security",
+    "generators.diagram_generator",
+    "generators.universal_generator",
+    "generators.dynamic_drawio_generator",
+    "generators.template_drawio_generator",
+    "generators.prompt_generator",
+    "generators.doc_generator",
+]
+
+class WorkflowWatcher:
+    """Observa entradas del flujo y regenera solo los artefactos afectados
+    
+    Usa sondeo de mtime/tamaño (sin dependencias externas). Los cambios se
+    agrupan con un debounce y el orquestador se reutiliza entre ejecuciones,
+    de modo que imports de generadores, pool PNG y caché quedan en caliente.
+    """
+    
+    def __init__(self, orchestrator, interval: float = 0.5, debounce: float = 1.0):
+        self.orchestrator = orchestrator
+        self.paths = orchestrator.paths
+        self.interval = interval
+        self.debounce = debounce
+        self.runs = 0
+    
+    def watched_files(self) -> List[Path]:
+        """Archivos de entrada observados"""
+        
+        files = [
+            self.orchestrator.app_config.spec_file,
+            self.paths.schemas_dir / "standard_input_model.json",
+        ]
+        files.extend(sorted(self.paths.templates_dir.glob("*.drawio")))
+        
+        return files
+    
+    def snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Estado (mtime_ns, tamaño) de cada archivo observado"""
+        
+        state = {}
+        for path in self.watched_files():
+            try:
+                stat = path.stat()
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        
+        return state
+    
+    @staticmethod
+    def diff(before: Dict[Path, Tuple[int, int]], after: Dict[Path, Tuple[int, int]]) -> List[Path]:
+        """Archivos creados, modificados o eliminados entre dos snapshots"""
+        
+        return sorted(path for path in set(before) | set(after) if before.get(path) != after.get(path))
+    
+    def targets_for(self, changed: List[Path]) -> List[str]:
+        """Targets del pipeline afectados por los archivos cambiados"""
+        
+        targets = []
+        for path in changed:
+            if path.suffix == ".drawio":
+                new_targets = ["drawio:template", "html_report"]
+            else:
+                # Especificación o esquema: la caché decide qué artefactos cambian
+                new_targets = ["final_report", "html_report"]
+            targets.extend(target for target in new_targets if target not in targets)
+        
+        return targets
+    
+    def warm_up(self) -> None:
+        """Importa generadores (diagrams, Graphviz) una sola vez"""
+        
+        import importlib
+        
+        for module_name in WARM_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                logger.warning("⚠️ No se pudo precargar %s: %s", module_name, e)
+    
+    def regenerate(self, changed: List[Path]) -> Dict[str, float]:
+        """Regenera los targets afectados por los cambios"""
+        
+        targets = self.targets_for(changed)
+        
+        if any(path.suffix != ".drawio" for path in changed):
+            self.orchestrator.app_config.clear_cache()
+        
+        logger.info("🔁 Cambios: %s -> %s", ', '.join(path.name for path in changed), ', '.join(targets))
+        start = time.perf_counter()
+        
+        try:
+            self.orchestrator.run_targets(targets)
+        except Exception as e:
+            logger.error("❌ Error regenerando: %s", e)
+        
+        self.runs += 1
+        cache = self.orchestrator.cache.summary()
+        logger.info("✅ Regenerado en %.2fs (%s artefactos, %s desde caché)",
+                    time.perf_counter() - start, len(cache['misses']), len(cache['hits']))
+        
+        return dict(self.orchestrator.stage_timings)
+    
+    def wait_for_changes(self, state: Dict[Path, Tuple[int, int]]) -> Tuple[List[Path], Dict[Path, Tuple[int, int]]]:
+        """Espera un cambio y agrupa la ráfaga hasta que pasen `debounce` segundos sin cambios"""
+        
+        while True:
+            time.sleep(self.interval)
+            current = self.snapshot()
+            if current != state:
+                break
+        
+        changed = set(self.diff(state, current))
+        quiet_since = time.monotonic()
+        
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(self.interval)
+            latest = self.snapshot()
+            if latest != current:
+                changed.update(self.diff(current, latest))
+                current = latest
+                quiet_since = time.monotonic()
+        
+        return sorted(changed), current
+    
+    def watch(self, max_runs: Optional[int] = None) -> None:
+        """Bucle principal: ejecución inicial y regeneración en cada cambio"""
+        
+        logger.info("👀 Observando %s archivos (Ctrl+C para salir)", len(self.watched_files()))
+        
+        self.warm_up()
+        self.orchestrator.keep_pool = True
+        state = self.snapshot()
+        
+        try:
+            self.regenerate(sorted(state))
+            
+            while max_runs is None or self.runs < max_runs:
+                changed, state = self.wait_for_changes(state)
+                self.regenerate(changed)
+        except KeyboardInterrupt:
+            logger.info("👋 Watch detenido")
+        finally:
+            self.orchestrator.close()
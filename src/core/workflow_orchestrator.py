@@ -5,64 +5,209 @@ Workflow Orchestrator - Orquestador completo del flujo de generación
 
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
 import json
+import os
 
-from .app_config import get_config, save_config, get_output_path, get_paths
+from .app_config import AppConfig, app_config as shared_app_config
+from .build_cache import BuildCache, stable_config
+from .mxgraph_writer import compressed_by_default
+from .pipeline import PipelineEngine, PipelineNode
+from .tracing import Tracer
+from .logger import get_logger
+
+logger = get_logger(__name__)
 
 class WorkflowOrchestrator:
     """Orquestador del flujo completo de generación"""
     
-    def __init__(self, project_name: str = "bmc_input"):
+    PNG_TYPES = ["network", "microservices", "security", "data_flow"]
+    
+    def __init__(self, project_name: str = "bmc_input", parallel: bool = False,
+                 max_workers: Optional[int] = None, use_cache: bool = True,
+                 app_config: Optional[AppConfig] = None, profile: bool = False,
+                 trace_memory: bool = False):
         self.project_name = project_name
-        self.paths = get_paths()
+        # Instancia propia por proyecto en ejecuciones batch; global por defecto
+        self.app_config = app_config or shared_app_config
+        self.paths = self.app_config.paths
         self.results = {}
         self.start_time = datetime.now()
+        
+        # Ejecución paralela de etapas independientes
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.stage_timings = {}
+        self.engine = None
+        
+        # Trazas por etapa/generador; cProfile y tracemalloc son opcionales
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.tracer = Tracer()
+        self.trace_files = {}
+        self._png_pool = None
+        self.keep_pool = False
+        self._png_pool_lock = threading.Lock()
+        
+        # Caché incremental: omite artefactos cuyas entradas no cambiaron
+        self.cache = BuildCache(
+            self.paths.outputs_generated_dir / f"{project_name}_build_manifest.json",
+            enabled=use_cache
+        )
+    
+    def build_pipeline(self) -> PipelineEngine:
+        """Construye el grafo de generadores con sus dependencias"""
+        
+        workers = (self.max_workers or os.cpu_count() or 1) if self.parallel else 1
+        engine = PipelineEngine(max_workers=workers, tracer=self.tracer)
+        
+        engine.add_node(PipelineNode(
+            "config", lambda deps: self._load_and_validate_config(),
+            outputs=[f"generated/{self.project_name}_consolidated.json"],
+            description="Configuración MCP consolidada"
+        ))
+        engine.add_node(PipelineNode(
+            "prompts", lambda deps: self._generate_mcp_prompts(deps["config"]),
+            inputs=["config"], outputs=[f"prompts/{self.project_name}/*.md"],
+            description="Prompts MCP"
+        ))
+        engine.add_node(PipelineNode(
+            "documentation", lambda deps: self._generate_documentation(deps["config"]),
+            inputs=["config"], outputs=[f"documentation/{self.project_name}/*.md"],
+            description="Documentación técnica"
+        ))
+        
+        for diagram_type in self.PNG_TYPES:
+            engine.add_node(PipelineNode(
+                f"png:{diagram_type}",
+                lambda deps, diagram_type=diagram_type: self._generate_png(deps["config"], diagram_type),
+                inputs=["config"], outputs=[f"png/{self.project_name}/{diagram_type}*.png"],
+                description=f"Diagrama PNG {diagram_type}"
+            ))
+        
+        engine.add_node(PipelineNode(
+            "drawio:static", lambda deps: self._generate_static_drawio(deps["config"]),
+            inputs=["config"], outputs=[f"drawio/{self.project_name}/complete_architecture.drawio"],
+            description="DrawIO completo (universal_generator)"
+        ))
+        engine.add_node(PipelineNode(
+            "drawio:dynamic", lambda deps: self._generate_dynamic_drawio(deps["config"]),
+            inputs=["config"], outputs=[f"drawio/{self.project_name}/dynamic_architecture_*.drawio"],
+            description="DrawIO dinámico desde especificación"
+        ))
+        engine.add_node(PipelineNode(
+            "drawio:template", lambda deps: self._generate_template_drawio(deps["config"]),
+            inputs=["config"], outputs=[f"drawio/{self.project_name}/template_*.drawio"],
+            description="DrawIO desde plantillas"
+        ))
+        engine.add_node(PipelineNode(
+            "drawio:bundle", lambda deps: self._generate_bundle_drawio(deps["config"]),
+            inputs=["config"], outputs=[f"drawio/{self.project_name}/professional_architecture.drawio"],
+            description="DrawIO multi-página (network, microservices, security, data flow)"
+        ))
+        engine.add_node(PipelineNode(
+            "html_report", self._generate_html_report,
+            inputs=["drawio:static", "drawio:dynamic", "drawio:template", "drawio:bundle"],
+            outputs=[f"reports/{self.project_name}/diagram_report_*.html"],
+            description="Reporte HTML de diagramas DrawIO"
+        ))
+        
+        png_nodes = [f"png:{diagram_type}" for diagram_type in self.PNG_TYPES]
+        engine.add_node(PipelineNode(
+            "results", self._consolidate_from_nodes,
+            inputs=["config", "prompts", "documentation"] + png_nodes + ["drawio:static"],
+            outputs=[f"generated/{self.project_name}_results.json"],
+            description="Resultados consolidados"
+        ))
+        engine.add_node(PipelineNode(
+            "final_report", lambda deps: self._generate_final_report(deps["results"]),
+            inputs=["results"], outputs=[f"documentation/{self.project_name}/{self.project_name}_report.md"],
+            description="Reporte final de generación"
+        ))
+        
+        return engine
+    
+    def run_targets(self, targets: Union[str, List[str], None] = None) -> Dict[str, Any]:
+        """Ejecuta solo los nodos necesarios para los targets indicados"""
+        
+        # --watch reutiliza el orquestador: timestamp y duración son de esta ejecución
+        self.start_time = datetime.now()
+        self.tracer = Tracer(profile=self.profile, memory=self.trace_memory)
+        self.engine = self.build_pipeline()
+        self.cache.reset_stats()
+        
+        try:
+            with self.tracer.span("workflow", "workflow", project=self.project_name, targets=targets):
+                outputs = self.engine.run(targets)
+        finally:
+            self.stage_timings = dict(self.engine.timings)
+            self.cache.save()
+            self.trace_files = self.tracer.export(self.paths.outputs_generated_dir, self.project_name)
+            self.tracer.close()
+            if not self.keep_pool:
+                self.close()
+        
+        return outputs
     
+    def close(self) -> None:
+        """Libera el pool de procesos PNG"""
+        
+        if self._png_pool is not None:
+            self._png_pool.shutdown()
+            self._png_pool = None
+
     def execute_complete_workflow(self) -> Dict[str, Any]:
         """Ejecuta el flujo completo de generación"""
         
-        print(f"🚀 Iniciando flujo completo para {self.project_name}")
-        print("=" * 60)
+        mode = "paralelo" if self.parallel else "secuencial"
+        logger.info("🚀 Iniciando flujo completo para %s (modo %s)", self.project_name, mode)
+        logger.info("=" * 60)
         
         try:
-            # 1. Cargar y validar configuración
-            config = self._load_and_validate_config()
-            
-            # 2. Generar prompts MCP
-            prompts = self._generate_mcp_prompts(config)
-            
-            # 3. Generar documentación
-            documentation = self._generate_documentation(config)
-            
-            # 4. Generar diagramas
-            diagrams = self._generate_diagrams(config)
-            
-            # 5. Consolidar resultados
-            results = self._consolidate_results(config, prompts, documentation, diagrams)
+            # config -> prompts/documentación/diagramas -> resultados -> reporte final
+            outputs = self.run_targets("final_report")
             
-            # 6. Generar reporte final
-            report = self._generate_final_report(results)
-            
-            print(f"\n🎉 Flujo completado exitosamente")
-            return results
+            if "final_report" not in outputs:
+                failed = ", ".join(f"{name}: {error}" for name, error in self.engine.errors.items())
+                raise RuntimeError(f"Pipeline incompleto ({failed or 'nodos omitidos'})")
             
+            logger.info("🎉 Flujo completado exitosamente")
+            return outputs["results"]
+        
         except Exception as e:
-            print(f"\n❌ Error en flujo: {e}")
+            logger.error("❌ Error en flujo: %s", e)
             raise
     
+    def _artifact_key(self, artifact: str, config: Dict[str, Any], sources: List[str]) -> str:
+        """Clave de caché: subárbol MCP, versión y código fuente del generador y sus helpers"""
+        
+        inputs = {
+            "artifact": artifact,
+            "project_name": self.project_name,
+            "version": config.get("version"),
+            "mcp": stable_config(config["mcp"])
+        }
+        if artifact.startswith("drawio"):
+            # Cambiar entre salida comprimida y sin comprimir regenera los DrawIO
+            inputs["compressed"] = compressed_by_default()
+        sources = self.cache.source_closure([self.paths.src_dir / source for source in sources], self.paths.src_dir)
+        return self.cache.compute_key(inputs, sources)
+    
     def _load_and_validate_config(self) -> Dict[str, Any]:
         """Carga y valida configuración"""
         
-        print("\n1️⃣ CARGANDO CONFIGURACIÓN")
+        logger.info("1️⃣ CARGANDO CONFIGURACIÓN")
         
         # Cargar configuración MCP
-        mcp_config = get_config("bmc")
-        print(f"✅ Configuración MCP cargada")
+        mcp_config = self.app_config.load_config("bmc")
+        logger.info("✅ Configuración MCP cargada")
         
         # Cargar modelo estándar
-        standard_model = get_config("standard_model")
-        print(f"✅ Modelo estándar cargado")
+        standard_model = self.app_config.load_config("standard_model")
+        logger.info("✅ Modelo estándar cargado")
         
         # Validar configuración
         microservices = mcp_config.get("microservices")
@@ -73,9 +218,9 @@ class WorkflowOrchestrator:
             microservices = arch_design.get("microservices")
             
             if not microservices:
-                print("⚠️ No se encontraron microservicios en configuración MCP, usando defaults")
+                logger.warning("⚠️ No se encontraron microservicios en configuración MCP, usando defaults")
                 # Usar configuración por defecto con microservicios
-                default_mcp = get_config("bmc")
+                default_mcp = self.app_config.load_config("bmc")
                 mcp_config.update(default_mcp)
         
         # Consolidar configuración
@@ -88,15 +233,21 @@ class WorkflowOrchestrator:
         }
         
         # Guardar configuración consolidada
-        config_path = save_config(f"{self.project_name}_consolidated", consolidated_config)
-        print(f"✅ Configuración consolidada guardada: {Path(config_path).name}")
+        config_path = self.app_config.save_config(f"{self.project_name}_consolidated", consolidated_config)
+        logger.info("✅ Configuración consolidada guardada: %s", Path(config_path).name)
         
         return consolidated_config
     
     def _generate_mcp_prompts(self, config: Dict[str, Any]) -> Dict[str, str]:
         """Genera prompts MCP"""
         
-        print("\n2️⃣ GENERANDO PROMPTS MCP")
+        logger.info("2️⃣ GENERANDO PROMPTS MCP")
+        
+        cache_key = self._artifact_key("prompts", config, ["generators/prompt_generator.py"])
+        cached = self.cache.lookup("prompts", cache_key)
+        if cached is not None:
+            logger.info("⏭️ Prompts sin cambios, usando caché: %s", len(cached))
+            return cached
         
         from generators.prompt_generator import MCPPromptGenerator
         
@@ -106,18 +257,26 @@ class WorkflowOrchestrator:
         
         # Generar prompts usando método existente
         try:
-            prompt_results = prompt_generator.generate_prompts(self.project_name)
+            with self.tracer.span("MCPPromptGenerator.generate_prompts"):
+                prompt_results = prompt_generator.generate_prompts(self.project_name)
             prompts.update(prompt_results)
-            print(f"✅ Prompts generados: {len(prompt_results)}")
+            logger.info("✅ Prompts generados: %s", len(prompt_results))
+            self.cache.store("prompts", cache_key, prompts)
         except Exception as e:
-            print(f"⚠️ Error generando prompts: {e}")
+            logger.warning("⚠️ Error generando prompts: %s", e)
         
         return prompts
     
     def _generate_documentation(self, config: Dict[str, Any]) -> Dict[str, str]:
         """Genera documentación"""
         
-        print("\n3️⃣ GENERANDO DOCUMENTACIÓN")
+        logger.info("3️⃣ GENERANDO DOCUMENTACIÓN")
+        
+        cache_key = self._artifact_key("documentation", config, ["generators/doc_generator.py"])
+        cached = self.cache.lookup("documentation", cache_key)
+        if cached is not None:
+            logger.info("⏭️ Documentación sin cambios, usando caché: %s", len(cached))
+            return cached
         
         from generators.doc_generator import ImplementationDocGenerator
         
@@ -127,64 +286,226 @@ class WorkflowOrchestrator:
         
         # Generar documentos usando método existente
         try:
-            doc_results = doc_generator.generate_implementation_docs(self.project_name)
+            with self.tracer.span("ImplementationDocGenerator.generate_implementation_docs"):
+                doc_results = doc_generator.generate_implementation_docs(self.project_name)
             documentation.update(doc_results)
-            print(f"✅ Documentos generados: {len(doc_results)}")
+            logger.info("✅ Documentos generados: %s", len(doc_results))
+            self.cache.store("documentation", cache_key, documentation)
         except Exception as e:
-            print(f"⚠️ Error generando documentos: {e}")
+            logger.warning("⚠️ Error generando documentos: %s", e)
         
         return documentation
     
-    def _generate_diagrams(self, config: Dict[str, Any]) -> Dict[str, str]:
-        """Genera diagramas"""
+    def _generate_png(self, config: Dict[str, Any], diagram_type: str) -> Dict[str, str]:
+        """Genera un diagrama PNG"""
         
-        print("\n4️⃣ GENERANDO DIAGRAMAS")
+        logger.info("4️⃣ GENERANDO DIAGRAMA PNG %s", diagram_type.upper())
         
-        diagrams = {}
+        artifact = f"png:{diagram_type}"
+        cache_key = self._artifact_key(artifact, config, ["generators/diagram_generator.py"])
+        cached = self.cache.lookup(artifact, cache_key)
+        if cached is not None:
+            logger.info("⏭️ PNG %s sin cambios, usando caché", diagram_type)
+            return cached
         
         try:
-            # Generar PNG usando diagram_generator
             from generators.diagram_generator import DiagramGenerator
             
             diagram_generator = DiagramGenerator(config["mcp"], str(self.paths.outputs_png_dir))
+            with self.tracer.span("DiagramGenerator.generate_diagrams", diagram_type=diagram_type):
+                png_paths = diagram_generator.generate_diagrams(
+                    [diagram_type],
+                    output_path=str(self.paths.outputs_png_dir / self.project_name),
+                    executor=self._get_png_pool()
+                )
+        except Exception as e:
+            logger.warning("⚠️ Error PNG %s: %s", diagram_type, e)
+            return {}
+        
+        if diagram_type in png_paths:
+            self.cache.store(artifact, cache_key, png_paths)
+            logger.info("✅ PNG %s: %s", diagram_type, Path(png_paths[diagram_type]).name)
+        
+        return png_paths
+    
+    def _get_png_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Pool de procesos compartido por los nodos PNG en modo paralelo"""
+        
+        if not self.parallel:
+            return None
+        
+        with self._png_pool_lock:
+            if self._png_pool is None:
+                # spawn evita heredar locks de los hilos del pipeline al hacer fork
+                self._png_pool = ProcessPoolExecutor(
+                    max_workers=min(len(self.PNG_TYPES), self.max_workers or os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+        
+        return self._png_pool
+    
+    def _generate_static_drawio(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Genera DrawIO completo estático"""
+        
+        logger.info("4️⃣ GENERANDO DRAWIO COMPLETO")
+        
+        cache_key = self._artifact_key("drawio:static", config, ["generators/universal_generator.py"])
+        cached = self.cache.lookup("drawio:static", cache_key)
+        if cached is not None:
+            logger.info("⏭️ DrawIO completo sin cambios, usando caché")
+            return cached
+        
+        try:
+            from generators.universal_generator import UniversalGenerator
+            universal_generator = UniversalGenerator(str(self.paths.outputs_dir))
             
-            # Generar diagramas PNG
-            png_types = ["network", "microservices", "security", "data_flow"]
-            
-            for diagram_type in png_types:
-                try:
-                    png_path = diagram_generator.generate_diagram(
-                        diagram_type, 
-                        str(self.paths.outputs_png_dir / project_name)
-                    )
-                    diagrams[f"png_{diagram_type}"] = png_path
-                    print(f"✅ PNG {diagram_type}: {Path(png_path).name}")
-                except Exception as e:
-                    print(f"⚠️ Error PNG {diagram_type}: {e}")
+            with self.tracer.span("UniversalGenerator.generate_drawio_xml"):
+                drawio_path = universal_generator.generate_drawio_xml(config["mcp"], self.project_name)
+        except Exception as e:
+            logger.error("❌ Error generando DrawIO completo: %s", e)
+            return {}
+        
+        outputs = {"drawio_complete": drawio_path}
+        self.cache.store("drawio:static", cache_key, outputs)
+        logger.info("✅ DrawIO completo: %s", Path(drawio_path).name)
+        
+        return outputs
+    
+    def _generate_dynamic_drawio(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Genera DrawIO dinámico desde la especificación"""
+        
+        logger.info("4️⃣ GENERANDO DRAWIO DINÁMICO")
+        
+        spec_path = self.app_config.spec_file
+        cache_key = self._artifact_key("drawio:dynamic", config,
+                                       ["generators/dynamic_drawio_generator.py", spec_path])
+        cached = self.cache.lookup("drawio:dynamic", cache_key)
+        if cached is not None:
+            logger.info("⏭️ DrawIO dinámico sin cambios, usando caché")
+            return cached
+        
+        try:
+            from generators.dynamic_drawio_generator import DynamicDrawIOGenerator
             
-            # Generar DrawIO usando universal_generator
-            from generators.universal_generator import UniversalGenerator
-            universal_generator = UniversalGenerator(config["mcp"], str(self.paths.outputs_dir))
+            spec = spec_path.read_text(encoding='utf-8')
+            dynamic_generator = DynamicDrawIOGenerator(str(self.paths.outputs_dir))
+            with self.tracer.span("DynamicDrawIOGenerator.generate_dynamic_drawio"):
+                drawio_path = dynamic_generator.generate_dynamic_drawio(spec, self.project_name)
+        except Exception as e:
+            logger.error("❌ Error generando DrawIO dinámico: %s", e)
+            return {}
+        
+        outputs = {"drawio_dynamic": drawio_path}
+        self.cache.store("drawio:dynamic", cache_key, outputs)
+        
+        return outputs
+    
+    def _generate_template_drawio(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Genera DrawIO desde plantillas"""
+        
+        logger.info("4️⃣ GENERANDO DRAWIO DESDE PLANTILLAS")
+        
+        templates = sorted(self.paths.templates_dir.glob("*.drawio"))
+        cache_key = self._artifact_key("drawio:template", config,
+                                       ["generators/template_drawio_generator.py"] + templates)
+        cached = self.cache.lookup("drawio:template", cache_key)
+        if cached is not None:
+            logger.info("⏭️ DrawIO de plantillas sin cambios, usando caché")
+            return cached
+        
+        try:
+            from generators.template_drawio_generator import TemplateDrawIOGenerator
             
-            drawio_path = universal_generator.generate_drawio_xml(config["mcp"])
-            diagrams["drawio_complete"] = drawio_path
-            print(f"✅ DrawIO completo: {Path(drawio_path).name}")
+            template_generator = TemplateDrawIOGenerator(str(self.paths.outputs_dir))
+            with self.tracer.span("TemplateDrawIOGenerator.generate_all_templates"):
+                outputs = template_generator.generate_all_templates(config["mcp"], self.project_name)
+        except Exception as e:
+            logger.error("❌ Error generando DrawIO desde plantillas: %s", e)
+            return {}
+        
+        self.cache.store("drawio:template", cache_key, outputs)
+        
+        return outputs
+    
+    def _generate_bundle_drawio(self, config: Dict[str, Any]) -> Dict[str, str]:
+        """Genera el DrawIO multi-página del proyecto"""
+        
+        logger.info("4️⃣ GENERANDO DRAWIO MULTI-PÁGINA")
+        
+        cache_key = self._artifact_key("drawio:bundle", config,
+                                       ["generators/professional_drawio_generator.py", "core/drawio_bundler.py"])
+        cached = self.cache.lookup("drawio:bundle", cache_key)
+        if cached is not None:
+            logger.info("⏭️ DrawIO multi-página sin cambios, usando caché")
+            return cached
+        
+        try:
+            from generators.professional_drawio_generator import ProfessionalDrawIOGenerator
             
+            professional_generator = ProfessionalDrawIOGenerator(str(self.paths.outputs_dir))
+            with self.tracer.span("ProfessionalDrawIOGenerator.generate_professional_drawio"):
+                drawio_path = professional_generator.generate_professional_drawio(config["mcp"], self.project_name)
         except Exception as e:
-            print(f"❌ Error generando diagramas: {e}")
+            logger.error("❌ Error generando DrawIO multi-página: %s", e)
+            return {}
+        
+        outputs = {"drawio_bundle": drawio_path}
+        self.cache.store("drawio:bundle", cache_key, outputs)
+        
+        return outputs
+    
+    def _generate_html_report(self, deps: Dict[str, Dict[str, str]]) -> str:
+        """Genera reporte HTML con los DrawIO generados"""
+        
+        logger.info("📊 GENERANDO REPORTE HTML")
+        
+        from reports.html_report_generator import HTMLReportGenerator
+        from validators.xml_validator import validate_drawio_file
+        
+        diagrams = []
+        with self.tracer.span("validate_drawio_file"):
+            for node_outputs in deps.values():
+                for name, path in node_outputs.items():
+                    diagrams.append({
+                        "name": name,
+                        "path": path,
+                        "type": "drawio",
+                        "valid": validate_drawio_file(path)["valid"]
+                    })
+        
+        with self.tracer.span("HTMLReportGenerator.generate_diagram_report"):
+            return HTMLReportGenerator(str(self.paths.outputs_dir)).generate_diagram_report(diagrams, self.project_name)
+    
+    def _consolidate_from_nodes(self, deps: Dict[str, Any]) -> Dict[str, Any]:
+        """Consolida resultados a partir de las salidas de los nodos"""
         
-        return diagrams
+        diagrams = {}
+        for diagram_type in self.PNG_TYPES:
+            png_outputs = deps.get(f"png:{diagram_type}", {})
+            if diagram_type in png_outputs:
+                diagrams[f"png_{diagram_type}"] = png_outputs[diagram_type]
+        diagrams.update(deps.get("drawio:static", {}))
+        
+        return self._consolidate_results(deps["config"], deps["prompts"], deps["documentation"], diagrams)
     
     def _consolidate_results(self, config: Dict[str, Any], prompts: Dict[str, str], 
                            documentation: Dict[str, str], diagrams: Dict[str, str]) -> Dict[str, Any]:
         """Consolida todos los resultados"""
         
-        print("\n5️⃣ CONSOLIDANDO RESULTADOS")
+        logger.info("5️⃣ CONSOLIDANDO RESULTADOS")
         
         results = {
             "project_name": self.project_name,
             "timestamp": self.start_time.isoformat(),
             "duration_seconds": (datetime.now() - self.start_time).total_seconds(),
+            "execution_mode": "parallel" if self.parallel else "sequential",
+            # Etapas completadas hasta este punto (el pipeline sigue en curso)
+            "stage_timings": dict(self.engine.timings) if self.engine else dict(self.stage_timings),
+            "trace_files": {
+                "trace": str(self.paths.outputs_generated_dir / f"{self.project_name}_trace.json"),
+                "timings": str(self.paths.outputs_generated_dir / f"{self.project_name}_timings.json")
+            },
+            "cache": self.cache.summary(),
             "config": config,
             "generated_files": {
                 "prompts": prompts,
@@ -200,15 +521,15 @@ class WorkflowOrchestrator:
         }
         
         # Guardar resultados consolidados
-        results_path = save_config(f"{self.project_name}_results", results)
-        print(f"✅ Resultados consolidados: {Path(results_path).name}")
+        results_path = self.app_config.save_config(f"{self.project_name}_results", results)
+        logger.info("✅ Resultados consolidados: %s", Path(results_path).name)
         
         return results
     
     def _generate_final_report(self, results: Dict[str, Any]) -> str:
         """Genera reporte final"""
         
-        print("\n6️⃣ GENERANDO REPORTE FINAL")
+        logger.info("6️⃣ GENERANDO REPORTE FINAL")
         
         report_content = f"""# Reporte de Generación - {results['project_name'].upper()}
 
@@ -217,8 +538,20 @@ class WorkflowOrchestrator:
 - **Proyecto:** {results['project_name']}
 - **Fecha:** {results['timestamp'][:19]}
 - **Duración:** {results['duration_seconds']:.1f} segundos
+- **Modo de ejecución:** {results.get('execution_mode', 'sequential')}
 - **Archivos generados:** {results['summary']['total_files']}
 
+## ⏱️ Tiempos por Etapa
+
+"""
+        
+        for stage_name, stage_seconds in results.get('stage_timings', {}).items():
+            report_content += f"- **{stage_name}:** {stage_seconds:.2f}s\n"
+        
+        if results.get('trace_files'):
+            report_content += f"\nTraza detallada (chrome://tracing): `{Path(results['trace_files']['trace']).name}`\n"
+        
+        report_content += f"""
 ## 📋 Archivos Generados
 
 ### 🎯 Prompts MCP ({results['summary']['prompts_count']})
@@ -257,16 +590,37 @@ Generación completada exitosamente. Todos los archivos están disponibles en la
 """
         
         # Guardar reporte
-        report_path = get_output_path("documentation", f"{self.project_name}_report.md", self.project_name)
+        report_path = self.app_config.get_output_path("documentation", f"{self.project_name}_report.md", self.project_name)
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(report_content)
         
-        print(f"✅ Reporte final: {report_path.name}")
+        logger.info("✅ Reporte final: %s", report_path.name)
         
         return str(report_path)
 
-def run_complete_workflow(project_name: str = "bmc_input") -> Dict[str, Any]:
+def run_complete_workflow(project_name: str = "bmc_input", parallel: bool = False,
+                          max_workers: Optional[int] = None, use_cache: bool = True,
+                          profile: bool = False, trace_memory: bool = False) -> Dict[str, Any]:
     """Ejecuta el flujo completo de generación"""
     
-    orchestrator = WorkflowOrchestrator(project_name)
+    orchestrator = WorkflowOrchestrator(project_name, parallel=parallel, max_workers=max_workers,
+                                        use_cache=use_cache, profile=profile, trace_memory=trace_memory)
     return orchestrator.execute_complete_workflow()
+
+def run_workflow_targets(targets: Union[str, List[str]], project_name: str = "bmc_input",
+                         parallel: bool = False, max_workers: Optional[int] = None,
+                         use_cache: bool = True, profile: bool = False,
+                         trace_memory: bool = False) -> Dict[str, Any]:
+    """Ejecuta solo los nodos del pipeline necesarios para los targets"""
+    
+    orchestrator = WorkflowOrchestrator(project_name, parallel=parallel, max_workers=max_workers,
+                                        use_cache=use_cache, profile=profile, trace_memory=trace_memory)
+    outputs = orchestrator.run_targets(targets)
+    
+    return {
+        "outputs": outputs,
+        "errors": dict(orchestrator.engine.errors),
+        "skipped": list(orchestrator.engine.skipped),
+        "stage_timings": orchestrator.stage_timings,
+        "trace_files": orchestrator.trace_files
+    }
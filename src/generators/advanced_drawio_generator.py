@@ -8,6 +8,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Tuple
 import json
 
+from core.logger import get_logger
+from core.mxgraph_writer import compress_document, compressed_by_default
+
+logger = get_logger(__name__)
+
 class AdvancedDrawIOGenerator:
     """Generador DrawIO avanzado que replica estructura PNG"""
     
@@ -311,9 +316,11 @@ class AdvancedDrawIOGenerator:
         filename = f"{diagram_type}_png_level_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
         file_path = output_dir / filename
         
+        if compressed_by_default():
+            xml_content = compress_document(xml_content)
         file_path.write_text(xml_content, encoding='utf-8')
         
-        print(f"✅ Advanced DrawIO (PNG Level) generado: {file_path}")
+        logger.info("✅ Advanced DrawIO (PNG Level) generado: %s", file_path)
         return str(file_path)
     
     def _next_id(self) -> int:
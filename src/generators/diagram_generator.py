@@ -4,30 +4,26 @@ Refined Diagram Generator - Generador refinado para diagramas profesionales
 Crea diagramas detallados y profesionales usando configuración MCP refinada
 """
 
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import Fargate, Lambda, ECS
-from diagrams.aws.database import RDS, Elasticache, Redshift
-from diagrams.aws.storage import S3, EBS
-from diagrams.aws.network import APIGateway, CloudFront, ELB, VPC, PrivateSubnet, PublicSubnet
-from diagrams.aws.security import Cognito, WAF, KMS, SecretsManager
-from diagrams.aws.integration import SQS, SNS, Eventbridge
-from diagrams.aws.ml import Textract, Comprehend
-from diagrams.aws.management import Cloudwatch, SystemsManager
-from diagrams.aws.analytics import Kinesis
-from diagrams.onprem.client import Users, Client
-from diagrams.onprem.network import Internet
-from diagrams.generic.blank import Blank
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+import multiprocessing
 import os
 
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class RefinedDiagramGenerator:
     """Generador refinado de diagramas AWS profesionales"""
     
+    DIAGRAM_TYPES = ["network", "microservices", "security", "data_flow"]
+    
     def __init__(self, config: Dict[str, Any], output_dir: str = "output"):
         self.config = config
         self.output_dir = output_dir
         self.diagram_config = config.get("diagram_config", {})
         self.colors = self.diagram_config.get("colors", {})
+        self.errors = {}
     
     def generate_diagram(self, diagram_type: str, output_path: str = None) -> str:
         """Genera diagrama según el tipo especificado"""
@@ -48,9 +44,77 @@ class RefinedDiagramGenerator:
         else:
             raise ValueError(f"Tipo de diagrama no soportado: {diagram_type}")
     
+    def generate_diagrams(self, diagram_types: List[str] = None, output_path: str = None,
+                          max_workers: Optional[int] = None,
+                          executor: Optional[Executor] = None) -> Dict[str, str]:
+        """Genera varios tipos de diagrama, cada uno en su propio proceso
+        
+        Retorna {tipo: ruta_png} con los tipos generados. Los errores quedan
+        aislados por tipo y se registran en self.errors. Si se pasa `executor`
+        se reutiliza ese pool en lugar de crear uno nuevo.
+        """
+        
+        if diagram_types is None:
+            diagram_types = self.DIAGRAM_TYPES
+        
+        if output_path:
+            self.output_dir = output_path
+        
+        if max_workers is None:
+            max_workers = min(len(diagram_types), os.cpu_count() or 1)
+        
+        results = {}
+        self.errors = {}
+        
+        if executor is not None:
+            return self._collect_results(executor, diagram_types, results)
+        
+        # Un solo worker: renderizar en el proceso actual sin coste de pool
+        if max_workers <= 1 or len(diagram_types) <= 1:
+            for diagram_type in diagram_types:
+                try:
+                    results[diagram_type] = self.generate_diagram(diagram_type)
+                except Exception as e:
+                    self.errors[diagram_type] = str(e)
+                    logger.warning("⚠️ Error PNG %s: %s", diagram_type, e)
+            return results
+        
+        # spawn evita heredar locks de otros hilos del orquestador al hacer fork
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            return self._collect_results(executor, diagram_types, results)
+    
+    def _collect_results(self, executor: Executor, diagram_types: List[str],
+                         results: Dict[str, str]) -> Dict[str, str]:
+        """Envía cada tipo al pool y recoge rutas, aislando errores por tipo"""
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        futures = {
+            diagram_type: executor.submit(_render_diagram, self.config, self.output_dir, diagram_type)
+            for diagram_type in diagram_types
+        }
+        
+        for diagram_type, future in futures.items():
+            try:
+                results[diagram_type] = future.result()
+            except Exception as e:
+                self.errors[diagram_type] = str(e)
+                logger.warning("⚠️ Error PNG %s: %s", diagram_type, e)
+        
+        return results
+
     def _generate_network_png(self) -> str:
         """Genera diagrama de red completo"""
         
+        from diagrams import Diagram, Cluster
+        from diagrams.aws.compute import Fargate
+        from diagrams.aws.database import RDS
+        from diagrams.aws.storage import S3
+        from diagrams.aws.network import APIGateway, CloudFront, ELB
+        from diagrams.aws.security import WAF
+        from diagrams.onprem.client import Users
+        
         filename = os.path.join(self.output_dir, "network_architecture")
         
         with Diagram("BMC Network Architecture", 
@@ -93,12 +157,18 @@ class RefinedDiagramGenerator:
             product >> s3_data
         
         png_path = f"{filename}.png"
-        print(f"✅ Network PNG generado: {png_path}")
+        logger.info("✅ Network PNG generado: %s", png_path)
         return png_path
     
     def _generate_microservices_png(self) -> str:
         """Genera diagrama de microservicios detallado"""
         
+        from diagrams import Diagram, Cluster
+        from diagrams.aws.compute import Fargate
+        from diagrams.aws.database import RDS, Elasticache
+        from diagrams.aws.storage import S3
+        from diagrams.aws.network import APIGateway
+        
         filename = os.path.join(self.output_dir, "microservices_detailed")
         
         with Diagram("BMC Microservices Architecture", 
@@ -135,12 +205,21 @@ class RefinedDiagramGenerator:
             [product, invoice] >> s3_data
         
         png_path = f"{filename}.png"
-        print(f"✅ Microservices PNG generado: {png_path}")
+        logger.info("✅ Microservices PNG generado: %s", png_path)
         return png_path
     
     def _generate_security_png(self) -> str:
         """Genera diagrama de seguridad"""
         
+        from diagrams import Diagram, Cluster
+        from diagrams.aws.compute import Fargate
+        from diagrams.aws.database import RDS
+        from diagrams.aws.network import APIGateway, CloudFront
+        from diagrams.aws.security import Cognito, WAF, KMS, SecretsManager
+        from diagrams.aws.management import Cloudwatch
+        from diagrams.onprem.client import Users
+        from diagrams.onprem.network import Internet
+        
         filename = os.path.join(self.output_dir, "security_architecture")
         
         with Diagram("BMC Security Architecture", 
@@ -182,12 +261,23 @@ class RefinedDiagramGenerator:
             [waf, api_gw, fargate] >> cloudwatch
         
         png_path = f"{filename}.png"
-        print(f"✅ Security PNG generado: {png_path}")
+        logger.info("✅ Security PNG generado: %s", png_path)
         return png_path
     
     def _generate_data_flow_png(self) -> str:
         """Genera diagrama de flujo de datos nivel AWS Senior Architect"""
         
+        from diagrams import Diagram, Cluster
+        from diagrams.aws.compute import Fargate, Lambda
+        from diagrams.aws.database import RDS, Elasticache, Redshift
+        from diagrams.aws.storage import S3
+        from diagrams.aws.network import APIGateway, ELB
+        from diagrams.aws.security import Cognito
+        from diagrams.aws.integration import SQS, SNS
+        from diagrams.aws.ml import Textract, Comprehend
+        from diagrams.onprem.client import Users
+        from diagrams.onprem.network import Internet
+        
         filename = os.path.join(self.output_dir, "data_flow")
         
         with Diagram("BMC Data Flow Architecture - Senior Level", 
@@ -319,8 +409,13 @@ class RefinedDiagramGenerator:
             fargate_commission >> dian_api
         
         png_path = f"{filename}.png"
-        print(f"✅ Senior-Level Data Flow PNG generado: {png_path}")
+        logger.info("✅ Senior-Level Data Flow PNG generado: %s", png_path)
         return png_path
 
+def _render_diagram(config: Dict[str, Any], output_dir: str, diagram_type: str) -> str:
+    """Renderiza un tipo de diagrama en un proceso worker"""
+    
+    return RefinedDiagramGenerator(config, output_dir).generate_diagram(diagram_type)
+
 # Alias para compatibilidad
 DiagramGenerator = RefinedDiagramGenerator
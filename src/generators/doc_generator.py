@@ -7,6 +7,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
 
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class ImplementationDocGenerator:
     """Generador de documentación de implementación"""
     
@@ -50,7 +54,7 @@ class ImplementationDocGenerator:
             f.write(migration_plan)
         results["migration_plan"] = str(migration_file)
         
-        print(f"✓ Implementation docs generated in {docs_dir}")
+        logger.info("✓ Implementation docs generated in %s", docs_dir)
         return results
     
     def _generate_technical_architecture(self) -> str:
@@ -11,6 +11,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Tuple
 import uuid
 
+from core.mxgraph_writer import MxGraphWriter
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class DynamicDrawIOGenerator:
     """Generador DrawIO completamente dinámico con IA generativa"""
     
@@ -43,7 +48,7 @@ class DynamicDrawIOGenerator:
             "sns": "mxgraph.aws4.sns",
             "eventbridge": "mxgraph.aws4.eventbridge"
         }
-        
+    
     def generate_dynamic_drawio(self, specification: str, project_name: str = "bmc_input") -> str:
         """Genera DrawIO XML completamente dinámico desde especificación"""
         
@@ -56,11 +61,8 @@ class DynamicDrawIOGenerator:
         # 3. Layout inteligente automático
         layout = self._calculate_intelligent_layout(components)
         
-        # 4. Generación XML DrawIO
-        xml_content = self._generate_drawio_xml(components, layout, project_name)
-        
-        # 5. Guardar archivo
-        output_path = self._save_drawio_file(xml_content, project_name)
+        # 4. Generación XML DrawIO, escrito directo al archivo
+        output_path = self._save_drawio_file(components, layout, project_name)
         
         return output_path
     
@@ -319,37 +321,26 @@ class DynamicDrawIOGenerator:
         
         return layout
     
-    def _generate_drawio_xml(self, components: List[Dict], layout: Dict, project_name: str) -> str:
-        """Genera XML DrawIO dinámico"""
+    def _write_drawio(self, writer: MxGraphWriter, components: List[Dict], layout: Dict, project_name: str) -> None:
+        """Escribe el XML DrawIO dinámico"""
         
-        xml_parts = []
-        
-        # Header XML
-        xml_parts.append(f'''<?xml version="1.0" encoding="UTF-8"?>
-<mxfile host="app.diagrams.net" modified="{datetime.now().isoformat()}" version="22.1.11">
-  <diagram name="{project_name.upper()} Dynamic Architecture" id="dynamic-arch">
-    <mxGraphModel dx="2500" dy="1600" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="{layout['canvas_width']}" pageHeight="{layout['canvas_height']}">
-      <root>
-        <mxCell id="0"/>
-        <mxCell id="1" parent="0"/>''')
+        writer.start_file()
+        writer.start_diagram(f"{project_name.upper()} Dynamic Architecture", "dynamic-arch",
+                             pageWidth=layout['canvas_width'], pageHeight=layout['canvas_height'])
         
         # Título dinámico
-        xml_parts.append(f'''
-        <mxCell id="title" value="{project_name.upper()} - DYNAMIC ARCHITECTURE (AI Generated)" style="text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=18;fontStyle=1;fontColor=#1976D2;" vertex="1" parent="1">
-          <mxGeometry x="400" y="20" width="600" height="30" as="geometry"/>
-        </mxCell>''')
+        writer.vertex("title", f"{project_name.upper()} - DYNAMIC ARCHITECTURE (AI Generated)",
+                      "text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=18;fontStyle=1;fontColor=#1976D2;",
+                      400, 20, 600, 30)
         
         # Generar componentes dinámicamente
         for component in components:
             pos = layout["component_positions"][component["id"]]
             
             # Label dinámico con información técnica
-            label = component["label"]
-            
-            xml_parts.append(f'''
-        <mxCell id="comp_{component['id']}" value="{label}" style="shape={component['shape']};labelPosition=bottom;verticalLabelPosition=top;align=center;verticalAlign=bottom;{component['style']}" vertex="1" parent="1">
-          <mxGeometry x="{pos['x']}" y="{pos['y']}" width="{pos['width']}" height="{pos['height']}" as="geometry"/>
-        </mxCell>''')
+            style = f"shape={component['shape']};labelPosition=bottom;verticalLabelPosition=top;align=center;verticalAlign=bottom;{component['style']}"
+            writer.vertex(f"comp_{component['id']}", component["label"], style,
+                          pos['x'], pos['y'], pos['width'], pos['height'])
         
         # Generar conexiones dinámicas
         connection_id = 2000
@@ -357,20 +348,12 @@ class DynamicDrawIOGenerator:
             for connection in component.get("connections", []):
                 target_comp = next((c for c in components if connection.lower() in c["name"].lower()), None)
                 if target_comp:
-                    xml_parts.append(f'''
-        <mxCell id="conn_{connection_id}" style="edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;strokeColor=#1976D2;strokeWidth=2;" edge="1" parent="1" source="comp_{component['id']}" target="comp_{target_comp['id']}">
-          <mxGeometry relative="1" as="geometry"/>
-        </mxCell>''')
+                    writer.edge(f"conn_{connection_id}",
+                                "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;strokeColor=#1976D2;strokeWidth=2;",
+                                f"comp_{component['id']}", f"comp_{target_comp['id']}")
                     connection_id += 1
         
-        # Footer XML
-        xml_parts.append('''
-      </root>
-    </mxGraphModel>
-  </diagram>
-</mxfile>''')
-        
-        return ''.join(xml_parts)
+        writer.close()
     
     def _generate_dynamic_label(self, microservice: Dict) -> str:
         """Genera label dinámico para microservicio"""
@@ -428,18 +411,16 @@ class DynamicDrawIOGenerator:
         else:
             return "fillColor=#F5F5F5;strokeColor=#666666;fontColor=#333333;"
     
-    def _save_drawio_file(self, xml_content: str, project_name: str) -> str:
+    def _save_drawio_file(self, components: List[Dict], layout: Dict, project_name: str) -> str:
         """Guarda archivo DrawIO"""
         
-        output_dir = self.output_dir / "drawio" / project_name
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
         filename = f"dynamic_architecture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
-        file_path = output_dir / filename
+        file_path = self.output_dir / "drawio" / project_name / filename
         
-        file_path.write_text(xml_content, encoding='utf-8')
+        with MxGraphWriter.open(file_path) as writer:
+            self._write_drawio(writer, components, layout, project_name)
         
-        print(f"✅ Dynamic DrawIO generado: {file_path}")
+        logger.info("✅ Dynamic DrawIO generado: %s", file_path)
         return str(file_path)
     
     def _get_next_id(self) -> int:
@@ -11,9 +11,13 @@ sys.path.append('/home/giovanemere/Migracion/src')
 
 from models.diagram_model import DiagramModel, DiagramModelBuilder
 from layouts.diagram_layouts import LayoutEngine, LayoutType
+from layouts.incremental_layout import LayoutSnapshot
 from validators.drawio_validator import DrawIOValidator, DrawIOPreview, DrawIOTester
 from styles.diagram_styles import StyleManager, LegendGenerator, AnnotationManager
 from reports.html_report_generator import HTMLReportGenerator
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class EnhancedDrawIOGenerator:
     """Generador DrawIO mejorado con todas las características"""
@@ -33,7 +37,7 @@ class EnhancedDrawIOGenerator:
             "summary": {}
         }
         
-        print("🎨 Generando diagramas mejorados...")
+        logger.info("🎨 Generando diagramas mejorados...")
         
         # 1. Crear múltiples diagramas con diferentes layouts
         diagram_configs = [
@@ -55,20 +59,20 @@ class EnhancedDrawIOGenerator:
                 results["diagrams"].append(diagram_result)
         
         # 2. Generar previews
-        print("🖼️ Generando previews...")
+        logger.info("🖼️ Generando previews...")
         for diagram in results["diagrams"]:
             preview_path = self._generate_preview(diagram["path"])
             if preview_path:
                 results["previews"].append(preview_path)
         
         # 3. Ejecutar validaciones
-        print("🔍 Ejecutando validaciones...")
+        logger.info("🔍 Ejecutando validaciones...")
         for diagram in results["diagrams"]:
             validation_result = self._validate_diagram(diagram["path"])
             results["validations"].append(validation_result)
         
         # 4. Generar reporte HTML
-        print("📄 Generando reporte HTML...")
+        logger.info("📄 Generando reporte HTML...")
         report_path = self._generate_html_report(results["diagrams"], project_name)
         results["report_path"] = report_path
         
@@ -80,7 +84,7 @@ class EnhancedDrawIOGenerator:
             "report_generated": report_path is not None
         }
         
-        print(f"✅ Generación completa: {results['summary']}")
+        logger.info("✅ Generación completa: %s", results['summary'])
         return results
     
     def _generate_single_diagram(self, config: Dict, project_name: str, diagram_name: str, layout: LayoutType) -> Dict:
@@ -95,17 +99,17 @@ class EnhancedDrawIOGenerator:
             # 2. Aplicar estilos consistentes
             self._apply_consistent_styles(model)
             
-            # 3. Aplicar layout
-            LayoutEngine.apply_layout(model)
+            # 3. Aplicar layout (estable respecto a la ejecución anterior)
+            safe_name = diagram_name.lower().replace(" ", "_")
+            layout_path = self.output_dir / "drawio" / project_name / f"enhanced_{safe_name}.layout.json"
+            LayoutEngine.apply_layout(model, LayoutSnapshot.load(layout_path))
+            LayoutSnapshot.from_model(model).save(layout_path)
             
             # 4. Agregar leyenda y anotaciones
             self._add_legend_and_annotations(model)
             
-            # 5. Generar XML
-            xml_content = self._render_enhanced_xml(model)
-            
-            # 6. Guardar archivo
-            file_path = self._save_diagram_file(xml_content, project_name, diagram_name)
+            # 5. Generar XML directo al archivo
+            file_path = self._save_diagram_file(model, project_name, diagram_name)
             
             return {
                 "name": diagram_name,
@@ -118,7 +122,7 @@ class EnhancedDrawIOGenerator:
             }
         
         except Exception as e:
-            print(f"❌ Error generando {diagram_name}: {e}")
+            logger.error("❌ Error generando %s: %s", diagram_name, e)
             return None
     
     def _apply_consistent_styles(self, model: DiagramModel) -> None:
@@ -214,17 +218,11 @@ class EnhancedDrawIOGenerator:
             )
             model.add_component(component)
     
-    def _render_enhanced_xml(self, model: DiagramModel) -> str:
-        """Renderiza XML mejorado con todas las características"""
+    def _save_diagram_file(self, model: DiagramModel, project_name: str, diagram_name: str) -> str:
+        """Renderiza el modelo al archivo de diagrama (comprimido si está activado)"""
         
         from generators.refactored_drawio_generator import XMLRenderer
         
-        renderer = XMLRenderer()
-        return renderer.render_model(model)
-    
-    def _save_diagram_file(self, xml_content: str, project_name: str, diagram_name: str) -> str:
-        """Guarda archivo de diagrama"""
-        
         output_dir = self.output_dir / "drawio" / project_name
         output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -232,9 +230,9 @@ class EnhancedDrawIOGenerator:
         filename = f"enhanced_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
         file_path = output_dir / filename
         
-        file_path.write_text(xml_content, encoding='utf-8')
+        XMLRenderer().render_to_file(model, file_path)
         
-        print(f"✅ {diagram_name} generado: {file_path.name}")
+        logger.info("✅ %s generado: %s", diagram_name, file_path.name)
         return str(file_path)
     
     def _generate_preview(self, diagram_path: str) -> str:
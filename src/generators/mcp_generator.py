@@ -7,7 +7,11 @@ Genera PNG, DrawIO y Mermaid desde la misma base de infraestructura
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
-import xml.etree.ElementTree as ET
+
+from core.mxgraph_writer import MxGraphWriter
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class UnifiedMCPGenerator:
     """Generador unificado desde MCP"""
@@ -15,7 +19,7 @@ class UnifiedMCPGenerator:
     def __init__(self, config: Dict[str, Any], output_dir: str = "outputs/mcp"):
         self.config = config
         self.output_dir = Path(output_dir)
-        
+    
     def generate_all_diagrams(self, project_name: str = "bmc_input") -> Dict[str, str]:
         """Genera todos los diagramas desde la misma base MCP"""
         
@@ -40,7 +44,7 @@ class UnifiedMCPGenerator:
         hierarchical_drawio = hierarchical_generator.generate_network_with_clusters(project_name)
         results["drawio_network_hierarchical"] = hierarchical_drawio
         
-        print(f"✓ Unified diagrams generated from MCP infrastructure")
+        logger.info("✓ Unified diagrams generated from MCP infrastructure")
         return results
     
     def _generate_mermaid_diagrams(self, base_dir: Path, project_name: str) -> Dict[str, str]:
@@ -254,68 +258,41 @@ graph LR
         microservices = self.config.get("microservices", {})
         aws_services = self.config.get("aws_services", {})
         
-        # Crear XML DrawIO
-        mxfile = ET.Element("mxfile", host="app.diagrams.net")
-        diagram = ET.SubElement(mxfile, "diagram", name=f"{project_name} MCP Architecture", id="mcp")
-        model = ET.SubElement(diagram, "mxGraphModel", dx="1600", dy="900", grid="1", gridSize="10")
-        root = ET.SubElement(model, "root")
-        
-        # Celdas base
-        ET.SubElement(root, "mxCell", id="0")
-        ET.SubElement(root, "mxCell", id="1", parent="0")
-        
-        # Título
-        title_cell = ET.SubElement(root, "mxCell",
-            id="title",
-            value=f"{project_name.upper()} - MCP Architecture",
-            style="rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
-            vertex="1", parent="1"
-        )
-        ET.SubElement(title_cell, "mxGeometry", x="50", y="20", width="1200", height="50", **{"as": "geometry"})
-        
-        # AWS Cloud
-        aws_cell = ET.SubElement(root, "mxCell",
-            id="aws_cloud",
-            value="AWS Cloud - BMC Infrastructure",
-            style="rounded=1;whiteSpace=wrap;html=1;fillColor=#E3F2FD;strokeColor=#1976D2;fontSize=14;fontStyle=1;verticalAlign=top;",
-            vertex="1", parent="1"
-        )
-        ET.SubElement(aws_cell, "mxGeometry", x="100", y="100", width="1100", height="600", **{"as": "geometry"})
-        
-        # Microservicios
-        y_pos = 200
-        for i, (service_name, service_config) in enumerate(microservices.items()):
-            service_cell = ET.SubElement(root, "mxCell",
-                id=f"ms_{i}",
-                value=f"{service_name.replace('_', ' ').title()}\\n{service_config.get('business_function', '')[:30]}...",
-                style="rounded=1;whiteSpace=wrap;html=1;fillColor=#D05C17;fontColor=#FFFFFF;fontSize=10;",
-                vertex="1", parent="1"
-            )
-            ET.SubElement(service_cell, "mxGeometry", x="200", y=str(y_pos), width="150", height="80", **{"as": "geometry"})
-            y_pos += 100
-        
-        # Servicios AWS
-        x_pos = 500
-        for i, (service_name, service_config) in enumerate(aws_services.items()):
-            aws_service_cell = ET.SubElement(root, "mxCell",
-                id=f"aws_{i}",
-                value=f"{service_name.replace('_', ' ').title()}\\n{service_config.get('type', '').upper()}",
-                style="rounded=1;whiteSpace=wrap;html=1;fillColor=#116D5B;fontColor=#FFFFFF;fontSize=10;",
-                vertex="1", parent="1"
-            )
-            ET.SubElement(aws_service_cell, "mxGeometry", x=str(x_pos), y="300", width="120", height="60", **{"as": "geometry"})
-            x_pos += 150
-        
-        # Generar XML
-        ET.indent(mxfile, space="  ")
-        xml_str = ET.tostring(mxfile, encoding='unicode', xml_declaration=True)
-        
-        # Guardar archivo
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{project_name}_mcp_unified_{timestamp}.drawio"
         output_path = base_dir / "drawio" / filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(xml_str)
+        # Las celdas se escriben al archivo a medida que se generan
+        with MxGraphWriter.open(output_path) as writer:
+            writer.start_file()
+            writer.start_diagram(f"{project_name} MCP Architecture", "mcp", dx=1600, dy=900)
+            
+            # Título
+            writer.vertex("title", f"{project_name.upper()} - MCP Architecture",
+                          "rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
+                          50, 20, 1200, 50)
+            
+            # AWS Cloud
+            writer.vertex("aws_cloud", "AWS Cloud - BMC Infrastructure",
+                          "rounded=1;whiteSpace=wrap;html=1;fillColor=#E3F2FD;strokeColor=#1976D2;fontSize=14;fontStyle=1;verticalAlign=top;",
+                          100, 100, 1100, 600)
+            
+            # Microservicios
+            y_pos = 200
+            for i, (service_name, service_config) in enumerate(microservices.items()):
+                writer.vertex(f"ms_{i}",
+                              f"{service_name.replace('_', ' ').title()}\\n{service_config.get('business_function', '')[:30]}...",
+                              "rounded=1;whiteSpace=wrap;html=1;fillColor=#D05C17;fontColor=#FFFFFF;fontSize=10;",
+                              200, y_pos, 150, 80)
+                y_pos += 100
+            
+            # Servicios AWS
+            x_pos = 500
+            for i, (service_name, service_config) in enumerate(aws_services.items()):
+                writer.vertex(f"aws_{i}",
+                              f"{service_name.replace('_', ' ').title()}\\n{service_config.get('type', '').upper()}",
+                              "rounded=1;whiteSpace=wrap;html=1;fillColor=#116D5B;fontColor=#FFFFFF;fontSize=10;",
+                              x_pos, 300, 120, 60)
+                x_pos += 150
         
         return str(output_path)
@@ -7,6 +7,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
 
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class MCPPromptGenerator:
     """Generador de prompts MCP"""
     
@@ -43,7 +47,7 @@ class MCPPromptGenerator:
             f.write(impl_prompt)
         results["implementation"] = str(impl_file)
         
-        print(f"✓ MCP prompts generated in {prompts_dir}")
+        logger.info("✓ MCP prompts generated in %s", prompts_dir)
         return results
     
     def _generate_architecture_prompt(self) -> str:
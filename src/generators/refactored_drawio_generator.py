@@ -3,15 +3,22 @@
 Refactored DrawIO Generator - Arquitectura separada datos/lógica
 """
 
+import io
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import sys
 sys.path.append('/home/giovanemere/Migracion/src')
 
 from models.diagram_model import DiagramModel, DiagramModelBuilder, Component, Connection
 from layouts.diagram_layouts import LayoutEngine
+from layouts.incremental_layout import LayoutSnapshot
+from layouts.edge_router import EdgeRouter
 from validators.diagram_validator import DiagramValidator, XMLValidator, DiagramsNetAPI
+from core.mxgraph_writer import MxGraphWriter
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class RefactoredDrawIOGenerator:
     """Generador DrawIO refactorizado con separación datos/lógica"""
@@ -20,100 +27,102 @@ class RefactoredDrawIOGenerator:
         self.output_dir = Path(output_dir)
         self.xml_renderer = XMLRenderer()
     
-    def generate_from_config(self, config: Dict[str, Any], project_name: str = "bmc_input") -> str:
-        """Genera DrawIO desde configuración usando modelo de datos"""
+    def generate_from_config(self, config: Dict[str, Any], project_name: str = "bmc_input",
+                             previous_layout: Optional[str] = None) -> str:
+        """Genera DrawIO desde configuración usando modelo de datos
+        
+        previous_layout: .drawio o JSON de un layout anterior; por defecto el
+        JSON que deja la ejecución previa del proyecto. Los componentes sin
+        cambios conservan su posición.
+        """
         
         # 1. Crear modelo desde configuración
         model = DiagramModelBuilder.from_config(config)
         
-        # 2. Aplicar layout automático
-        LayoutEngine.apply_layout(model)
+        # 2. Aplicar layout automático (estable respecto al anterior)
+        layout_path = self.output_dir / "drawio" / project_name / "refactored_architecture.layout.json"
+        previous = LayoutSnapshot.load(previous_layout or layout_path)
+        LayoutEngine.apply_layout(model, previous)
+        LayoutSnapshot.from_model(model).save(layout_path)
         
         # 3. Validar modelo
-        is_valid, errors = DiagramValidator.validate_model(model)
-        if not is_valid:
-            print(f"⚠️ Errores en modelo: {errors}")
+        report = DiagramValidator.lint_model(model)
+        if not report.valid:
+            logger.warning("⚠️ Errores en modelo: %s", report.errors)
+        if report.warnings:
+            logger.info("🔍 Advertencias en modelo: %s", report.warnings)
         
-        # 4. Generar XML
-        xml_content = self.xml_renderer.render_model(model)
+        # 4. Generar XML directo al archivo
+        output_path = self.xml_renderer.render_to_file(model, self._output_path(project_name))
+        logger.info("✅ Refactored DrawIO generado: %s", output_path)
+        xml_content = Path(output_path).read_text(encoding='utf-8')
         
         # 5. Validar XML
         xml_valid, xml_errors = XMLValidator.validate_xml(xml_content)
         if not xml_valid:
-            print(f"⚠️ Errores en XML: {xml_errors}")
+            logger.warning("⚠️ Errores en XML: %s", xml_errors)
         
         # 6. Validación online (opcional)
         online_valid, online_msg = DiagramsNetAPI.validate_online(xml_content)
         if online_valid:
-            print("✅ Validación online exitosa")
+            logger.info("✅ Validación online exitosa")
         else:
-            print(f"⚠️ Validación online: {online_msg}")
-        
-        # 7. Guardar archivo
-        output_path = self._save_file(xml_content, project_name)
+            logger.warning("⚠️ Validación online: %s", online_msg)
         
         return output_path
     
-    def _save_file(self, xml_content: str, project_name: str) -> str:
-        """Guarda archivo DrawIO"""
-        
-        output_dir = self.output_dir / "drawio" / project_name
-        output_dir.mkdir(parents=True, exist_ok=True)
+    def _output_path(self, project_name: str) -> Path:
+        """Ruta del archivo DrawIO"""
         
         filename = f"refactored_architecture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
-        file_path = output_dir / filename
-        
-        file_path.write_text(xml_content, encoding='utf-8')
-        
-        print(f"✅ Refactored DrawIO generado: {file_path}")
-        return str(file_path)
+        return self.output_dir / "drawio" / project_name / filename
 
 class XMLRenderer:
     """Renderizador de XML DrawIO desde modelo"""
     
     def __init__(self):
         self.id_counter = 1000
+        # Reutilizado entre renders: solo se re-rutean conexiones afectadas por cambios
+        self.edge_router = EdgeRouter()
     
     def render_model(self, model: DiagramModel) -> str:
         """Renderiza modelo completo a XML"""
         
-        xml_parts = []
+        buffer = io.StringIO()
+        self.write_model(model, MxGraphWriter(buffer))
+        return buffer.getvalue()
+    
+    def render_to_file(self, model: DiagramModel, path: str, pretty: bool = True) -> str:
+        """Escribe el modelo directo al archivo, celda por celda"""
         
-        # Header
-        xml_parts.append(self._render_header(model))
+        with MxGraphWriter.open(path, pretty) as writer:
+            self.write_model(model, writer)
+        return str(path)
+    
+    def write_model(self, model: DiagramModel, writer: MxGraphWriter) -> None:
+        """Escribe el modelo con el writer (archivo, socket o buffer)"""
+        
+        canvas_width, canvas_height = model.canvas_size
+        writer.start_file()
+        writer.start_diagram(model.name, "refactored_diagram", pageWidth=canvas_width, pageHeight=canvas_height)
         
         # Componentes
         for component in model.components:
-            xml_parts.append(self._render_component(component))
+            self._render_component(writer, component)
         
-        # Conexiones
+        # Conexiones con sus puntos de quiebre
+        routes = self.edge_router.route_all(
+            {c.id: (c.position.x, c.position.y, c.position.width, c.position.height) for c in model.components},
+            ((connection.id, connection.source, connection.target) for connection in model.connections)
+        )
         for connection in model.connections:
-            xml_parts.append(self._render_connection(connection))
-        
-        # Footer
-        xml_parts.append(self._render_footer())
-        
-        return ''.join(xml_parts)
-    
-    def _render_header(self, model: DiagramModel) -> str:
-        """Renderiza header XML"""
-        
-        canvas_width, canvas_height = model.canvas_size
+            self._render_connection(writer, connection, routes[connection.id])
         
-        return f'''<?xml version="1.0" encoding="UTF-8"?>
-<mxfile host="app.diagrams.net" modified="{datetime.now().isoformat()}" version="22.1.11">
-  <diagram name="{model.name}" id="refactored_diagram">
-    <mxGraphModel dx="2500" dy="1600" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="{canvas_width}" pageHeight="{canvas_height}">
-      <root>
-        <mxCell id="0"/>
-        <mxCell id="1" parent="0"/>'''
+        writer.close()
     
-    def _render_component(self, component: Component) -> str:
+    def _render_component(self, writer: MxGraphWriter, component: Component) -> None:
         """Renderiza componente individual"""
         
-        # Escapar caracteres XML
-        escaped_label = self._escape_xml(component.label or component.name)
-        
         # Construir estilo
         style_parts = [
             f"fillColor={component.style.fill_color}",
@@ -133,16 +142,13 @@ class XMLRenderer:
         
         style = ";".join(style_parts) + ";"
         
-        return f'''
-        <mxCell id="{component.id}" value="{escaped_label}" style="{style}" vertex="1" parent="1">
-          <mxGeometry x="{component.position.x}" y="{component.position.y}" width="{component.position.width}" height="{component.position.height}" as="geometry"/>
-        </mxCell>'''
+        pos = component.position
+        writer.vertex(component.id, component.label or component.name, style, pos.x, pos.y, pos.width, pos.height)
     
-    def _render_connection(self, connection: Connection) -> str:
+    def _render_connection(self, writer: MxGraphWriter, connection: Connection,
+                           points: List[Tuple[int, int]] = ()) -> None:
         """Renderiza conexión individual"""
         
-        escaped_label = self._escape_xml(connection.label)
-        
         # Estilo de conexión
         style_parts = [
             "edgeStyle=orthogonalEdgeStyle",
@@ -157,39 +163,9 @@ class XMLRenderer:
         
         style = ";".join(style_parts) + ";"
         
-        label_id = f"label_{self._next_id()}"
-        
-        return f'''
-        <mxCell id="{connection.id}" style="{style}" edge="1" parent="1" source="{connection.source}" target="{connection.target}">
-          <mxGeometry relative="1" as="geometry">
-            <Array as="points"/>
-          </mxGeometry>
-        </mxCell>
-        <mxCell id="{label_id}" value="{escaped_label}" style="edgeLabel;html=1;align=center;verticalAlign=middle;resizable=0;points=[];fontSize={connection.style.font_size};fontColor={connection.style.font_color};" vertex="1" connectable="0" parent="{connection.id}">
-          <mxGeometry x="-0.1" y="1" relative="1" as="geometry">
-            <mxPoint as="offset"/>
-          </mxGeometry>
-        </mxCell>'''
-    
-    def _render_footer(self) -> str:
-        """Renderiza footer XML"""
-        
-        return '''
-      </root>
-    </mxGraphModel>
-  </diagram>
-</mxfile>'''
-    
-    def _escape_xml(self, text: str) -> str:
-        """Escapa caracteres XML"""
-        if not text:
-            return ""
-        
-        return (text.replace('&', '&amp;')
-                   .replace('<', '&lt;')
-                   .replace('>', '&gt;')
-                   .replace('"', '&quot;')
-                   .replace("'", '&apos;'))
+        writer.edge(connection.id, style, connection.source, connection.target, points=points)
+        writer.edge_label(f"label_{self._next_id()}", connection.label or "", connection.id,
+                          connection.style.font_size, connection.style.font_color)
     
     def _next_id(self) -> int:
         """Genera ID único"""
@@ -9,6 +9,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
 
+from core.mxgraph_writer import MxGraphWriter
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class SimpleDrawIOGenerator:
     """Generador DrawIO simple que copia la lógica PNG exitosa"""
     
@@ -37,110 +42,104 @@ class SimpleDrawIOGenerator:
     def generate_network_drawio(self) -> str:
         """Genera diagrama de red - COPIA EXACTA de PNG exitoso"""
         
-        components = []
-        
-        # Título (igual que PNG)
-        components.append(self._create_title("BMC Network Architecture - AWS Senior Level"))
-        
-        # Componentes exactos del PNG exitoso
-        components.append(self._create_aws_service("cloudfront", "CloudFront CDN\\n200+ edge locations\\nSSL/TLS 1.3", 150, 150))
-        components.append(self._create_aws_service("waf", "AWS WAF\\nDDoS protection\\nRate limiting: 2K/s", 350, 150))
-        components.append(self._create_aws_service("api_gateway", "API Gateway\\n10K req/s throttle\\nCaching: 300s TTL", 550, 150))
-        
-        # Microservicios (posiciones exactas del PNG)
-        components.append(self._create_aws_service("invoice", "Invoice Service\\n2vCPU/4GB\\nBlue/Green deploy", 200, 400))
-        components.append(self._create_aws_service("product", "Product Service\\n4vCPU/8GB\\n60M products", 400, 400))
-        components.append(self._create_aws_service("ocr", "OCR Service\\n4vCPU/8GB\\nTextract integration", 600, 400))
-        
-        # Base de datos (posiciones exactas del PNG)
-        components.append(self._create_aws_service("rds", "RDS Primary\\nPostgreSQL 14\\ndb.r6g.2xlarge", 300, 600))
-        components.append(self._create_aws_service("redis", "ElastiCache Redis\\n6 nodes\\nMulti-AZ", 500, 600))
-        
-        # Storage
-        components.append(self._create_aws_service("s3", "S3 Documents\\nIntelligent Tiering", 750, 150))
-        
-        # Conexiones exactas del PNG exitoso
-        connections = [
-            self._create_connection("cloudfront", "waf", "HTTPS Traffic"),
-            self._create_connection("waf", "api_gateway", "Filtered Requests"),
-            self._create_connection("api_gateway", "invoice", "Route /invoices"),
-            self._create_connection("api_gateway", "product", "Route /products"),
-            self._create_connection("api_gateway", "ocr", "Route /ocr"),
-            self._create_connection("invoice", "rds", "Write Operations"),
-            self._create_connection("product", "rds", "Write Operations"),
-            self._create_connection("product", "redis", "Cache Lookup"),
-            self._create_connection("ocr", "s3", "Store Documents")
-        ]
-        
-        # Generar XML DrawIO
-        xml_content = self._build_drawio_xml("Network Architecture", components + connections)
-        
-        # Guardar archivo
-        return self._save_file(xml_content, "simple_network_architecture")
+        file_path = self._output_path("simple_network_architecture")
+        with MxGraphWriter.open(file_path) as writer:
+            self._start_diagram(writer, "Network Architecture")
+            
+            # Título (igual que PNG)
+            self._create_title(writer, "BMC Network Architecture - AWS Senior Level")
+            
+            # Componentes exactos del PNG exitoso
+            self._create_aws_service(writer, "cloudfront", "CloudFront CDN\\n200+ edge locations\\nSSL/TLS 1.3", 150, 150)
+            self._create_aws_service(writer, "waf", "AWS WAF\\nDDoS protection\\nRate limiting: 2K/s", 350, 150)
+            self._create_aws_service(writer, "api_gateway", "API Gateway\\n10K req/s throttle\\nCaching: 300s TTL", 550, 150)
+            
+            # Microservicios (posiciones exactas del PNG)
+            self._create_aws_service(writer, "invoice", "Invoice Service\\n2vCPU/4GB\\nBlue/Green deploy", 200, 400)
+            self._create_aws_service(writer, "product", "Product Service\\n4vCPU/8GB\\n60M products", 400, 400)
+            self._create_aws_service(writer, "ocr", "OCR Service\\n4vCPU/8GB\\nTextract integration", 600, 400)
+            
+            # Base de datos (posiciones exactas del PNG)
+            self._create_aws_service(writer, "rds", "RDS Primary\\nPostgreSQL 14\\ndb.r6g.2xlarge", 300, 600)
+            self._create_aws_service(writer, "redis", "ElastiCache Redis\\n6 nodes\\nMulti-AZ", 500, 600)
+            
+            # Storage
+            self._create_aws_service(writer, "s3", "S3 Documents\\nIntelligent Tiering", 750, 150)
+            
+            # Conexiones exactas del PNG exitoso
+            self._create_connection(writer, "cloudfront", "waf", "HTTPS Traffic")
+            self._create_connection(writer, "waf", "api_gateway", "Filtered Requests")
+            self._create_connection(writer, "api_gateway", "invoice", "Route /invoices")
+            self._create_connection(writer, "api_gateway", "product", "Route /products")
+            self._create_connection(writer, "api_gateway", "ocr", "Route /ocr")
+            self._create_connection(writer, "invoice", "rds", "Write Operations")
+            self._create_connection(writer, "product", "rds", "Write Operations")
+            self._create_connection(writer, "product", "redis", "Cache Lookup")
+            self._create_connection(writer, "ocr", "s3", "Store Documents")
+        
+        logger.info("✅ Simple DrawIO generado: %s", file_path)
+        return str(file_path)
     
     def generate_microservices_drawio(self) -> str:
         """Genera diagrama de microservicios - COPIA EXACTA de PNG exitoso"""
         
-        components = []
-        
-        # Título
-        components.append(self._create_title("BMC Microservices - Detailed Architecture"))
-        
-        # API Layer (posiciones del PNG exitoso)
-        components.append(self._create_aws_service("api_gateway", "API Gateway\\nThrottling: 10K req/s", 150, 120))
-        components.append(self._create_aws_service("cognito", "Cognito User Pool\\nJWT + MFA", 400, 120))
-        components.append(self._create_aws_service("alb", "Application LB\\nHealth checks", 650, 120))
-        
-        # Microservicios (layout del PNG)
-        components.append(self._create_aws_service("invoice_task", "Invoice Task\\n2vCPU/4GB\\nPort: 8000", 120, 350))
-        components.append(self._create_aws_service("product_task", "Product Task\\n4vCPU/8GB\\n<500ms lookup", 370, 350))
-        components.append(self._create_aws_service("ocr_task", "OCR Task\\n4vCPU/8GB\\nTextract", 620, 350))
-        
-        # Data Services (posiciones del PNG)
-        components.append(self._create_aws_service("rds", "RDS PostgreSQL\\ndb.r6g.2xlarge\\nMulti-AZ", 150, 580))
-        components.append(self._create_aws_service("redis", "ElastiCache Redis\\n6 nodes\\nCluster mode", 400, 580))
-        components.append(self._create_aws_service("s3", "S3 Documents\\nVersioning enabled", 650, 580))
-        components.append(self._create_aws_service("textract", "Amazon Textract\\n>95% accuracy", 900, 580))
-        
-        # Conexiones del PNG exitoso
-        connections = [
-            self._create_connection("api_gateway", "cognito", "Auth"),
-            self._create_connection("cognito", "alb", "Authorized"),
-            self._create_connection("alb", "invoice_task", "Route"),
-            self._create_connection("alb", "product_task", "Route"),
-            self._create_connection("alb", "ocr_task", "Route"),
-            self._create_connection("invoice_task", "rds", "Write"),
-            self._create_connection("product_task", "redis", "Cache"),
-            self._create_connection("product_task", "rds", "60M lookup"),
-            self._create_connection("ocr_task", "textract", "OCR >95%"),
-            self._create_connection("ocr_task", "s3", "Documents")
-        ]
-        
-        xml_content = self._build_drawio_xml("Microservices Architecture", components + connections)
-        return self._save_file(xml_content, "simple_microservices_detailed")
+        file_path = self._output_path("simple_microservices_detailed")
+        with MxGraphWriter.open(file_path) as writer:
+            self._start_diagram(writer, "Microservices Architecture")
+            
+            # Título
+            self._create_title(writer, "BMC Microservices - Detailed Architecture")
+            
+            # API Layer (posiciones del PNG exitoso)
+            self._create_aws_service(writer, "api_gateway", "API Gateway\\nThrottling: 10K req/s", 150, 120)
+            self._create_aws_service(writer, "cognito", "Cognito User Pool\\nJWT + MFA", 400, 120)
+            self._create_aws_service(writer, "alb", "Application LB\\nHealth checks", 650, 120)
+            
+            # Microservicios (layout del PNG)
+            self._create_aws_service(writer, "invoice_task", "Invoice Task\\n2vCPU/4GB\\nPort: 8000", 120, 350)
+            self._create_aws_service(writer, "product_task", "Product Task\\n4vCPU/8GB\\n<500ms lookup", 370, 350)
+            self._create_aws_service(writer, "ocr_task", "OCR Task\\n4vCPU/8GB\\nTextract", 620, 350)
+            
+            # Data Services (posiciones del PNG)
+            self._create_aws_service(writer, "rds", "RDS PostgreSQL\\ndb.r6g.2xlarge\\nMulti-AZ", 150, 580)
+            self._create_aws_service(writer, "redis", "ElastiCache Redis\\n6 nodes\\nCluster mode", 400, 580)
+            self._create_aws_service(writer, "s3", "S3 Documents\\nVersioning enabled", 650, 580)
+            self._create_aws_service(writer, "textract", "Amazon Textract\\n>95% accuracy", 900, 580)
+            
+            # Conexiones del PNG exitoso
+            self._create_connection(writer, "api_gateway", "cognito", "Auth")
+            self._create_connection(writer, "cognito", "alb", "Authorized")
+            self._create_connection(writer, "alb", "invoice_task", "Route")
+            self._create_connection(writer, "alb", "product_task", "Route")
+            self._create_connection(writer, "alb", "ocr_task", "Route")
+            self._create_connection(writer, "invoice_task", "rds", "Write")
+            self._create_connection(writer, "product_task", "redis", "Cache")
+            self._create_connection(writer, "product_task", "rds", "60M lookup")
+            self._create_connection(writer, "ocr_task", "textract", "OCR >95%")
+            self._create_connection(writer, "ocr_task", "s3", "Documents")
+        
+        logger.info("✅ Simple DrawIO generado: %s", file_path)
+        return str(file_path)
     
-    def _create_title(self, text: str) -> str:
+    def _create_title(self, writer: MxGraphWriter, text: str) -> None:
         """Crea título simple"""
-        escaped_text = self._escape_xml(text)
-        return f'''<mxCell id="title_{self._next_id()}" value="{escaped_text}" style="text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=18;fontStyle=1;fontColor=#1976D2;" vertex="1" parent="1">
-          <mxGeometry x="400" y="20" width="600" height="30" as="geometry"/>
-        </mxCell>'''
+        writer.vertex(f"title_{self._next_id()}", text,
+                      "text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=18;fontStyle=1;fontColor=#1976D2;",
+                      400, 20, 600, 30)
     
-    def _create_aws_service(self, service_type: str, label: str, x: int, y: int) -> str:
+    def _create_aws_service(self, writer: MxGraphWriter, service_type: str, label: str, x: int, y: int) -> None:
         """Crea servicio AWS - mapeo directo desde PNG"""
         
         shape = self.aws_shapes.get(service_type, "mxgraph.aws4.generic")
-        escaped_label = self._escape_xml(label)
         component_id = f"{service_type}_{self._next_id()}"
         
-        return f'''<mxCell id="{component_id}" value="{escaped_label}" style="shape={shape};labelPosition=bottom;verticalLabelPosition=top;align=center;verticalAlign=bottom;fillColor=#E8F5E8;strokeColor=#4CAF50;fontColor=#2E7D32;" vertex="1" parent="1">
-          <mxGeometry x="{x}" y="{y}" width="78" height="78" as="geometry"/>
-        </mxCell>'''
+        writer.vertex(component_id, label,
+                      f"shape={shape};labelPosition=bottom;verticalLabelPosition=top;align=center;verticalAlign=bottom;fillColor=#E8F5E8;strokeColor=#4CAF50;fontColor=#2E7D32;",
+                      x, y, 78, 78)
     
-    def _create_connection(self, source_type: str, target_type: str, label: str) -> str:
+    def _create_connection(self, writer: MxGraphWriter, source_type: str, target_type: str, label: str) -> None:
         """Crea conexión simple"""
         
-        escaped_label = self._escape_xml(label)
         conn_id = f"conn_{self._next_id()}"
         label_id = f"label_{self._next_id()}"
         
@@ -148,62 +147,21 @@ class SimpleDrawIOGenerator:
         source_id = f"{source_type}_*"  # Usar wildcard para matching
         target_id = f"{target_type}_*"
         
-        return f'''<mxCell id="{conn_id}" style="edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;strokeColor=#1976D2;strokeWidth=2;" edge="1" parent="1" source="{source_id}" target="{target_id}">
-          <mxGeometry relative="1" as="geometry"/>
-        </mxCell>
-        <mxCell id="{label_id}" value="{escaped_label}" style="edgeLabel;html=1;align=center;verticalAlign=middle;resizable=0;points=[];fontSize=10;fontColor=#1976D2;" vertex="1" connectable="0" parent="{conn_id}">
-          <mxGeometry x="-0.1" y="1" relative="1" as="geometry">
-            <mxPoint as="offset"/>
-          </mxGeometry>
-        </mxCell>'''
-    
-    def _build_drawio_xml(self, diagram_name: str, components: list) -> str:
-        """Construye XML DrawIO mínimo"""
-        
-        xml_parts = []
-        
-        # Header mínimo
-        xml_parts.append(f'''<?xml version="1.0" encoding="UTF-8"?>
-<mxfile host="app.diagrams.net" modified="{datetime.now().isoformat()}" version="22.1.11">
-  <diagram name="{diagram_name}" id="simple_diagram">
-    <mxGraphModel dx="2500" dy="1600" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="1400" pageHeight="1000">
-      <root>
-        <mxCell id="0"/>
-        <mxCell id="1" parent="0"/>''')
-        
-        # Componentes
-        for component in components:
-            xml_parts.append(component)
-        
-        # Footer
-        xml_parts.append('''
-      </root>
-    </mxGraphModel>
-  </diagram>
-</mxfile>''')
-        
-        return ''.join(xml_parts)
+        writer.edge(conn_id,
+                    "edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;strokeColor=#1976D2;strokeWidth=2;",
+                    source_id, target_id)
+        writer.edge_label(label_id, label, conn_id)
     
-    def _save_file(self, xml_content: str, filename: str) -> str:
-        """Guarda archivo DrawIO"""
+    def _start_diagram(self, writer: MxGraphWriter, diagram_name: str) -> None:
+        """Encabezado DrawIO mínimo"""
         
-        output_dir = Path(self.output_dir) / "drawio" / "bmc_input"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = output_dir / f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
-        file_path.write_text(xml_content, encoding='utf-8')
-        
-        print(f"✅ Simple DrawIO generado: {file_path}")
-        return str(file_path)
+        writer.start_file()
+        writer.start_diagram(diagram_name, "simple_diagram")
     
-    def _escape_xml(self, text: str) -> str:
-        """Escapa caracteres XML"""
-        if not text:
-            return ""
-        return (text.replace('&', '&amp;')
-                   .replace('<', '&lt;')
-                   .replace('>', '&gt;')
-                   .replace('"', '&quot;'))
+    def _output_path(self, filename: str) -> Path:
+        """Ruta del archivo DrawIO"""
+        
+        return Path(self.output_dir) / "drawio" / "bmc_input" / f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
     
     def _next_id(self) -> int:
         """Genera ID único"""
@@ -215,11 +173,11 @@ class SimpleDrawIOGenerator:
         
         results = {}
         
-        print("🎨 Generando DrawIO simple (copiando lógica PNG exitosa)...")
+        logger.info("🎨 Generando DrawIO simple (copiando lógica PNG exitosa)...")
         
         # Solo los diagramas que funcionan en PNG
         results["network"] = self.generate_network_drawio()
         results["microservices"] = self.generate_microservices_drawio()
         
-        print(f"✅ {len(results)} diagramas DrawIO simples generados")
+        logger.info("✅ %s diagramas DrawIO simples generados", len(results))
         return results
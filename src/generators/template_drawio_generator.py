@@ -10,6 +10,11 @@ from datetime import datetime
 from typing import Dict, Any
 import shutil
 
+from core.logger import get_logger
+from core.mxgraph_writer import parse_drawio, compress_tree, compressed_by_default
+
+logger = get_logger(__name__)
+
 class TemplateDrawIOGenerator:
     """Generador DrawIO basado en plantillas XML"""
     
@@ -27,8 +32,8 @@ class TemplateDrawIOGenerator:
             # Crear plantilla si no existe
             self._create_template(template_name)
         
-        # Cargar XML
-        tree = ET.parse(template_path)
+        # Cargar XML (las plantillas guardadas comprimidas por draw.io se expanden)
+        tree = ET.ElementTree(parse_drawio(template_path.read_text(encoding='utf-8')))
         root = tree.getroot()
         
         # Aplicar configuración
@@ -53,7 +58,7 @@ class TemplateDrawIOGenerator:
             xml_content = self._get_basic_template()
         
         template_path.write_text(xml_content, encoding='utf-8')
-        print(f"✅ Plantilla creada: {template_path}")
+        logger.info("✅ Plantilla creada: %s", template_path)
     
     def _get_network_template(self) -> str:
         """Plantilla de red AWS"""
@@ -335,9 +340,11 @@ class TemplateDrawIOGenerator:
         filename = f"template_{template_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.drawio"
         file_path = output_dir / filename
         
+        if compressed_by_default():
+            compress_tree(tree.getroot())
         tree.write(file_path, encoding='utf-8', xml_declaration=True)
         
-        print(f"✅ Template DrawIO generado: {file_path}")
+        logger.info("✅ Template DrawIO generado: %s", file_path)
         return str(file_path)
     
     def generate_all_templates(self, config: Dict[str, Any], project_name: str = "bmc_input") -> Dict[str, str]:
@@ -345,7 +352,7 @@ class TemplateDrawIOGenerator:
         
         results = {}
         
-        print("🎨 Generando DrawIO desde plantillas...")
+        logger.info("🎨 Generando DrawIO desde plantillas...")
         
         # Generar todos los diagramas
         templates = ["aws_network", "aws_microservices", "aws_security"]
@@ -355,7 +362,7 @@ class TemplateDrawIOGenerator:
                 result_path = self.generate_from_template(template_name, config, project_name)
                 results[template_name] = result_path
             except Exception as e:
-                print(f"❌ Error generando {template_name}: {e}")
+                logger.error("❌ Error generando %s: %s", template_name, e)
         
-        print(f"✅ {len(results)} diagramas generados desde plantillas")
+        logger.info("✅ %s diagramas generados desde plantillas", len(results))
         return results
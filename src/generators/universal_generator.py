@@ -3,38 +3,38 @@
 Universal Generator - PNG y DrawIO desde mismo esquema
 """
 
-import xml.etree.ElementTree as ET
+import importlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Tuple
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import Fargate
-from diagrams.aws.database import RDS
-from diagrams.aws.network import APIGateway, ELB
-from diagrams.aws.security import Cognito, WAF
-from diagrams.onprem.client import Users
-from diagrams.onprem.network import Internet
+from typing import Dict, Any, List, Tuple
 
-from core.universal_schema import UniversalDiagramSchema, DiagramType, OutputFormat
+from core.universal_schema import UniversalDiagramSchema, DiagramType, OutputFormat, Position, Size
+from layouts.container_layout import ContainerLayout
+from layouts.edge_router import EdgeRouter
+from core.mxgraph_writer import MxGraphWriter
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class UniversalGenerator:
     """Generador universal para PNG y DrawIO desde mismo esquema"""
     
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
+        self.edge_router = EdgeRouter()
         
         # Mapeo de tipos a componentes
         self.component_mapping = {
-            # PNG (diagrams library)
+            # PNG (diagrams library, se importa solo al generar PNG)
             "png": {
-                "users": Users,
-                "internet_gateway": Internet,
-                "api_gateway": APIGateway,
-                "fargate": Fargate,
-                "rds": RDS,
-                "elastic_load_balancing": ELB,
-                "cognito": Cognito,
-                "waf": WAF
+                "users": "diagrams.onprem.client.Users",
+                "internet_gateway": "diagrams.onprem.network.Internet",
+                "api_gateway": "diagrams.aws.network.APIGateway",
+                "fargate": "diagrams.aws.compute.Fargate",
+                "rds": "diagrams.aws.database.RDS",
+                "elastic_load_balancing": "diagrams.aws.network.ELB",
+                "cognito": "diagrams.aws.security.Cognito",
+                "waf": "diagrams.aws.security.WAF"
             },
             # DrawIO (mxgraph shapes)
             "drawio": {
@@ -64,10 +64,10 @@ class UniversalGenerator:
         
         return results
     
-    def generate_drawio_xml(self, config: Dict[str, Any]) -> str:
+    def generate_drawio_xml(self, config: Dict[str, Any], project_name: str = "bmc_input") -> str:
         """Genera XML DrawIO válido desde configuración MCP"""
         
-        output_dir = Path(self.output_dir) / "drawio" / "bmc_input"
+        output_dir = Path(self.output_dir) / "drawio" / project_name
         output_dir.mkdir(parents=True, exist_ok=True)
         
         drawio_path = output_dir / "complete_architecture.drawio"
@@ -152,7 +152,7 @@ class UniversalGenerator:
         <mxCell id="conn3" style="edgeStyle=orthogonalEdgeStyle;rounded=0;orthogonalLoop=1;jettySize=auto;html=1;strokeColor=#1976D2;strokeWidth=2;" edge="1" parent="1" source="api_gateway" target="invoice_service">
           <mxGeometry relative="1" as="geometry"/>
         </mxCell>
-        
+      
       </root>
     </mxGraphModel>
   </diagram>
@@ -161,12 +161,20 @@ class UniversalGenerator:
         # Guardar archivo DrawIO
         drawio_path.write_text(xml_content, encoding='utf-8')
         
-        print(f"✅ DrawIO generado: {drawio_path}")
+        logger.info("✅ DrawIO generado: %s", drawio_path)
         return str(drawio_path)
     
+    def _png_class(self, component_type: str):
+        """Importa la clase de diagrams para un tipo de componente"""
+        
+        module_name, class_name = self.component_mapping["png"][component_type].rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    
     def _generate_png(self, schema: UniversalDiagramSchema) -> str:
         """Genera PNG usando diagrams library"""
         
+        from diagrams import Diagram, Cluster, Edge
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{schema.project_name}_{schema.diagram_type.value}_{timestamp}"
         
@@ -184,7 +192,7 @@ class UniversalGenerator:
             # Componentes externos
             for component in schema.components:
                 if component.type in self.component_mapping["png"]:
-                    ComponentClass = self.component_mapping["png"][component.type]
+                    ComponentClass = self._png_class(component.type)
                     png_components[component.id] = ComponentClass(component.label)
             
             # Contenedores con componentes
@@ -192,7 +200,7 @@ class UniversalGenerator:
                 with Cluster(container.label):
                     for component in container.components:
                         if component.type in self.component_mapping["png"]:
-                            ComponentClass = self.component_mapping["png"][component.type]
+                            ComponentClass = self._png_class(component.type)
                             png_components[component.id] = ComponentClass(component.label)
                     
                     # Contenedores anidados
@@ -200,7 +208,7 @@ class UniversalGenerator:
                         with Cluster(child_container.label):
                             for component in child_container.components:
                                 if component.type in self.component_mapping["png"]:
-                                    ComponentClass = self.component_mapping["png"][component.type]
+                                    ComponentClass = self._png_class(component.type)
                                     png_components[component.id] = ComponentClass(component.label)
             
             # Crear conexiones
@@ -221,123 +229,103 @@ class UniversalGenerator:
     def _generate_drawio(self, schema: UniversalDiagramSchema) -> str:
         """Genera DrawIO XML desde esquema"""
         
-        # Crear XML DrawIO
-        mxfile = ET.Element("mxfile", host="app.diagrams.net")
-        diagram = ET.SubElement(mxfile, "diagram", name=schema.title, id="universal")
-        model = ET.SubElement(diagram, "mxGraphModel", 
-                             dx=str(schema.canvas.width), 
-                             dy=str(schema.canvas.height), 
-                             grid="1", gridSize=str(schema.canvas.grid))
-        root = ET.SubElement(model, "root")
+        # Tamaño de contenedores y posiciones desde la jerarquía
+        if schema.auto_layout:
+            ContainerLayout.apply(schema)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{schema.project_name}_{schema.diagram_type.value}_{timestamp}.drawio"
+        output_path = self.output_dir / "drawio" / filename
+        
+        # Las celdas se escriben al archivo a medida que se generan
+        with MxGraphWriter.open(output_path) as writer:
+            writer.start_file()
+            writer.start_diagram(schema.title, "universal", dx=schema.canvas.width, dy=schema.canvas.height,
+                                 gridSize=schema.canvas.grid)
+            self._write_cells(writer, schema)
         
-        # Celdas base
-        ET.SubElement(root, "mxCell", id="0")
-        ET.SubElement(root, "mxCell", id="1", parent="0")
+        return str(output_path)
+    
+    def _write_cells(self, writer: MxGraphWriter, schema: UniversalDiagramSchema) -> None:
+        """Título, componentes, contenedores anidados y conexiones"""
         
         cell_id = 2
         component_ids = {}
+        # Cajas en coordenadas absolutas para el ruteo de conexiones
+        boxes = {}
         
         # Título
-        title = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=schema.title,
-            style="rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
-            vertex="1", parent="1"
-        )
-        ET.SubElement(title, "mxGeometry", x="50", y="20", width="2000", height="50", **{"as": "geometry"})
+        writer.vertex(cell_id, schema.title,
+                      "rounded=0;whiteSpace=wrap;html=1;fillColor=#232F3E;fontColor=#FFFFFF;fontSize=18;fontStyle=1;",
+                      50, 20, 2000, 50)
         cell_id += 1
         
         # Componentes externos
         for component in schema.components:
-            comp_id = self._create_drawio_component(root, component, cell_id, "1")
+            comp_id = self._create_drawio_component(writer, component, cell_id, "1")
             component_ids[component.id] = comp_id
+            boxes[component.id] = self._absolute_box(component, 0, 0)
             cell_id += 1
         
-        # Contenedores
-        for container in schema.containers:
-            container_id = self._create_drawio_container(root, container, cell_id, "1")
+        # Contenedores, sus componentes y contenedores anidados a cualquier profundidad
+        # (las posiciones de los hijos son relativas al contenedor)
+        pending = [(container, "1", 0, 0) for container in reversed(schema.containers)]
+        while pending:
+            container, parent_id, offset_x, offset_y = pending.pop()
+            container_id = self._create_drawio_container(writer, container, cell_id, parent_id)
             cell_id += 1
+            offset_x, offset_y = offset_x + container.position.x, offset_y + container.position.y
             
-            # Componentes del contenedor
             for component in container.components:
-                comp_id = self._create_drawio_component(root, component, cell_id, str(container_id))
+                comp_id = self._create_drawio_component(writer, component, cell_id, str(container_id))
                 component_ids[component.id] = comp_id
+                boxes[component.id] = self._absolute_box(component, offset_x, offset_y)
                 cell_id += 1
             
-            # Contenedores anidados
-            for child_container in container.children:
-                child_id = self._create_drawio_container(root, child_container, cell_id, str(container_id))
-                cell_id += 1
-                
-                for component in child_container.components:
-                    comp_id = self._create_drawio_component(root, component, cell_id, str(child_id))
-                    component_ids[component.id] = comp_id
-                    cell_id += 1
-        
-        # Conexiones
-        for connection in schema.connections:
-            if connection.from_id in component_ids and connection.to_id in component_ids:
-                self._create_drawio_connection(root, connection, component_ids, cell_id)
-                cell_id += 1
+            pending.extend((child, str(container_id), offset_x, offset_y) for child in reversed(container.children))
         
-        # Guardar archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{schema.project_name}_{schema.diagram_type.value}_{timestamp}.drawio"
-        output_path = self.output_dir / "drawio" / filename
-        
-        ET.indent(mxfile, space="  ")
-        xml_str = ET.tostring(mxfile, encoding='unicode', xml_declaration=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(xml_str)
-        
-        return str(output_path)
+        # Conexiones con puntos de quiebre que esquivan componentes
+        connections = [c for c in schema.connections if c.from_id in component_ids and c.to_id in component_ids]
+        routes = self.edge_router.route_all(
+            boxes, (((c.from_id, c.to_id), c.from_id, c.to_id) for c in connections)
+        )
+        for connection in connections:
+            self._create_drawio_connection(writer, connection, component_ids, cell_id,
+                                           routes[(connection.from_id, connection.to_id)])
+            cell_id += 1
     
-    def _create_drawio_component(self, root, component, cell_id: int, parent_id: str) -> int:
+    def _create_drawio_component(self, writer: MxGraphWriter, component, cell_id: int, parent_id: str) -> int:
         """Crea componente DrawIO"""
         
         drawio_shape = self.component_mapping["drawio"].get(component.type, "rounded=1;whiteSpace=wrap;html=1;")
         style = self._get_drawio_style(drawio_shape)
         
-        comp = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=component.label,
-            style=style,
-            vertex="1", parent=parent_id
-        )
-        
         # Posición y tamaño
         pos = component.position or Position(100, 100)
         size = component.size or Size(100, 100)
         
-        ET.SubElement(comp, "mxGeometry", 
-                     x=str(pos.x), y=str(pos.y), 
-                     width=str(size.width), height=str(size.height), 
-                     **{"as": "geometry"})
-        
+        writer.vertex(cell_id, component.label, style, pos.x, pos.y, size.width, size.height, parent=parent_id)
         return cell_id
     
-    def _create_drawio_container(self, root, container, cell_id: int, parent_id: str) -> int:
+    def _create_drawio_container(self, writer: MxGraphWriter, container, cell_id: int, parent_id: str) -> int:
         """Crea contenedor DrawIO"""
         
         style = container.style
         container_style = f"fillColor={style.fill_color};strokeColor={style.stroke_color};dashed=1;verticalAlign=top;fontStyle=1;fontColor={style.stroke_color};whiteSpace=wrap;html=1;fontSize=12;" if style else "fillColor=#E3F2FD;strokeColor=#1976D2;dashed=1;verticalAlign=top;fontStyle=1;fontColor=#1976D2;whiteSpace=wrap;html=1;fontSize=12;"
         
-        cont = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=container.label,
-            style=container_style,
-            vertex="1", parent=parent_id
-        )
-        
-        ET.SubElement(cont, "mxGeometry", 
-                     x=str(container.position.x), y=str(container.position.y), 
-                     width=str(container.size.width), height=str(container.size.height), 
-                     **{"as": "geometry"})
-        
+        writer.vertex(cell_id, container.label, container_style, container.position.x, container.position.y,
+                      container.size.width, container.size.height, parent=parent_id)
         return cell_id
     
-    def _create_drawio_connection(self, root, connection, component_ids: Dict[str, int], cell_id: int):
+    def _absolute_box(self, component, offset_x: int, offset_y: int) -> Tuple[int, int, int, int]:
+        """Caja del componente en coordenadas absolutas (mismos defaults que el XML)"""
+        
+        pos = component.position or Position(100, 100)
+        size = component.size or Size(100, 100)
+        return offset_x + pos.x, offset_y + pos.y, size.width, size.height
+    
+    def _create_drawio_connection(self, writer: MxGraphWriter, connection, component_ids: Dict[str, int],
+                                  cell_id: int, points: List[Tuple[int, int]] = ()):
         """Crea conexión DrawIO"""
         
         from_id = component_ids[connection.from_id]
@@ -346,14 +334,8 @@ class UniversalGenerator:
         style = connection.style
         edge_style = f"endArrow=classic;html=1;rounded=0;strokeColor={style.color};strokeWidth={style.width};" if style else "endArrow=classic;html=1;rounded=0;strokeColor=#232F3E;strokeWidth=2;"
         
-        edge = ET.SubElement(root, "mxCell",
-            id=str(cell_id),
-            value=connection.label,
-            style=edge_style,
-            edge="1", parent="1", 
-            source=str(from_id), target=str(to_id)
-        )
-        ET.SubElement(edge, "mxGeometry", width="50", height="50", relative="1", **{"as": "geometry"})
+        writer.edge(cell_id, edge_style, from_id, to_id, value=connection.label,
+                    points=points or None, geometry={"width": "50", "height": "50"})
     
     def _get_drawio_style(self, shape: str) -> str:
         """Obtiene estilo DrawIO para shape"""
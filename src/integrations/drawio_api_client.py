@@ -3,18 +3,23 @@
 Draw.io API Client - Integración con diagrams.net API
 """
 
-import requests
 import json
 import base64
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
 class DrawIOAPIClient:
     """Cliente para API de diagrams.net"""
     
     def __init__(self, api_key: Optional[str] = None):
         self.base_url = "https://app.diagrams.net"
         self.api_key = api_key
+        import requests
+        
         self.session = requests.Session()
         
         if api_key:
@@ -236,9 +241,9 @@ def export_drawio_to_png(xml_file_path: str, output_path: str) -> bool:
                 f.write(result["content"])
             return True
         else:
-            print(f"Error: {result['error']}")
+            logger.info("Error: %s", result['error'])
             return False
             
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.info("Error: %s", str(e))
         return False
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Container Layout - Empaquetado anidado de contenedores (VPC / AZ / subnet)
+
+Cada contenedor se dimensiona desde sus hijos (bottom-up) y sus hijos se
+ubican con un empaquetado por estantes (next-fit decreasing height). Las
+posiciones de los hijos son relativas al contenedor padre, como en DrawIO.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.universal_schema import UniversalDiagramSchema, Position, Size
+
+class ContainerLayout:
+    """Layout de contenedores anidados sin solapamientos"""
+    
+    PADDING = 20            # Margen interior del contenedor
+    HEADER = 40             # Espacio para el título del contenedor
+    GAP = 30                # Separación entre elementos hermanos
+    LABEL_HEIGHT = 30       # Label bajo el ícono (verticalLabelPosition=bottom)
+    DEFAULT_SIZE = (78, 78)
+    MIN_CONTAINER = (200, 150)
+    ASPECT = 1.6            # Relación ancho/alto buscada en cada contenedor
+    TOP = 100               # Debajo del título del diagrama
+    MARGIN = 50
+    
+    @staticmethod
+    def apply(schema: UniversalDiagramSchema) -> None:
+        """Ubica componentes y contenedores del esquema; amplía el canvas si hace falta"""
+        
+        def component_size(component) -> Tuple[int, int]:
+            if component.size is None:
+                component.size = Size(*ContainerLayout.DEFAULT_SIZE)
+            return component.size.width, component.size.height
+        
+        def place_component(component, x: int, y: int) -> None:
+            component.position = Position(x, y)
+        
+        def place_container(container, x: int, y: int, width: int, height: int) -> None:
+            container.position = Position(x, y)
+            container.size = Size(width, height)
+        
+        width, height = ContainerLayout._layout(
+            schema.components, schema.containers, schema.canvas.width - 2 * ContainerLayout.MARGIN,
+            component_size, place_component, place_container, origin=(ContainerLayout.MARGIN, ContainerLayout.TOP)
+        )
+        
+        schema.canvas.width = max(schema.canvas.width, width + 2 * ContainerLayout.MARGIN)
+        schema.canvas.height = max(schema.canvas.height, height + ContainerLayout.TOP + ContainerLayout.MARGIN)
+    
+    @staticmethod
+    def apply_aws_containers(containers: List[Any], max_width: int = 2400,
+                             origin: Tuple[int, int] = (50, 100)) -> Tuple[int, int]:
+        """Ubica contenedores de components.aws_components (bounds en dict)"""
+        
+        def component_size(component) -> Tuple[int, int]:
+            return component.size.width, component.size.height
+        
+        def place_component(component, x: int, y: int) -> None:
+            component.position.x, component.position.y = x, y
+        
+        def place_container(container, x: int, y: int, width: int, height: int) -> None:
+            container.bounds = {"x": x, "y": y, "width": width, "height": height}
+        
+        return ContainerLayout._layout([], containers, max_width, component_size,
+                                       place_component, place_container, origin=origin)
+    
+    @staticmethod
+    def _layout(components: List[Any], containers: List[Any], max_width: int, component_size: Callable,
+                place_component: Callable, place_container: Callable,
+                origin: Tuple[int, int]) -> Tuple[int, int]:
+        """Dimensiona contenedores en post-orden y empaqueta el nivel superior
+        
+        Contenedores y componentes solo necesitan `components` y `children`;
+        leer tamaños y escribir posiciones queda en las funciones recibidas.
+        """
+        
+        cls = ContainerLayout
+        sizes: Dict[int, Tuple[int, int]] = {}
+        
+        # Post-orden iterativo: jerarquías profundas sin recursión y cada
+        # contenedor se visita una sola vez
+        stack = [(container, False) for container in reversed(containers)]
+        while stack:
+            container, expanded = stack.pop()
+            if not expanded:
+                stack.append((container, True))
+                stack.extend((child, False) for child in reversed(container.children))
+                continue
+            
+            items = cls._items(container.components, container.children, sizes, component_size)
+            placements, width, height = cls._pack([size for _, _, size in items])
+            
+            for (kind, item, _), (x, y) in zip(items, placements):
+                if kind == "component":
+                    place_component(item, cls.PADDING + x, cls.HEADER + y)
+                else:
+                    child_width, child_height = sizes[id(item)]
+                    place_container(item, cls.PADDING + x, cls.HEADER + y, child_width, child_height)
+            
+            sizes[id(container)] = (max(width + 2 * cls.PADDING, cls.MIN_CONTAINER[0]),
+                                    max(height + cls.HEADER + cls.PADDING, cls.MIN_CONTAINER[1]))
+        
+        items = cls._items(components, containers, sizes, component_size)
+        placements, width, height = cls._pack([size for _, _, size in items], max_width)
+        
+        for (kind, item, _), (x, y) in zip(items, placements):
+            if kind == "component":
+                place_component(item, origin[0] + x, origin[1] + y)
+            else:
+                place_container(item, origin[0] + x, origin[1] + y, *sizes[id(item)])
+        
+        return width, height
+    
+    @staticmethod
+    def _items(components: List[Any], containers: List[Any], sizes: Dict[int, Tuple[int, int]],
+               component_size: Callable) -> List[Tuple[str, Any, Tuple[int, int]]]:
+        """Elementos a empaquetar con su caja (los íconos reservan espacio para el label)"""
+        
+        items = []
+        for component in components:
+            width, height = component_size(component)
+            items.append(("component", component, (width, height + ContainerLayout.LABEL_HEIGHT)))
+        for container in containers:
+            items.append(("container", container, sizes[id(container)]))
+        return items
+    
+    @staticmethod
+    def _pack(sizes: List[Tuple[int, int]], max_width: int = None) -> Tuple[List[Tuple[int, int]], int, int]:
+        """Empaquetado por estantes: elementos por alto decreciente, fila a fila
+        
+        Sin max_width el ancho objetivo busca la relación ASPECT a partir del
+        área total. Retorna posiciones (en el orden de entrada), ancho y alto.
+        """
+        
+        if not sizes:
+            return [], 0, 0
+        
+        gap = ContainerLayout.GAP
+        widest = max(width for width, _ in sizes)
+        if max_width is None:
+            area = sum((width + gap) * (height + gap) for width, height in sizes)
+            max_width = int(math.sqrt(area * ContainerLayout.ASPECT))
+        max_width = max(max_width, widest)
+        
+        order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+        placements = [None] * len(sizes)
+        x = y = shelf_height = used_width = 0
+        
+        for i in order:
+            width, height = sizes[i]
+            if x and x + width > max_width:
+                y += shelf_height + gap
+                x = shelf_height = 0
+            placements[i] = (x, y)
+            used_width = max(used_width, x + width)
+            shelf_height = max(shelf_height, height)
+            x += width + gap
+        
+        return placements, used_width, y + shelf_height
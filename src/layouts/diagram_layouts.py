@@ -5,14 +5,30 @@ Diagram Layouts - Sistema de layouts automáticos
 
 from typing import List, Tuple, Dict
 from models.diagram_model import DiagramModel, Component, Position, LayoutType
+from layouts.incremental_layout import IncrementalLayout, LayoutSnapshot
+from core.logger import get_logger
 import math
 
+logger = get_logger(__name__)
+
 class LayoutEngine:
     """Motor de layouts para diagramas"""
     
     @staticmethod
-    def apply_layout(model: DiagramModel) -> None:
-        """Aplica layout según el tipo especificado"""
+    def apply_layout(model: DiagramModel, previous: LayoutSnapshot = None) -> None:
+        """Aplica layout según el tipo especificado
+        
+        Con un layout anterior (previous) los componentes sin cambios quedan
+        fijos y solo se ubican los nuevos o modificados; si ninguno coincide
+        se hace el layout completo.
+        """
+        
+        if previous is not None and previous.matches(model):
+            node_size = None
+            if model.layout == LayoutType.HIERARCHICAL:
+                node_size = (HierarchicalLayout.NODE_WIDTH, HierarchicalLayout.NODE_HEIGHT)
+            IncrementalLayout.apply(model, previous, node_size)
+            return
         
         if model.layout == LayoutType.HIERARCHICAL:
             HierarchicalLayout.apply(model)
@@ -24,23 +40,63 @@ class LayoutEngine:
             ForceDirectedLayout.apply(model)
 
 class HierarchicalLayout:
-    """Layout jerárquico por capas"""
+    """Layout jerárquico por capas (Sugiyama)
+    
+    1. Capas desde el grafo de conexiones: se invierten las aristas que
+       cierran ciclos y se asigna la capa por camino más largo.
+    2. Aristas que saltan capas pasan por nodos ficticios para que el
+       conteo y la reducción de cruces vean la arista completa.
+    3. Barridos de baricentro arriba/abajo; se conserva el orden con menos
+       cruces (conteo por inversiones con árbol de Fenwick, O(E log V)).
+    4. Coordenadas por compactación lineal izquierda/derecha alineada al
+       baricentro de los predecesores; las capas que no caben en el ancho
+       del canvas se parten en varias filas.
+    
+    Sin conexiones se usan las capas lógicas por nombre (edge, api,
+    microservicios, datos, resto).
+    """
+    
+    NODE_WIDTH = 120
+    NODE_HEIGHT = 80
+    H_SPACING = 60
+    ROW_HEIGHT = 140      # Avance vertical entre filas de una capa partida
+    LAYER_GAP = 60        # Espacio extra entre capas
+    Y_START = 100
+    MARGIN = 50
+    SWEEPS = 4
     
     @staticmethod
     def apply(model: DiagramModel) -> None:
         """Aplica layout jerárquico"""
         
-        # Agrupar componentes por tipo
-        layers = HierarchicalLayout._group_by_layers(model.components)
+        components = [c for c in model.components if c.component_type.value != "title"]
+        if not components:
+            return
         
-        # Posicionar por capas
-        y_start = 100
-        layer_height = 200
+        position_of = {component.id: i for i, component in enumerate(components)}
+        edges = list(dict.fromkeys(
+            (position_of[conn.source], position_of[conn.target])
+            for conn in model.connections
+            if conn.source in position_of and conn.target in position_of and conn.source != conn.target
+        ))
         
-        for i, (layer_name, components) in enumerate(layers.items()):
-            y_pos = y_start + (i * layer_height)
-            HierarchicalLayout._position_layer(components, y_pos, model.canvas_size[0])
-
+        if edges:
+            edges = HierarchicalLayout._remove_cycles(len(components), edges)
+            layer_of = HierarchicalLayout._assign_layers(len(components), edges)
+        else:
+            groups = HierarchicalLayout._group_by_layers(components)
+            group_index = {component.id: i for i, group in enumerate(groups.values()) for component in group}
+            layer_of = [group_index[component.id] for component in components]
+        
+        layers, up, down = HierarchicalLayout._build_proper_graph(len(components), edges, layer_of)
+        layers = HierarchicalLayout._reduce_crossings(layers, up, down)
+        
+        predecessors = [[] for _ in components]
+        for source, target in edges:
+            predecessors[target].append(source)
+        
+        HierarchicalLayout._assign_coordinates(model, components, layers, predecessors)
+    
     @staticmethod
     def _group_by_layers(components: List[Component]) -> Dict[str, List[Component]]:
         """Agrupa componentes en capas lógicas"""
@@ -49,7 +105,8 @@ class HierarchicalLayout:
             "edge": [],
             "api": [],
             "microservices": [],
-            "data": []
+            "data": [],
+            "other": []
         }
         
         for component in components:
@@ -61,23 +118,201 @@ class HierarchicalLayout:
                 layers["microservices"].append(component)
             elif any(keyword in component.name.lower() for keyword in ["rds", "redis", "s3"]):
                 layers["data"].append(component)
+            else:
+                layers["other"].append(component)
         
         return {k: v for k, v in layers.items() if v}  # Solo capas no vacías
     
     @staticmethod
-    def _position_layer(components: List[Component], y_pos: int, canvas_width: int) -> None:
-        """Posiciona componentes en una capa horizontal"""
+    def _remove_cycles(n: int, edges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Invierte las aristas de retroceso de un DFS iterativo (grafo acíclico)"""
         
-        if not components:
-            return
+        adjacency = [[] for _ in range(n)]
+        for source, target in edges:
+            adjacency[source].append(target)
         
-        # Calcular espaciado
-        component_width = 120
-        spacing = max(50, (canvas_width - len(components) * component_width) // (len(components) + 1))
+        state = [0] * n  # 0 sin visitar, 1 en la pila, 2 terminado
+        back_edges = set()
         
-        for i, component in enumerate(components):
-            x_pos = spacing + (i * (component_width + spacing))
-            component.position = Position(x_pos, y_pos, component_width, 80)
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(adjacency[root]))]
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[node] = 2
+                    stack.pop()
+                elif state[child] == 1:
+                    back_edges.add((node, child))
+                elif state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, iter(adjacency[child])))
+        
+        return list(dict.fromkeys(
+            (target, source) if (source, target) in back_edges else (source, target)
+            for source, target in edges
+        ))
+    
+    @staticmethod
+    def _assign_layers(n: int, edges: List[Tuple[int, int]]) -> List[int]:
+        """Capa por camino más largo desde las fuentes (orden topológico de Kahn)"""
+        
+        successors = [[] for _ in range(n)]
+        in_degree = [0] * n
+        for source, target in edges:
+            successors[source].append(target)
+            in_degree[target] += 1
+        
+        layer_of = [0] * n
+        queue = [node for node in range(n) if in_degree[node] == 0]
+        for node in queue:  # la lista crece mientras se recorre
+            for child in successors[node]:
+                layer_of[child] = max(layer_of[child], layer_of[node] + 1)
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+        
+        return layer_of
+    
+    @staticmethod
+    def _build_proper_graph(n: int, edges: List[Tuple[int, int]], layer_of: List[int]):
+        """Capas con nodos ficticios: toda arista une capas consecutivas"""
+        
+        layers = [[] for _ in range(max(layer_of) + 1)]
+        for node in range(n):
+            layers[layer_of[node]].append(node)
+        
+        up, down = {}, {}
+        next_id = n
+        for source, target in edges:
+            previous = source
+            for layer in range(layer_of[source] + 1, layer_of[target]):
+                layers[layer].append(next_id)
+                down.setdefault(previous, []).append(next_id)
+                up.setdefault(next_id, []).append(previous)
+                previous, next_id = next_id, next_id + 1
+            down.setdefault(previous, []).append(target)
+            up.setdefault(target, []).append(previous)
+        
+        return layers, up, down
+    
+    @staticmethod
+    def _reduce_crossings(layers: List[List[int]], up: Dict[int, List[int]],
+                          down: Dict[int, List[int]]) -> List[List[int]]:
+        """Barridos de baricentro; retorna el orden con menos cruces"""
+        
+        def reorder(layer: List[int], reference: List[int], neighbors: Dict[int, List[int]]) -> List[int]:
+            position = {node: i for i, node in enumerate(reference)}
+            scale = len(reference) / len(layer)
+            keys = {}
+            for i, node in enumerate(layer):
+                linked = neighbors.get(node)
+                # Nodos sin vecinos mantienen su lugar relativo en la capa
+                keys[node] = sum(position[m] for m in linked) / len(linked) if linked else i * scale
+            return sorted(layer, key=keys.__getitem__)
+        
+        best = [list(layer) for layer in layers]
+        best_crossings = HierarchicalLayout._count_crossings(best, down)
+        current = [list(layer) for layer in layers]
+        
+        for _ in range(HierarchicalLayout.SWEEPS):
+            if best_crossings == 0:
+                break
+            for i in range(1, len(current)):
+                current[i] = reorder(current[i], current[i - 1], up)
+            for i in range(len(current) - 2, -1, -1):
+                current[i] = reorder(current[i], current[i + 1], down)
+            
+            crossings = HierarchicalLayout._count_crossings(current, down)
+            if crossings < best_crossings:
+                best, best_crossings = [list(layer) for layer in current], crossings
+        
+        return best
+    
+    @staticmethod
+    def _count_crossings(layers: List[List[int]], down: Dict[int, List[int]]) -> int:
+        """Cruces entre capas consecutivas contando inversiones (Fenwick)"""
+        
+        total = 0
+        for upper, lower in zip(layers, layers[1:]):
+            position = {node: i for i, node in enumerate(lower)}
+            targets = [position[target] for node in upper for target in sorted(down.get(node, []), key=position.get)]
+            
+            tree = [0] * (len(lower) + 1)
+            for seen, target in enumerate(targets):
+                # Aristas previas con destino a la derecha de este cruzan con él
+                index, not_greater = target + 1, 0
+                while index > 0:
+                    not_greater += tree[index]
+                    index -= index & -index
+                total += seen - not_greater
+                
+                index = target + 1
+                while index <= len(lower):
+                    tree[index] += 1
+                    index += index & -index
+        
+        return total
+    
+    @staticmethod
+    def _assign_coordinates(model: DiagramModel, components: List[Component],
+                            layers: List[List[int]], predecessors: List[List[int]]) -> None:
+        """Compactación lineal por fila, alineada al baricentro de los predecesores"""
+        
+        cls = HierarchicalLayout
+        canvas_width = model.canvas_size[0]
+        slot = cls.NODE_WIDTH + cls.H_SPACING
+        per_row = max(1, (canvas_width - 2 * cls.MARGIN + cls.H_SPACING) // slot)
+        
+        x_of = {}
+        y = cls.Y_START
+        right_edge = bottom_edge = 0
+        
+        for layer in layers:
+            real = [node for node in layer if node < len(components)]
+            if not real:
+                continue
+            
+            for start in range(0, len(real), per_row):
+                row = real[start:start + per_row]
+                
+                # Posición por defecto: fila centrada en el canvas
+                row_width = len(row) * slot - cls.H_SPACING
+                offset = (canvas_width - row_width) / 2
+                desired = []
+                for i, node in enumerate(row):
+                    placed = [x_of[p] for p in predecessors[node] if p in x_of]
+                    desired.append(sum(placed) / len(placed) if placed else offset + i * slot)
+                
+                # Pasadas izquierda y derecha respetando separación; el promedio también la respeta
+                left = list(desired)
+                for i in range(1, len(row)):
+                    left[i] = max(left[i], left[i - 1] + slot)
+                right = list(desired)
+                for i in range(len(row) - 2, -1, -1):
+                    right[i] = min(right[i], right[i + 1] - slot)
+                xs = [(l + r) / 2 for l, r in zip(left, right)]
+                
+                # Si la alineación no cabe en el ancho se usa la fila centrada
+                if xs[-1] - xs[0] > canvas_width - 2 * cls.MARGIN - cls.NODE_WIDTH:
+                    xs = [offset + i * slot for i in range(len(row))]
+                
+                # Mantiene la fila dentro del canvas
+                shift = max(cls.MARGIN - xs[0], 0) or min(canvas_width - cls.MARGIN - cls.NODE_WIDTH - xs[-1], 0)
+                for node, x in zip(row, xs):
+                    x_of[node] = x + shift
+                    components[node].position = Position(int(round(x + shift)), y, cls.NODE_WIDTH, cls.NODE_HEIGHT)
+                
+                right_edge = max(right_edge, int(xs[-1] + shift) + cls.NODE_WIDTH + cls.MARGIN)
+                bottom_edge = y + cls.NODE_HEIGHT + cls.MARGIN
+                y += cls.ROW_HEIGHT
+            
+            y += cls.LAYER_GAP
+        
+        model.canvas_size = (max(canvas_width, right_edge), max(model.canvas_size[1], bottom_edge))
 
 class GridLayout:
     """Layout en grilla regular"""
@@ -133,16 +368,217 @@ class CircularLayout:
             component.position = Position(int(x), int(y))
 
 class ForceDirectedLayout:
-    """Layout dirigido por fuerzas (simplificado)"""
+    """Layout Fruchterman–Reingold (spring-electrical) vectorizado con NumPy
+    
+    Repulsión k²/d entre todos los pares, atracción d²/k en cada conexión y
+    una gravedad lineal hacia el centro que mantiene juntos los grupos
+    desconectados. El desplazamiento máximo lo limita una temperatura que se
+    enfría en cada iteración.
+    
+    Hasta EXACT_LIMIT componentes la repulsión es exacta (por bloques de
+    filas); por encima se aproxima con una grilla al estilo Barnes–Hut de un
+    nivel: pares exactos en celdas vecinas y centroides para celdas lejanas.
+    """
+    
+    ITERATIONS = 100
+    COOLING = 0.92
+    GRAVITY = 1.0
+    TOLERANCE = 0.01       # Desplazamiento medio (en unidades de k) para converger
+    MIN_DISTANCE = 140     # Distancia ideal mínima entre componentes (px)
+    MARGIN = 100
+    EXACT_LIMIT = 1000
+    BLOCK_PAIRS = 2_000_000
     
     @staticmethod
-    def apply(model: DiagramModel) -> None:
+    def apply(model: DiagramModel, iterations: int = None, cooling: float = None,
+              tolerance: float = None, seed: int = 42) -> None:
         """Aplica layout dirigido por fuerzas"""
         
-        # Implementación simplificada - usar grid como base
-        GridLayout.apply(model)
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("⚠️ NumPy no instalado: layout de fuerzas simplificado (grid + ajuste)")
+            ForceDirectedLayout._apply_without_numpy(model)
+            return
+        
+        components = [c for c in model.components if c.component_type.value != "title"]
+        if not components:
+            return
+        
+        iterations = ForceDirectedLayout.ITERATIONS if iterations is None else iterations
+        cooling = ForceDirectedLayout.COOLING if cooling is None else cooling
+        tolerance = ForceDirectedLayout.TOLERANCE if tolerance is None else tolerance
+        
+        n = len(components)
+        width, height = model.canvas_size
+        k = max(math.sqrt(width * height / n), ForceDirectedLayout.MIN_DISTANCE)
+        
+        # Posición inicial: grilla con espaciado k y una perturbación determinista
+        rng = np.random.default_rng(seed)
+        cols = math.ceil(math.sqrt(n))
+        index = np.arange(n)
+        pos = np.column_stack([index % cols, index // cols]).astype(float) * k
+        pos += rng.uniform(-0.1, 0.1, size=(n, 2)) * k
+        
+        src, dst = ForceDirectedLayout._edge_arrays(model, components, np)
+        
+        temperature = k * cols / 10
+        for _ in range(iterations):
+            if n > ForceDirectedLayout.EXACT_LIMIT:
+                disp = ForceDirectedLayout._grid_repulsion(pos, k, np)
+            else:
+                disp = ForceDirectedLayout._exact_repulsion(pos, k, np)
+            
+            if len(src):
+                delta = pos[src] - pos[dst]
+                distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 0.01)
+                force = delta * (distance / k)[:, None]
+                for axis in (0, 1):
+                    disp[:, axis] -= np.bincount(src, weights=force[:, axis], minlength=n)
+                    disp[:, axis] += np.bincount(dst, weights=force[:, axis], minlength=n)
+            
+            disp -= ForceDirectedLayout.GRAVITY * (pos - pos.mean(axis=0))
+            
+            length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 0.01)
+            step = disp * (np.minimum(length, temperature) / length)[:, None]
+            pos += step
+            
+            temperature *= cooling
+            if np.hypot(step[:, 0], step[:, 1]).mean() < tolerance * k:
+                break
+        
+        ForceDirectedLayout._write_positions(model, components, pos)
+    
+    @staticmethod
+    def _edge_arrays(model: DiagramModel, components: List[Component], np):
+        """Índices origen/destino de las conexiones entre componentes posicionados"""
+        
+        position_of = {component.id: i for i, component in enumerate(components)}
+        pairs = [
+            (position_of[conn.source], position_of[conn.target])
+            for conn in model.connections
+            if conn.source in position_of and conn.target in position_of and conn.source != conn.target
+        ]
+        
+        if not pairs:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
         
-        # Ajustar posiciones basado en conexiones
+        edges = np.array(pairs, dtype=int)
+        return edges[:, 0], edges[:, 1]
+    
+    @staticmethod
+    def _exact_repulsion(pos, k: float, np):
+        """Repulsión k²/d entre todos los pares, por bloques de filas para acotar memoria"""
+        
+        n = len(pos)
+        disp = np.zeros_like(pos)
+        block = max(1, ForceDirectedLayout.BLOCK_PAIRS // n)
+        x, y = pos[:, 0], pos[:, 1]
+        
+        for start in range(0, n, block):
+            dx = x[start:start + block, None] - x[None, :]
+            dy = y[start:start + block, None] - y[None, :]
+            weight = (k * k) / np.maximum(dx * dx + dy * dy, 0.01)
+            disp[start:start + block, 0] = (dx * weight).sum(axis=1)
+            disp[start:start + block, 1] = (dy * weight).sum(axis=1)
+        
+        return disp
+    
+    @staticmethod
+    def _grid_repulsion(pos, k: float, np):
+        """Repulsión aproximada: pares exactos en celdas vecinas, centroides en el resto"""
+        
+        n = len(pos)
+        origin = pos.min(axis=0)
+        extent = max(float((pos.max(axis=0) - origin).max()), k)
+        # ~sqrt(n)/4 celdas por lado equilibra pares cercanos (n²/celdas) y lejanos (n·celdas)
+        cell_size = max(2 * k, extent / max(8, int(math.sqrt(n) / 4)))
+        grid = int(extent // cell_size) + 1
+        
+        cell_xy = ((pos - origin) // cell_size).astype(int)
+        cell = cell_xy[:, 0] * grid + cell_xy[:, 1]
+        cells = grid * grid
+        
+        # Masa y centroide por celda
+        mass = np.bincount(cell, minlength=cells).astype(float)
+        centroid = np.zeros((cells, 2))
+        for axis in (0, 1):
+            centroid[:, axis] = np.bincount(cell, weights=pos[:, axis], minlength=cells)
+        occupied = mass > 0
+        centroid[occupied] /= mass[occupied][:, None]
+        
+        def repulsion(dx, dy, weight):
+            return weight * (k * k) / np.maximum(dx * dx + dy * dy, 0.01)
+        
+        # Campo lejano: todas las celdas ocupadas como una masa puntual
+        occupied_cells = np.flatnonzero(occupied)
+        cx, cy, cmass = centroid[occupied_cells, 0], centroid[occupied_cells, 1], mass[occupied_cells]
+        disp = np.zeros_like(pos)
+        block = max(1, ForceDirectedLayout.BLOCK_PAIRS // max(len(occupied_cells), 1))
+        for start in range(0, n, block):
+            dx = pos[start:start + block, 0, None] - cx[None, :]
+            dy = pos[start:start + block, 1, None] - cy[None, :]
+            weight = repulsion(dx, dy, cmass[None, :])
+            disp[start:start + block, 0] = (dx * weight).sum(axis=1)
+            disp[start:start + block, 1] = (dy * weight).sum(axis=1)
+        
+        # Celdas vecinas (3x3): se descuenta su centroide y se suman los pares
+        # exactos. Ordenando por celda, los miembros de cada celda son un rango
+        # contiguo y los pares de un nodo quedan consecutivos (add.reduceat).
+        order = np.argsort(cell, kind="stable")
+        cell_start = np.searchsorted(cell[order], np.arange(cells))
+        sx, sy, sorted_xy = pos[order, 0], pos[order, 1], cell_xy[order]
+        near = np.zeros_like(pos)
+        
+        for offset_x in (-1, 0, 1):
+            for offset_y in (-1, 0, 1):
+                nx, ny = sorted_xy[:, 0] + offset_x, sorted_xy[:, 1] + offset_y
+                valid = (nx >= 0) & (nx < grid) & (ny >= 0) & (ny < grid)
+                neighbor_cell = nx * grid + ny
+                counts = np.where(valid, mass[np.where(valid, neighbor_cell, 0)], 0).astype(int)
+                nodes = np.flatnonzero(counts)
+                if not len(nodes):
+                    continue
+                neighbor_cell, counts = neighbor_cell[nodes], counts[nodes]
+                
+                dx = sx[nodes] - centroid[neighbor_cell, 0]
+                dy = sy[nodes] - centroid[neighbor_cell, 1]
+                weight = repulsion(dx, dy, mass[neighbor_cell])
+                near[nodes, 0] -= dx * weight
+                near[nodes, 1] -= dy * weight
+                
+                # El par de un nodo consigo mismo tiene delta 0 y no aporta fuerza
+                starts = np.cumsum(counts) - counts
+                target = np.repeat(cell_start[neighbor_cell] - starts, counts) + np.arange(int(counts.sum()))
+                dx = np.repeat(sx[nodes], counts) - sx[target]
+                dy = np.repeat(sy[nodes], counts) - sy[target]
+                weight = repulsion(dx, dy, 1.0)
+                near[nodes, 0] += np.add.reduceat(dx * weight, starts)
+                near[nodes, 1] += np.add.reduceat(dy * weight, starts)
+        
+        disp[order] += near
+        return disp
+    
+    @staticmethod
+    def _write_positions(model: DiagramModel, components: List[Component], pos) -> None:
+        """Traslada al margen del canvas, que se amplía si el layout no cabe"""
+        
+        margin = ForceDirectedLayout.MARGIN
+        pos = pos - pos.min(axis=0) + margin
+        
+        for component, (x, y) in zip(components, pos.tolist()):
+            current = component.position
+            component.position = Position(int(round(x)), int(round(y)), current.width, current.height)
+        
+        right = max(c.position.x + c.position.width for c in components) + margin
+        bottom = max(c.position.y + c.position.height for c in components) + margin
+        model.canvas_size = (max(model.canvas_size[0], right), max(model.canvas_size[1], bottom))
+    
+    @staticmethod
+    def _apply_without_numpy(model: DiagramModel) -> None:
+        """Aproximación sin NumPy: grid y acercamiento de componentes conectados"""
+        
+        GridLayout.apply(model)
         ForceDirectedLayout._adjust_connected_components(model)
     
     @staticmethod
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Edge Router - Ruteo ortogonal de conexiones esquivando componentes
+
+Para cada conexión se arma una grilla dispersa con los bordes (inflados)
+de los componentes cercanos, obtenidos del índice espacial, y se busca con
+A* el camino ortogonal más corto penalizando los quiebres. El resultado son
+los puntos de quiebre que los renderers escriben en <Array as="points">.
+
+Por defecto solo se prueban recta, L y Z; A* es opcional (search=True) y
+acotado: no se usa en diagramas de más de MAX_SEARCH_COMPONENTS
+componentes y cada route_all le dedica a lo sumo SEARCH_BUDGET segundos.
+Con más de MAX_ROUTED_COMPONENTS componentes no se rutea nada. Las
+conexiones sin puntos las rutea draw.io al abrir el archivo.
+"""
+
+import heapq
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from layouts.spatial_index import SpatialIndex, Box
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+Point = Tuple[int, int]
+
+# Direcciones: derecha, abajo, izquierda, arriba
+_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+class EdgeRouter:
+    """Router ortogonal con caché por conexión
+    
+    Una ruta se reutiliza mientras no cambien sus extremos ni los obstáculos
+    de la región en la que se calculó; mover un componente solo recalcula
+    las conexiones cuya región lo incluye.
+    """
+    
+    MARGIN = 10             # Separación mínima entre la línea y un componente
+    BEND_PENALTY = 40       # Costo de un quiebre, en px de recorrido
+    REGION_MARGIN = 200     # Holgura inicial alrededor de origen y destino
+    EXPANSIONS = 3          # Veces que se duplica la región si no hay camino
+    MAX_OBSTACLES = 150     # Más obstáculos en la región: se deja rutear a draw.io
+    MAX_VISITS = 1000       # Estados expandidos por búsqueda antes de desistir
+    MAX_ROUTED_COMPONENTS = 500     # Diagramas más grandes: todo lo rutea draw.io
+    MAX_SEARCH_COMPONENTS = 200     # Diagramas más grandes: solo recta, L y Z
+    SEARCH_BUDGET = 0.05            # Segundos de A* por route_all
+    
+    def __init__(self, search: bool = False):
+        self.search = search
+        self._cache: Dict[Hashable, Tuple[tuple, List[Point]]] = {}
+        self._deadline: Optional[float] = None
+        self.stats = {"direct": 0, "routed": 0, "cached": 0, "unrouted": 0, "skipped": 0}
+    
+    def route_all(self, boxes: Dict[Hashable, Box],
+                  edges: Iterable[Tuple[Hashable, Hashable, Hashable]]) -> Dict[Hashable, List[Point]]:
+        """Rutea conexiones (edge_id, origen, destino) entre cajas absolutas
+        
+        Retorna los puntos de quiebre por conexión; una lista vacía significa
+        línea recta o sin ruta (draw.io rutea al abrir el archivo).
+        """
+        
+        routes = {}
+        if len(boxes) > self.MAX_ROUTED_COMPONENTS:
+            for edge_id, _, _ in edges:
+                routes[edge_id] = []
+            self.stats["skipped"] += len(routes)
+            logger.debug("🔀 %s componentes: rutas delegadas a draw.io", len(boxes))
+            return routes
+        
+        index = SpatialIndex.from_boxes(boxes)
+        search = self.search and len(boxes) <= self.MAX_SEARCH_COMPONENTS
+        self._deadline = time.perf_counter() + self.SEARCH_BUDGET if search else 0.0
+        
+        try:
+            for edge_id, source, target in edges:
+                if source not in boxes or target not in boxes or source == target:
+                    routes[edge_id] = []
+                    continue
+                routes[edge_id] = self.route(edge_id, source, target, index)
+        finally:
+            self._deadline = None
+        
+        logger.debug("🔀 Rutas: %s", self.stats)
+        return routes
+    
+    def route(self, edge_id: Hashable, source: Hashable, target: Hashable,
+              index: SpatialIndex) -> List[Point]:
+        """Puntos de quiebre de una conexión, desde caché si nada se movió
+        
+        Llamada suelta (fuera de route_all) usa A* si search está activo, sin
+        plazo.
+        """
+        
+        source_box, target_box = index.boxes[source], index.boxes[target]
+        start, goal = self._center(source_box), self._center(target_box)
+        
+        cached = self._cache.get(edge_id)
+        if cached is not None:
+            signatures, points = cached
+            if all(signature == self._signature(source, target, source_box, target_box, signature[2], index)
+                   for signature in signatures):
+                self.stats["cached"] += 1
+                return points
+        
+        # Firma de cada región consultada: la ruta depende solo de ellas
+        margin = self.MARGIN
+        span = (min(start[0], goal[0]) - margin, min(start[1], goal[1]) - margin,
+                abs(start[0] - goal[0]) + 2 * margin, abs(start[1] - goal[1]) + 2 * margin)
+        signatures = [self._signature(source, target, source_box, target_box, span, index)]
+        points = None
+        
+        if not isinstance(signatures[0][3], int):
+            # Recta, L y Z quedan dentro del rectángulo origen-destino
+            points = self._direct(start, goal, self._obstacles(signatures[0], start, goal))
+            if points is not None:
+                self.stats["direct"] += 1
+        
+        if points is None and not isinstance(signatures[0][3], int) and not self._searchable():
+            # Sin A* (o sin presupuesto) no se guarda en caché: la conexión
+            # se vuelve a intentar en la próxima pasada
+            self.stats["skipped"] += 1
+            return []
+        
+        if points is None and not isinstance(signatures[0][3], int):
+            x, y, width, height = self._union(source_box, target_box)
+            
+            for attempt in range(self.EXPANSIONS + 1):
+                grow = self.REGION_MARGIN * 2 ** attempt
+                region = (x - grow, y - grow, width + 2 * grow, height + 2 * grow)
+                signatures.append(self._signature(source, target, source_box, target_box, region, index))
+                if isinstance(signatures[-1][3], int):
+                    break
+                
+                path, exhausted = self._search(start, goal, self._obstacles(signatures[-1], start, goal), region)
+                if path is not None:
+                    points = self._bends(path)
+                    self.stats["routed"] += 1
+                    break
+                if exhausted:
+                    # Región demasiado enredada: ampliarla solo costaría más
+                    break
+        
+        if points is None:
+            # Sin ruta (o demasiados obstáculos) también se guarda: no se
+            # reintenta hasta que algo se mueva
+            self.stats["unrouted"] += 1
+            points = []
+        
+        self._cache[edge_id] = (tuple(signatures), points)
+        return points
+    
+    def clear(self) -> None:
+        """Descarta todas las rutas en caché"""
+        
+        self._cache.clear()
+    
+    def _searchable(self) -> bool:
+        """A* activo y con tiempo restante en el presupuesto de route_all"""
+        
+        return self.search and (self._deadline is None or time.perf_counter() < self._deadline)
+    
+    def _signature(self, source, target, source_box: Box, target_box: Box,
+                   region: Box, index: SpatialIndex) -> tuple:
+        """Extremos, región y obstáculos de la región: si no cambian, la ruta tampoco
+        
+        Con más de MAX_OBSTACLES solo se guarda la cantidad (acotada), que
+        basta para saber que la conexión se sigue dejando a draw.io.
+        """
+        
+        keys = [key for key in index.query(region, limit=self.MAX_OBSTACLES + 2) if key != source and key != target]
+        if len(keys) > self.MAX_OBSTACLES:
+            return source_box, target_box, region, len(keys)
+        
+        obstacles = sorted((str(key), index.boxes[key]) for key in keys)
+        return source_box, target_box, region, tuple(obstacles)
+    
+    def _obstacles(self, signature: tuple, start: Point, goal: Point) -> List[Tuple[float, float, float, float]]:
+        """Obstáculos de la firma inflados en MARGIN como (x0, y0, x1, y1)
+        
+        Se descartan los que contienen el origen o el destino (componentes
+        superpuestos): no hay forma de esquivarlos.
+        """
+        
+        margin = self.MARGIN
+        (sx, sy), (gx, gy) = start, goal
+        inflated = []
+        for _, (x, y, width, height) in signature[3]:
+            x0, y0, x1, y1 = x - margin, y - margin, x + width + margin, y + height + margin
+            if not (x0 < sx < x1 and y0 < sy < y1) and not (x0 < gx < x1 and y0 < gy < y1):
+                inflated.append((x0, y0, x1, y1))
+        return inflated
+    
+    def _search(self, start: Point, goal: Point, inflated: List[Tuple[float, float, float, float]],
+                region: Box) -> Tuple[Optional[List[Point]], bool]:
+        """A* sobre la grilla dispersa de la región
+        
+        Retorna el camino (None si no hay) y si se agotó MAX_VISITS.
+        """
+        
+        rx0, ry0, rx1, ry1 = region[0], region[1], region[0] + region[2], region[1] + region[3]
+        xs = sorted({start[0], goal[0], rx0, rx1} | {v for box in inflated for v in (box[0], box[2]) if rx0 < v < rx1})
+        ys = sorted({start[1], goal[1], ry0, ry1} | {v for box in inflated for v in (box[1], box[3]) if ry0 < v < ry1})
+        
+        # Los bordes de los obstáculos son líneas de la grilla: un tramo entre
+        # nodos vecinos está bloqueado si su punto medio cae dentro de uno
+        cell = self.REGION_MARGIN
+        buckets: Dict[Tuple[int, int], List[Tuple[float, float, float, float]]] = {}
+        for box in inflated:
+            for cx in range(int(box[0] // cell), int(box[2] // cell) + 1):
+                for cy in range(int(box[1] // cell), int(box[3] // cell) + 1):
+                    buckets.setdefault((cx, cy), []).append(box)
+        
+        def blocked(x: float, y: float) -> bool:
+            return any(x0 < x < x1 and y0 < y < y1 for x0, y0, x1, y1 in buckets.get((int(x // cell), int(y // cell)), ()))
+        
+        start_node = (xs.index(start[0]), ys.index(start[1]))
+        goal_node = (xs.index(goal[0]), ys.index(goal[1]))
+        
+        gx, gy = goal
+        bend_penalty = self.BEND_PENALTY
+        
+        def heuristic(i: int, j: int, direction: int) -> float:
+            # Distancia Manhattan más los quiebres que faltan como mínimo
+            dx, dy = gx - xs[i], gy - ys[j]
+            distance = abs(dx) + abs(dy)
+            if dx and dy:
+                return distance + bend_penalty
+            if direction == -1 or not distance:
+                return distance
+            toward = 0 if dx > 0 else 2 if dx < 0 else 1 if dy > 0 else 3
+            return distance if direction == toward else distance + bend_penalty
+        
+        # Estado: (i, j, dirección de llegada); -1 en el origen. Con igual
+        # costo estimado se expande primero el más avanzado (-costo en el heap)
+        start_state = (start_node[0], start_node[1], -1)
+        best = {start_state: 0}
+        came_from = {}
+        heap = [(heuristic(*start_state), 0, start_state)]
+        
+        visits = 0
+        while heap:
+            _, cost, state = heapq.heappop(heap)
+            cost = -cost
+            if cost > best.get(state, float("inf")):
+                continue
+            
+            visits += 1
+            if visits > self.MAX_VISITS:
+                return None, True
+            
+            i, j, direction = state
+            if (i, j) == goal_node:
+                path = [(xs[i], ys[j])]
+                while state in came_from:
+                    state = came_from[state]
+                    path.append((xs[state[0]], ys[state[1]]))
+                return path[::-1], False
+            
+            for new_direction, (di, dj) in enumerate(_DIRECTIONS):
+                if direction != -1 and new_direction == (direction + 2) % 4:
+                    continue
+                
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < len(xs) and 0 <= nj < len(ys)):
+                    continue
+                if blocked((xs[i] + xs[ni]) / 2, (ys[j] + ys[nj]) / 2):
+                    continue
+                
+                step = abs(xs[ni] - xs[i]) + abs(ys[nj] - ys[j])
+                if direction != -1 and new_direction != direction:
+                    step += bend_penalty
+                
+                new_state = (ni, nj, new_direction)
+                new_cost = cost + step
+                if new_cost < best.get(new_state, float("inf")):
+                    best[new_state] = new_cost
+                    came_from[new_state] = state
+                    heapq.heappush(heap, (new_cost + heuristic(*new_state), -new_cost, new_state))
+        
+        return None, False
+    
+    def _direct(self, start: Point, goal: Point,
+                inflated: List[Tuple[float, float, float, float]]) -> Optional[List[Point]]:
+        """Primera ruta libre entre recta, L (dos variantes) y Z por el punto medio"""
+        
+        (sx, sy), (gx, gy) = start, goal
+        mx, my = (sx + gx) // 2, (sy + gy) // 2
+        
+        if sx == gx or sy == gy:
+            candidates = [[]]
+        else:
+            candidates = [[(gx, sy)], [(sx, gy)], [(mx, sy), (mx, gy)], [(sx, my), (gx, my)]]
+        
+        for bends in candidates:
+            path = [start] + bends + [goal]
+            if not any(self._blocked(a, b, inflated) for a, b in zip(path, path[1:])):
+                return bends
+        return None
+    
+    @staticmethod
+    def _blocked(a: Point, b: Point, inflated: List[Tuple[float, float, float, float]]) -> bool:
+        """El tramo ortogonal a-b pasa por dentro de alguna caja inflada"""
+        
+        if a[1] == b[1]:
+            y, low, high = a[1], min(a[0], b[0]), max(a[0], b[0])
+            return any(y0 < y < y1 and low < x1 and x0 < high for x0, y0, x1, y1 in inflated)
+        x, low, high = a[0], min(a[1], b[1]), max(a[1], b[1])
+        return any(x0 < x < x1 and low < y1 and y0 < high for x0, y0, x1, y1 in inflated)
+    
+    @staticmethod
+    def _bends(path: List[Point]) -> List[Point]:
+        """Solo los puntos donde cambia la dirección (sin origen ni destino)"""
+        
+        bends = []
+        for previous, point, following in zip(path, path[1:], path[2:]):
+            horizontal_in = previous[1] == point[1]
+            horizontal_out = point[1] == following[1]
+            if horizontal_in != horizontal_out:
+                bends.append((int(point[0]), int(point[1])))
+        return bends
+    
+    @staticmethod
+    def _center(box: Box) -> Point:
+        return int(box[0] + box[2] / 2), int(box[1] + box[3] / 2)
+    
+    @staticmethod
+    def _union(a: Box, b: Box) -> Box:
+        x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+        x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+        return x0, y0, x1 - x0, y1 - y0
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Incremental Layout - Re-layout estable entre ejecuciones
+
+Un LayoutSnapshot guarda la posición y una firma (label + shape) de cada
+componente: se carga del JSON auxiliar que dejan los generadores o de un
+.drawio generado antes. Los componentes con la misma firma quedan fijos en
+su posición anterior; solo los nuevos o modificados se ubican, en el hueco
+libre más cercano a sus vecinos. Así agregar un microservicio no mueve el
+resto del diagrama y el diff del .drawio queda acotado.
+"""
+
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models.diagram_model import DiagramModel, Component, Position
+from layouts.spatial_index import SpatialIndex, Box
+from core.logger import get_logger
+from core.mxgraph_writer import parse_drawio
+
+logger = get_logger(__name__)
+
+class LayoutSnapshot:
+    """Posiciones y firmas de componentes de un layout anterior"""
+    
+    VERSION = 1
+    
+    def __init__(self, positions: Dict[str, Box] = None, signatures: Dict[str, str] = None):
+        self.positions: Dict[str, Box] = positions or {}
+        self.signatures: Dict[str, str] = signatures or {}
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    @staticmethod
+    def signature(label: str, shape: Optional[str]) -> str:
+        """Firma del contenido de un componente: si cambia, se vuelve a ubicar"""
+        
+        return hashlib.sha1(f"{label}\x00{shape or ''}".encode("utf-8")).hexdigest()[:16]
+    
+    @staticmethod
+    def component_signature(component: Component) -> str:
+        return LayoutSnapshot.signature(component.label or component.name, component.shape)
+    
+    def unchanged(self, component: Component) -> bool:
+        """El componente existía con el mismo contenido"""
+        
+        return component.id in self.positions and self.signatures.get(component.id) == self.component_signature(component)
+    
+    def matches(self, model: DiagramModel) -> bool:
+        """Algún componente del modelo puede quedar fijo"""
+        
+        return any(self.unchanged(component) for component in model.components)
+    
+    @classmethod
+    def from_model(cls, model: DiagramModel) -> 'LayoutSnapshot':
+        """Snapshot del layout actual del modelo (sin el título)"""
+        
+        snapshot = cls()
+        for component in model.components:
+            if component.component_type.value == "title":
+                continue
+            pos = component.position
+            snapshot.positions[component.id] = (pos.x, pos.y, pos.width, pos.height)
+            snapshot.signatures[component.id] = cls.component_signature(component)
+        return snapshot
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['LayoutSnapshot']:
+        """Carga un JSON auxiliar o un .drawio; None si no existe o no se puede leer"""
+        
+        path = Path(path)
+        if not path.is_file():
+            return None
+        
+        try:
+            if path.suffix == ".json":
+                return cls.from_json(path.read_text(encoding="utf-8"))
+            return cls.from_drawio(path.read_text(encoding="utf-8"))
+        except (ValueError, KeyError, TypeError, ET.ParseError) as e:
+            logger.warning("⚠️ Layout anterior ilegible (%s): %s", path, e)
+            return None
+    
+    @classmethod
+    def from_json(cls, content: str) -> 'LayoutSnapshot':
+        data = json.loads(content)
+        snapshot = cls()
+        for component_id, entry in data["components"].items():
+            snapshot.positions[component_id] = (entry["x"], entry["y"], entry["width"], entry["height"])
+            snapshot.signatures[component_id] = entry.get("signature", "")
+        return snapshot
+    
+    @classmethod
+    def from_drawio(cls, content: str) -> 'LayoutSnapshot':
+        """Vértices del .drawio con geometría (el shape se lee del estilo)"""
+        
+        snapshot = cls()
+        for cell in parse_drawio(content).iter("mxCell"):
+            geometry = cell.find("mxGeometry")
+            if cell.get("vertex") != "1" or geometry is None or cell.get("id") is None:
+                continue
+            
+            style = dict(part.split("=", 1) for part in (cell.get("style") or "").split(";") if "=" in part)
+            component_id = cell.get("id")
+            snapshot.positions[component_id] = tuple(
+                int(float(geometry.get(name, 0))) for name in ("x", "y", "width", "height")
+            )
+            snapshot.signatures[component_id] = cls.signature(cell.get("value", ""), style.get("shape"))
+        return snapshot
+    
+    def to_json(self) -> str:
+        components = {
+            component_id: dict(zip(("x", "y", "width", "height"), box), signature=self.signatures.get(component_id, ""))
+            for component_id, box in sorted(self.positions.items())
+        }
+        return json.dumps({"version": self.VERSION, "components": components}, indent=2)
+    
+    def save(self, path: str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json(), encoding="utf-8")
+
+class IncrementalLayout:
+    """Fija componentes sin cambios y ubica los nuevos o modificados"""
+    
+    GAP = 60            # Separación mínima con otros componentes
+    MARGIN = 50
+    MAX_RINGS = 50      # Anillos de búsqueda de hueco antes de ir al final del diagrama
+    
+    @staticmethod
+    def apply(model: DiagramModel, previous: LayoutSnapshot,
+              node_size: Tuple[int, int] = None) -> List[Component]:
+        """Aplica el layout anterior; retorna los componentes que hubo que ubicar
+        
+        node_size es el tamaño que daría el layout completo a un componente
+        nuevo (p.ej. el de HierarchicalLayout); por defecto se conserva el suyo.
+        """
+        
+        cls = IncrementalLayout
+        components = [c for c in model.components if c.component_type.value != "title"]
+        
+        index = SpatialIndex()
+        pending = []
+        for component in components:
+            if previous.unchanged(component):
+                box = previous.positions[component.id]
+                component.position = Position(*box)
+                index.insert(component.id, box)
+            else:
+                pending.append(component)
+        
+        if not pending:
+            cls._fit_canvas(model, components)
+            return []
+        
+        # Primero los vecinos de lo ya ubicado (BFS); los aislados van al final del diagrama
+        pending_ids = {component.id for component in pending}
+        queue = deque(c for c in pending if any(n.id in index for n in model.get_neighbors(c.id)))
+        queued = {component.id for component in queue}
+        starts = iter(pending)
+        
+        while True:
+            while queue:
+                component = queue.popleft()
+                cls._place(model, component, previous, index, node_size)
+                
+                for neighbor in model.get_neighbors(component.id):
+                    if neighbor.id in pending_ids and neighbor.id not in queued:
+                        queued.add(neighbor.id)
+                        queue.append(neighbor)
+            
+            start = next((c for c in starts if c.id not in queued), None)
+            if start is None:
+                break
+            queued.add(start.id)
+            queue.append(start)
+        
+        cls._fit_canvas(model, components)
+        logger.debug("📌 Layout incremental: %s fijos, %s ubicados", len(components) - len(pending), len(pending))
+        return pending
+    
+    @staticmethod
+    def _place(model: DiagramModel, component: Component, previous: LayoutSnapshot,
+               index: SpatialIndex, node_size: Tuple[int, int]) -> None:
+        """Ubica el componente en el hueco libre más cercano a su posición deseada"""
+        
+        cls = IncrementalLayout
+        width, height = node_size or (component.position.width, component.position.height)
+        
+        # Deseada: la anterior si solo cambió el contenido; si no, el centro de los vecinos ya ubicados
+        if component.id in previous.positions:
+            desired_x, desired_y = previous.positions[component.id][:2]
+        else:
+            placed = [index.boxes[n.id] for n in model.get_neighbors(component.id) if n.id in index]
+            if placed:
+                desired_x = sum(box[0] + box[2] / 2 for box in placed) / len(placed) - width / 2
+                desired_y = sum(box[1] + box[3] / 2 for box in placed) / len(placed) - height / 2
+            else:
+                desired_x, desired_y = cls._below_everything(index)
+        
+        step_x, step_y = width + cls.GAP, height + cls.GAP
+        for x, y in cls._candidates(desired_x, desired_y, step_x, step_y):
+            if cls._is_free(index, (x, y, width, height)):
+                break
+        else:
+            x, y = cls._below_everything(index)
+        
+        box = (int(round(x)), int(round(y)), width, height)
+        component.position = Position(*box)
+        index.insert(component.id, box)
+    
+    @staticmethod
+    def _candidates(x: float, y: float, step_x: float, step_y: float):
+        """Posiciones por anillos alrededor de (x, y), de la más cercana a la más lejana"""
+        
+        margin = IncrementalLayout.MARGIN
+        for ring in range(IncrementalLayout.MAX_RINGS + 1):
+            cells = [(i, j) for i in range(-ring, ring + 1) for j in range(-ring, ring + 1)
+                     if max(abs(i), abs(j)) == ring]
+            cells.sort(key=lambda cell: (cell[0] * step_x) ** 2 + (cell[1] * step_y) ** 2)
+            for i, j in cells:
+                cx, cy = x + i * step_x, y + j * step_y
+                if cx >= margin and cy >= margin:
+                    yield cx, cy
+    
+    @staticmethod
+    def _is_free(index: SpatialIndex, box: Box) -> bool:
+        gap = IncrementalLayout.GAP
+        x, y, width, height = box
+        return not index.query((x - gap, y - gap, width + 2 * gap, height + 2 * gap), limit=0)
+    
+    @staticmethod
+    def _below_everything(index: SpatialIndex) -> Tuple[float, float]:
+        if not len(index):
+            return IncrementalLayout.MARGIN, IncrementalLayout.MARGIN
+        bottom = max(box[1] + box[3] for box in index.boxes.values())
+        return IncrementalLayout.MARGIN, bottom + IncrementalLayout.GAP
+    
+    @staticmethod
+    def _fit_canvas(model: DiagramModel, components: List[Component]) -> None:
+        if not components:
+            return
+        margin = IncrementalLayout.MARGIN
+        right = max(c.position.x + c.position.width for c in components) + margin
+        bottom = max(c.position.y + c.position.height for c in components) + margin
+        model.canvas_size = (max(model.canvas_size[0], right), max(model.canvas_size[1], bottom))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Spatial Index - Índice de cajas por grilla uniforme
+
+Cada caja (x, y, width, height) se registra en las celdas que toca; una
+consulta por rectángulo solo revisa las cajas de esas celdas en vez de
+recorrer todo el diagrama.
+"""
+
+from itertools import product
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+Box = Tuple[float, float, float, float]
+
+class SpatialIndex:
+    """Grilla hash de cajas alineadas a los ejes"""
+    
+    DEFAULT_CELL_SIZE = 256
+    
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.boxes: Dict[Hashable, Box] = {}
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+    
+    @classmethod
+    def from_boxes(cls, boxes: Dict[Hashable, Box], cell_size: float = None) -> 'SpatialIndex':
+        """Construye el índice; sin cell_size usa el doble del tamaño medio de caja"""
+        
+        if cell_size is None and boxes:
+            mean_side = sum(max(box[2], box[3]) for box in boxes.values()) / len(boxes)
+            cell_size = max(2 * mean_side, 1)
+        
+        index = cls(cell_size or cls.DEFAULT_CELL_SIZE)
+        for key, box in boxes.items():
+            index.insert(key, box)
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.boxes)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.boxes
+    
+    def insert(self, key: Hashable, box: Box) -> None:
+        """Registra (o mueve) la caja asociada a key"""
+        
+        if key in self.boxes:
+            self.remove(key)
+        
+        self.boxes[key] = box
+        for cell in self._cells_for(box):
+            self._cells.setdefault(cell, set()).add(key)
+    
+    def remove(self, key: Hashable) -> None:
+        """Quita la caja asociada a key (si existe)"""
+        
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        
+        for cell in self._cells_for(box):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+    
+    def query(self, bbox: Box, limit: Optional[int] = None) -> List[Hashable]:
+        """Claves cuyas cajas se intersectan con bbox (bordes que solo se tocan no cuentan)
+        
+        Con limit la búsqueda se corta al superar limit resultados.
+        """
+        
+        x, y, width, height = bbox
+        x1, y1 = x + width, y + height
+        boxes = self.boxes
+        found = []
+        seen = set()
+        
+        size = self.cell_size
+        columns = range(int(x // size), int((x + max(width, 0)) // size) + 1)
+        rows = range(int(y // size), int((y + max(height, 0)) // size) + 1)
+        # Rectángulos enormes: recorrer solo las celdas ocupadas
+        occupied = self._cells
+        cells = occupied.values() if len(columns) * len(rows) > len(occupied) else [
+            occupied[cell] for cell in product(columns, rows) if cell in occupied]
+        
+        for bucket in cells:
+            for key in bucket:
+                bx, by, bw, bh = boxes[key]
+                # Una caja en varias celdas aparece varias veces: se deduplica solo si coincide
+                if bx < x1 and x < bx + bw and by < y1 and y < by + bh and key not in seen:
+                    seen.add(key)
+                    found.append(key)
+                    if limit is not None and len(found) > limit:
+                        return found
+        
+        return found
+    
+    def overlapping_pairs(self) -> List[Tuple[Hashable, Hashable]]:
+        """Pares de claves cuyas cajas se superponen, cada par una sola vez
+        
+        Solo se comparan cajas que comparten celda; el par se reporta en la
+        celda que contiene la esquina superior izquierda de la intersección.
+        """
+        
+        boxes = self.boxes
+        order = {key: i for i, key in enumerate(boxes)}
+        size = self.cell_size
+        pairs = []
+        
+        for (cx, cy), bucket in self._cells.items():
+            keys = sorted(bucket, key=order.__getitem__)
+            for i, first in enumerate(keys):
+                ax, ay, aw, ah = boxes[first]
+                for second in keys[i + 1:]:
+                    bx, by, bw, bh = boxes[second]
+                    if not (bx < ax + aw and ax < bx + bw and by < ay + ah and ay < by + bh):
+                        continue
+                    if int(max(ax, bx) // size) == cx and int(max(ay, by) // size) == cy:
+                        pairs.append((first, second))
+        
+        pairs.sort(key=lambda pair: (order[pair[0]], order[pair[1]]))
+        return pairs
+    
+    def _cells_for(self, box: Box) -> Iterable[Tuple[int, int]]:
+        x, y, width, height = box
+        size = self.cell_size
+        for cx in range(int(x // size), int((x + max(width, 0)) // size) + 1):
+            for cy in range(int(y // size), int((y + max(height, 0)) // size) + 1):
+                yield cx, cy
+
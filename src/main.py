@@ -9,11 +9,15 @@ from pathlib import Path
 # Agregar src al path
 sys.path.append(str(Path(__file__).parent))
 
+from core.logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
 def main():
     """Punto de entrada principal"""
     
-    print("🚀 MCP Diagram Generator v4.1.0")
-    print("=" * 40)
+    logger.info("🚀 MCP Diagram Generator v4.1.0")
+    logger.info("=" * 40)
     
     # Usar nueva arquitectura con WorkflowOrchestrator
     from core.workflow_orchestrator import run_complete_workflow
@@ -22,16 +26,17 @@ def main():
         # Ejecutar flujo completo
         results = run_complete_workflow("bmc_input")
         
-        print(f"\n🎉 Generación completada exitosamente!")
-        print(f"📊 Archivos generados: {results['summary']['total_files']}")
-        print(f"⏱️ Tiempo: {results['duration_seconds']:.1f}s")
+        logger.info("🎉 Generación completada exitosamente!")
+        logger.info("📊 Archivos generados: %s", results['summary']['total_files'])
+        logger.info("⏱️ Tiempo: %.1fs", results['duration_seconds'])
         
         return True
         
     except Exception as e:
-        print(f"\n❌ Error: {e}")
+        logger.error("❌ Error: %s", e)
         return False
 
 if __name__ == "__main__":
+    setup_logging()
     success = main()
     sys.exit(0 if success else 1)
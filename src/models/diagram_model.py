@@ -64,17 +64,80 @@ class DiagramModel:
     layout: LayoutType = LayoutType.HIERARCHICAL
     canvas_size: Tuple[int, int] = (1400, 1000)
     
+    # Índices derivados de components/connections (id -> componente, adyacencia)
+    _index: Dict[str, Component] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _outgoing: Dict[str, List[Connection]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _incoming: Dict[str, List[Connection]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_sizes: Tuple[int, int] = field(default=(0, 0), init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._rebuild_index()
+    
     def add_component(self, component: Component) -> None:
         """Agrega componente al modelo"""
+        self._ensure_index()
         self.components.append(component)
+        self._index_component(component)
+        self._indexed_sizes = (len(self.components), len(self.connections))
     
     def add_connection(self, connection: Connection) -> None:
         """Agrega conexión al modelo"""
+        self._ensure_index()
         self.connections.append(connection)
+        self._index_connection(connection)
+        self._indexed_sizes = (len(self.components), len(self.connections))
     
     def get_component_by_id(self, component_id: str) -> Optional[Component]:
         """Busca componente por ID"""
-        return next((c for c in self.components if c.id == component_id), None)
+        self._ensure_index()
+        return self._index.get(component_id)
+    
+    def get_outgoing_connections(self, component_id: str) -> List[Connection]:
+        """Conexiones que salen del componente"""
+        self._ensure_index()
+        return list(self._outgoing.get(component_id, []))
+    
+    def get_incoming_connections(self, component_id: str) -> List[Connection]:
+        """Conexiones que llegan al componente"""
+        self._ensure_index()
+        return list(self._incoming.get(component_id, []))
+    
+    def get_neighbors(self, component_id: str, direction: str = "both") -> List[Component]:
+        """Componentes conectados, sin repetir, en orden de conexión
+        
+        direction: "out" (destinos), "in" (orígenes) o "both"
+        """
+        self._ensure_index()
+        
+        neighbor_ids = []
+        if direction in ("out", "both"):
+            neighbor_ids.extend(conn.target for conn in self._outgoing.get(component_id, []))
+        if direction in ("in", "both"):
+            neighbor_ids.extend(conn.source for conn in self._incoming.get(component_id, []))
+        
+        return [self._index[nid] for nid in dict.fromkeys(neighbor_ids) if nid in self._index]
+    
+    def _ensure_index(self) -> None:
+        """Reconstruye índices si las listas se modificaron sin add_component/add_connection"""
+        if self._indexed_sizes != (len(self.components), len(self.connections)):
+            self._rebuild_index()
+    
+    def _rebuild_index(self) -> None:
+        """Construye índice de componentes y listas de adyacencia"""
+        self._index, self._outgoing, self._incoming = {}, {}, {}
+        for component in self.components:
+            self._index_component(component)
+        for connection in self.connections:
+            self._index_connection(connection)
+        self._indexed_sizes = (len(self.components), len(self.connections))
+    
+    def _index_component(self, component: Component) -> None:
+        # Con IDs duplicados se conserva el primero, igual que la búsqueda lineal
+        self._index.setdefault(component.id, component)
+    
+    def _index_connection(self, connection: Connection) -> None:
+        self._outgoing.setdefault(connection.source, []).append(connection)
+        self._incoming.setdefault(connection.target, []).append(connection)
     
     def validate(self) -> List[str]:
         """Valida el modelo y retorna errores"""
@@ -9,6 +9,11 @@ from typing import List, Dict, Optional
 import base64
 import json
 
+from core.logger import get_logger
+from core.drawio_rasterizer import render_preview
+
+logger = get_logger(__name__)
+
 class HTMLReportGenerator:
     """Generador de reportes HTML con diagramas embebidos"""
     
@@ -28,7 +33,7 @@ class HTMLReportGenerator:
         report_path = report_dir / f"diagram_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         report_path.write_text(html_content, encoding='utf-8')
         
-        print(f"✅ Reporte HTML generado: {report_path}")
+        logger.info("✅ Reporte HTML generado: %s", report_path)
         return str(report_path)
     
     def _build_html_report(self, diagrams: List[Dict], project_name: str) -> str:
@@ -43,7 +48,7 @@ class HTMLReportGenerator:
         html_parts.append(self._get_executive_summary(diagrams))
         
         # Sección de diagramas
-        html_parts.append(self._get_diagrams_section(diagrams))
+        html_parts.append(self._get_diagrams_section(diagrams, project_name))
         
         # Métricas y validación
         html_parts.append(self._get_metrics_section(diagrams))
@@ -220,7 +225,7 @@ class HTMLReportGenerator:
             <p><strong>Nivel:</strong> AWS Senior Architect con patrones enterprise y observabilidad completa.</p>
         </div>'''
     
-    def _get_diagrams_section(self, diagrams: List[Dict]) -> str:
+    def _get_diagrams_section(self, diagrams: List[Dict], project_name: str = "bmc_input") -> str:
         """Sección de diagramas con previews"""
         
         section_parts = ['<div class="section"><h2>🎨 Diagramas Generados</h2>']
@@ -242,7 +247,7 @@ class HTMLReportGenerator:
                     <p><strong>Tamaño:</strong> {self._get_file_size(diagram_path) if diagram_path else 'N/A'}</p>
                     
                     <div class="diagram-preview">
-                        {self._get_diagram_preview(diagram)}
+                        {self._get_diagram_preview(diagram, project_name)}
                     </div>
                     
                     <p><strong>Características:</strong></p>
@@ -296,11 +301,18 @@ class HTMLReportGenerator:
             </div>
         </div>'''
     
-    def _get_diagram_preview(self, diagram: Dict) -> str:
-        """Genera preview del diagrama"""
+    def _get_diagram_preview(self, diagram: Dict, project_name: str = "bmc_input") -> str:
+        """Genera preview del diagrama (SVG embebido, cacheado por contenido en reports/<proyecto>/previews)"""
         
-        # En implementación real, generaríamos preview PNG
-        # Por ahora, mostrar placeholder
+        drawio_path = diagram.get("path")
+        if drawio_path and str(drawio_path).endswith(".drawio") and Path(drawio_path).exists():
+            try:
+                preview_dir = self.output_dir / "reports" / project_name / "previews"
+                svg_path = render_preview(drawio_path, str(preview_dir), fmt="svg")
+                svg_data = base64.b64encode(Path(svg_path).read_bytes()).decode("ascii")
+                return f'<img src="data:image/svg+xml;base64,{svg_data}" alt="Preview {Path(drawio_path).stem}">'
+            except Exception as e:
+                logger.warning("⚠️ No se pudo generar preview de %s: %s", drawio_path, e)
         
         return '''
         <div style="background: #f0f0f0; padding: 40px; border-radius: 8px; color: #666;">
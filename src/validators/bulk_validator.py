@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Bulk Validator - Validación masiva de diagramas DrawIO antes de publicar
+
+Recorre un directorio (por defecto outputs/drawio), omite los archivos cuyo
+contenido ya pasó la validación (hash SHA-256 en un BuildCache) y reparte el
+resto en un pool de procesos. drawio-export se resuelve una sola vez y se
+pasa a los workers; no se generan previews ni se relee el archivo por cada
+chequeo. El resultado se guarda en un
+reporte JSON y otro JUnit (para CI).
+"""
+
+import json
+import time
+import shutil
+import hashlib
+import multiprocessing
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+
+from core.app_config import AppConfig, app_config
+from core.build_cache import BuildCache
+from core.logger import get_logger
+from validators.drawio_validator import DrawIOValidator
+from validators.xml_validator import validate_drawio_file
+
+logger = get_logger(__name__)
+
+# Archivos más grandes se validan por streaming (memoria acotada)
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+# Bytes mínimos por worker: arrancar un proceso spawn cuesta más que validar
+# unos pocos MB, así que árboles chicos se validan en el proceso actual
+BYTES_PER_WORKER = 4 * 1024 * 1024
+
+# Cambiar cualquiera de estos módulos invalida las validaciones cacheadas
+VALIDATOR_SOURCES = [
+    Path(__file__).parent / name
+    for name in ("bulk_validator.py", "drawio_validator.py", "xml_validator.py", "streaming_validator.py",
+                 "diagram_rules.py", "diagram_index.py", "rule_engine.py")
+] + [Path(__file__).parent.parent / "core" / "mxgraph_writer.py"]
+
+def validate_file(file_path: str, streaming_threshold: int = STREAMING_THRESHOLD) -> Dict[str, Any]:
+    """Valida un archivo; pensado para ejecutarse en un worker (no lanza errores)"""
+    
+    start = time.perf_counter()
+    result = {"file": file_path, "status": "failed", "errors": []}
+    
+    try:
+        # Estructura, IDs y referencias: una sola lectura (o streaming si es grande, mismo veredicto)
+        streaming = Path(file_path).stat().st_size > streaming_threshold
+        validation = validate_drawio_file(file_path, streaming=streaming)
+        result["streaming"] = streaming
+        result["errors"].extend(validation.get("errors", []))
+        
+        can_export, export_msg = DrawIOValidator.validate_with_drawio_export(file_path)
+        if not can_export:
+            result["errors"].append(export_msg)
+        
+        if validation["valid"] and not result["errors"]:
+            result["status"] = "passed"
+    except Exception as e:
+        result["errors"].append(f"{type(e).__name__}: {e}")
+    
+    result["duration_seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+def validate_tree(directory: str, jobs: Optional[int] = None, use_cache: bool = True,
+                  root_path: Optional[str] = None, pattern: str = "**/*.drawio") -> Dict[str, Any]:
+    """Valida todos los .drawio del directorio en un pool de procesos"""
+    
+    paths = AppConfig(root_path).paths if root_path else app_config.paths
+    directory = Path(directory)
+    files = sorted(path for path in directory.glob(pattern) if path.is_file())
+    
+    start = time.perf_counter()
+    tool = shutil.which('drawio-export')
+    DrawIOValidator.use_drawio_export(tool)
+    cache = BuildCache(paths.outputs_generated_dir / "validation_manifest.json", enabled=use_cache)
+    
+    # Caché por hash de contenido: un contenido que ya pasó con los mismos validadores no se
+    # repite en ninguna ruta, y las copias idénticas se validan una sola vez por ejecución
+    keys, cached, pending, copies = {}, [], [], defaultdict(list)
+    pending_bytes = 0
+    for path in files:
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest in copies:
+            copies[digest].append(str(path))
+            continue
+        key = cache.compute_key({"sha256": digest, "drawio_export": tool}, VALIDATOR_SOURCES)
+        if cache.lookup(f"validate:{digest}", key):
+            cached.append({"file": str(path), "status": "passed", "errors": [], "cached": True, "sha256": digest})
+        else:
+            keys[str(path)] = (digest, key)
+            copies[digest] = []
+            pending.append(str(path))
+            pending_bytes += len(content)
+    
+    jobs = max(1, min(jobs or multiprocessing.cpu_count(), len(pending) or 1, pending_bytes // BYTES_PER_WORKER))
+    logger.info("🔍 Validando %s archivos (%s en caché o repetidos) con %s procesos", len(files), len(files) - len(pending), jobs)
+    
+    if jobs == 1:
+        validated = [validate_file(path) for path in pending]
+    else:
+        # Lotes por worker: con cientos de archivos chicos el costo es el IPC, no la validación
+        chunksize = max(1, len(pending) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=DrawIOValidator.use_drawio_export, initargs=(tool,)) as executor:
+            validated = list(executor.map(validate_file, pending, chunksize=chunksize))
+    
+    for result in validated:
+        digest, key = keys[result["file"]]
+        result["sha256"] = digest
+        if result["status"] == "passed":
+            cache.store(f"validate:{digest}", key, {"file": result["file"]})
+        else:
+            cache.invalidate(f"validate:{digest}")
+        cached.extend(dict(result, file=path, cached=True) for path in copies[digest])
+    cache.save()
+    
+    results = sorted(cached + validated, key=lambda result: result["file"])
+    for result in results:
+        result["file"] = _relative(result["file"], directory)
+    
+    failed = [result["file"] for result in results if result["status"] != "passed"]
+    
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "directory": str(directory),
+        "jobs": jobs,
+        "drawio_export": tool,
+        "total_files": len(results),
+        "validated": len(validated),
+        "cached": len(cached),
+        "passed": len(results) - len(failed),
+        "failed": failed,
+        "duration_seconds": round(time.perf_counter() - start, 2),
+        "files": results
+    }
+    
+    report_dir = paths.outputs_dir / "validation"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    
+    json_path = report_dir / "validation_report.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    
+    junit_path = report_dir / "validation_report.junit.xml"
+    write_junit_report(summary, junit_path)
+    
+    summary["report_paths"] = {"json": str(json_path), "junit": str(junit_path)}
+    return summary
+
+def write_junit_report(summary: Dict[str, Any], junit_path: Path) -> None:
+    """Reporte JUnit: un testcase por archivo, con el detalle de errores en <failure>"""
+    
+    attrs = {
+        "name": "drawio-validation",
+        "tests": str(summary["total_files"]),
+        "failures": str(len(summary["failed"])),
+        "errors": "0",
+        "time": str(summary["duration_seconds"])
+    }
+    testsuites = ET.Element("testsuites", attrs)
+    testsuite = ET.SubElement(testsuites, "testsuite", {**attrs, "timestamp": summary["timestamp"]})
+    
+    for result in summary["files"]:
+        path = Path(result["file"])
+        testcase = ET.SubElement(testsuite, "testcase", {
+            "classname": ".".join(path.parent.parts) or "drawio",
+            "name": path.name,
+            "time": str(result.get("duration_seconds", 0))
+        })
+        
+        if result["status"] != "passed":
+            failure = ET.SubElement(testcase, "failure", {"message": result["errors"][0] if result["errors"] else "",
+                                                          "type": "ValidationError"})
+            failure.text = "\n".join(result["errors"])
+        elif result.get("cached"):
+            ET.SubElement(testcase, "system-out").text = "Contenido ya validado (caché)"
+    
+    ET.indent(testsuites)
+    ET.ElementTree(testsuites).write(junit_path, encoding="utf-8", xml_declaration=True)
+
+def _relative(file_path: str, directory: Path) -> str:
+    try:
+        return str(Path(file_path).relative_to(directory))
+    except ValueError:
+        return file_path
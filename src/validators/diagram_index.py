@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Diagram Index - Representación indexada común para las reglas de lint
+
+El modelo (DiagramModel), el XML DrawIO (DrawIOAnalysis), el esquema de la
+API (UniversalDiagramSchema) y los datos de plantilla se convierten a un
+DiagramIndex: páginas con nodos por id y conexiones. Cada origen declara
+las facetas que aporta ("geometry", "structure", ...) y el motor solo
+ejecuta las reglas que tienen lo que necesitan.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from validators.xml_validator import AWS_SHAPE_PATTERN
+
+Box = Tuple[float, float, float, float]
+
+@dataclass
+class IndexedNode:
+    """Componente, contenedor o celda"""
+    
+    id: str
+    label: str = ""
+    kind: str = "component"                 # ComponentType del modelo, "container", "vertex", "edge", "cell"
+    shape: Optional[str] = None             # mxgraph.aws4.x o tipo de servicio
+    parent: Optional[str] = None
+    box: Optional[Box] = None
+    colors: Tuple[str, ...] = ()
+    font_size: int = 12
+
+@dataclass
+class IndexedEdge:
+    """Conexión entre nodos"""
+    
+    id: str
+    source: Optional[str]
+    target: Optional[str]
+
+@dataclass
+class IndexedPage:
+    """Una página: nodos por id (el primero gana) y conexiones"""
+    
+    name: Optional[str] = None
+    nodes: Dict[str, IndexedNode] = field(default_factory=dict)
+    edges: List[IndexedEdge] = field(default_factory=list)
+    duplicate_ids: List[str] = field(default_factory=list)
+    cell_count: int = 0
+    has_model: bool = True
+    has_root: bool = True
+    
+    def add(self, node: IndexedNode) -> None:
+        if node.id in self.nodes:
+            self.duplicate_ids.append(node.id)
+        else:
+            self.nodes[node.id] = node
+
+class DiagramIndex:
+    """Diagrama indexado sobre el que corren las reglas"""
+    
+    def __init__(self, source: str, facets: Iterable[str] = ()):
+        self.source = source
+        self.facets: Set[str] = set(facets)
+        self.pages: List[IndexedPage] = []
+        self.error: Optional[str] = None
+        self.root_tag: Optional[str] = None
+        self.canvas: Optional[Tuple[int, int]] = None
+        self.sections: Set[str] = set()
+        self.metadata: Dict[str, Any] = {}
+        self.expected_components: Optional[List[str]] = None
+    
+    def where(self, page: IndexedPage) -> str:
+        """Sufijo de página para los mensajes (solo si hay varias)"""
+        
+        return f" (página '{page.name}')" if len(self.pages) > 1 else ""
+    
+    def nodes(self) -> Iterable[IndexedNode]:
+        for page in self.pages:
+            yield from page.nodes.values()
+    
+    def with_expected_components(self, expected_components: List[str]) -> 'DiagramIndex':
+        """Copia del índice con las reglas de completitud MCP habilitadas"""
+        
+        index = copy.copy(self)
+        index.expected_components = list(expected_components)
+        index.facets = self.facets | {"mcp"}
+        return index
+    
+    # Orígenes
+    
+    @classmethod
+    def from_model(cls, model) -> 'DiagramIndex':
+        """Desde un DiagramModel (geometría, estilos y conexiones)"""
+        
+        index = cls("model", ("ids", "graph", "geometry", "styles", "canvas"))
+        index.canvas = tuple(model.canvas_size)
+        page = IndexedPage(model.name)
+        
+        for component in model.components:
+            pos, style = component.position, component.style
+            page.add(IndexedNode(
+                component.id, component.label or component.name, component.component_type.value,
+                shape=component.shape, parent=component.parent, box=(pos.x, pos.y, pos.width, pos.height),
+                colors=(style.fill_color, style.stroke_color, style.font_color), font_size=style.font_size
+            ))
+        page.edges = [IndexedEdge(connection.id, connection.source, connection.target)
+                      for connection in model.connections]
+        
+        index.pages.append(page)
+        return index
+    
+    @classmethod
+    def from_xml(cls, xml_content: str) -> 'DiagramIndex':
+        """Desde XML DrawIO (parsea una vez; ver DrawIOAnalysis)"""
+        
+        from validators.xml_validator import DrawIOAnalysis
+        return DrawIOAnalysis.from_xml(xml_content).index
+    
+    @classmethod
+    def from_analysis(cls, analysis) -> 'DiagramIndex':
+        """Desde un DrawIOAnalysis ya parseado (todas las páginas)"""
+        
+        index = cls("xml", ("xml",))
+        if analysis.error:
+            index.error = analysis.error
+            return index
+        
+        index.facets.update(("structure", "ids", "graph", "aws"))
+        index.root_tag = analysis.root.tag
+        
+        for diagram_page in analysis.pages:
+            page = IndexedPage(diagram_page.name, cell_count=diagram_page.cell_count,
+                               has_model=diagram_page.model is not None,
+                               has_root=diagram_page.model_root is not None)
+            page.duplicate_ids = list(diagram_page.duplicate_ids)
+            
+            if diagram_page.model_root is not None:
+                for cell in diagram_page.model_root.iter("mxCell"):
+                    node = cls._cell_node(cell)
+                    page.nodes.setdefault(node.id, node)
+                    if node.kind == "edge":
+                        page.edges.append(IndexedEdge(node.id, cell.get("source"), cell.get("target")))
+            
+            index.pages.append(page)
+        
+        return index
+    
+    @staticmethod
+    def _cell_node(cell) -> IndexedNode:
+        style = cell.get("style", "")
+        aws_match = AWS_SHAPE_PATTERN.search(style) if "mxgraph.aws4" in style else None
+        kind = "edge" if cell.get("edge") == "1" else "vertex" if cell.get("vertex") == "1" else "cell"
+        
+        box = None
+        geometry = cell.find("mxGeometry")
+        if geometry is not None and kind == "vertex":
+            try:
+                box = tuple(float(geometry.get(attr, 0)) for attr in ("x", "y", "width", "height"))
+            except ValueError:
+                box = None
+        
+        return IndexedNode(cell.get("id"), cell.get("value", ""), kind,
+                           shape=aws_match.group() if aws_match else None, parent=cell.get("parent"), box=box)
+    
+    @classmethod
+    def from_schema(cls, schema) -> 'DiagramIndex':
+        """Desde un UniversalDiagramSchema (API)"""
+        
+        index = cls("schema", ("ids", "graph", "content", "canvas"))
+        index.canvas = (schema.canvas.width, schema.canvas.height)
+        page = IndexedPage(getattr(schema, "title", None))
+        
+        for component in schema.components:
+            page.add(IndexedNode(component.id, component.label, shape=component.type))
+        
+        def add_container(container, parent=None):
+            page.add(IndexedNode(container.id, container.label, "container", parent=parent))
+            for component in container.components:
+                page.add(IndexedNode(component.id, component.label, shape=component.type, parent=container.id))
+            for child in container.children:
+                add_container(child, container.id)
+        
+        for container in schema.containers:
+            add_container(container)
+        
+        page.edges = [IndexedEdge(f"{connection.from_id}->{connection.to_id}", connection.from_id, connection.to_id)
+                      for connection in schema.connections]
+        
+        index.pages.append(page)
+        return index
+    
+    @classmethod
+    def from_template_data(cls, data: Dict[str, Any]) -> 'DiagramIndex':
+        """Desde los datos de plantilla (metadata + architecture)"""
+        
+        index = cls("template", ("template",))
+        index.sections = set(data)
+        index.metadata = data.get("metadata") or {}
+        
+        architecture = data.get("architecture")
+        if architecture is None:
+            return index
+        
+        index.facets.update(("ids", "graph", "content"))
+        page = IndexedPage(index.metadata.get("title"))
+        
+        for component in architecture.get("components") or []:
+            page.add(IndexedNode(component.get("id"), component.get("label", ""), shape=component.get("type")))
+        for container in architecture.get("containers") or []:
+            page.add(IndexedNode(container.get("id"), container.get("label", ""), "container"))
+        
+        page.edges = [IndexedEdge(connection.get("id") or f"{connection.get('from')}->{connection.get('to')}",
+                                  connection.get("from"), connection.get("to"))
+                      for connection in architecture.get("connections") or []]
+        
+        index.pages.append(page)
+        return index
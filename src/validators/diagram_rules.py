@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Diagram Rules - Reglas de lint integradas sobre el DiagramIndex
+
+Reúne las validaciones que antes estaban repartidas entre DiagramValidator,
+XMLValidator, DrawIOXMLValidator, MCPIntegrator, el endpoint /validate de la
+API y DrawIOTemplates. Los validadores existentes ejecutan subconjuntos de
+estas reglas (ver los grupos *_RULES).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from layouts.spatial_index import SpatialIndex, Box
+from validators.rule_engine import RuleRegistry, RuleEngine, Severity
+from validators.diagram_index import DiagramIndex, IndexedNode, IndexedPage
+
+RULES = RuleRegistry()
+
+# Subconjuntos usados por los validadores existentes
+STRUCTURE_RULES = ("xml", "ids.unique")
+# Lo mismo que revisa StreamingDrawIOValidator: estructura, IDs y referencias
+FILE_RULES = STRUCTURE_RULES + ("cells.parent", "connections.dangling")
+AWS_RULES = ("aws.components",)
+MCP_RULES = STRUCTURE_RULES + AWS_RULES + ("mcp.completeness",)
+MODEL_RULES = ("ids", "connections", "geometry", "styles")
+TEMPLATE_RULES = ("template", "content")
+API_RULES = ("content", "connections.dangling", "canvas")
+
+LABEL_CHAR_WIDTH = 0.6      # Ancho aproximado de un carácter (× fontSize)
+LABEL_LINE_HEIGHT = 1.25    # Alto de línea (× fontSize)
+NON_OVERLAPPING_TYPES = ("container", "connection")  # Tipos que no se revisan por solapamiento
+MIN_CANVAS = (800, 600)
+
+_engines: Dict[Tuple[str, ...], RuleEngine] = {}
+
+def engine_for(select: Tuple[str, ...]) -> RuleEngine:
+    """Motor reutilizable para una selección de reglas (tiempos acumulados por selección)"""
+    
+    if select not in _engines:
+        _engines[select] = RuleEngine(RULES, select=select)
+    return _engines[select]
+
+# Estructura XML
+
+@RULES.rule("xml.parse", requires={"xml"})
+def check_parse(index: DiagramIndex) -> Iterable[str]:
+    """El XML se puede parsear"""
+    
+    if index.error:
+        yield index.error
+
+@RULES.rule("xml.root", requires={"structure"})
+def check_root(index: DiagramIndex) -> Iterable[str]:
+    """El elemento raíz es mxfile"""
+    
+    if index.root_tag != "mxfile":
+        yield "Elemento raíz debe ser 'mxfile'"
+
+@RULES.rule("xml.pages", requires={"structure"})
+def check_pages(index: DiagramIndex) -> Iterable[str]:
+    """Hay al menos un <diagram>"""
+    
+    if not index.pages:
+        yield "Elemento 'diagram' no encontrado"
+
+@RULES.rule("xml.model", requires={"structure"})
+def check_model(index: DiagramIndex) -> Iterable[str]:
+    """Cada página tiene mxGraphModel/root y las celdas base 0 y 1"""
+    
+    for page in index.pages:
+        where = index.where(page)
+        if not page.has_model:
+            yield f"Elemento 'mxGraphModel' no encontrado{where}"
+        elif not page.has_root:
+            yield f"Elemento 'root' no encontrado{where}"
+        elif page.cell_count < 2:
+            yield f"Debe tener al menos 2 celdas base (id='0' y id='1'){where}"
+
+@RULES.rule("cells.parent", requires={"structure"})
+def check_parents(index: DiagramIndex) -> Iterable[str]:
+    """El parent de cada celda existe en su página"""
+    
+    for page in index.pages:
+        for node in page.nodes.values():
+            if node.parent is not None and node.parent not in page.nodes:
+                yield f"Celda {node.id}: parent '{node.parent}' no existe{index.where(page)}"
+
+# Grafo
+
+@RULES.rule("ids.unique", requires={"ids"})
+def check_unique_ids(index: DiagramIndex) -> Iterable[str]:
+    """Los IDs no se repiten dentro de una página"""
+    
+    for page in index.pages:
+        for node_id in page.duplicate_ids:
+            yield f"ID duplicado: {node_id}{index.where(page)}"
+
+@RULES.rule("connections.dangling", requires={"graph"})
+def check_dangling_connections(index: DiagramIndex) -> Iterable[str]:
+    """Source y target de cada conexión existen"""
+    
+    for page in index.pages:
+        where = index.where(page)
+        for edge in page.edges:
+            if edge.source is not None and edge.source not in page.nodes:
+                yield f"Conexión {edge.id}: source {edge.source} no existe{where}"
+            if edge.target is not None and edge.target not in page.nodes:
+                yield f"Conexión {edge.id}: target {edge.target} no existe{where}"
+
+@RULES.rule("connections.self_loop", requires={"graph"})
+def check_self_loops(index: DiagramIndex) -> Iterable[str]:
+    """Una conexión no une un componente consigo mismo"""
+    
+    for page in index.pages:
+        for edge in page.edges:
+            if edge.source is not None and edge.source == edge.target:
+                yield f"Conexión {edge.id}: auto-conexión no permitida{index.where(page)}"
+
+# Plantillas
+
+@RULES.rule("template.required", requires={"template"})
+def check_template_sections(index: DiagramIndex) -> Iterable[str]:
+    """metadata (title, project_name, diagram_type) y architecture son obligatorios"""
+    
+    if "metadata" not in index.sections:
+        yield "metadata es requerido"
+    else:
+        for field_name in ("title", "project_name", "diagram_type"):
+            if field_name not in index.metadata:
+                yield f"metadata.{field_name} es requerido"
+    
+    if "architecture" not in index.sections:
+        yield "architecture es requerido"
+
+@RULES.rule("content.empty", requires={"content"})
+def check_empty(index: DiagramIndex) -> Iterable[str]:
+    """Hay al menos un componente o contenedor"""
+    
+    if not any(page.nodes for page in index.pages):
+        yield "Debe tener al menos un componente o contenedor"
+
+# Geometría y estilos (modelo)
+
+@RULES.rule("geometry.bounds", requires={"geometry", "canvas"})
+def check_bounds(index: DiagramIndex) -> Iterable[str]:
+    """Los componentes quedan dentro del canvas"""
+    
+    canvas_width, canvas_height = index.canvas
+    for node in index.nodes():
+        if node.box is None:
+            continue
+        x, y, width, height = node.box
+        if x < 0 or y < 0:
+            yield f"Componente {node.id}: posición negativa"
+        if x + width > canvas_width:
+            yield f"Componente {node.id}: fuera del canvas (X)"
+        if y + height > canvas_height:
+            yield f"Componente {node.id}: fuera del canvas (Y)"
+
+@RULES.rule("geometry.overlap", requires={"geometry"})
+def check_overlaps(index: DiagramIndex) -> Iterable[str]:
+    """Componentes hermanos no se superponen"""
+    
+    for page in index.pages:
+        for first, second in overlapping_nodes(page):
+            yield f"Componentes {first} y {second}: superpuestos"
+
+@RULES.rule("geometry.labels", Severity.WARNING, requires={"geometry"})
+def check_labels(index: DiagramIndex) -> Iterable[str]:
+    """Los labels no tapan otros componentes o labels
+    
+    Advertencia: el ancho del label es una estimación (LABEL_CHAR_WIDTH).
+    """
+    
+    for page in index.pages:
+        for first, second in label_collisions(page):
+            yield f"Componente {first}: label se superpone con {second}"
+
+@RULES.rule("styles.colors", requires={"styles"})
+def check_colors(index: DiagramIndex) -> Iterable[str]:
+    """Los colores están en formato hex #RRGGBB"""
+    
+    for node in index.nodes():
+        for color in node.colors:
+            if not color.startswith('#') or len(color) != 7:
+                yield f"Componente {node.id}: color inválido {color}"
+
+@RULES.rule("canvas.size", Severity.WARNING, requires={"canvas"})
+def check_canvas(index: DiagramIndex) -> Iterable[str]:
+    """El canvas tiene el tamaño mínimo recomendado"""
+    
+    width, height = index.canvas
+    if width < MIN_CANVAS[0] or height < MIN_CANVAS[1]:
+        yield f"Canvas muy pequeño, recomendado mínimo {MIN_CANVAS[0]}x{MIN_CANVAS[1]}"
+
+# AWS / MCP
+
+@RULES.rule("aws.components", Severity.WARNING, requires={"aws"})
+def check_aws_components(index: DiagramIndex) -> Iterable[str]:
+    """El diagrama tiene al menos un componente AWS"""
+    
+    if not any(node.shape for node in index.nodes()):
+        yield "No se encontraron componentes AWS"
+
+@RULES.rule("mcp.completeness", Severity.WARNING, requires={"aws", "mcp"})
+def check_completeness(index: DiagramIndex) -> Iterable[str]:
+    """Todos los servicios del MCP aparecen en el diagrama"""
+    
+    from validators.xml_validator import DrawIOXMLValidator
+    
+    shapes = [node.shape for node in index.nodes() if node.shape]
+    missing = DrawIOXMLValidator.completeness(shapes, index.expected_components)["missing"]
+    if missing:
+        yield f"Componentes esperados sin dibujar: {', '.join(sorted(missing))}"
+
+# Geometría compartida con DiagramValidator
+
+def overlapping_nodes(page: IndexedPage) -> List[Tuple[str, str]]:
+    """Pares de nodos hermanos superpuestos (los contenedores no cuentan)"""
+    
+    groups: Dict[Optional[str], Dict[str, Box]] = {}
+    for node in page.nodes.values():
+        if node.box is None or node.kind in NON_OVERLAPPING_TYPES:
+            continue
+        groups.setdefault(node.parent, {})[node.id] = node.box
+    
+    pairs = []
+    for boxes in groups.values():
+        if len(boxes) > 1:
+            pairs.extend(SpatialIndex.from_boxes(boxes).overlapping_pairs())
+    return pairs
+
+def label_collisions(page: IndexedPage) -> List[Tuple[str, str]]:
+    """Pares (nodo, otro) donde el label del primero tapa al otro o a su label"""
+    
+    boxes: Dict[Tuple[str, str], Box] = {}
+    for node in page.nodes.values():
+        if node.box is None or node.kind in NON_OVERLAPPING_TYPES:
+            continue
+        boxes[("component", node.id)] = node.box
+        box = label_box(node)
+        if box is not None:
+            boxes[("label", node.id)] = box
+    
+    collisions = set()
+    for first, second in SpatialIndex.from_boxes(boxes).overlapping_pairs():
+        if first[1] == second[1]:
+            continue
+        if first[0] == "label":
+            collisions.add((first[1], second[1]))
+        if second[0] == "label":
+            collisions.add((second[1], first[1]))
+    
+    order = {node_id: i for i, node_id in enumerate(page.nodes)}
+    return sorted(collisions, key=lambda pair: (order[pair[0]], order[pair[1]]))
+
+def label_box(node: IndexedNode) -> Optional[Box]:
+    """Caja estimada del label según el estilo de XMLRenderer
+    
+    Con shape el label va sobre el ícono (verticalLabelPosition=top); sin
+    shape queda dentro de la caja y no puede tapar a otros.
+    """
+    
+    if not node.shape or node.box is None:
+        return None
+    
+    lines = node.label.replace("\\n", "\n").split("\n")
+    width = max(len(line) for line in lines) * node.font_size * LABEL_CHAR_WIDTH
+    height = len(lines) * node.font_size * LABEL_LINE_HEIGHT
+    
+    x, y, box_width, _ = node.box
+    return x + (box_width - width) / 2, y - height, width, height
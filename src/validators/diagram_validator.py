@@ -3,149 +3,70 @@
 Diagram Validator - Validación de modelos y XML
 """
 
-import xml.etree.ElementTree as ET
 from typing import List, Dict, Tuple
 from models.diagram_model import DiagramModel
-import requests
-import json
+from layouts.spatial_index import SpatialIndex
+from validators.diagram_index import DiagramIndex
+from validators.diagram_rules import engine_for, overlapping_nodes, label_collisions, MODEL_RULES, STRUCTURE_RULES
+from validators.rule_engine import LintReport
 
 class DiagramValidator:
-    """Validador de diagramas y XML"""
+    """Validador de diagramas y XML
+    
+    Las reglas están en validators.diagram_rules; aquí se ejecuta el
+    subconjunto de reglas de modelo sobre su DiagramIndex.
+    """
     
     @staticmethod
     def validate_model(model: DiagramModel) -> Tuple[bool, List[str]]:
-        """Valida modelo de diagrama"""
-        
-        errors = []
-        
-        # Validaciones básicas del modelo
-        errors.extend(model.validate())
-        
-        # Validaciones adicionales
-        errors.extend(DiagramValidator._validate_positions(model))
-        errors.extend(DiagramValidator._validate_styles(model))
-        errors.extend(DiagramValidator._validate_connections(model))
+        """Valida modelo de diagrama (solo errores; ver lint_model para advertencias)"""
         
-        return len(errors) == 0, errors
+        report = DiagramValidator.lint_model(model)
+        return report.valid, report.errors
     
     @staticmethod
-    def _validate_positions(model: DiagramModel) -> List[str]:
-        """Valida posiciones de componentes"""
+    def lint_model(model: DiagramModel) -> LintReport:
+        """Reglas de modelo con errores y advertencias por separado"""
         
-        errors = []
-        canvas_width, canvas_height = model.canvas_size
-        
-        for component in model.components:
-            pos = component.position
-            
-            # Verificar que esté dentro del canvas
-            if pos.x < 0 or pos.y < 0:
-                errors.append(f"Componente {component.id}: posición negativa")
-            
-            if pos.x + pos.width > canvas_width:
-                errors.append(f"Componente {component.id}: fuera del canvas (X)")
-            
-            if pos.y + pos.height > canvas_height:
-                errors.append(f"Componente {component.id}: fuera del canvas (Y)")
-        
-        return errors
+        return engine_for(MODEL_RULES).run(DiagramIndex.from_model(model))
     
     @staticmethod
-    def _validate_styles(model: DiagramModel) -> List[str]:
-        """Valida estilos de componentes"""
-        
-        errors = []
+    def spatial_index(model: DiagramModel) -> SpatialIndex:
+        """Índice espacial de los componentes del modelo (clave: id)
         
-        for component in model.components:
-            style = component.style
-            
-            # Validar colores (formato hex)
-            colors = [style.fill_color, style.stroke_color, style.font_color]
-            for color in colors:
-                if not color.startswith('#') or len(color) != 7:
-                    errors.append(f"Componente {component.id}: color inválido {color}")
+        Misma API query(bbox) que usan layouts y router de conexiones.
+        """
         
-        return errors
+        return SpatialIndex.from_boxes({
+            component.id: (component.position.x, component.position.y,
+                           component.position.width, component.position.height)
+            for component in model.components
+        })
     
     @staticmethod
-    def _validate_connections(model: DiagramModel) -> List[str]:
-        """Valida conexiones entre componentes"""
+    def find_overlaps(model: DiagramModel) -> List[Tuple[str, str]]:
+        """Pares de componentes hermanos superpuestos
         
-        errors = []
+        Los contenedores no cuentan: envolver componentes es su función.
+        """
         
-        for connection in model.connections:
-            # Verificar que source y target existan
-            if not model.get_component_by_id(connection.source):
-                errors.append(f"Conexión {connection.id}: source {connection.source} no existe")
-            
-            if not model.get_component_by_id(connection.target):
-                errors.append(f"Conexión {connection.id}: target {connection.target} no existe")
-            
-            # Verificar que no sea auto-conexión
-            if connection.source == connection.target:
-                errors.append(f"Conexión {connection.id}: auto-conexión no permitida")
+        return overlapping_nodes(DiagramIndex.from_model(model).pages[0])
+    
+    @staticmethod
+    def find_label_collisions(model: DiagramModel) -> List[Tuple[str, str]]:
+        """Pares (componente, otro) donde el label del primero tapa al otro o a su label"""
         
-        return errors
+        return label_collisions(DiagramIndex.from_model(model).pages[0])
 
 class XMLValidator:
     """Validador de XML DrawIO"""
     
     @staticmethod
     def validate_xml(xml_content: str) -> Tuple[bool, List[str]]:
-        """Valida XML DrawIO"""
-        
-        errors = []
-        
-        try:
-            # Parsear XML
-            root = ET.fromstring(xml_content)
-            
-            # Validar estructura básica
-            if root.tag != 'mxfile':
-                errors.append("Root element debe ser 'mxfile'")
-            
-            # Validar diagramas
-            diagrams = root.findall('diagram')
-            if not diagrams:
-                errors.append("No se encontraron diagramas")
-            
-            for diagram in diagrams:
-                errors.extend(XMLValidator._validate_diagram(diagram))
-        
-        except ET.ParseError as e:
-            errors.append(f"Error de parsing XML: {e}")
-        
-        return len(errors) == 0, errors
-    
-    @staticmethod
-    def _validate_diagram(diagram_element) -> List[str]:
-        """Valida elemento diagram"""
-        
-        errors = []
-        
-        # Verificar que tenga mxGraphModel
-        model = diagram_element.find('mxGraphModel')
-        if model is None:
-            errors.append("Diagrama sin mxGraphModel")
-            return errors
-        
-        # Verificar root
-        root = model.find('root')
-        if root is None:
-            errors.append("mxGraphModel sin root")
-            return errors
-        
-        # Verificar celdas básicas (0 y 1)
-        cells = root.findall('mxCell')
-        if len(cells) < 2:
-            errors.append("Faltan celdas básicas (0 y 1)")
-        
-        # Validar IDs únicos
-        ids = [cell.get('id') for cell in cells if cell.get('id')]
-        if len(ids) != len(set(ids)):
-            errors.append("IDs duplicados en celdas")
+        """Valida XML DrawIO (mismas reglas de estructura que DrawIOXMLValidator)"""
         
-        return errors
+        report = engine_for(STRUCTURE_RULES).run(DiagramIndex.from_xml(xml_content))
+        return report.valid, report.errors
 
 class DiagramsNetAPI:
     """Integración con API de diagrams.net"""
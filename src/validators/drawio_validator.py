@@ -4,16 +4,41 @@ DrawIO Validator - Validación automática y preview
 """
 
 import subprocess
+import shutil
 import json
-import requests
 from pathlib import Path
 from typing import Tuple, Dict, Optional
 import base64
 import tempfile
 
+from core.logger import get_logger
+from core.mxgraph_writer import parse_drawio
+from core.drawio_rasterizer import render_preview, has_pillow
+
+logger = get_logger(__name__)
+
 class DrawIOValidator:
     """Validador automático de archivos DrawIO"""
     
+    # Ruta de drawio-export resuelta una vez por proceso
+    _export_tool: Optional[str] = None
+    _export_resolved = False
+    
+    @classmethod
+    def drawio_export_path(cls) -> Optional[str]:
+        """Ruta de drawio-export (None si no está instalado)"""
+        
+        if not cls._export_resolved:
+            cls.use_drawio_export(shutil.which('drawio-export'))
+        return cls._export_tool
+    
+    @classmethod
+    def use_drawio_export(cls, tool_path: Optional[str]) -> None:
+        """Fija la ruta ya resuelta (p.ej. en workers de validación masiva)"""
+        
+        cls._export_tool = tool_path
+        cls._export_resolved = True
+    
     @staticmethod
     def validate_with_api(xml_content: str) -> Tuple[bool, str]:
         """Valida XML usando API de diagrams.net"""
@@ -43,17 +68,13 @@ class DrawIOValidator:
         
         try:
             # Verificar si drawio-export está disponible
-            result = subprocess.run(
-                ['which', 'drawio-export'], 
-                capture_output=True, 
-                text=True
-            )
+            tool = DrawIOValidator.drawio_export_path()
             
-            if result.returncode != 0:
+            if tool is None:
                 return True, "drawio-export no disponible, usando validación local"
             
             # Validar archivo con drawio-export
-            cmd = ['drawio-export', '--check', file_path]
+            cmd = [tool, '--check', file_path]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
             
             if result.returncode == 0:
@@ -71,15 +92,37 @@ class DrawIOPreview:
     
     @staticmethod
     def generate_png_preview(drawio_path: str, output_dir: str) -> Optional[str]:
+        """Genera preview PNG en el proceso (Pillow) o, sin Pillow, con drawio-export
+        
+        El preview del rasterizador se nombra con el hash del contenido y se
+        reutiliza mientras el .drawio no cambie.
+        """
+        
+        if has_pillow():
+            try:
+                return render_preview(drawio_path, output_dir, fmt="png")
+            except Exception as e:
+                logger.warning("⚠️ Error en preview PNG: %s", e)
+                return None
+        
+        return DrawIOPreview.export_png_preview(drawio_path, output_dir)
+    
+    @staticmethod
+    def export_png_preview(drawio_path: str, output_dir: str) -> Optional[str]:
         """Genera preview PNG usando drawio-export"""
         
         try:
+            tool = DrawIOValidator.drawio_export_path()
+            if tool is None:
+                logger.warning("⚠️ drawio-export no disponible, preview omitido")
+                return None
+            
             drawio_file = Path(drawio_path)
             output_path = Path(output_dir) / f"{drawio_file.stem}_preview.png"
             
             # Comando drawio-export para generar PNG
             cmd = [
-                'drawio-export',
+                tool,
                 '--format', 'png',
                 '--width', '1200',
                 '--height', '800',
@@ -90,17 +133,17 @@ class DrawIOPreview:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0 and output_path.exists():
-                print(f"✅ Preview PNG generado: {output_path}")
+                logger.info("✅ Preview PNG generado: %s", output_path)
                 return str(output_path)
             else:
-                print(f"⚠️ Error generando preview: {result.stderr}")
+                logger.warning("⚠️ Error generando preview: %s", result.stderr)
                 return None
                 
         except subprocess.TimeoutExpired:
-            print("⚠️ Timeout generando preview PNG")
+            logger.warning("⚠️ Timeout generando preview PNG")
             return None
         except Exception as e:
-            print(f"⚠️ Error en preview PNG: {e}")
+            logger.warning("⚠️ Error en preview PNG: %s", e)
             return None
     
     @staticmethod
@@ -125,24 +168,28 @@ class DrawIOPreview:
                         timeout=10
                     )
                     if result.returncode == 0:
-                        print(f"✅ Archivo abierto en DrawIO Desktop")
+                        logger.info("✅ Archivo abierto en DrawIO Desktop")
                         return True
                 except (subprocess.TimeoutExpired, FileNotFoundError):
                     continue
             
-            print("⚠️ DrawIO Desktop no disponible")
+            logger.warning("⚠️ DrawIO Desktop no disponible")
             return False
             
         except Exception as e:
-            print(f"⚠️ Error abriendo DrawIO Desktop: {e}")
+            logger.warning("⚠️ Error abriendo DrawIO Desktop: %s", e)
             return False
 
 class DrawIOTester:
     """Tests automáticos de renderizado DrawIO"""
     
     @staticmethod
-    def test_renderability(file_path: str) -> Dict[str, bool]:
-        """Tests automáticos de renderizado"""
+    def test_renderability(file_path: str, preview: bool = True) -> Dict[str, bool]:
+        """Tests automáticos de renderizado
+        
+        preview=False omite el PNG de prueba (no es un test crítico y es lo
+        más costoso); preview_generated queda en False.
+        """
         
         results = {
             "file_exists": False,
@@ -164,30 +211,39 @@ class DrawIOTester:
             content = file_path_obj.read_text(encoding='utf-8')
             results["valid_xml"] = content.startswith('<?xml') and 'mxfile' in content
             
-            # Test 3: Estructura DrawIO
-            results["drawio_structure"] = all(
-                tag in content for tag in ['mxGraphModel', 'root', 'mxCell']
-            )
+            # Test 3: Estructura DrawIO (los diagramas comprimidos se expanden)
+            if 'mxGraphModel' not in content and '<diagram' in content:
+                root = parse_drawio(content)
+                results["drawio_structure"] = all(
+                    root.find(path) is not None for path in ['.//mxGraphModel', './/root', './/mxCell']
+                )
+            else:
+                results["drawio_structure"] = all(
+                    tag in content for tag in ['mxGraphModel', 'root', 'mxCell']
+                )
             
             # Test 4: Puede exportar
             is_valid, _ = DrawIOValidator.validate_with_drawio_export(file_path)
             results["can_export"] = is_valid
             
             # Test 5: Preview generado
+            if not preview:
+                return results
+            
             with tempfile.TemporaryDirectory() as temp_dir:
                 preview_path = DrawIOPreview.generate_png_preview(file_path, temp_dir)
                 results["preview_generated"] = preview_path is not None
             
         except Exception as e:
-            print(f"⚠️ Error en tests: {e}")
+            logger.warning("⚠️ Error en tests: %s", e)
         
         return results
     
     @staticmethod
-    def run_full_test_suite(file_path: str) -> Tuple[bool, Dict[str, bool]]:
+    def run_full_test_suite(file_path: str, preview: bool = True) -> Tuple[bool, Dict[str, bool]]:
         """Ejecuta suite completa de tests"""
         
-        results = DrawIOTester.test_renderability(file_path)
+        results = DrawIOTester.test_renderability(file_path, preview=preview)
         
         # Determinar si pasa todos los tests críticos
         critical_tests = ["file_exists", "valid_xml", "drawio_structure"]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Rule Engine - Registro de reglas de lint y ejecución con tiempos por regla
+
+Una regla es una función que recibe el DiagramIndex y genera mensajes; se
+registra con un id jerárquico ("connections.dangling"), una severidad y las
+facetas del índice que necesita. Las reglas cuyas facetas no están en el
+índice (p.ej. geometría en un XML) se omiten. Se pueden seleccionar o
+desactivar reglas por patrón ("geometry.*") y cada ejecución mide el
+tiempo de cada regla, así las lentas se encuentran y se desactivan en
+caminos sensibles a la latencia (API).
+"""
+
+import time
+import threading
+from enum import Enum
+from fnmatch import fnmatch
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+class Severity(Enum):
+    """Severidad de una regla (ERROR invalida el diagrama)"""
+    
+    INFO = "info"
+    WARNING = "warning"
+    ERROR = "error"
+    
+    @property
+    def rank(self) -> int:
+        return ("info", "warning", "error").index(self.value)
+
+@dataclass(frozen=True)
+class Rule:
+    """Regla registrada"""
+    
+    id: str
+    check: Callable[[Any], Iterable[str]]
+    severity: Severity = Severity.ERROR
+    requires: FrozenSet[str] = frozenset()
+    description: str = ""
+
+@dataclass
+class Issue:
+    """Hallazgo de una regla"""
+    
+    rule: str
+    severity: Severity
+    message: str
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {"rule": self.rule, "severity": self.severity.value, "message": self.message}
+
+@dataclass
+class LintReport:
+    """Resultado de ejecutar las reglas sobre un índice"""
+    
+    issues: List[Issue] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)     # id -> segundos
+    skipped: List[str] = field(default_factory=list)            # sin las facetas requeridas
+    
+    @property
+    def valid(self) -> bool:
+        return not any(issue.severity.value == Severity.ERROR.value for issue in self.issues)
+    
+    @property
+    def errors(self) -> List[str]:
+        return self.messages(Severity.ERROR)
+    
+    @property
+    def warnings(self) -> List[str]:
+        return self.messages(Severity.WARNING)
+    
+    def messages(self, severity: Optional[Severity] = None, rules: Optional[Iterable[str]] = None) -> List[str]:
+        """Mensajes filtrados por severidad y/o patrones de regla"""
+        
+        patterns = list(rules) if rules is not None else None
+        return [issue.message for issue in self.issues
+                if (severity is None or issue.severity.value == severity.value)
+                and (patterns is None or _matches(issue.rule, patterns))]
+    
+    def slowest(self, limit: int = 5) -> List[tuple]:
+        """(regla, segundos) de las reglas más lentas"""
+        
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "valid": self.valid,
+            "issues": [issue.to_dict() for issue in self.issues],
+            "timings_ms": {rule_id: round(seconds * 1000, 3) for rule_id, seconds in self.timings.items()},
+            "skipped": list(self.skipped)
+        }
+
+class RuleRegistry:
+    """Reglas por id, en orden de registro"""
+    
+    def __init__(self):
+        self._rules: Dict[str, Rule] = {}
+    
+    def register(self, rule: Rule) -> Rule:
+        if rule.id in self._rules:
+            raise ValueError(f"Regla ya registrada: {rule.id}")
+        self._rules[rule.id] = rule
+        return rule
+    
+    def rule(self, rule_id: str, severity: Severity = Severity.ERROR, requires: Iterable[str] = (),
+             description: str = "") -> Callable:
+        """Decorador: registra la función como regla"""
+        
+        def decorator(check: Callable[[Any], Iterable[str]]) -> Callable[[Any], Iterable[str]]:
+            self.register(Rule(rule_id, check, severity, frozenset(requires), description or (check.__doc__ or "").strip()))
+            return check
+        
+        return decorator
+    
+    def get(self, rule_id: str) -> Rule:
+        return self._rules[rule_id]
+    
+    def select(self, select: Optional[Iterable[str]] = None, ignore: Optional[Iterable[str]] = None) -> List[Rule]:
+        """Reglas que coinciden con select (todas si es None) y no con ignore"""
+        
+        select = list(select) if select is not None else None
+        ignore = list(ignore or [])
+        return [rule for rule in self._rules.values()
+                if (select is None or _matches(rule.id, select)) and not _matches(rule.id, ignore)]
+    
+    def __iter__(self):
+        return iter(self._rules.values())
+    
+    def __len__(self) -> int:
+        return len(self._rules)
+
+class RuleEngine:
+    """Ejecuta una selección de reglas y acumula sus tiempos entre ejecuciones"""
+    
+    def __init__(self, registry: Optional[RuleRegistry] = None, select: Optional[Iterable[str]] = None,
+                 ignore: Optional[Iterable[str]] = None, min_severity: Severity = Severity.INFO,
+                 tracer=None):
+        if registry is None:
+            from validators.diagram_rules import RULES
+            registry = RULES
+        self.registry = registry
+        self.rules = registry.select(select, ignore)
+        self.min_severity = min_severity
+        self.tracer = tracer
+        self._stats: Dict[str, List[float]] = {}     # id -> [ejecuciones, segundos]
+        self._lock = threading.Lock()
+    
+    def run(self, index) -> LintReport:
+        """Ejecuta las reglas aplicables al índice"""
+        
+        report = LintReport()
+        
+        for rule in self.rules:
+            if rule.severity.rank < self.min_severity.rank:
+                continue
+            if not rule.requires <= index.facets:
+                report.skipped.append(rule.id)
+                continue
+            
+            start = time.perf_counter()
+            if self.tracer is not None:
+                with self.tracer.span(f"rule:{rule.id}", category="rule"):
+                    messages = list(rule.check(index))
+            else:
+                messages = list(rule.check(index))
+            elapsed = time.perf_counter() - start
+            
+            report.timings[rule.id] = elapsed
+            report.issues.extend(Issue(rule.id, rule.severity, message) for message in messages)
+            
+            with self._lock:
+                stats = self._stats.setdefault(rule.id, [0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+        
+        return report
+    
+    def timing_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Tiempos acumulados por regla (de la más lenta a la más rápida)"""
+        
+        with self._lock:
+            stats = {rule_id: list(values) for rule_id, values in self._stats.items()}
+        
+        summary = {
+            rule_id: {"runs": runs, "total_ms": round(seconds * 1000, 3), "avg_ms": round(seconds * 1000 / runs, 3)}
+            for rule_id, (runs, seconds) in stats.items()
+        }
+        return dict(sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+def _matches(rule_id: str, patterns: List[str]) -> bool:
+    """Coincide por id exacto, prefijo de grupo ("geometry") o patrón ("geometry.*")"""
+    
+    return any(rule_id == pattern or rule_id.startswith(pattern + ".") or fnmatch(rule_id, pattern)
+               for pattern in patterns)
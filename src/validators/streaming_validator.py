@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Streaming Validator - Validación de .drawio muy grandes en memoria acotada
+
+El archivo se lee por bloques con XMLPullParser y cada celda se descarta
+del árbol apenas se procesa, así que nunca se arma el documento completo.
+Los diagramas comprimidos se descomprimen también por bloques. Por página
+solo se guardan los IDs vistos y las referencias aún no resueltas.
+
+Chequeos: estructura mxfile/diagram/mxGraphModel/root, IDs duplicados,
+source/target de conexiones y parents inexistentes, y estadísticas de
+shapes AWS.
+"""
+
+import binascii
+import zlib
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.mxgraph_writer import iter_decompressed
+from validators.xml_validator import AWS_SHAPE_PATTERN
+
+class _PageState:
+    """IDs y referencias pendientes de la página en curso"""
+    
+    def __init__(self, name: Optional[str]):
+        self.name = name
+        self.has_model = False
+        self.has_root = False
+        self.cell_count = 0
+        self.ids: Set[str] = set()
+        self.pending: Dict[str, List[Tuple[str, str]]] = {}   # id referenciado -> [(celda, atributo)]
+
+class StreamingDrawIOValidator:
+    """Validador DrawIO basado en XMLPullParser (sin árbol en memoria)"""
+    
+    CHUNK_SIZE = 1 << 16        # Múltiplo de 4 para decodificar base64 por bloques
+    MAX_ERRORS = 100            # Errores detallados; el resto solo se cuenta
+    WRAPPER_TAGS = ("UserObject", "object")
+    
+    def __init__(self):
+        self.errors: List[str] = []
+        self.error_count = 0
+        self.page_count = 0
+        self.cell_count = 0
+        self.aws_components = 0
+        self.generic_components = 0
+        self.connections = 0
+        self.shape_counts: Counter = Counter()
+        self._page: Optional[_PageState] = None
+        self._has_mxfile = False
+    
+    def validate_file(self, file_path: str) -> Tuple[bool, List[str], Dict[str, Any]]:
+        """Valida el archivo; retorna (válido, errores, estadísticas)"""
+        
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack: List[ET.Element] = []
+        
+        try:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                    parser.feed(chunk)
+                    self._consume(parser, stack)
+            parser.close()
+            self._consume(parser, stack)
+        except ET.ParseError as e:
+            self._error(f"XML malformado: {str(e)}")
+            return False, self._error_list(), self.stats()
+        
+        if not self._has_mxfile:
+            self._error("Elemento raíz debe ser 'mxfile'")
+        if not self.page_count:
+            self._error("Elemento 'diagram' no encontrado")
+        
+        return self.error_count == 0, self._error_list(), self.stats()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas equivalentes al análisis AWS (sin detalle por componente)"""
+        
+        return {
+            "aws_components": self.aws_components,
+            "generic_components": self.generic_components,
+            "connections": self.connections,
+            "total_elements": self.aws_components + self.generic_components,
+            "shape_counts": dict(self.shape_counts),
+            "pages": self.page_count,
+            "cells": self.cell_count
+        }
+    
+    # Eventos
+    
+    def _consume(self, parser: ET.XMLPullParser, stack: List[ET.Element]) -> None:
+        for event, element in parser.read_events():
+            if event == "start":
+                self._start(element, stack)
+                stack.append(element)
+            else:
+                stack.pop()
+                self._end(element, stack)
+    
+    def _start(self, element: ET.Element, stack: List[ET.Element]) -> None:
+        tag = element.tag
+        parent_tag = stack[-1].tag if stack else None
+        
+        if tag == "mxfile" and parent_tag is None:
+            self._has_mxfile = True
+        elif tag == "diagram":
+            self._begin_page(element.get("name"))
+        elif tag == "mxGraphModel" and self._page is not None:
+            self._page.has_model = True
+        elif tag == "root" and parent_tag == "mxGraphModel" and self._page is not None:
+            self._page.has_root = True
+    
+    def _end(self, element: ET.Element, stack: List[ET.Element]) -> None:
+        tag = element.tag
+        parent = stack[-1] if stack else None
+        
+        if tag == "mxCell" and self._page is not None and self._page.has_root:
+            wrapper = parent if parent is not None and parent.tag in self.WRAPPER_TAGS else None
+            self._cell(element, wrapper)
+        elif tag == "diagram" and self._page is not None:
+            payload = (element.text or "").strip()
+            if not self._page.has_model and payload:
+                self._stream_compressed(payload)
+            self._end_page()
+        
+        # Lo ya procesado se descarta del árbol
+        if parent is not None and parent.tag in ("root", "mxfile"):
+            parent.clear()
+    
+    # Celdas y páginas
+    
+    def _begin_page(self, name: Optional[str]) -> None:
+        self.page_count += 1
+        self._page = _PageState(name)
+    
+    def _cell(self, cell: ET.Element, wrapper: Optional[ET.Element]) -> None:
+        page = self._page
+        cell_id = cell.get("id") or (wrapper.get("id") if wrapper is not None else None)
+        page.cell_count += 1
+        self.cell_count += 1
+        
+        if cell_id is not None:
+            if cell_id in page.ids:
+                self._error(f"ID duplicado: {cell_id}{self._where()}")
+            page.ids.add(cell_id)
+            page.pending.pop(cell_id, None)
+        
+        for attribute in ("parent", "source", "target"):
+            reference = cell.get(attribute)
+            if reference is not None and reference not in page.ids:
+                page.pending.setdefault(reference, []).append((cell_id, attribute))
+        
+        style = cell.get("style", "")
+        if "mxgraph.aws4" in style:
+            aws_match = AWS_SHAPE_PATTERN.search(style)
+            if aws_match:
+                self.aws_components += 1
+                self.shape_counts[aws_match.group()] += 1
+        elif cell.get("vertex") == "1":
+            self.generic_components += 1
+        elif cell.get("edge") == "1":
+            self.connections += 1
+    
+    def _end_page(self) -> None:
+        page, where = self._page, self._where()
+        
+        if not page.has_model:
+            self._error(f"Elemento 'mxGraphModel' no encontrado{where}")
+        elif not page.has_root:
+            self._error(f"Elemento 'root' no encontrado{where}")
+        elif page.cell_count < 2:
+            self._error(f"Debe tener al menos 2 celdas base (id='0' y id='1'){where}")
+        
+        # Referencias que nunca aparecieron en la página
+        for reference, users in page.pending.items():
+            for cell_id, attribute in users:
+                self._error(f"Celda {cell_id}: {attribute} '{reference}' no existe{where}")
+        
+        self._page = None
+    
+    def _stream_compressed(self, payload: str) -> None:
+        """Descomprime (base64 -> inflate -> URL-decode) y parsea la página por bloques"""
+        
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack: List[ET.Element] = []
+        
+        try:
+            for chunk in iter_decompressed(payload, self.CHUNK_SIZE):
+                parser.feed(chunk)
+                self._consume(parser, stack)
+            parser.close()
+            self._consume(parser, stack)
+        except (binascii.Error, zlib.error, UnicodeDecodeError) as e:
+            self._error(f"Diagrama comprimido inválido{self._where()}: {e}")
+        except ET.ParseError as e:
+            self._error(f"XML malformado{self._where()}: {str(e)}")
+    
+    # Errores
+    
+    def _where(self) -> str:
+        # Sin leer todo el archivo no se sabe si es multi-página: se nombra siempre la página
+        return f" (página '{self._page.name}')" if self._page is not None and self._page.name else ""
+    
+    def _error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(message)
+    
+    def _error_list(self) -> List[str]:
+        hidden = self.error_count - len(self.errors)
+        return self.errors + ([f"... y {hidden} errores más"] if hidden else [])
@@ -1,169 +1,227 @@
 #!/usr/bin/env python3
 """
 XML Validator - Validación de XML DrawIO y integración con MCP
+
+El XML se parsea una sola vez (DrawIOXMLValidator.analyze) y todas las
+reglas trabajan sobre el DrawIOAnalysis resultante. Los métodos validate_*
+aceptan el XML o un análisis ya construido y ejecutan su subconjunto de
+reglas de validators.diagram_rules sobre el índice del análisis.
 """
 
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import json
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Tuple, Optional, Union
 import re
 
+from core.mxgraph_writer import parse_drawio
+
+AWS_SHAPE_PATTERN = re.compile(r'mxgraph\.aws4\.[a-zA-Z_]+')
+
+@dataclass
+class DiagramPage:
+    """Una página (<diagram>) con sus celdas indexadas por id"""
+    
+    name: Optional[str]
+    model: Optional[ET.Element] = None          # <mxGraphModel>
+    model_root: Optional[ET.Element] = None     # <root> del modelo
+    cells: Dict[str, ET.Element] = field(default_factory=dict)
+    cell_count: int = 0
+    duplicate_ids: List[str] = field(default_factory=list)
+    edges: List[ET.Element] = field(default_factory=list)
+    parents: Dict[str, str] = field(default_factory=dict)          # id -> parent
+    children: Dict[str, List[str]] = field(default_factory=dict)   # parent -> ids
+
+class DrawIOAnalysis:
+    """Resultado de parsear un .drawio una sola vez
+    
+    Guarda el árbol, las páginas (celdas por id, conexiones, árbol de
+    parents) y la clasificación de celdas en componentes AWS, genéricos y
+    conexiones de todo el documento.
+    """
+    
+    def __init__(self, root: Optional[ET.Element] = None, error: Optional[str] = None):
+        self.root = root
+        self.error = error
+        self.pages: List[DiagramPage] = []
+        self.aws_components: List[Dict[str, Any]] = []
+        self.generic_components: List[Dict[str, Any]] = []
+        self.connections: List[Dict[str, Any]] = []
+        self._diagram_index = None
+        
+        if root is not None:
+            self._index(root)
+    
+    @classmethod
+    def from_xml(cls, xml_content: str) -> 'DrawIOAnalysis':
+        """Parsea el XML (expandiendo diagramas comprimidos); no lanza excepciones"""
+        
+        try:
+            return cls(parse_drawio(xml_content))
+        except ET.ParseError as e:
+            return cls(error=f"XML malformado: {str(e)}")
+        except Exception as e:
+            return cls(error=f"Error inesperado: {str(e)}")
+    
+    @property
+    def aws_shapes(self) -> List[str]:
+        return [component["shape"] for component in self.aws_components]
+    
+    @property
+    def index(self):
+        """DiagramIndex para el motor de reglas (se construye una vez)"""
+        
+        if self._diagram_index is None:
+            from validators.diagram_index import DiagramIndex
+            self._diagram_index = DiagramIndex.from_analysis(self)
+        return self._diagram_index
+    
+    def _index(self, root: ET.Element) -> None:
+        for diagram in root.findall("diagram"):
+            page = DiagramPage(diagram.get("name"), model=diagram.find("mxGraphModel"))
+            if page.model is not None:
+                page.model_root = page.model.find("root")
+            if page.model_root is not None:
+                self._index_page(page)
+            self.pages.append(page)
+    
+    def _index_page(self, page: DiagramPage) -> None:
+        for cell in page.model_root.findall("mxCell"):
+            cell_id = cell.get("id")
+            page.cell_count += 1
+            if cell_id in page.cells:
+                page.duplicate_ids.append(cell_id)
+            page.cells[cell_id] = cell
+        
+        for cell in page.model_root.iter("mxCell"):
+            cell_id, parent = cell.get("id"), cell.get("parent")
+            if parent is not None:
+                page.parents[cell_id] = parent
+                page.children.setdefault(parent, []).append(cell_id)
+            if cell.get("edge") == "1":
+                page.edges.append(cell)
+            self._classify(cell)
+    
+    def _classify(self, cell: ET.Element) -> None:
+        style = cell.get("style", "")
+        
+        # Componente AWS
+        if "mxgraph.aws4" in style:
+            aws_match = AWS_SHAPE_PATTERN.search(style)
+            if aws_match:
+                self.aws_components.append({
+                    "id": cell.get("id"),
+                    "shape": aws_match.group(),
+                    "label": cell.get("value", "")
+                })
+        
+        # Componente genérico
+        elif cell.get("vertex") == "1":
+            self.generic_components.append({
+                "id": cell.get("id"),
+                "label": cell.get("value", ""),
+                "style": style
+            })
+        
+        # Conexión
+        elif cell.get("edge") == "1":
+            self.connections.append({
+                "id": cell.get("id"),
+                "source": cell.get("source"),
+                "target": cell.get("target"),
+                "label": cell.get("value", "")
+            })
+
 class DrawIOXMLValidator:
     """Validador de XML DrawIO"""
     
     def __init__(self):
         self.required_elements = ["mxfile", "diagram", "mxGraphModel", "root"]
-        self.aws_shape_pattern = re.compile(r'mxgraph\.aws4\.[a-zA-Z_]+')
+        self.aws_shape_pattern = AWS_SHAPE_PATTERN
+    
+    def analyze(self, xml_content: str) -> DrawIOAnalysis:
+        """Parsea el XML una vez; el resultado se pasa a los validate_*"""
         
-    def validate_xml_structure(self, xml_content: str) -> Tuple[bool, List[str]]:
-        """Valida estructura básica del XML DrawIO"""
+        return DrawIOAnalysis.from_xml(xml_content)
+    
+    def as_analysis(self, source: Union[str, DrawIOAnalysis]) -> DrawIOAnalysis:
+        """El análisis recibido, o el del XML recibido"""
         
-        errors = []
+        return source if isinstance(source, DrawIOAnalysis) else self.analyze(source)
+    
+    def validate_xml_structure(self, source: Union[str, DrawIOAnalysis]) -> Tuple[bool, List[str]]:
+        """Valida estructura básica del XML DrawIO (todas las páginas)"""
         
-        try:
-            # Parsear XML
-            root = ET.fromstring(xml_content)
-            
-            # Verificar elemento raíz
-            if root.tag != "mxfile":
-                errors.append("Elemento raíz debe ser 'mxfile'")
-            
-            # Verificar elementos requeridos
-            diagram = root.find("diagram")
-            if diagram is None:
-                errors.append("Elemento 'diagram' no encontrado")
-                return False, errors
-            
-            model = diagram.find("mxGraphModel")
-            if model is None:
-                errors.append("Elemento 'mxGraphModel' no encontrado")
-                return False, errors
-            
-            model_root = model.find("root")
-            if model_root is None:
-                errors.append("Elemento 'root' no encontrado")
-                return False, errors
-            
-            # Verificar celdas base
-            cells = model_root.findall("mxCell")
-            if len(cells) < 2:
-                errors.append("Debe tener al menos 2 celdas base (id='0' y id='1')")
-            
-            # Verificar IDs únicos
-            ids = set()
-            for cell in cells:
-                cell_id = cell.get("id")
-                if cell_id in ids:
-                    errors.append(f"ID duplicado: {cell_id}")
-                ids.add(cell_id)
-            
-        except ET.ParseError as e:
-            errors.append(f"XML malformado: {str(e)}")
-            return False, errors
-        except Exception as e:
-            errors.append(f"Error inesperado: {str(e)}")
-            return False, errors
+        from validators.diagram_rules import engine_for, STRUCTURE_RULES
         
-        return len(errors) == 0, errors
+        report = engine_for(STRUCTURE_RULES).run(self.as_analysis(source).index)
+        return report.valid, report.errors
     
-    def validate_aws_components(self, xml_content: str) -> Tuple[bool, Dict[str, Any]]:
+    def validate_aws_components(self, source: Union[str, DrawIOAnalysis]) -> Tuple[bool, Dict[str, Any]]:
         """Valida componentes AWS en el XML"""
         
-        try:
-            root = ET.fromstring(xml_content)
-            
-            # Buscar componentes AWS
-            aws_components = []
-            generic_components = []
-            connections = []
-            
-            for cell in root.findall(".//mxCell"):
-                style = cell.get("style", "")
-                
-                # Componente AWS
-                if "mxgraph.aws4" in style:
-                    aws_match = self.aws_shape_pattern.search(style)
-                    if aws_match:
-                        aws_components.append({
-                            "id": cell.get("id"),
-                            "shape": aws_match.group(),
-                            "label": cell.get("value", "")
-                        })
-                
-                # Componente genérico
-                elif cell.get("vertex") == "1":
-                    generic_components.append({
-                        "id": cell.get("id"),
-                        "label": cell.get("value", ""),
-                        "style": style
-                    })
-                
-                # Conexión
-                elif cell.get("edge") == "1":
-                    connections.append({
-                        "id": cell.get("id"),
-                        "source": cell.get("source"),
-                        "target": cell.get("target"),
-                        "label": cell.get("value", "")
-                    })
-            
-            analysis = {
-                "aws_components": len(aws_components),
-                "generic_components": len(generic_components),
-                "connections": len(connections),
-                "total_elements": len(aws_components) + len(generic_components),
-                "aws_shapes": [comp["shape"] for comp in aws_components],
-                "component_details": aws_components,
-                "connection_details": connections
-            }
-            
-            # Validaciones
-            is_valid = True
-            if len(aws_components) == 0:
-                is_valid = False
-                analysis["warning"] = "No se encontraron componentes AWS"
-            
-            return is_valid, analysis
-            
-        except Exception as e:
-            return False, {"error": str(e)}
+        from validators.diagram_rules import engine_for, AWS_RULES
+        
+        analysis = self.as_analysis(source)
+        if analysis.error:
+            return False, {"error": analysis.error}
+        
+        result = self.aws_summary(analysis)
+        warnings = engine_for(AWS_RULES).run(analysis.index).warnings
+        if warnings:
+            result["warning"] = warnings[0]
+        
+        return not warnings, result
+    
+    @staticmethod
+    def aws_summary(analysis: DrawIOAnalysis) -> Dict[str, Any]:
+        """Conteos y detalle de componentes AWS, genéricos y conexiones"""
+        
+        return {
+            "aws_components": len(analysis.aws_components),
+            "generic_components": len(analysis.generic_components),
+            "connections": len(analysis.connections),
+            "total_elements": len(analysis.aws_components) + len(analysis.generic_components),
+            "aws_shapes": analysis.aws_shapes,
+            "component_details": list(analysis.aws_components),
+            "connection_details": list(analysis.connections)
+        }
     
-    def validate_diagram_completeness(self, xml_content: str, expected_components: List[str]) -> Tuple[bool, Dict[str, Any]]:
+    def validate_diagram_completeness(self, source: Union[str, DrawIOAnalysis],
+                                      expected_components: List[str]) -> Tuple[bool, Dict[str, Any]]:
         """Valida completitud del diagrama vs componentes esperados"""
         
-        try:
-            _, analysis = self.validate_aws_components(xml_content)
-            
-            if "error" in analysis:
-                return False, analysis
-            
-            # Extraer tipos de componentes encontrados
-            found_shapes = set()
-            for comp in analysis["component_details"]:
-                shape_name = comp["shape"].replace("mxgraph.aws4.", "")
-                found_shapes.add(shape_name)
-            
-            # Comparar con esperados
-            expected_set = set(expected_components)
-            missing = expected_set - found_shapes
-            extra = found_shapes - expected_set
-            
-            completeness = {
-                "expected": len(expected_components),
-                "found": len(found_shapes),
-                "missing": list(missing),
-                "extra": list(extra),
-                "completeness_percentage": (len(found_shapes & expected_set) / len(expected_set)) * 100 if expected_components else 100
-            }
-            
-            analysis["completeness"] = completeness
-            
-            return len(missing) == 0, analysis
-            
-        except Exception as e:
-            return False, {"error": str(e)}
+        _, result = self.validate_aws_components(source)
+        
+        if "error" in result:
+            return False, result
+        
+        # Extraer tipos de componentes encontrados
+        completeness = self.completeness(result["aws_shapes"], expected_components)
+        result["completeness"] = completeness
+        
+        return len(completeness["missing"]) == 0, result
+    
+    @staticmethod
+    def completeness(shapes: Iterable[str], expected_components: List[str]) -> Dict[str, Any]:
+        """Compara los shapes encontrados (mxgraph.aws4.x) con los tipos esperados"""
+        
+        found_shapes = {shape.replace("mxgraph.aws4.", "") for shape in shapes}
+        
+        # Comparar con esperados
+        expected_set = set(expected_components)
+        missing = expected_set - found_shapes
+        extra = found_shapes - expected_set
+        
+        return {
+            "expected": len(expected_components),
+            "found": len(found_shapes),
+            "missing": list(missing),
+            "extra": list(extra),
+            "completeness_percentage": (len(found_shapes & expected_set) / len(expected_set)) * 100 if expected_components else 100
+        }
     
     def format_xml(self, xml_content: str) -> str:
         """Formatea XML para mejor legibilidad"""
@@ -296,31 +354,60 @@ class MCPIntegrator:
         
         return standard_model
     
-    def validate_mcp_generated_xml(self, xml_content: str, mcp_config: Dict[str, Any]) -> Dict[str, Any]:
+    def validate_mcp_generated_xml(self, xml_content: Union[str, DrawIOAnalysis], mcp_config: Dict[str, Any]) -> Dict[str, Any]:
         """Valida XML generado desde MCP"""
         
-        # Validación estructural
-        is_valid_structure, structure_errors = self.validator.validate_xml_structure(xml_content)
+        from validators.diagram_rules import engine_for, STRUCTURE_RULES, AWS_RULES, MCP_RULES
+        
+        # Un solo parseo y una sola pasada de reglas para todas las validaciones
+        analysis = self.validator.as_analysis(xml_content)
+        expected_components = self.expected_components(mcp_config)
+        report = engine_for(MCP_RULES).run(analysis.index.with_expected_components(expected_components))
+        
+        structure_errors = report.messages(rules=STRUCTURE_RULES)
+        aws_warnings = report.messages(rules=AWS_RULES)
         
-        # Validación de componentes AWS
-        is_valid_aws, aws_analysis = self.validator.validate_aws_components(xml_content)
+        if analysis.error:
+            aws_analysis, completeness = {"error": analysis.error}, {}
+        else:
+            aws_analysis = self.validator.aws_summary(analysis)
+            if aws_warnings:
+                aws_analysis["warning"] = aws_warnings[0]
+            completeness = self.validator.completeness(analysis.aws_shapes, expected_components)
+        
+        result = self._integration_result(not structure_errors, structure_errors, not analysis.error and not aws_warnings,
+                                          aws_analysis, completeness, mcp_config)
+        result["lint"] = report.to_dict()
+        return result
+    
+    def validate_streaming_stats(self, is_valid: bool, errors: List[str], stats: Dict[str, Any],
+                                 mcp_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Integración MCP a partir del resultado de StreamingDrawIOValidator"""
+        
+        completeness = self.validator.completeness(stats["shape_counts"], self.expected_components(mcp_config))
+        return self._integration_result(is_valid, errors, stats["aws_components"] > 0, stats, completeness, mcp_config)
+    
+    @staticmethod
+    def expected_components(mcp_config: Dict[str, Any]) -> List[str]:
+        """Tipos de componentes AWS que el diagrama debería tener según el MCP"""
         
-        # Extraer componentes esperados del MCP
         expected_components = []
-        microservices = mcp_config.get("microservices", {})
-        aws_services = mcp_config.get("aws_services", {})
         
-        # Agregar tipos esperados
-        if microservices:
-            expected_components.append("fargate")  # Microservicios como Fargate
+        # Microservicios como Fargate
+        if mcp_config.get("microservices", {}):
+            expected_components.append("fargate")
         
-        for service_name in aws_services.keys():
+        for service_name in mcp_config.get("aws_services", {}).keys():
             expected_components.append(service_name.lower())
         
-        # Validación de completitud
-        is_complete, completeness_analysis = self.validator.validate_diagram_completeness(
-            xml_content, expected_components
-        )
+        return expected_components
+    
+    @staticmethod
+    def _integration_result(is_valid_structure: bool, structure_errors: List[str], is_valid_aws: bool,
+                            aws_analysis: Dict[str, Any], completeness: Dict[str, Any],
+                            mcp_config: Dict[str, Any]) -> Dict[str, Any]:
+        microservices = mcp_config.get("microservices", {})
+        aws_services = mcp_config.get("aws_services", {})
         
         return {
             "overall_valid": is_valid_structure and is_valid_aws,
@@ -329,11 +416,11 @@ class MCPIntegrator:
                 "errors": structure_errors
             },
             "aws_components": aws_analysis,
-            "completeness": completeness_analysis.get("completeness", {}),
+            "completeness": completeness,
             "mcp_integration": {
                 "expected_microservices": len(microservices),
                 "expected_aws_services": len(aws_services),
-                "total_expected": len(expected_components)
+                "total_expected": len(MCPIntegrator.expected_components(mcp_config))
             }
         }
     
@@ -360,17 +447,30 @@ class MCPIntegrator:
         }
 
 # Funciones de utilidad
-def validate_drawio_file(file_path: str, mcp_config_path: str = None) -> Dict[str, Any]:
-    """Valida archivo DrawIO completo"""
+def validate_drawio_file(file_path: str, mcp_config_path: str = None, streaming: bool = False) -> Dict[str, Any]:
+    """Valida archivo DrawIO completo
+    
+    Ambos modos revisan lo mismo (estructura, IDs duplicados y referencias
+    source/target/parent inexistentes) y dan el mismo veredicto.
+    streaming=True solo cambia la lectura: por bloques sin armar el árbol
+    (archivos muy grandes), con conteos por shape en el análisis en lugar
+    del detalle por componente.
+    """
+    
+    if streaming:
+        return _validate_drawio_file_streaming(file_path, mcp_config_path)
+    
+    from validators.diagram_rules import engine_for, FILE_RULES
     
     validator = DrawIOXMLValidator()
     
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            xml_content = f.read()
+            analysis = validator.analyze(f.read())
         
-        # Validación básica
-        is_valid, errors = validator.validate_xml_structure(xml_content)
+        # Estructura, IDs y referencias (mismas reglas que el modo streaming)
+        report = engine_for(FILE_RULES).run(analysis.index)
+        is_valid, errors = report.valid, report.errors
         
         if not is_valid:
             return {
@@ -380,7 +480,7 @@ def validate_drawio_file(file_path: str, mcp_config_path: str = None) -> Dict[st
             }
         
         # Validación AWS
-        _, aws_analysis = validator.validate_aws_components(xml_content)
+        _, aws_analysis = validator.validate_aws_components(analysis)
         
         result = {
             "valid": True,
@@ -392,11 +492,45 @@ def validate_drawio_file(file_path: str, mcp_config_path: str = None) -> Dict[st
         if mcp_config_path:
             integrator = MCPIntegrator(mcp_config_path)
             mcp_config = integrator.load_mcp_config()
-            mcp_validation = integrator.validate_mcp_generated_xml(xml_content, mcp_config)
+            mcp_validation = integrator.validate_mcp_generated_xml(analysis, mcp_config)
             result["mcp_integration"] = mcp_validation
         
         return result
+    
+    except Exception as e:
+        return {
+            "valid": False,
+            "errors": [str(e)],
+            "file": file_path
+        }
+
+def _validate_drawio_file_streaming(file_path: str, mcp_config_path: str = None) -> Dict[str, Any]:
+    from validators.streaming_validator import StreamingDrawIOValidator
+    
+    try:
+        is_valid, errors, stats = StreamingDrawIOValidator().validate_file(file_path)
+        
+        if not is_valid:
+            return {
+                "valid": False,
+                "errors": errors,
+                "file": file_path
+            }
+        
+        result = {
+            "valid": True,
+            "file": file_path,
+            "analysis": stats
+        }
         
+        # Integración MCP si se proporciona config
+        if mcp_config_path:
+            integrator = MCPIntegrator(mcp_config_path)
+            mcp_config = integrator.load_mcp_config()
+            result["mcp_integration"] = integrator.validate_streaming_stats(is_valid, errors, stats, mcp_config)
+        
+        return result
+    
     except Exception as e:
         return {
             "valid": False,
@@ -423,26 +423,9 @@ class DrawIOTemplates:
     
     @classmethod
     def validate_template_data(cls, data: Dict[str, Any]) -> List[str]:
-        """Valida datos del template"""
-        
-        errors = []
-        
-        # Validar metadata
-        if "metadata" not in data:
-            errors.append("metadata es requerido")
-        else:
-            metadata = data["metadata"]
-            required_fields = ["title", "project_name", "diagram_type"]
-            for field in required_fields:
-                if field not in metadata:
-                    errors.append(f"metadata.{field} es requerido")
-        
-        # Validar architecture
-        if "architecture" not in data:
-            errors.append("architecture es requerido")
-        else:
-            arch = data["architecture"]
-            if not arch.get("components") and not arch.get("containers"):
-                errors.append("Debe tener al menos components o containers")
-        
-        return errors
+        """Valida datos del template (reglas template.* y content.* del motor de lint)"""
+        
+        from validators.diagram_index import DiagramIndex
+        from validators.diagram_rules import engine_for, TEMPLATE_RULES
+        
+        return engine_for(TEMPLATE_RULES).run(DiagramIndex.from_template_data(data)).errors
@@ -4,17 +4,41 @@ Automated Quality Tests - Tests automatizados para asegurar calidad de diagramas
 """
 
 import unittest
+import io
 import json
 import tempfile
 import os
+import sys
+import importlib.util
+import zlib
+from unittest import mock
 from pathlib import Path
 from typing import Dict, Any, List
 import xml.etree.ElementTree as ET
 
+# Los módulos de src se importan entre sí como paquetes de primer nivel (core, models, ...)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / "src")]
+
 # Imports del sistema
 from src.validators.xml_validator import DrawIOXMLValidator, MCPIntegrator, validate_drawio_file
 from templates.drawio_templates import DrawIOTemplates
 from src.components.aws_components import ComponentFactory, ComponentType
+from src.models.diagram_model import DiagramModel, Component, Connection, Position, Style
+from src.models.diagram_model import ComponentType as ModelComponentType
+from src.layouts.diagram_layouts import ForceDirectedLayout, HierarchicalLayout
+from src.layouts.container_layout import ContainerLayout
+from src.layouts.incremental_layout import IncrementalLayout, LayoutSnapshot
+from src.layouts.edge_router import EdgeRouter
+from src.layouts.spatial_index import SpatialIndex
+from src.validators.diagram_validator import DiagramValidator
+from src.core import universal_schema as us
+from src.core.mxgraph_writer import MxGraphWriter, parse_drawio, compress_diagram, decompress_diagram, iter_decompressed
+from src.core.drawio_bundler import DrawIOBundler, BundlePage
+from src.components.aws_components import VPCContainer, AvailabilityZoneContainer
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+HAS_PIL = importlib.util.find_spec("PIL") is not None
 
 class StandardModelTests(unittest.TestCase):
     """Tests para el modelo estándar de entrada"""
@@ -190,6 +214,34 @@ class XMLValidationTests(unittest.TestCase):
         self.assertEqual(completeness["expected"], 1)
         self.assertEqual(completeness["found"], 1)
         self.assertEqual(len(completeness["missing"]), 0)
+    
+    def test_single_parse_analysis(self):
+        """Test todas las validaciones MCP usan un único parseo del XML"""
+        
+        from src.validators import xml_validator
+        
+        with mock.patch.object(xml_validator, "parse_drawio", wraps=xml_validator.parse_drawio) as parse:
+            result = MCPIntegrator("mcp.json").validate_mcp_generated_xml(self.valid_xml, {"aws_services": {"api_gateway": {}}})
+        
+        self.assertEqual(parse.call_count, 1)
+        self.assertTrue(result["overall_valid"])
+        self.assertEqual(result["completeness"]["missing"], [])
+        
+        analysis = self.validator.analyze(self.valid_xml)
+        page = analysis.pages[0]
+        self.assertEqual(set(page.cells), {"0", "1", "api_gw"})
+        self.assertEqual(page.children["1"], ["api_gw"])
+        self.assertEqual(analysis.aws_shapes, ["mxgraph.aws4.api_gateway"])
+    
+    def test_every_page_is_validated(self):
+        """Test los errores de estructura se buscan en todas las páginas"""
+        
+        second_page = '<diagram name="Security" id="p2"><mxGraphModel><root><mxCell id="0"/><mxCell id="0"/></root></mxGraphModel></diagram>'
+        multi_page = self.valid_xml.replace("</mxfile>", second_page + "</mxfile>")
+        
+        is_valid, errors = self.validator.validate_xml_structure(multi_page)
+        self.assertFalse(is_valid)
+        self.assertEqual(errors, ["ID duplicado: 0 (página 'Security')"])
 
 class TemplateGenerationTests(unittest.TestCase):
     """Tests para generación de templates DrawIO"""
@@ -329,6 +381,985 @@ class MCPIntegrationTests(unittest.TestCase):
         self.assertEqual(mcp_integration["expected_microservices"], 2)
         self.assertEqual(mcp_integration["expected_aws_services"], 2)
 
+class DiagramModelTests(unittest.TestCase):
+    """Tests para índice y adyacencia del modelo de diagrama"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.model = DiagramModel(name="Test")
+        for component_id in ("api", "invoice", "product", "rds"):
+            self.model.add_component(Component(component_id, component_id, ModelComponentType.AWS_SERVICE,
+                                               Position(0, 0), Style()))
+        for source, target in (("api", "invoice"), ("api", "product"), ("invoice", "rds"), ("product", "rds")):
+            self.model.add_connection(Connection(f"{source}_{target}", source, target, "", Style()))
+    
+    def test_lookup_and_neighbors(self):
+        """Test búsqueda por ID y consultas de vecinos"""
+        
+        self.assertEqual(self.model.get_component_by_id("rds").name, "rds")
+        self.assertIsNone(self.model.get_component_by_id("missing"))
+        
+        self.assertEqual([c.id for c in self.model.get_neighbors("api", "out")], ["invoice", "product"])
+        self.assertEqual([c.id for c in self.model.get_neighbors("rds", "in")], ["invoice", "product"])
+        self.assertEqual([c.id for c in self.model.get_neighbors("invoice")], ["rds", "api"])
+        self.assertEqual([c.id for c in self.model.get_incoming_connections("rds")], ["invoice_rds", "product_rds"])
+    
+    def test_index_follows_direct_list_changes(self):
+        """Test el índice se reconstruye si las listas se modifican directamente"""
+        
+        self.model.components.append(Component("redis", "redis", ModelComponentType.AWS_SERVICE,
+                                               Position(0, 0), Style()))
+        self.model.connections.append(Connection("product_redis", "product", "redis", "", Style()))
+        
+        self.assertIsNotNone(self.model.get_component_by_id("redis"))
+        self.assertEqual([c.id for c in self.model.get_neighbors("product", "out")], ["rds", "redis"])
+        self.assertEqual(self.model.validate(), [])
+
+class HierarchicalLayoutTests(unittest.TestCase):
+    """Tests para el layout por capas (Sugiyama)"""
+    
+    def _build_model(self, edges: List[tuple], extra: List[str] = ()) -> DiagramModel:
+        model = DiagramModel(name="Layers")
+        ids = list(dict.fromkeys([node for edge in edges for node in edge] + list(extra)))
+        for component_id in ids:
+            model.add_component(Component(component_id, component_id, ModelComponentType.AWS_SERVICE,
+                                          Position(0, 0), Style()))
+        for source, target in edges:
+            model.add_connection(Connection(f"{source}_{target}", source, target, "", Style()))
+        return model
+    
+    def _position(self, model: DiagramModel, component_id: str) -> Position:
+        return model.get_component_by_id(component_id).position
+    
+    def test_layers_follow_connections_with_cycles(self):
+        """Test cada conexión baja de capa, salvo la que cierra un ciclo"""
+        
+        model = self._build_model([("api", "invoice"), ("invoice", "rds"), ("api", "rds"), ("rds", "api")])
+        HierarchicalLayout.apply(model)
+        
+        ys = [self._position(model, cid).y for cid in ("api", "invoice", "rds")]
+        self.assertEqual(ys, sorted(set(ys)))
+    
+    def test_barycenter_sweeps_remove_crossings(self):
+        """Test el orden de las capas elimina cruces evitables"""
+        
+        model = self._build_model([("a", "d"), ("b", "c"), ("a", "e"), ("b", "f")])
+        HierarchicalLayout.apply(model)
+        
+        x = {cid: self._position(model, cid).x for cid in "abcdef"}
+        self.assertEqual(x["a"] < x["b"], max(x["d"], x["e"]) < min(x["c"], x["f"]))
+    
+    def test_large_layers_wrap_inside_canvas(self):
+        """Test capas más anchas que el canvas se parten en filas"""
+        
+        model = self._build_model([("root", f"ms_{i}") for i in range(30)])
+        HierarchicalLayout.apply(model)
+        
+        width = model.canvas_size[0]
+        positions = [c.position for c in model.components]
+        self.assertEqual(width, 1400)
+        self.assertTrue(all(0 <= p.x and p.x + p.width <= width for p in positions))
+        self.assertGreater(len({p.y for p in positions}), 2)
+        self.assertEqual(len({(p.x, p.y) for p in positions}), len(positions))
+    
+    def test_without_connections_uses_name_layers(self):
+        """Test sin conexiones se agrupa por nombre y se posicionan todos"""
+        
+        model = self._build_model([], extra=["cloudfront", "api_gateway", "ms_invoice", "rds", "sqs"])
+        HierarchicalLayout.apply(model)
+        
+        ys = [self._position(model, cid).y for cid in ("cloudfront", "api_gateway", "ms_invoice", "rds", "sqs")]
+        self.assertEqual(ys, sorted(set(ys)))
+
+class IncrementalLayoutTests(unittest.TestCase):
+    """Tests para el re-layout estable a partir de un layout anterior"""
+    
+    CONFIG = {
+        "microservices": {"invoice": {}, "product": {}, "ocr": {}},
+        "aws_services": {"rds_postgres": {}, "redis": {}, "s3": {}}
+    }
+    
+    def _positions(self, model: DiagramModel) -> Dict[str, tuple]:
+        return {c.id: (c.position.x, c.position.y, c.position.width, c.position.height) for c in model.components}
+    
+    def test_new_component_does_not_move_the_rest(self):
+        """Test un componente nuevo se ubica en un hueco libre sin mover los demás"""
+        
+        from src.models.diagram_model import DiagramModelBuilder
+        
+        model = DiagramModelBuilder.from_config(self.CONFIG)
+        HierarchicalLayout.apply(model)
+        before = self._positions(model)
+        snapshot = LayoutSnapshot.from_model(model)
+        
+        config = json.loads(json.dumps(self.CONFIG))
+        config["microservices"]["commission"] = {}
+        model = DiagramModelBuilder.from_config(config)
+        placed = IncrementalLayout.apply(model, snapshot)
+        
+        after = self._positions(model)
+        self.assertEqual([c.id for c in placed], ["ms_commission"])
+        self.assertEqual({k: v for k, v in after.items() if k != "ms_commission"}, before)
+        self.assertEqual(DiagramValidator.find_overlaps(model), [])
+    
+    def test_changed_component_is_placed_again(self):
+        """Test un componente con otro label se vuelve a ubicar (y conserva su lugar si está libre)"""
+        
+        from src.models.diagram_model import DiagramModelBuilder
+        
+        model = DiagramModelBuilder.from_config(self.CONFIG)
+        HierarchicalLayout.apply(model)
+        snapshot = LayoutSnapshot.from_model(model)
+        
+        model.get_component_by_id("ms_ocr").label = "OCR Service v2"
+        placed = IncrementalLayout.apply(model, snapshot)
+        
+        self.assertEqual([c.id for c in placed], ["ms_ocr"])
+        self.assertEqual(self._positions(model)["ms_ocr"], snapshot.positions["ms_ocr"])
+    
+    def test_snapshot_from_drawio_and_json(self):
+        """Test el layout anterior se lee igual desde el .drawio generado y desde el JSON"""
+        
+        from src.models.diagram_model import DiagramModelBuilder
+        from src.generators.refactored_drawio_generator import XMLRenderer
+        
+        model = DiagramModelBuilder.from_config(self.CONFIG)
+        HierarchicalLayout.apply(model)
+        snapshot = LayoutSnapshot.from_model(model)
+        
+        from_drawio = LayoutSnapshot.from_drawio(XMLRenderer().render_model(model))
+        from_json = LayoutSnapshot.from_json(snapshot.to_json())
+        
+        for component_id, box in snapshot.positions.items():
+            self.assertEqual(from_drawio.positions[component_id], box)
+            self.assertEqual(from_drawio.signatures[component_id], snapshot.signatures[component_id])
+            self.assertEqual(from_json.positions[component_id], box)
+            self.assertEqual(from_json.signatures[component_id], snapshot.signatures[component_id])
+    
+    def test_generator_reuses_previous_layout(self):
+        """Test dos ejecuciones del generador producen las mismas posiciones"""
+        
+        from src.generators.refactored_drawio_generator import RefactoredDrawIOGenerator
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            generator = RefactoredDrawIOGenerator(temp_dir)
+            first = LayoutSnapshot.load(generator.generate_from_config(self.CONFIG, "stable"))
+            
+            config = json.loads(json.dumps(self.CONFIG))
+            config["aws_services"]["sqs"] = {}
+            second = LayoutSnapshot.load(generator.generate_from_config(config, "stable"))
+        
+        for component_id, box in first.positions.items():
+            if component_id.startswith(("ms_", "aws_")):
+                self.assertEqual(second.positions[component_id], box)
+        self.assertIn("aws_sqs", second.positions)
+
+class ForceDirectedLayoutTests(unittest.TestCase):
+    """Tests para el layout dirigido por fuerzas"""
+    
+    def _build_model(self, groups: int = 4, size: int = 6) -> DiagramModel:
+        """Grupos densamente conectados unidos por una sola conexión"""
+        model = DiagramModel(name="Clusters")
+        for group in range(groups):
+            ids = [f"g{group}_{i}" for i in range(size)]
+            for component_id in ids:
+                model.add_component(Component(component_id, component_id, ModelComponentType.AWS_SERVICE,
+                                              Position(0, 0), Style()))
+            for i, source in enumerate(ids):
+                for target in ids[i + 1:]:
+                    model.add_connection(Connection(f"{source}_{target}", source, target, "", Style()))
+            if group:
+                model.add_connection(Connection(f"bridge_{group}", f"g{group - 1}_0", f"g{group}_0", "", Style()))
+        return model
+    
+    def _distance(self, model: DiagramModel, a: str, b: str) -> float:
+        pa, pb = model.get_component_by_id(a).position, model.get_component_by_id(b).position
+        return ((pa.x - pb.x) ** 2 + (pa.y - pb.y) ** 2) ** 0.5
+    
+    @unittest.skipUnless(HAS_NUMPY, "numpy no instalado")
+    def test_connected_components_end_up_closer(self):
+        """Test componentes del mismo grupo quedan más cerca que los de otros grupos"""
+        
+        model = self._build_model()
+        ForceDirectedLayout.apply(model)
+        
+        same_group = max(self._distance(model, "g0_1", f"g0_{i}") for i in range(2, 6))
+        other_group = min(self._distance(model, "g0_1", f"g2_{i}") for i in range(1, 6))
+        self.assertLess(same_group, other_group)
+        
+        positions = {(c.position.x, c.position.y) for c in model.components}
+        self.assertEqual(len(positions), len(model.components))
+        self.assertTrue(all(c.position.x >= 0 and c.position.y >= 0 for c in model.components))
+    
+    @unittest.skipUnless(HAS_NUMPY, "numpy no instalado")
+    def test_grid_approximation_matches_exact_repulsion(self):
+        """Test la repulsión por grilla aproxima la exacta en diagramas grandes"""
+        
+        import numpy as np
+        
+        pos = np.random.default_rng(7).uniform(0, 6000, size=(1500, 2))
+        exact = ForceDirectedLayout._exact_repulsion(pos, 140, np)
+        approx = ForceDirectedLayout._grid_repulsion(pos, 140, np)
+        
+        error = np.hypot(*(exact - approx).T) / np.maximum(np.hypot(*exact.T), 1e-9)
+        self.assertLess(float(np.median(error)), 0.05)
+    
+    def test_falls_back_without_numpy(self):
+        """Test sin numpy se usa el layout simplificado"""
+        
+        model = self._build_model(groups=2, size=3)
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            ForceDirectedLayout.apply(model)
+        
+        self.assertTrue(all(c.position.x > 0 for c in model.components))
+
+class ContainerLayoutTests(unittest.TestCase):
+    """Tests para el layout de contenedores anidados"""
+    
+    def _container(self, container_id: str, components: int = 0) -> us.Container:
+        container = us.Container(container_id, container_id, us.Position(0, 0), us.Size(1, 1))
+        container.components = [us.Component(f"{container_id}_c{i}", "ec2", f"c{i}") for i in range(components)]
+        return container
+    
+    def _build_schema(self) -> us.UniversalDiagramSchema:
+        """VPCs con AZs y subnets de distinto tamaño, más una cadena profunda"""
+        containers = []
+        for v in range(20):
+            vpc = self._container(f"vpc{v}", components=v % 3)
+            for a in range(3):
+                az = self._container(f"vpc{v}_az{a}")
+                az.children = [self._container(f"vpc{v}_az{a}_s{s}", components=s + v % 4) for s in range(4)]
+                vpc.children.append(az)
+            containers.append(vpc)
+        
+        chain = self._container("deep0", components=1)
+        current = chain
+        for depth in range(1, 300):
+            child = self._container(f"deep{depth}", components=1)
+            current.children.append(child)
+            current = child
+        containers.append(chain)
+        
+        return us.UniversalDiagramSchema("Redes", us.DiagramType.NETWORK, "test", containers=containers,
+                                         components=[us.Component("users", "users", "Users")])
+    
+    def _assert_no_overlap(self, boxes: List[tuple]):
+        boxes = sorted(boxes)
+        for i, a in enumerate(boxes):
+            for b in boxes[i + 1:]:
+                if b[0] >= a[0] + a[2]:
+                    break
+                self.assertFalse(a[1] < b[1] + b[3] and b[1] < a[1] + a[3], f"{a} se solapa con {b}")
+    
+    def _check_container(self, container: us.Container):
+        boxes = []
+        for component in container.components:
+            box = (component.position.x, component.position.y, component.size.width,
+                   component.size.height + ContainerLayout.LABEL_HEIGHT)
+            boxes.append(box)
+        for child in container.children:
+            boxes.append((child.position.x, child.position.y, child.size.width, child.size.height))
+        
+        for x, y, width, height in boxes:
+            self.assertGreaterEqual(x, ContainerLayout.PADDING)
+            self.assertGreaterEqual(y, ContainerLayout.HEADER)
+            self.assertLessEqual(x + width + ContainerLayout.PADDING, container.size.width)
+            self.assertLessEqual(y + height + ContainerLayout.PADDING, container.size.height)
+        self._assert_no_overlap(boxes)
+    
+    def test_nested_containers_fit_without_overlaps(self):
+        """Test cada contenedor envuelve a sus hijos y los hermanos no se solapan"""
+        
+        schema = self._build_schema()
+        ContainerLayout.apply(schema)
+        
+        stack = list(schema.containers)
+        while stack:
+            container = stack.pop()
+            self._check_container(container)
+            stack.extend(container.children)
+        
+        top_level = [(c.position.x, c.position.y, c.size.width, c.size.height) for c in schema.containers]
+        top_level += [(c.position.x, c.position.y, c.size.width, c.size.height) for c in schema.components]
+        self._assert_no_overlap(top_level)
+        self.assertTrue(all(x + width <= schema.canvas.width and y + height <= schema.canvas.height
+                            for x, y, width, height in top_level))
+    
+    def test_aws_containers_get_bounds(self):
+        """Test los contenedores de aws_components reciben bounds válidos"""
+        
+        vpc = VPCContainer("vpc", "VPC", {"x": 0, "y": 0, "width": 0, "height": 0})
+        for zone in ("us-east-1a", "us-east-1b"):
+            az = AvailabilityZoneContainer(zone, zone, {"x": 0, "y": 0, "width": 0, "height": 0}, zone_name=zone)
+            az.add_component(ComponentFactory.create_component(ComponentType.FARGATE, f"task_{zone}", "Task"))
+            vpc.add_child(az)
+        
+        ContainerLayout.apply_aws_containers([vpc])
+        
+        self.assertEqual(vpc.validate(), [])
+        first, second = (az.bounds for az in vpc.children)
+        self._assert_no_overlap([(b["x"], b["y"], b["width"], b["height"]) for b in (first, second)])
+        self.assertLessEqual(second["y"] + second["height"], vpc.bounds["height"])
+    
+    def test_drawio_export_includes_every_nesting_level(self):
+        """Test el export DrawIO incluye contenedores y componentes de cualquier profundidad"""
+        
+        from src.generators.universal_generator import UniversalGenerator
+        
+        schema = self._build_schema()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "drawio").mkdir()
+            drawio_file = UniversalGenerator(temp_dir)._generate_drawio(schema)
+            cells = ET.parse(drawio_file).getroot().findall(".//mxCell")
+        
+        ids = {cell.get("value") for cell in cells}
+        self.assertIn("deep299", ids)
+        self.assertIn("vpc19_az2_s3", ids)
+
+class EdgeRouterTests(unittest.TestCase):
+    """Tests para el ruteo ortogonal de conexiones"""
+    
+    # Un muro entre api y db, y un componente en el camino directo
+    BOXES = {
+        "api": (0, 200, 78, 78),
+        "db": (600, 200, 78, 78),
+        "wall": (250, 0, 100, 600),
+        "cache": (420, 210, 60, 60)
+    }
+    
+    def _path(self, boxes: Dict[str, tuple], source: str, target: str, points: List[tuple]) -> List[tuple]:
+        def center(box):
+            return int(box[0] + box[2] / 2), int(box[1] + box[3] / 2)
+        return [center(boxes[source])] + list(points) + [center(boxes[target])]
+    
+    def _crosses(self, a: tuple, b: tuple, box: tuple) -> bool:
+        x0, y0, x1, y1 = box[0], box[1], box[0] + box[2], box[1] + box[3]
+        if a[1] == b[1]:
+            return y0 < a[1] < y1 and min(a[0], b[0]) < x1 and x0 < max(a[0], b[0])
+        return x0 < a[0] < x1 and min(a[1], b[1]) < y1 and y0 < max(a[1], b[1])
+    
+    def test_route_is_orthogonal_and_avoids_components(self):
+        """Test la ruta es ortogonal y no atraviesa otros componentes"""
+        
+        routes = EdgeRouter(search=True).route_all(self.BOXES, [("api_db", "api", "db")])
+        path = self._path(self.BOXES, "api", "db", routes["api_db"])
+        
+        self.assertTrue(routes["api_db"])
+        for a, b in zip(path, path[1:]):
+            self.assertTrue(a[0] == b[0] or a[1] == b[1], f"Tramo diagonal {a} -> {b}")
+            for obstacle in ("wall", "cache"):
+                self.assertFalse(self._crosses(a, b, self.BOXES[obstacle]), f"{a} -> {b} cruza {obstacle}")
+    
+    def test_unobstructed_connection_has_no_waypoints(self):
+        """Test una conexión recta sin obstáculos no agrega puntos"""
+        
+        boxes = {"a": (0, 0, 78, 78), "b": (300, 0, 78, 78)}
+        self.assertEqual(EdgeRouter().route_all(boxes, [("ab", "a", "b")]), {"ab": []})
+    
+    def test_routes_are_cached_until_an_obstacle_moves(self):
+        """Test la ruta se reutiliza hasta que se mueve un obstáculo de su región"""
+        
+        router = EdgeRouter(search=True)
+        boxes = dict(self.BOXES)
+        edges = [("api_db", "api", "db")]
+        
+        first = router.route_all(boxes, edges)
+        boxes["far"] = (5000, 5000, 78, 78)
+        self.assertEqual(router.route_all(boxes, edges), first)
+        self.assertEqual(router.stats["cached"], 1)
+        
+        boxes["cache"] = (420, 300, 60, 60)
+        router.route_all(boxes, edges)
+        self.assertEqual(router.stats["cached"], 1)
+        self.assertEqual(router.stats["routed"], 2)
+    
+    def test_search_is_opt_in_and_bounded(self):
+        """Test sin search (o sin presupuesto) solo se prueban recta, L y Z y nada queda en caché"""
+        
+        edges = [("api_db", "api", "db")]
+        router = EdgeRouter()
+        self.assertEqual(router.route_all(self.BOXES, edges), {"api_db": []})
+        self.assertEqual(router.route_all(self.BOXES, edges), {"api_db": []})
+        self.assertEqual((router.stats["skipped"], router.stats["cached"]), (2, 0))
+        
+        router = EdgeRouter(search=True)
+        router.SEARCH_BUDGET = 0
+        self.assertEqual(router.route_all(self.BOXES, edges), {"api_db": []})
+        self.assertEqual(router.stats["routed"], 0)
+        
+        # Diagramas grandes: el ruteo queda todo para draw.io
+        boxes = {f"c{i}": (i * 100, 0, 78, 78) for i in range(EdgeRouter.MAX_ROUTED_COMPONENTS + 1)}
+        routes = router.route_all(boxes, [("e", "c0", "c9")])
+        self.assertEqual(routes, {"e": []})
+        self.assertEqual(router.stats["direct"], 0)
+        
+        # La L sigue sin A*: solo hay que esquivar cache
+        boxes = {"api": (0, 200, 78, 78), "db": (600, 400, 78, 78), "cache": (420, 210, 60, 60)}
+        self.assertEqual(EdgeRouter().route_all(boxes, edges), {"api_db": [(39, 439)]})
+    
+    def test_spatial_index_query(self):
+        """Test el índice espacial encuentra, mueve y quita cajas"""
+        
+        index = SpatialIndex.from_boxes(self.BOXES)
+        self.assertEqual(index.query((240, 100, 20, 20)), ["wall"])
+        self.assertEqual(sorted(index.query((0, 0, 700, 700))), ["api", "cache", "db", "wall"])
+        
+        index.insert("wall", (1000, 1000, 10, 10))
+        self.assertEqual(index.query((240, 100, 20, 20)), [])
+        index.remove("api")
+        self.assertNotIn("api", index.query((0, 0, 700, 700)))
+    
+    def test_xml_renderer_writes_waypoints(self):
+        """Test el XML de la conexión incluye los puntos de quiebre"""
+        
+        from src.generators.refactored_drawio_generator import XMLRenderer
+        
+        model = DiagramModel(name="Ruteo")
+        for component_id, (x, y, width, height) in self.BOXES.items():
+            model.add_component(Component(component_id, component_id, ModelComponentType.AWS_SERVICE,
+                                          Position(x, y, width, height), Style()))
+        model.add_connection(Connection("api_db", "api", "db", "SQL", Style()))
+        
+        renderer = XMLRenderer()
+        renderer.edge_router = EdgeRouter(search=True)
+        root = ET.fromstring(renderer.render_model(model))
+        points = root.findall(".//mxCell[@id='api_db']/mxGeometry/Array/mxPoint")
+        self.assertGreater(len(points), 0)
+
+class SpatialValidationTests(unittest.TestCase):
+    """Tests para solapamientos y colisiones de labels sobre el índice espacial"""
+    
+    def _model(self, components: List[tuple]) -> DiagramModel:
+        model = DiagramModel(name="Solapamientos", canvas_size=(2000, 2000))
+        for component_id, component_type, (x, y, width, height), shape in components:
+            model.add_component(Component(component_id, component_id, component_type,
+                                          Position(x, y, width, height), Style(), shape=shape))
+        return model
+    
+    def test_overlapping_pairs_match_all_pairs_check(self):
+        """Test cada par superpuesto se reporta una vez, como en la comparación de todos los pares"""
+        
+        import random
+        rng = random.Random(7)
+        boxes = {f"c{i}": (rng.randint(0, 1500), rng.randint(0, 1500), rng.randint(20, 400), rng.randint(20, 400))
+                 for i in range(150)}
+        
+        def overlap(a, b):
+            return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+        
+        keys = list(boxes)
+        expected = [(a, b) for i, a in enumerate(keys) for b in keys[i + 1:] if overlap(boxes[a], boxes[b])]
+        self.assertEqual(SpatialIndex.from_boxes(boxes, cell_size=100).overlapping_pairs(), expected)
+    
+    def test_overlapping_components_are_reported(self):
+        """Test el validador reporta componentes superpuestos pero no contenedores"""
+        
+        model = self._model([
+            ("vpc", ModelComponentType.CONTAINER, (0, 0, 1000, 800), None),
+            ("api", ModelComponentType.AWS_SERVICE, (100, 100, 78, 78), None),
+            ("db", ModelComponentType.AWS_SERVICE, (150, 150, 78, 78), None),
+            ("cache", ModelComponentType.AWS_SERVICE, (400, 100, 78, 78), None)
+        ])
+        
+        self.assertEqual(DiagramValidator.find_overlaps(model), [("api", "db")])
+        is_valid, errors = DiagramValidator.validate_model(model)
+        self.assertFalse(is_valid)
+        self.assertIn("Componentes api y db: superpuestos", errors)
+    
+    def test_label_collisions_are_reported(self):
+        """Test el label sobre un ícono no puede tapar al componente de arriba"""
+        
+        shape = "mxgraph.aws4.fargate"
+        model = self._model([
+            ("api", ModelComponentType.AWS_SERVICE, (100, 100, 78, 78), shape),
+            ("db", ModelComponentType.AWS_SERVICE, (100, 190, 78, 78), shape),
+            ("cache", ModelComponentType.AWS_SERVICE, (400, 190, 78, 78), shape)
+        ])
+        
+        self.assertEqual(DiagramValidator.find_overlaps(model), [])
+        self.assertEqual(DiagramValidator.find_label_collisions(model), [("db", "api")])
+        self.assertIn("api", DiagramValidator.spatial_index(model).query((90, 90, 20, 20)))
+        
+        # El ancho del label es estimado: advertencia, no error
+        self.assertEqual(DiagramValidator.validate_model(model), (True, []))
+        self.assertEqual(DiagramValidator.lint_model(model).warnings, ["Componente db: label se superpone con api"])
+    
+    def test_project_config_validates_after_default_layout(self):
+        """Test la configuración BMC con el layout por defecto no tiene errores de modelo"""
+        
+        from src.models.diagram_model import DiagramModelBuilder
+        from src.layouts.diagram_layouts import LayoutEngine
+        
+        config = json.loads((ROOT_DIR / "outputs" / "generated" / "bmc.json").read_text(encoding='utf-8'))
+        model = DiagramModelBuilder.from_config(config)
+        LayoutEngine.apply_layout(model)
+        
+        is_valid, errors = DiagramValidator.validate_model(model)
+        self.assertTrue(is_valid, errors)
+
+class MxGraphWriterTests(unittest.TestCase):
+    """Tests para la escritura incremental de archivos DrawIO"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def _write(self, writer: MxGraphWriter) -> None:
+        writer.start_file()
+        writer.start_diagram('A & "B"', "diagram_0")
+        writer.vertex("api", "API <Gateway>\nv2", "shape=mxgraph.aws4.api_gateway;", 10, 20, 78, 78)
+        writer.vertex("db", "RDS", "shape=mxgraph.aws4.rds;", 200, 20, 78, 78)
+        writer.edge("e1", "endArrow=classic;", "api", "db", points=[(100, 60), (150, 60)])
+        writer.edge_label("e1_label", "SQL & TLS", "e1")
+        writer.end_diagram()
+        writer.close()
+    
+    def test_attributes_are_escaped(self):
+        """Test nombres y labels con caracteres especiales sobreviven al parseo"""
+        
+        for pretty in (True, False):
+            buffer = io.StringIO()
+            self._write(MxGraphWriter(buffer, pretty=pretty))
+            root = ET.fromstring(buffer.getvalue())
+            cells = {cell.get("id"): cell for cell in root.iter("mxCell")}
+            
+            self.assertEqual(root.find("diagram").get("name"), 'A & "B"')
+            self.assertEqual(cells["api"].get("value"), "API <Gateway>\nv2")
+            self.assertEqual(cells["e1_label"].get("value"), "SQL & TLS")
+            self.assertEqual([(p.get("x"), p.get("y")) for p in cells["e1"].iter("mxPoint")],
+                             [("100", "60"), ("150", "60")])
+    
+    def test_compressed_output(self):
+        """Test el modo comprimido produce el formato nativo de draw.io y se valida igual"""
+        
+        plain, compressed = io.StringIO(), io.StringIO()
+        self._write(MxGraphWriter(plain))
+        self._write(MxGraphWriter(compressed, compressed=True))
+        
+        diagram = ET.fromstring(compressed.getvalue()).find("diagram")
+        self.assertIsNone(diagram.find("mxGraphModel"))
+        self.assertEqual(ET.fromstring(decompress_diagram(diagram.text)).tag, "mxGraphModel")
+        self.assertLess(len(compressed.getvalue()), len(plain.getvalue()))
+        
+        cells = lambda content: [(c.get("id"), c.get("value")) for c in parse_drawio(content).iter("mxCell")]
+        self.assertEqual(cells(compressed.getvalue()), cells(plain.getvalue()))
+        self.assertTrue(DrawIOXMLValidator().validate_xml_structure(compressed.getvalue())[0])
+        
+        xml = '<mxGraphModel><root><mxCell id="0" value="Facturación ñ &amp; 100%"/></root></mxGraphModel>'
+        self.assertEqual(decompress_diagram(compress_diagram(xml)), xml)
+        
+        # Bloques chicos: los %XX quedan partidos entre bloques
+        payload = compress_diagram(xml * 50)
+        chunks = list(iter_decompressed(payload, chunk_size=4))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b"".join(chunks).decode("utf-8"), xml * 50)
+        with self.assertRaises(zlib.error):
+            list(iter_decompressed(payload[:len(payload) // 2 // 4 * 4]))
+    
+    def test_open_is_atomic(self):
+        """Test un error a mitad de la escritura no deja archivos parciales"""
+        
+        path = self.temp_dir / "out" / "diagram.drawio"
+        with MxGraphWriter.open(str(path)) as writer:
+            self._write(writer)
+        self.assertTrue(validate_drawio_file(str(path))["valid"])
+        
+        failed = self.temp_dir / "failed.drawio"
+        with self.assertRaises(RuntimeError):
+            with MxGraphWriter.open(str(failed)) as writer:
+                writer.start_file()
+                raise RuntimeError("fallo")
+        self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir()), ["out"])
+        self.assertEqual(sorted(p.name for p in path.parent.iterdir()), ["diagram.drawio"])
+
+class DrawIOBundlerTests(unittest.TestCase):
+    """Tests para el bundle DrawIO multi-página"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def _page(self, name: str, label: str) -> BundlePage:
+        return BundlePage(name, lambda writer: writer.vertex("rds", label, "shape=mxgraph.aws4.rds;", 100, 100, 78, 78))
+    
+    def test_identical_pages_are_written_once(self):
+        """Test páginas con el mismo contenido se escriben una sola vez"""
+        
+        path = self.temp_dir / "bundle.drawio"
+        result = DrawIOBundler.write(str(path), [self._page("network", "RDS"), self._page("security", "RDS"),
+                                                 self._page("data_flow", "RDS Replica")])
+        
+        self.assertEqual(result["pages"], ["network", "data_flow"])
+        self.assertEqual(result["duplicates"], ["security"])
+        diagrams = ET.parse(path).getroot().findall("diagram")
+        self.assertEqual([d.get("name") for d in diagrams], ["network", "data_flow"])
+        self.assertTrue(all(d.get("id").startswith("page-") for d in diagrams))
+    
+    def test_unchanged_bundle_is_not_rewritten(self):
+        """Test si ninguna página cambió el archivo queda intacto"""
+        
+        path = self.temp_dir / "bundle.drawio"
+        pages = [self._page("network", "RDS"), self._page("data_flow", "S3")]
+        self.assertTrue(DrawIOBundler.write(str(path), pages)["changed"])
+        content = path.read_text(encoding='utf-8')
+        
+        self.assertFalse(DrawIOBundler.write(str(path), pages)["changed"])
+        self.assertEqual(path.read_text(encoding='utf-8'), content)
+        
+        self.assertTrue(DrawIOBundler.write(str(path), [self._page("network", "RDS Multi-AZ"), pages[1]])["changed"])
+        self.assertTrue(DrawIOBundler.write(str(path), pages, compressed=True)["changed"])
+        self.assertEqual(len(parse_drawio(path.read_text(encoding='utf-8')).findall("diagram/mxGraphModel")), 2)
+        self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir()), ["bundle.drawio"])
+
+class StreamingValidationTests(unittest.TestCase):
+    """Tests para la validación por streaming de archivos grandes"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def _write(self, cells: List[tuple], compressed: bool = False) -> str:
+        path = self.temp_dir / "diagram.drawio"
+        with MxGraphWriter.open(str(path), compressed=compressed) as writer:
+            writer.start_file()
+            writer.start_diagram("Arquitectura", "arch")
+            for cell in cells:
+                if cell[0] == "edge":
+                    writer.edge(cell[1], "endArrow=classic;", cell[2], cell[3])
+                else:
+                    writer.vertex(cell[1], cell[1].upper(), f"shape=mxgraph.aws4.{cell[1]};", 100, 100, 78, 78,
+                                  parent=cell[2] if len(cell) > 2 else "1")
+            writer.end_diagram()
+            writer.close()
+        return str(path)
+    
+    def test_dangling_references_are_reported(self):
+        """Test IDs duplicados, conexiones y parents inexistentes"""
+        
+        path = self._write([("vertex", "rds"), ("vertex", "rds"), ("vertex", "s3", "vpc"),
+                            ("edge", "e1", "rds", "ghost")])
+        result = validate_drawio_file(path, streaming=True)
+        
+        self.assertFalse(result["valid"])
+        self.assertIn("ID duplicado: rds (página 'Arquitectura')", result["errors"])
+        self.assertIn("Celda e1: target 'ghost' no existe (página 'Arquitectura')", result["errors"])
+        self.assertIn("Celda s3: parent 'vpc' no existe (página 'Arquitectura')", result["errors"])
+    
+    def test_same_verdict_as_tree_mode(self):
+        """Test streaming y árbol rechazan los mismos defectos y aceptan el mismo archivo válido"""
+        
+        cases = [
+            ([("vertex", "rds"), ("edge", "e1", "rds", "ghost")], False),
+            ([("vertex", "rds"), ("vertex", "s3", "vpc")], False),
+            ([("vertex", "rds"), ("vertex", "rds")], False),
+            ([("vertex", "rds"), ("vertex", "s3"), ("edge", "e1", "rds", "s3")], True)
+        ]
+        
+        for cells, valid in cases:
+            for compressed in (False, True):
+                path = self._write(cells, compressed)
+                tree, streamed = validate_drawio_file(path), validate_drawio_file(path, streaming=True)
+                self.assertEqual((tree["valid"], streamed["valid"]), (valid, valid), (cells, tree.get("errors")))
+                self.assertEqual(len(tree.get("errors", [])), len(streamed.get("errors", [])))
+    
+    def test_matches_tree_analysis(self):
+        """Test plano y comprimido dan las mismas estadísticas que el análisis en árbol"""
+        
+        cells = [("vertex", "ec2"), ("vertex", "rds"), ("vertex", "s3"), ("edge", "e1", "ec2", "rds")]
+        expected = DrawIOXMLValidator().analyze(Path(self._write(cells)).read_text(encoding='utf-8'))
+        
+        for compressed in (False, True):
+            result = validate_drawio_file(self._write(cells, compressed), streaming=True)
+            self.assertTrue(result["valid"], result.get("errors"))
+            self.assertEqual(result["analysis"]["aws_components"], len(expected.aws_components))
+            self.assertEqual(result["analysis"]["connections"], len(expected.connections))
+            self.assertEqual(sorted(result["analysis"]["shape_counts"]), expected.aws_shapes)
+    
+    def test_error_list_is_capped(self):
+        """Test el detalle de errores se corta en MAX_ERRORS"""
+        
+        from src.validators.streaming_validator import StreamingDrawIOValidator
+        
+        path = self._write([("vertex", "rds")] + [("edge", f"e{i}", "rds", "ghost") for i in range(150)])
+        is_valid, errors, _ = StreamingDrawIOValidator().validate_file(path)
+        
+        self.assertFalse(is_valid)
+        self.assertEqual(len(errors), StreamingDrawIOValidator.MAX_ERRORS + 1)
+        self.assertEqual(errors[-1], "... y 50 errores más")
+
+class RuleEngineTests(unittest.TestCase):
+    """Tests para el motor de reglas sobre el índice común"""
+    
+    def _model(self) -> DiagramModel:
+        model = DiagramModel(name="Reglas", canvas_size=(700, 500))
+        model.add_component(Component("api", "API", ModelComponentType.AWS_SERVICE, Position(100, 100, 78, 78), Style()))
+        model.add_component(Component("db", "DB", ModelComponentType.AWS_SERVICE, Position(120, 120, 78, 78), Style()))
+        model.add_connection(Connection("c1", "api", "ghost", "", Style()))
+        return model
+    
+    def test_every_source_uses_the_same_rules(self):
+        """Test modelo, XML, esquema de la API y plantilla reportan la misma regla"""
+        
+        from src.validators.diagram_index import DiagramIndex
+        from src.validators.rule_engine import RuleEngine
+        
+        xml = ('<mxfile><diagram name="P"><mxGraphModel><root><mxCell id="0"/><mxCell id="1" parent="0"/>'
+               '<mxCell id="c1" edge="1" source="1" target="ghost" parent="1"/></root></mxGraphModel></diagram></mxfile>')
+        schema = us.UniversalDiagramSchema("Reglas", us.DiagramType.NETWORK, "test",
+                                           components=[us.Component("api", "ec2", "API")],
+                                           connections=[us.Connection("api", "ghost")])
+        template = {"metadata": {"title": "T", "project_name": "t", "diagram_type": "network"},
+                    "architecture": {"components": [{"id": "api"}], "connections": [{"id": "c1", "from": "api", "to": "ghost"}]}}
+        
+        engine = RuleEngine(select=["connections"])
+        for index in (DiagramIndex.from_model(self._model()), DiagramIndex.from_xml(xml),
+                      DiagramIndex.from_schema(schema), DiagramIndex.from_template_data(template)):
+            report = engine.run(index)
+            self.assertFalse(report.valid, index.source)
+            self.assertEqual([issue.rule for issue in report.issues], ["connections.dangling"], index.source)
+    
+    def test_selection_severity_and_timings(self):
+        """Test selección por grupo, severidades y tiempos por regla"""
+        
+        from src.validators.diagram_index import DiagramIndex
+        from src.validators.rule_engine import RuleEngine
+        
+        index = DiagramIndex.from_model(self._model())
+        engine = RuleEngine(select=["geometry", "canvas.*"], ignore=["geometry.labels"])
+        report = engine.run(index)
+        
+        self.assertEqual(set(report.timings), {"geometry.bounds", "geometry.overlap", "canvas.size"})
+        self.assertEqual(report.errors, ["Componentes api y db: superpuestos"])
+        self.assertEqual(report.warnings, ["Canvas muy pequeño, recomendado mínimo 800x600"])
+        self.assertIn(report.slowest(1)[0][0], report.timings)
+        
+        engine.run(index)
+        self.assertEqual(engine.timing_summary()["geometry.overlap"]["runs"], 2)
+        
+        # Validadores existentes: mismo motor, su subconjunto de reglas
+        is_valid, errors = DiagramValidator.validate_model(self._model())
+        self.assertFalse(is_valid)
+        self.assertIn("Conexión c1: target ghost no existe", errors)
+        self.assertNotIn("Canvas muy pequeño, recomendado mínimo 800x600", errors)
+        
+        result = MCPIntegrator("mcp.json").validate_mcp_generated_xml(
+            DrawIOTemplates.BASE_TEMPLATE.safe_substitute(title_cell="", content=""), {"aws_services": {"rds": {}}})
+        self.assertTrue(result["structure"]["valid"])
+        self.assertIn("mcp.completeness", result["lint"]["timings_ms"])
+        self.assertEqual(result["lint"]["issues"][-1]["message"], "Componentes esperados sin dibujar: rds")
+
+class BulkValidationTests(unittest.TestCase):
+    """Tests para la validación masiva de un árbol de outputs"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.drawio_dir = self.temp_dir / "outputs" / "drawio"
+        
+        for name, duplicate in (("network", False), ("security", False), ("data_flow", True)):
+            path = self.drawio_dir / "bmc_input" / f"{name}.drawio"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with MxGraphWriter.open(str(path), compressed=name == "security") as writer:
+                writer.start_file()
+                writer.start_diagram(name, name)
+                writer.vertex("rds", "RDS", "shape=mxgraph.aws4.rds;", 100, 100, 78, 78)
+                writer.vertex("rds" if duplicate else "s3", "S3", "shape=mxgraph.aws4.s3;", 300, 100, 78, 78)
+                writer.end_diagram()
+                writer.close()
+    
+    def test_aggregated_reports_and_hash_cache(self):
+        """Test reporte JSON/JUnit y archivos ya validados se omiten"""
+        
+        from src.validators.bulk_validator import validate_tree
+        
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        
+        self.assertEqual(summary["total_files"], 3)
+        self.assertEqual(summary["failed"], [os.path.join("bmc_input", "data_flow.drawio")])
+        self.assertEqual(json.loads(Path(summary["report_paths"]["json"]).read_text(encoding='utf-8'))["passed"], 2)
+        junit = ET.parse(summary["report_paths"]["junit"]).getroot()
+        self.assertEqual((junit.get("tests"), junit.get("failures")), ("3", "1"))
+        self.assertIn("ID duplicado: rds", junit.find(".//failure").text)
+        
+        # Solo el archivo fallido vuelve a validarse
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertEqual((summary["validated"], summary["cached"]), (1, 2))
+        
+        (self.drawio_dir / "bmc_input" / "network.drawio").write_text("<mxfile/>", encoding='utf-8')
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertEqual((summary["validated"], summary["cached"]), (2, 1))
+    
+    def test_tool_is_resolved_once(self):
+        """Test drawio-export se busca una vez por ejecución, no por archivo"""
+        
+        from src.validators.bulk_validator import validate_tree
+        
+        with mock.patch("shutil.which", return_value=None) as which:
+            summary = validate_tree(str(self.drawio_dir), jobs=1, use_cache=False, root_path=str(self.temp_dir))
+        
+        which.assert_called_once_with("drawio-export")
+        self.assertEqual(summary["validated"], 3)
+    
+    def test_identical_copies_validated_once(self):
+        """Test copias con el mismo contenido se validan una vez y reusan el veredicto"""
+        
+        from src.validators.bulk_validator import validate_tree
+        
+        for name in ("network", "data_flow"):
+            content = (self.drawio_dir / "bmc_input" / f"{name}.drawio").read_bytes()
+            for i in range(5):
+                copy = self.drawio_dir / f"copy_{i}" / f"{name}.drawio"
+                copy.parent.mkdir(parents=True, exist_ok=True)
+                copy.write_bytes(content)
+        
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertEqual((summary["total_files"], summary["validated"]), (13, 3))
+        self.assertEqual(len(summary["failed"]), 6)
+        
+        # Una ruta nueva con contenido ya aprobado sale de la caché
+        moved = self.drawio_dir / "moved" / "network.drawio"
+        moved.parent.mkdir()
+        moved.write_bytes((self.drawio_dir / "copy_0" / "network.drawio").read_bytes())
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertEqual((summary["validated"], summary["cached"]), (1, 13))
+    
+    def test_same_verdict_streaming_or_not(self):
+        """Test una conexión a un ID inexistente falla con o sin streaming y no queda en caché"""
+        
+        from src.validators.bulk_validator import validate_file, validate_tree
+        
+        path = self.drawio_dir / "bmc_input" / "network.drawio"
+        with MxGraphWriter.open(str(path)) as writer:
+            writer.start_file()
+            writer.start_diagram("network", "network")
+            writer.vertex("rds", "RDS", "shape=mxgraph.aws4.rds;", 100, 100, 78, 78)
+            writer.edge("e1", "endArrow=classic;", "rds", "nope")
+            writer.end_diagram()
+            writer.close()
+        
+        tree, streamed = validate_file(str(path)), validate_file(str(path), streaming_threshold=0)
+        self.assertEqual((tree["streaming"], streamed["streaming"]), (False, True))
+        self.assertEqual((tree["status"], streamed["status"]), ("failed", "failed"))
+        for result in (tree, streamed):
+            self.assertTrue(any("nope" in error for error in result["errors"]), result["errors"])
+        
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertIn(os.path.join("bmc_input", "network.drawio"), summary["failed"])
+        summary = validate_tree(str(self.drawio_dir), jobs=1, root_path=str(self.temp_dir))
+        self.assertEqual(summary["cached"], 1)
+
+class RasterizerTests(unittest.TestCase):
+    """Tests para los previews PNG/SVG dibujados en el proceso"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.drawio_path = self.temp_dir / "network.drawio"
+        self._write()
+    
+    def _write(self, db_label: str = "RDS", compressed: bool = False) -> None:
+        with MxGraphWriter.open(str(self.drawio_path), compressed=compressed) as writer:
+            writer.start_file()
+            writer.start_diagram("Network", "network")
+            writer.vertex("vpc", "VPC", "fillColor=#F5F5F5;dashed=1;verticalAlign=top;", 20, 20, 500, 300)
+            writer.vertex("api", "API", "shape=mxgraph.aws4.api_gateway;verticalLabelPosition=bottom;", 40, 60, 78, 78, parent="vpc")
+            writer.vertex("db", db_label, "shape=mxgraph.aws4.rds;verticalLabelPosition=bottom;", 360, 200, 78, 78, parent="vpc")
+            writer.vertex("cache", "Cache", "shape=mxgraph.aws4.rds;", 360, 60, 78, 78, parent="vpc")
+            writer.edge("e1", "edgeStyle=orthogonalEdgeStyle;", "api", "db", points=[(250, 120)])
+            writer.edge_label("e1_label", "SQL", "e1")
+            writer.edge("e2", "edgeStyle=orthogonalEdgeStyle;", "api", "cache")
+            writer.end_diagram()
+            writer.close()
+    
+    def test_scene_and_svg(self):
+        """Test coordenadas absolutas, rutas ortogonales y un ícono reutilizado por servicio"""
+        
+        from src.core.drawio_rasterizer import build_scene, render_svg
+        
+        content = self.drawio_path.read_text(encoding='utf-8')
+        scene = build_scene(content)
+        nodes = {item.id: item for item in scene.items if hasattr(item, "box")}
+        edges = {item.id: item for item in scene.items if hasattr(item, "points")}
+        
+        self.assertEqual(nodes["api"].box, (60.0, 80.0, 78.0, 78.0))
+        self.assertEqual(scene.icons, ["api_gateway", "rds"])
+        
+        # Tramos horizontales o verticales, del borde del origen al borde del destino
+        for edge in edges.values():
+            for (x1, y1), (x2, y2) in zip(edge.points, edge.points[1:]):
+                self.assertTrue(x1 == x2 or y1 == y2, edge.points)
+        self.assertEqual(edges["e1"].points[0], (138.0, 120.0))
+        self.assertIn((250.0, 120.0), edges["e1"].points)
+        self.assertEqual(edges["e1"].points[-1][1], 220.0)
+        self.assertEqual(edges["e2"].points, [(138.0, 119.0), (380.0, 119.0)])
+        self.assertEqual(edges["e1"].labels[0][0].lines, ["SQL"])
+        
+        svg = ET.fromstring(render_svg(scene, max_size=(300, 200)))
+        ns = "{http://www.w3.org/2000/svg}"
+        self.assertLessEqual(float(svg.get("width")), 300)
+        self.assertEqual(len(svg.findall(f"{ns}defs/{ns}symbol")), 2)
+        self.assertEqual(len(svg.findall(f"{ns}use")), 3)
+        
+        # Comprimido o plano, el dibujo es el mismo
+        self._write(compressed=True)
+        self.assertEqual(render_svg(build_scene(self.drawio_path.read_text(encoding='utf-8'))), render_svg(scene))
+    
+    def test_previews_cached_by_content(self):
+        """Test el preview se reutiliza hasta que cambia el contenido y el reporte HTML lo embebe"""
+        
+        from src.core import drawio_rasterizer
+        from src.reports.html_report_generator import HTMLReportGenerator
+        
+        output_dir = str(self.temp_dir / "previews")
+        first = drawio_rasterizer.render_preview(str(self.drawio_path), output_dir, fmt="svg")
+        
+        with mock.patch.object(drawio_rasterizer, "build_scene") as build_scene:
+            self.assertEqual(drawio_rasterizer.render_preview(str(self.drawio_path), output_dir, fmt="svg"), first)
+        build_scene.assert_not_called()
+        
+        self._write(db_label="RDS Primary")
+        second = drawio_rasterizer.render_preview(str(self.drawio_path), output_dir, fmt="svg")
+        self.assertNotEqual(second, first)
+        self.assertEqual([path.name for path in Path(output_dir).iterdir()], [Path(second).name])
+        
+        html = HTMLReportGenerator(str(self.temp_dir))._get_diagram_preview({"path": str(self.drawio_path)}, "demo")
+        self.assertIn("data:image/svg+xml;base64,", html)
+        self.assertEqual(len(list((self.temp_dir / "reports" / "demo" / "previews").glob("*.svg"))), 1)
+    
+    def test_projects_with_same_file_name_keep_their_previews(self):
+        """Test dos proyectos con el mismo nombre de .drawio no se borran los previews entre sí"""
+        
+        from src.core import drawio_rasterizer
+        
+        output_dir = str(self.temp_dir / "previews")
+        sources = []
+        for project in ("bmc_input", "other"):
+            source = self.temp_dir / "drawio" / project / "professional_architecture.drawio"
+            source.parent.mkdir(parents=True)
+            source.write_text(self.drawio_path.read_text(encoding='utf-8').replace("VPC", f"VPC {project}"), encoding='utf-8')
+            sources.append(source)
+        
+        previews = [drawio_rasterizer.render_preview(str(source), output_dir, fmt="svg") for source in sources]
+        self.assertTrue(all(Path(preview).exists() for preview in previews))
+        
+        with mock.patch.object(drawio_rasterizer, "build_scene") as build_scene:
+            self.assertEqual([drawio_rasterizer.render_preview(str(source), output_dir, fmt="svg") for source in sources],
+                             previews)
+        build_scene.assert_not_called()
+    
+    @unittest.skipUnless(HAS_PIL, "Pillow no instalado")
+    def test_png_preview_without_drawio_export(self):
+        """Test DrawIOPreview genera el PNG en el proceso aunque no haya drawio-export"""
+        
+        from src.validators.drawio_validator import DrawIOPreview
+        
+        with mock.patch("subprocess.run") as run:
+            preview = DrawIOPreview.generate_png_preview(str(self.drawio_path), str(self.temp_dir))
+        
+        run.assert_not_called()
+        data = Path(preview).read_bytes()
+        self.assertEqual(data[:8], b"\x89PNG\r\n\x1a\n")
+
 class EndToEndTests(unittest.TestCase):
     """Tests end-to-end del sistema completo"""
     
@@ -408,6 +1439,19 @@ def run_all_tests():
         XMLValidationTests,
         TemplateGenerationTests,
         MCPIntegrationTests,
+        DiagramModelTests,
+        HierarchicalLayoutTests,
+        ForceDirectedLayoutTests,
+        IncrementalLayoutTests,
+        ContainerLayoutTests,
+        EdgeRouterTests,
+        SpatialValidationTests,
+        MxGraphWriterTests,
+        DrawIOBundlerTests,
+        StreamingValidationTests,
+        BulkValidationTests,
+        RuleEngineTests,
+        RasterizerTests,
         EndToEndTests
     ]
     
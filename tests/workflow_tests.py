@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Workflow Tests - Tests del orquestador y la ejecución de etapas
+"""
+
+import io
+import os
+import json
+import sys
+import subprocess
+import unittest
+import tempfile
+import time
+import threading
+from pathlib import Path
+
+from src.core.workflow_orchestrator import WorkflowOrchestrator
+from src.core.build_cache import BuildCache, stable_config
+from src.core.pipeline import PipelineEngine, PipelineNode
+from src.core.watcher import WorkflowWatcher
+from src.core.app_config import AppConfig
+from src.core.batch_runner import project_name_from_spec, run_batch
+from src.core.tracing import Tracer
+from src.core.logger import get_logger, setup_logging, capture_logs
+from tools.scripts.generator_benchmark import build_schema, build_model, run_benchmark, append_history, compare
+
+class PipelineEngineTests(unittest.TestCase):
+    """Tests para el motor de pipeline por dependencias"""
+    
+    def _engine(self, max_workers=1):
+        """Pipeline config -> png:a/png:b -> report"""
+        engine = PipelineEngine(max_workers=max_workers)
+        engine.add_node(PipelineNode("config", lambda deps: {"value": 1}))
+        engine.add_node(PipelineNode("png:a", lambda deps: deps["config"]["value"] + 1, inputs=["config"]))
+        engine.add_node(PipelineNode("png:b", lambda deps: deps["config"]["value"] + 2, inputs=["config"]))
+        engine.add_node(PipelineNode("report", lambda deps: sum(deps.values()), inputs=["png:a", "png:b"]))
+        return engine
+    
+    def test_resolve_runs_only_required_nodes(self):
+        """Test un target ejecuta solo sus dependencias"""
+        
+        engine = self._engine()
+        self.assertEqual(engine.resolve("png:a"), ["config", "png:a"])
+        
+        outputs = engine.run("png:a")
+        self.assertEqual(set(outputs), {"config", "png:a"})
+        self.assertEqual(set(engine.timings), {"config", "png:a"})
+    
+    def test_prefix_target_expands_group(self):
+        """Test target "png" incluye todos los nodos png:*"""
+        
+        engine = self._engine()
+        self.assertEqual(engine.expand_targets("png"), ["png:a", "png:b"])
+        self.assertEqual(engine.run(["report"])["report"], 5)
+        
+        with self.assertRaises(ValueError):
+            engine.expand_targets("desconocido")
+    
+    def test_cycle_detected(self):
+        """Test ciclos de dependencias se reportan"""
+        
+        engine = PipelineEngine()
+        engine.add_node(PipelineNode("a", lambda deps: 1, inputs=["b"]))
+        engine.add_node(PipelineNode("b", lambda deps: 2, inputs=["a"]))
+        
+        with self.assertRaises(ValueError):
+            engine.resolve("a")
+    
+    def test_failure_skips_dependents(self):
+        """Test un nodo fallido omite a sus dependientes y registra tiempo"""
+        
+        engine = self._engine()
+        
+        def failing(deps):
+            raise RuntimeError("fallo")
+        
+        engine.nodes["png:a"].func = failing
+        outputs = engine.run("report")
+        
+        self.assertIn("png:b", outputs)
+        self.assertNotIn("report", outputs)
+        self.assertIn("png:a", engine.errors)
+        self.assertIn("png:a", engine.timings)
+        self.assertEqual(engine.skipped, ["report"])
+    
+    def test_independent_nodes_run_concurrently(self):
+        """Test nodos independientes se ejecutan en paralelo"""
+        
+        engine = PipelineEngine(max_workers=3)
+        for name in ("a", "b", "c"):
+            engine.add_node(PipelineNode(name, lambda deps: time.sleep(0.2) or "ok"))
+        
+        start = time.perf_counter()
+        outputs = engine.run()
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(outputs, {"a": "ok", "b": "ok", "c": "ok"})
+        self.assertLess(elapsed, 0.5, "Los nodos deben ejecutarse concurrentemente")
+    
+    def test_orchestrator_pipeline_targets(self):
+        """Test el orquestador expone todos los generadores como nodos"""
+        
+        engine = WorkflowOrchestrator("test_project", use_cache=False).build_pipeline()
+        
+        self.assertEqual(engine.resolve("prompts"), ["config", "prompts"])
+        self.assertEqual(len(engine.expand_targets("png")), len(WorkflowOrchestrator.PNG_TYPES))
+        self.assertIn("html_report", engine.nodes)
+        self.assertIn("drawio:bundle", engine.expand_targets("drawio"))
+        self.assertEqual(engine.resolve("final_report")[-2:], ["results", "final_report"])
+
+class WatcherTests(unittest.TestCase):
+    """Tests para el modo watch"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.watcher = WorkflowWatcher(WorkflowOrchestrator("test_project", use_cache=False))
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def test_diff_detects_modified_created_and_deleted(self):
+        """Test diff de snapshots detecta cambios"""
+        
+        spec = self.temp_dir / "spec.md"
+        template = self.temp_dir / "net.drawio"
+        before = {spec: (1, 10), template: (1, 20)}
+        after = {spec: (2, 10), self.temp_dir / "new.drawio": (1, 5)}
+        
+        changed = WorkflowWatcher.diff(before, after)
+        self.assertEqual(set(changed), {spec, template, self.temp_dir / "new.drawio"})
+        self.assertEqual(WorkflowWatcher.diff(before, dict(before)), [])
+    
+    def test_targets_for_changes(self):
+        """Test plantillas regeneran solo DrawIO de plantillas"""
+        
+        self.assertEqual(self.watcher.targets_for([Path("templates/aws_network.drawio")]),
+                         ["drawio:template", "html_report"])
+        
+        targets = self.watcher.targets_for([Path("config/bmc-input-specification.md"),
+                                            Path("templates/aws_network.drawio")])
+        self.assertIn("final_report", targets)
+        self.assertIn("drawio:template", targets)
+    
+    def test_burst_is_debounced(self):
+        """Test una ráfaga de cambios produce una sola regeneración"""
+        
+        watched = self.temp_dir / "spec.md"
+        watched.write_text("v0", encoding='utf-8')
+        self.watcher.watched_files = lambda: [watched]
+        self.watcher.interval = 0.01
+        self.watcher.debounce = 0.15
+        
+        def burst():
+            for version in range(3):
+                time.sleep(0.03)
+                watched.write_text(f"v{version + 1}" * (version + 2), encoding='utf-8')
+        
+        state = self.watcher.snapshot()
+        writer = threading.Thread(target=burst)
+        writer.start()
+        changed, new_state = self.watcher.wait_for_changes(state)
+        writer.join()
+        
+        self.assertEqual(changed, [watched])
+        self.assertEqual(new_state, self.watcher.snapshot())
+
+class StartupImportTests(unittest.TestCase):
+    """Tests para imports diferidos de dependencias pesadas"""
+    
+    def test_entry_points_do_not_load_heavy_dependencies(self):
+        """Test run.py y generadores no importan diagrams/requests al arrancar"""
+        
+        root = Path(__file__).resolve().parents[1]
+        code = (
+            "import sys, run, main, generators.diagram_generator, generators.universal_generator, "
+            "validators.diagram_validator, validators.drawio_validator, integrations.drawio_api_client; "
+            "print(','.join(m for m in ('diagrams', 'graphviz', 'PIL', 'requests', 'flask') if m in sys.modules))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(root / "src"), str(root)]))
+        
+        completed = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                                   capture_output=True, text=True)
+        
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), "")
+
+class BatchRunTests(unittest.TestCase):
+    """Tests para la ejecución batch multi-proyecto"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.root = Path(tempfile.mkdtemp())
+        (self.root / "src").mkdir()
+        (self.root / "config").mkdir()
+        self.spec = self.root / "config" / "client-a-input-specification.md"
+        self.spec.write_text("# Cliente A\n\n### Invoice Service\n- Facturación\n", encoding='utf-8')
+    
+    def test_project_name_from_spec(self):
+        """Test nombre de proyecto derivado del archivo"""
+        
+        self.assertEqual(project_name_from_spec("specs/client-a-input-specification.md"), "client_a")
+        self.assertEqual(project_name_from_spec("specs/Cliente B.md"), "cliente_b")
+    
+    def test_app_config_instances_are_isolated(self):
+        """Test cada proyecto tiene su propia caché y directorio generado"""
+        
+        config_a = AppConfig(str(self.root), spec_file=str(self.spec), project_name="client_a")
+        config_b = AppConfig(str(self.root), project_name="client_b")
+        
+        config_a.save_config("bmc", {"project": "a"})
+        
+        self.assertNotEqual(config_a.paths.outputs_generated_dir, config_b.paths.outputs_generated_dir)
+        self.assertEqual(config_a.load_config("bmc"), {"project": "a"})
+        self.assertNotIn("bmc", config_b._config_cache)
+        self.assertEqual(config_a.spec_file, self.spec)
+    
+    def test_batch_summary_records_failures(self):
+        """Test el resumen incluye duración por proyecto y fallos"""
+        
+        summary = run_batch([str(self.spec), str(self.root / "missing.md")], jobs=2,
+                            root_path=str(self.root))
+        
+        by_project = {result["project"]: result for result in summary["projects"]}
+        self.assertEqual(by_project["client_a"]["status"], "ok")
+        self.assertIsNotNone(by_project["client_a"]["duration_seconds"])
+        self.assertEqual(summary["failed"], ["missing"])
+        self.assertTrue((self.root / "outputs" / "generated" / "client_a" / "bmc.json").exists())
+        self.assertTrue(Path(summary["summary_path"]).exists())
+
+class TracerTests(unittest.TestCase):
+    """Tests para spans, perfiles y export Chrome trace"""
+    
+    def test_nested_spans_and_chrome_export(self):
+        """Test spans anidados registran padre y exportan eventos X"""
+        
+        tracer = Tracer()
+        with tracer.span("stage_a", "stage"):
+            with tracer.span("Generator.run"):
+                time.sleep(0.01)
+        
+        breakdown = tracer.breakdown()
+        self.assertEqual(breakdown["Generator.run"]["parent"], "stage_a")
+        self.assertGreaterEqual(breakdown["stage_a"]["total_seconds"], breakdown["Generator.run"]["total_seconds"])
+        
+        events = tracer.to_chrome_trace()["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["stage_a", "Generator.run"])
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] > 0 for event in events))
+    
+    def test_profile_and_memory_capture(self):
+        """Test cProfile y tracemalloc por etapa cuando están activados"""
+        
+        tracer = Tracer(profile=True, memory=True)
+        with tracer.span("stage_a", "stage", profile=True):
+            data = [str(i) for i in range(10000)]
+        tracer.close()
+        
+        entry = tracer.breakdown()["stage_a"]
+        self.assertTrue(entry["top_functions"])
+        self.assertGreater(entry["memory_peak_kb"], 0)
+        
+        files = tracer.export(Path(tempfile.mkdtemp()), "test_project")
+        self.assertTrue(Path(files["trace"]).exists())
+        self.assertTrue(Path(files["profile:stage_a"]).exists())
+        self.assertEqual(len(data), 10000)
+    
+    def test_pipeline_records_stage_spans(self):
+        """Test el motor abre un span por nodo ejecutado"""
+        
+        tracer = Tracer()
+        engine = PipelineEngine(tracer=tracer)
+        engine.add_node(PipelineNode("config", lambda deps: 1))
+        engine.add_node(PipelineNode("prompts", lambda deps: 2, inputs=["config"]))
+        engine.run("prompts")
+        
+        self.assertEqual({name: entry["category"] for name, entry in tracer.breakdown().items()},
+                         {"config": "stage", "prompts": "stage"})
+
+class GeneratorBenchmarkTests(unittest.TestCase):
+    """Tests para el benchmark de generadores sobre arquitecturas sintéticas"""
+    
+    def test_synthetic_architectures_have_requested_size(self):
+        """Test esquema y modelo sintéticos tienen N componentes y conexiones"""
+        
+        schema = build_schema(100)
+        in_containers = sum(len(c.components) + sum(len(child.components) for child in c.children)
+                            for c in schema.containers)
+        self.assertEqual(len(schema.components) + in_containers, 100)
+        self.assertEqual(len(schema.connections), 100)
+        
+        model = build_model(100)
+        self.assertEqual((len(model.components), len(model.connections)), (100, 100))
+        self.assertEqual(model.validate(), [])
+    
+    def test_history_detects_regressions(self):
+        """Test cada ejecución se agrega al historial y se compara con la anterior"""
+        
+        history_path = Path(tempfile.mkdtemp()) / "history.json"
+        report = run_benchmark(sizes=[10], repeat=1)
+        # Solo se toleran dependencias opcionales no instaladas (p.ej. yaml en el conversor)
+        self.assertFalse([entry for entry in report["results"]
+                          if "error" in entry and not entry["error"].startswith("ModuleNotFoundError")])
+        report["results"] = [entry for entry in report["results"] if "median_s" in entry]
+        
+        append_history(history_path, report)
+        slower = {"results": [dict(entry, median_s=entry["median_s"] * 2 + 0.01) for entry in report["results"]]}
+        history, previous = append_history(history_path, slower)
+        
+        self.assertEqual(len(history), 2)
+        self.assertEqual(len(compare(slower, previous)), len(report["results"]))
+        self.assertEqual(compare(report, previous), [])
+
+class LoggerTests(unittest.TestCase):
+    """Tests para la capa central de logging"""
+    
+    def tearDown(self):
+        setup_logging(async_output=False, stream=io.StringIO())
+    
+    def test_json_output_includes_extra_fields(self):
+        """Test modo JSON emite una línea por registro con campos extra"""
+        
+        stream = io.StringIO()
+        setup_logging(json_output=True, async_output=False, stream=stream)
+        get_logger("tests").info("✅ Generado %s", "network", extra={"target": "png:network"})
+        
+        entry = json.loads(stream.getvalue().strip())
+        self.assertEqual(entry["message"], "✅ Generado network")
+        self.assertEqual(entry["logger"], "bmc.tests")
+        self.assertEqual(entry["target"], "png:network")
+    
+    def test_quiet_mode_skips_formatting(self):
+        """Test en modo quiet los mensajes informativos no se formatean"""
+        
+        class Counter:
+            calls = 0
+            def __str__(self):
+                Counter.calls += 1
+                return "valor"
+        
+        stream = io.StringIO()
+        setup_logging(quiet=True, async_output=False, stream=stream)
+        get_logger("tests").info("📊 %s", Counter())
+        get_logger("tests").error("❌ %s", Counter())
+        
+        self.assertEqual(Counter.calls, 1)
+        self.assertEqual(stream.getvalue(), "❌ valor\n")
+    
+    def test_capture_logs_restores_async_output(self):
+        """Test capture_logs redirige y restaura la salida asíncrona"""
+        
+        console, captured = io.StringIO(), io.StringIO()
+        setup_logging(stream=console)
+        
+        with capture_logs(captured, json_output=False):
+            get_logger("tests").info("proyecto a")
+        get_logger("tests").info("consola")
+        setup_logging(async_output=False, stream=io.StringIO())
+        
+        self.assertEqual(captured.getvalue(), "proyecto a\n")
+        self.assertEqual(console.getvalue(), "consola\n")
+
+class BuildCacheTests(unittest.TestCase):
+    """Tests para la caché incremental de artefactos"""
+    
+    def setUp(self):
+        """Configuración inicial"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manifest = self.temp_dir / "manifest.json"
+        self.output = self.temp_dir / "prompt.md"
+        self.output.write_text("contenido", encoding='utf-8')
+    
+    def test_hit_after_store_and_reload(self):
+        """Test artefacto almacenado se reutiliza tras recargar manifiesto"""
+        
+        cache = BuildCache(self.manifest)
+        key = cache.compute_key({"mcp": {"microservices": {"a": {}}}})
+        self.assertIsNone(cache.lookup("prompts", key))
+        
+        cache.store("prompts", key, {"architecture": str(self.output)})
+        cache.save()
+        
+        reloaded = BuildCache(self.manifest)
+        self.assertEqual(reloaded.lookup("prompts", key), {"architecture": str(self.output)})
+        self.assertEqual(reloaded.summary()["hits"], ["prompts"])
+    
+    def test_changed_inputs_or_missing_outputs_miss(self):
+        """Test entradas distintas o salidas borradas invalidan el artefacto"""
+        
+        cache = BuildCache(self.manifest)
+        key = cache.compute_key({"mcp": {"a": 1}})
+        cache.store("prompts", key, {"architecture": str(self.output)})
+        
+        self.assertIsNone(cache.lookup("prompts", cache.compute_key({"mcp": {"a": 2}})))
+        
+        self.output.unlink()
+        self.assertIsNone(cache.lookup("prompts", key))
+    
+    def test_source_changes_invalidate_key(self):
+        """Test cambios en el código del generador cambian la clave"""
+        
+        source = self.temp_dir / "generator.py"
+        source.write_text("VERSION = 1", encoding='utf-8')
+        key_v1 = BuildCache(self.manifest).compute_key({}, [source])
+        
+        source.write_text("VERSION = 2", encoding='utf-8')
+        key_v2 = BuildCache(self.manifest).compute_key({}, [source])
+        
+        self.assertNotEqual(key_v1, key_v2)
+    
+    def test_helper_changes_invalidate_key(self):
+        """Test la clave incluye los módulos que el generador importa transitivamente"""
+        
+        src = self.temp_dir / "src"
+        for path, code in (("generators/gen.py", "from core.writer import write\n"),
+                           ("core/writer.py", "from .schema import SCHEMA\nimport json\n"),
+                           ("core/schema.py", "SCHEMA = 1\n"),
+                           ("core/unused.py", "")):
+            (src / path).parent.mkdir(parents=True, exist_ok=True)
+            (src / path).write_text(code, encoding='utf-8')
+        
+        sources = BuildCache(self.manifest).source_closure([src / "generators" / "gen.py"], src)
+        self.assertEqual([path.name for path in sources], ["schema.py", "writer.py", "gen.py"])
+        
+        key = lambda: BuildCache(self.manifest).compute_key({}, BuildCache(self.manifest).source_closure(
+            [src / "generators" / "gen.py"], src))
+        key_v1 = key()
+        (src / "core" / "schema.py").write_text("SCHEMA = 2\n", encoding='utf-8')
+        self.assertNotEqual(key(), key_v1)
+    
+    def test_stable_config_ignores_metadata(self):
+        """Test metadatos volátiles no afectan la clave"""
+        
+        config_a = {"microservices": {}, "metadata": {"generated_at": "2025-01-01"}}
+        config_b = {"microservices": {}, "metadata": {"generated_at": "2025-02-01"}}
+        self.assertEqual(stable_config(config_a), stable_config(config_b))
+
+if __name__ == '__main__':
+    unittest.main()
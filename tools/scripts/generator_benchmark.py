@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Generator Benchmark - Tiempos de generadores sobre arquitecturas sintéticas
+
+Sintetiza esquemas universales, configuraciones MCP y modelos de diagrama
+de 10 a 10.000 componentes, mide las etapas de generación, layout y
+validación, y agrega cada ejecución al historial JSON en outputs/benchmarks
+para que las regresiones se vean en el diff de la revisión.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from core.universal_schema import (UniversalDiagramSchema, DiagramType, Component, Container,
+                                   Connection, Position, Size, Style)
+from models.diagram_model import DiagramModel, DiagramModelBuilder, LayoutType
+from models.diagram_model import Connection as ModelConnection, Style as ModelStyle
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+HISTORY_FILE = ROOT / "outputs" / "benchmarks" / "generator_history.json"
+
+# Componentes por contenedor en los esquemas sintéticos
+CONTAINER_CAPACITY = 10
+
+COMPONENT_TYPES = ["api_gateway", "fargate", "rds", "elasticache", "s3", "cloudfront", "waf", "cognito"]
+MICROSERVICE_KINDS = ["product", "invoice", "certificate", "ocr", "notification"]
+AWS_SERVICE_KINDS = ["rds", "redis", "s3", "api_gateway", "cloudfront", "waf"]
+
+def build_schema(size: int, seed: int = 42) -> UniversalDiagramSchema:
+    """Esquema universal con `size` componentes, contenedores anidados y conexiones"""
+    
+    rng = random.Random(seed)
+    schema = UniversalDiagramSchema(
+        title=f"Benchmark {size}",
+        diagram_type=DiagramType.MICROSERVICES,
+        project_name=f"benchmark_{size}"
+    )
+    
+    def component(index: int) -> Component:
+        return Component(
+            id=f"comp_{index}",
+            type=COMPONENT_TYPES[index % len(COMPONENT_TYPES)],
+            label=f"Component {index}",
+            position=Position(100 + (index % 20) * 120, 100 + (index // 20) * 120),
+            size=Size(78, 78)
+        )
+    
+    # Una quinta parte fuera de contenedores, el resto agrupado en contenedores
+    external = max(1, size // 5)
+    schema.components.extend(component(i) for i in range(external))
+    
+    index = external
+    while index < size:
+        number = len(schema.containers)
+        container = Container(
+            f"container_{number}", f"Container {number}",
+            Position(50 + (number % 10) * 300, 300 + (number // 10) * 300), Size(280, 280)
+        )
+        container.components.extend(component(i) for i in range(index, min(index + CONTAINER_CAPACITY, size)))
+        index += CONTAINER_CAPACITY
+        
+        # Contenedores alternos llevan un hijo anidado
+        if number % 2 and index < size:
+            child = Container(f"container_{number}_child", f"Subnet {number}", Position(20, 40), Size(240, 200))
+            child.components.extend(component(i) for i in range(index, min(index + CONTAINER_CAPACITY, size)))
+            index += CONTAINER_CAPACITY
+            container.children.append(child)
+        
+        schema.containers.append(container)
+    
+    schema.connections.extend(
+        Connection(f"comp_{rng.randrange(size)}", f"comp_{rng.randrange(size)}", "HTTPS", Style("#2196F3", 2))
+        for _ in range(size)
+    )
+    
+    return schema
+
+def build_mcp_config(size: int) -> Dict[str, Any]:
+    """Configuración MCP con `size` servicios (mitad microservicios, mitad AWS)"""
+    
+    microservices = {
+        f"{MICROSERVICE_KINDS[i % len(MICROSERVICE_KINDS)]}_{i}": {
+            "scaling": {"cpu": "2vCPU", "memory": "4GB", "min_capacity": 2, "max_capacity": 10}
+        }
+        for i in range(size // 2)
+    }
+    aws_services = {
+        f"{AWS_SERVICE_KINDS[i % len(AWS_SERVICE_KINDS)]}_{i}": {"instance_class": "db.r6g.large"}
+        for i in range(size - size // 2)
+    }
+    
+    return {"project": {"name": f"benchmark_{size}"}, "microservices": microservices, "aws_services": aws_services}
+
+def build_model(size: int, seed: int = 42) -> DiagramModel:
+    """Modelo de diagrama desde la configuración MCP, completado hasta `size` conexiones"""
+    
+    rng = random.Random(seed)
+    model = DiagramModelBuilder.from_config(build_mcp_config(size))
+    ids = [component.id for component in model.components]
+    
+    while len(model.connections) < size:
+        source, target = rng.choice(ids), rng.choice(ids)
+        model.add_connection(ModelConnection(
+            id=f"conn_{len(model.connections)}", source=source, target=target,
+            label="HTTPS", style=ModelStyle(stroke_color="#2196F3", font_color="#2196F3")
+        ))
+    
+    return model
+
+def schema_to_converter_model(schema: UniversalDiagramSchema) -> Dict[str, Any]:
+    """Esquema universal en el formato que espera ModelToDrawIOConverter"""
+    
+    data = schema.to_dict()
+    for container, source in zip(data["containers"], schema.containers):
+        container["geometry"] = {"x": source.position.x, "y": source.position.y,
+                                 "width": source.size.width, "height": source.size.height}
+    
+    return data
+
+@contextmanager
+def working_directory(path: Path):
+    """El conversor escribe en rutas relativas: se aísla en un directorio temporal"""
+    
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def _case_universal_drawio(size: int, workdir: Path) -> Callable[[], Any]:
+    from generators.universal_generator import UniversalGenerator
+    
+    generator = UniversalGenerator(str(workdir))
+    (workdir / "drawio").mkdir(parents=True, exist_ok=True)
+    schema = build_schema(size)
+    return lambda: generator._generate_drawio(schema)
+
+def _case_xml_renderer(size: int, workdir: Path) -> Callable[[], Any]:
+    from generators.refactored_drawio_generator import XMLRenderer
+    
+    model = build_model(size)
+    return lambda: XMLRenderer().render_model(model)
+
+def _case_xml_validator(size: int, workdir: Path) -> Callable[[], Any]:
+    from generators.refactored_drawio_generator import XMLRenderer
+    from validators.xml_validator import DrawIOXMLValidator
+    
+    xml_content = XMLRenderer().render_model(build_model(size))
+    validator = DrawIOXMLValidator()
+    
+    def run():
+        analysis = validator.analyze(xml_content)
+        validator.validate_xml_structure(analysis)
+        return validator.validate_aws_components(analysis)
+    
+    return run
+
+def _case_layout(layout: LayoutType) -> Callable[[int, Path], Callable[[], Any]]:
+    def setup(size: int, workdir: Path) -> Callable[[], Any]:
+        from layouts.diagram_layouts import LayoutEngine
+        
+        model = build_model(size)
+        model.layout = layout
+        return lambda: LayoutEngine.apply_layout(model)
+    
+    return setup
+
+def _case_converter(size: int, workdir: Path) -> Callable[[], Any]:
+    from converters.model_to_drawio_converter import ModelToDrawIOConverter
+    
+    data = schema_to_converter_model(build_schema(size))
+    converter = ModelToDrawIOConverter()
+    
+    def run():
+        with working_directory(workdir):
+            return converter.convert_dict_to_drawio(data, f"benchmark_{size}")
+    
+    return run
+
+# Caso -> preparación (fuera del tiempo medido) que retorna la llamada a medir
+CASES: Dict[str, Callable[[int, Path], Callable[[], Any]]] = {
+    "universal_generator.drawio": _case_universal_drawio,
+    "xml_renderer.render_model": _case_xml_renderer,
+    "xml_validator.validate": _case_xml_validator,
+    **{f"layout.{layout.value}": _case_layout(layout) for layout in LayoutType},
+    "model_to_drawio_converter": _case_converter,
+}
+
+def measure(call: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Ejecuta `call` `repeat` veces y retorna mínimo y mediana en segundos"""
+    
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    
+    return {"min_s": round(min(timings), 6), "median_s": round(statistics.median(timings), 6), "repeat": repeat}
+
+def run_benchmark(sizes: List[int] = None, cases: List[str] = None, repeat: int = 3) -> Dict[str, Any]:
+    """Mide cada caso para cada tamaño"""
+    
+    sizes = sizes or DEFAULT_SIZES
+    cases = cases or list(CASES)
+    results = []
+    
+    with tempfile.TemporaryDirectory(prefix="bmc_benchmark_") as temp_dir:
+        workdir = Path(temp_dir)
+        for size in sizes:
+            for case in cases:
+                entry = {"case": case, "size": size}
+                try:
+                    entry.update(measure(CASES[case](size, workdir), repeat))
+                except Exception as e:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                results.append(entry)
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "results": results
+    }
+
+def _git_commit() -> Optional[str]:
+    """Commit actual, para asociar cada entrada del historial a un cambio"""
+    
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                   capture_output=True, text=True, timeout=10)
+        return completed.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    """Historial de ejecuciones anteriores (lista vacía si no existe)"""
+    
+    if not path.exists():
+        return []
+    
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except json.JSONDecodeError:
+        return []
+
+def compare(report: Dict[str, Any], previous: Optional[Dict[str, Any]],
+            threshold: float = 0.25, min_delta_s: float = 0.001) -> List[Dict[str, Any]]:
+    """Casos cuya mediana empeoró más que `threshold` respecto a la ejecución anterior
+    
+    Diferencias menores a `min_delta_s` se ignoran: en tamaños pequeños
+    el ruido del sistema supera cualquier cambio real.
+    """
+    
+    if not previous:
+        return []
+    
+    baseline = {(entry["case"], entry["size"]): entry for entry in previous["results"] if "median_s" in entry}
+    regressions = []
+    
+    for entry in report["results"]:
+        before = baseline.get((entry["case"], entry["size"]))
+        if before is None or "median_s" not in entry:
+            continue
+        
+        delta = entry["median_s"] - before["median_s"]
+        if delta > min_delta_s and entry["median_s"] > before["median_s"] * (1 + threshold):
+            regressions.append({
+                "case": entry["case"],
+                "size": entry["size"],
+                "before_s": before["median_s"],
+                "after_s": entry["median_s"],
+                "ratio": round(entry["median_s"] / before["median_s"], 2) if before["median_s"] else None
+            })
+    
+    return regressions
+
+def append_history(path: Path, report: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Agrega la ejecución al historial y retorna (historial, ejecución anterior)"""
+    
+    history = load_history(path)
+    previous = history[-1] if history else None
+    history.append(report)
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2), encoding='utf-8')
+    
+    return history, previous
+
+def main():
+    """Función principal"""
+    
+    parser = argparse.ArgumentParser(description="Benchmark de generadores sobre arquitecturas sintéticas")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Número de componentes por arquitectura (default: 10 100 1000 10000)')
+    parser.add_argument('--case', choices=list(CASES), nargs='+',
+                        help='Casos a medir (default: todos)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Repeticiones por caso; se reporta mínimo y mediana')
+    parser.add_argument('--history', default=str(HISTORY_FILE),
+                        help='Archivo JSON con el historial de ejecuciones')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Empeoramiento relativo que cuenta como regresión (default 0.25)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Retorna 1 si algún caso empeoró respecto a la ejecución anterior')
+    args = parser.parse_args()
+    
+    report = run_benchmark(args.sizes, args.case, max(1, args.repeat))
+    _, previous = append_history(Path(args.history), report)
+    regressions = compare(report, previous, args.threshold)
+    regressed = {(entry["case"], entry["size"]) for entry in regressions}
+    
+    for entry in report["results"]:
+        if "error" in entry:
+            print(f"⚠️ {entry['case']} [{entry['size']}]: {entry['error']}")
+            continue
+        
+        status = "❌" if (entry["case"], entry["size"]) in regressed else "✅"
+        print(f"{status} {entry['case']} [{entry['size']}]: {entry['median_s'] * 1000:.2f} ms "
+              f"(min {entry['min_s'] * 1000:.2f} ms)")
+    
+    for regression in regressions:
+        print(f"   Regresión {regression['case']} [{regression['size']}]: "
+              f"{regression['before_s'] * 1000:.2f} → {regression['after_s'] * 1000:.2f} ms (x{regression['ratio']})")
+    
+    print(f"📄 Historial: {args.history}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
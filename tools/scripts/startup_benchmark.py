@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Mide tiempo de import de cada punto de entrada
+
+Ejecuta `python -X importtime` por entrada, guarda el desglose en
+outputs/benchmarks y falla si se cargan dependencias pesadas al arrancar.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Punto de entrada -> módulo importado en frío
+ENTRY_POINTS = {
+    "run.py": "run",
+    "src/main.py": "main",
+    "flask_app": "src.api.diagram_api",
+}
+
+# Dependencias que solo deben cargarse en el camino que las usa
+HEAVY_MODULES = ["diagrams", "graphviz", "PIL", "numpy", "requests"]
+
+# Entradas que cargan flask de forma legítima
+ALLOWED_HEAVY = {
+    "flask_app": ["flask", "flask_cors"],
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_entry_point(name: str, module: str) -> Dict[str, Any]:
+    """Importa un módulo en un proceso limpio y parsea -X importtime"""
+    
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT / "src"), str(ROOT)])
+    
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": (len(match.group(3)) - 1) // 2
+            })
+    
+    loaded = {entry["module"].split(".")[0] for entry in imports}
+    heavy = [m for m in HEAVY_MODULES + ["flask"] if m in loaded and m not in ALLOWED_HEAVY.get(name, [])]
+    top_level = [entry for entry in imports if entry["depth"] == 0]
+    
+    return {
+        "entry_point": name,
+        "module": module,
+        "ok": completed.returncode == 0,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode else None,
+        "total_ms": round(sum(entry["cumulative_us"] for entry in top_level) / 1000, 2),
+        "module_count": len(imports),
+        "heavy_imports": heavy,
+        "slowest": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 2)}
+            for entry in sorted(top_level, key=lambda e: e["cumulative_us"], reverse=True)[:10]
+        ]
+    }
+
+def run_benchmark(entry_points: List[str] = None) -> Dict[str, Any]:
+    """Mide todos los puntos de entrada"""
+    
+    entry_points = entry_points or list(ENTRY_POINTS)
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "results": [measure_entry_point(name, ENTRY_POINTS[name]) for name in entry_points]
+    }
+
+def main():
+    """Función principal"""
+    
+    parser = argparse.ArgumentParser(description="Benchmark de arranque por punto de entrada")
+    parser.add_argument('--entry', choices=list(ENTRY_POINTS), nargs='+',
+                        help='Puntos de entrada a medir (default: todos)')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='Falla si alguna entrada supera este tiempo de import')
+    parser.add_argument('--output', default=str(ROOT / "outputs" / "benchmarks"),
+                        help='Directorio donde guardar el reporte JSON')
+    args = parser.parse_args()
+    
+    report = run_benchmark(args.entry)
+    
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    
+    failed = False
+    for result in report["results"]:
+        if not result["ok"]:
+            # Dependencias no instaladas: se reporta pero no cuenta como regresión
+            print(f"⚠️ {result['entry_point']}: no importable ({result['error']})")
+            continue
+        
+        status = "✅"
+        if result["heavy_imports"]:
+            status, failed = "❌", True
+        if args.max_ms is not None and result["total_ms"] > args.max_ms:
+            status, failed = "❌", True
+        
+        print(f"{status} {result['entry_point']}: {result['total_ms']:.1f} ms, "
+              f"{result['module_count']} módulos")
+        if result["heavy_imports"]:
+            print(f"   Dependencias pesadas al arrancar: {', '.join(result['heavy_imports'])}")
+    
+    print(f"📄 Reporte: {report_path}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())